@@ -13,7 +13,7 @@ Usage:
 """
 
 import os
-from typing import Literal, Dict, Optional
+from typing import Literal, Dict, List, Optional
 
 from aws_cdk import (
     Stack,
@@ -22,12 +22,21 @@ from aws_cdk import (
     aws_iam as iam,
     aws_apigateway as apigateway,
     aws_lambda as _lambda,
+    aws_events as events,
+    aws_events_targets as targets,
     Duration,
+    Size,
 )
 from constructs import Construct
 
 from cdk.utils import generate_lambda_powertools_arn, load_config
 
+# Runtimes SnapStart is available for (the Python ones since 3.12)
+SNAP_START_RUNTIMES = ("python3.12", "python3.13", "java11", "java17", "java21", "dotnet8")
+
+# Query strings that select a different response on the cached GET product routes
+PRODUCT_CACHE_QUERY_STRINGS = ("offset", "limit", "sort", "cursor", "search")
+
 
 class DeviceManagerAPIStack(Stack):
     """
@@ -35,6 +44,7 @@ class DeviceManagerAPIStack(Stack):
 
     This stack creates and configures the following AWS resources:
     - Lambda function for handling DeviceManager API requests
+    - Scheduled Lambda function sweeping abandoned guest carts and expired rows
     - API Gateway (HTTP API) for routing requests
     - VPC and security group configurations (when specified in config)
     - Lambda layers including PowerTools and optional custom DeviceManager API layer
@@ -107,7 +117,7 @@ class DeviceManagerAPIStack(Stack):
             architecture=_lambda.Architecture.ARM_64,  # type: ignore
         )
 
-        # Step 4: Create Lambda function
+        # Step 4: Create Lambda function (memory, timeout, concurrency from the `performance` section)
         device_manager_function = self._create_device_manager_function(
             runtime=_lambda.Runtime.PYTHON_3_12,  # type: ignore
             architecture=_lambda.Architecture.ARM_64,  # type: ignore
@@ -117,14 +127,49 @@ class DeviceManagerAPIStack(Stack):
             vpc=self._vpc,
             vpc_subnets=self._vpc_subnets,
             security_groups=self._security_groups,
-            memory_size=512,
+            **self._function_performance_options(runtime=_lambda.Runtime.PYTHON_3_12),  # type: ignore
         )
 
-        # Step 5: Configure database credentials
+        # Step 5: Configure database credentials and the token signing secret
         self._configure_database_credentials(device_manager_function)
+        self._configure_token_secret(device_manager_function)
+
+        # Step 6: Configure cold-start options (lazy imports, startup profiler)
+        self._configure_startup_options(device_manager_function)
+
+        # Step 7: Configure in-process caches
+        self._configure_cache_options(device_manager_function)
+        self._configure_search_options(device_manager_function)
+        self._configure_auth_options(device_manager_function)
+
+        # Step 8: Configure request metrics (EMF through the Powertools layer)
+        self._configure_metrics_options(device_manager_function)
+
+        # Step 9: Publish the alias API Gateway invokes (provisioned concurrency, SnapStart)
+        api_handler = self._create_live_alias(device_manager_function)
+
+        # Step 10: Create API Gateway
+        self.api_gateway = self._create_api_gateway(api_handler)
+
+        # Step 11: Scheduled maintenance sweep (guest carts, expired tokens and idempotency keys)
+        self.sweeper_function = self._create_sweeper_function(
+            runtime=_lambda.Runtime.PYTHON_3_12,  # type: ignore
+            architecture=_lambda.Architecture.ARM_64,  # type: ignore
+            layers=list(lambda_layers.values()),
+            vpc=self._vpc,
+            vpc_subnets=self._vpc_subnets,
+            security_groups=self._security_groups,
+        )
 
-        # Step 6: Create API Gateway
-        self.api_gateway = self._create_api_gateway(device_manager_function)
+        # Step 12: Outbox worker (confirmation emails, sheet sync and analytics of new orders)
+        self.outbox_function = self._create_outbox_function(
+            runtime=_lambda.Runtime.PYTHON_3_12,  # type: ignore
+            architecture=_lambda.Architecture.ARM_64,  # type: ignore
+            layers=list(lambda_layers.values()),
+            vpc=self._vpc,
+            vpc_subnets=self._vpc_subnets,
+            security_groups=self._security_groups,
+        )
 
     def _load_context_and_config(self) -> None:
         """
@@ -278,6 +323,99 @@ class DeviceManagerAPIStack(Stack):
 
         return lambda_layers
 
+    def _function_performance_options(self, *, runtime: _lambda.Runtime) -> Dict:
+        """
+        Lambda function options from the `performance` config section.
+
+        Supported keys:
+        - memory_size (MB, default 512) and timeout_seconds (default 60)
+        - ephemeral_storage_mb: /tmp size, 512-10240 (Lambda default 512)
+        - reserved_concurrency: caps the function, and so the database connections it opens
+        - snap_start (bool): snapshot the initialized container on publish; ignored with a
+          warning on runtimes without SnapStart. Cannot be combined with provisioned
+          concurrency or more than 512 MB of ephemeral storage.
+
+        Args:
+            runtime: Lambda runtime of the function
+
+        Returns:
+            Keyword arguments for _lambda.Function
+        """
+
+        performance_config: Dict = self._config.get("performance", {})
+        options: Dict = {
+            "memory_size": performance_config.get("memory_size", 512),
+            "timeout": performance_config.get("timeout_seconds", 60),
+        }
+
+        ephemeral_storage_mb = performance_config.get("ephemeral_storage_mb")
+        if ephemeral_storage_mb is not None:
+            options["ephemeral_storage_size"] = Size.mebibytes(ephemeral_storage_mb)
+
+        if "reserved_concurrency" in performance_config:
+            options["reserved_concurrent_executions"] = performance_config["reserved_concurrency"]
+
+        if performance_config.get("snap_start"):
+            if performance_config.get("provisioned_concurrency"):
+                raise ValueError("performance.snap_start cannot be combined with provisioned_concurrency")
+            if (ephemeral_storage_mb or 512) > 512:
+                raise ValueError("performance.snap_start supports at most 512 MB of ephemeral storage")
+
+            if runtime.name in SNAP_START_RUNTIMES:
+                options["snap_start"] = _lambda.SnapStartConf.ON_PUBLISHED_VERSIONS
+            else:
+                print(f"SnapStart is not available for {runtime.name}, performance.snap_start ignored")
+
+        return options
+
+    def _create_live_alias(self, device_manager_function: _lambda.Function) -> _lambda.IFunction:
+        """
+        Publish a version behind a `live` alias when the `performance` section needs one.
+
+        Provisioned concurrency and SnapStart only apply to published versions, so API
+        Gateway must invoke the alias rather than $LATEST. `provisioned_concurrency`
+        supports min (kept warm), max (auto-scaling ceiling, default min) and
+        target_utilization (default 0.7).
+
+        Args:
+            device_manager_function: The Lambda function to publish
+
+        Returns:
+            The alias, or the function itself when neither feature is configured
+        """
+
+        performance_config: Dict = self._config.get("performance", {})
+        provisioned_config: Dict = performance_config.get("provisioned_concurrency") or {}
+        if not provisioned_config and not performance_config.get("snap_start"):
+            return device_manager_function
+
+        alias_options: Dict = {}
+        if provisioned_config:
+            if "min" not in provisioned_config:
+                raise ValueError("performance.provisioned_concurrency.min is required")
+            min_capacity = provisioned_config["min"]
+            max_capacity = provisioned_config.get("max", min_capacity)
+            if max_capacity < min_capacity:
+                raise ValueError("performance.provisioned_concurrency.max must not be lower than min")
+            reserved = performance_config.get("reserved_concurrency")
+            if reserved is not None and reserved < max_capacity:
+                raise ValueError("performance.reserved_concurrency must cover provisioned_concurrency.max")
+            alias_options["provisioned_concurrent_executions"] = min_capacity
+
+        alias = _lambda.Alias(
+            scope=self,
+            id=f"{self._prefix}-{self._env}-DeviceManagerAPIFunctionLive",
+            alias_name="live",
+            version=device_manager_function.current_version,
+            **alias_options,
+        )
+
+        if provisioned_config and max_capacity > min_capacity:
+            scaling = alias.add_auto_scaling(min_capacity=min_capacity, max_capacity=max_capacity)
+            scaling.scale_on_utilization(utilization_target=provisioned_config.get("target_utilization", 0.7))
+
+        return alias
+
     def _create_device_manager_function(
         self,
         *,
@@ -329,6 +467,11 @@ class DeviceManagerAPIStack(Stack):
         2. AWS Secrets Manager (recommended) - automatic rotation, encrypted storage
         3. Direct credentials (development only) - plain text environment variables
 
+        An optional `database.proxy` block ({"endpoint": ..., "port": ...}) routes
+        connections through RDS Proxy instead of the database host. An optional
+        `database.read_replicas` block ({"endpoints": [{"endpoint": ..., "port": ...}],
+        "health_check_seconds", "max_lag_seconds", "pin_seconds"}) adds read replicas.
+
         Args:
             device_manager_function: The Lambda function to configure
         """
@@ -450,6 +593,44 @@ class DeviceManagerAPIStack(Stack):
                     }
                 )
 
+        # Optional RDS Proxy endpoint: the Lambda connects through the proxy instead of
+        # the instance host, so connection storms during scale-out are multiplexed
+        proxy_config: Optional[dict] = self._config.get("database", {}).get("proxy")
+        if proxy_config:
+            proxy_endpoint = proxy_config.get("endpoint")
+            if not proxy_endpoint:
+                raise ValueError("endpoint required for database proxy")
+
+            envs.update(
+                {
+                    "POSTGRES_PROXY_HOST": proxy_endpoint,
+                    "POSTGRES_PROXY_PORT": str(proxy_config.get("port", 5432)),
+                }
+            )
+
+        # Optional read replicas: catalog, search and order-history reads are spread over
+        # them (same credentials as the primary), with health checks, failover to the
+        # primary and read-your-writes pinning after cart/order writes
+        replica_config: Optional[dict] = self._config.get("database", {}).get("read_replicas")
+        if replica_config:
+            hosts: List[str] = []
+            for replica in replica_config.get("endpoints", []):
+                if not replica.get("endpoint"):
+                    raise ValueError("endpoint required for each database read replica")
+                hosts.append(f"{replica['endpoint']}:{replica.get('port', 5432)}")
+            if not hosts:
+                raise ValueError("database.read_replicas needs at least one endpoint")
+
+            envs["POSTGRES_READ_REPLICA_HOSTS"] = ",".join(hosts)
+            option_envs = {
+                "health_check_seconds": "READ_REPLICA_HEALTH_CHECK_SECONDS",
+                "max_lag_seconds": "READ_REPLICA_MAX_LAG_SECONDS",
+                "pin_seconds": "READ_AFTER_WRITE_PIN_SECONDS",
+            }
+            for option, env_name in option_envs.items():
+                if option in replica_config:
+                    envs[env_name] = str(replica_config[option])
+
         # Apply all collected environment variables to the Lambda function
         # Each key-value pair becomes available as os.environ[key] in Lambda runtime
 
@@ -464,25 +645,363 @@ class DeviceManagerAPIStack(Stack):
                 pass
             device_manager_function.add_environment(key=key, value=value)
 
-    def _create_api_gateway(self, device_manager_function: _lambda.Function):
+    def _configure_token_secret(self, function: _lambda.Function) -> None:
+        """
+        Set ENVIRONMENT to the deployment environment and TOKEN_SECRET from the
+        DEVICE_MANAGER__TOKEN_SECRET variable of the deployment (CI/CD) environment.
+
+        The app refuses to start outside ENVIRONMENT=local without a private
+        TOKEN_SECRET, since JWTs and pagination cursors are signed with it.
+
+        Args:
+            function: The Lambda function to configure
+        """
+
+        function.add_environment(key="ENVIRONMENT", value=self._env)
+
+        token_secret = os.environ.get("DEVICE_MANAGER__TOKEN_SECRET")
+        if token_secret:
+            function.add_environment(key="TOKEN_SECRET", value=token_secret)
+        else:
+            print(
+                "Warning: DEVICE_MANAGER__TOKEN_SECRET is not set; "
+                f"{function.node.id} will fail at startup without TOKEN_SECRET"
+            )
+
+    def _configure_startup_options(self, device_manager_function: _lambda.Function) -> None:
         """
-        Create HTTP API Gateway and configure routing to the Lambda function.
+        Configure cold-start related environment variables from the `startup` config section.
 
-        Creates HTTP API (faster and cheaper than REST API) with catch-all routing
-        that forwards all requests to the Lambda function for internal processing.
+        Supported keys:
+        - lazy_imports (bool): defer heavy modules (SQLAlchemy, gspread, crypto) until first use
+        - profile (bool): log a per-module import time breakdown at the end of the init phase
 
         Args:
-            device_manager_function: The Lambda function to route requests to
+            device_manager_function: The Lambda function to configure
+        """
+
+        startup_config: Dict = self._config.get("startup", {})
+
+        if "lazy_imports" in startup_config:
+            device_manager_function.add_environment(
+                key="LAZY_IMPORTS", value=str(bool(startup_config["lazy_imports"])).lower()
+            )
+
+        if startup_config.get("profile"):
+            device_manager_function.add_environment(key="STARTUP_PROFILE", value="true")
+
+    def _configure_cache_options(self, device_manager_function: _lambda.Function) -> None:
+        """
+        Configure the catalog response cache from the `cache.catalog` config section
+        and the HTTP caching of the catalog routes from `cache.http`.
+
+        `cache.catalog` keys: enabled (bool), ttl_seconds, max_entries,
+        version_check_seconds. The cache is off unless enabled per environment.
+        `cache.http` keys: conditional_get (bool, ETag/304, default on),
+        max_age_seconds, stale_while_revalidate_seconds (Cache-Control).
+
+        Args:
+            device_manager_function: The Lambda function to configure
+        """
+
+        envs: Dict[str, str] = {}
+        catalog_config: Dict = self._config.get("cache", {}).get("catalog", {})
+        if catalog_config.get("enabled"):
+            envs["CATALOG_CACHE_ENABLED"] = "true"
+            option_envs = {
+                "ttl_seconds": "CATALOG_CACHE_TTL_SECONDS",
+                "max_entries": "CATALOG_CACHE_MAX_ENTRIES",
+                "version_check_seconds": "CATALOG_CACHE_VERSION_CHECK_SECONDS",
+            }
+            for option, env_name in option_envs.items():
+                if option in catalog_config:
+                    envs[env_name] = str(catalog_config[option])
+
+        http_config: Dict = self._config.get("cache", {}).get("http", {})
+        if "conditional_get" in http_config:
+            envs["CONDITIONAL_GET_ENABLED"] = "true" if http_config["conditional_get"] else "false"
+        option_envs = {
+            "max_age_seconds": "CATALOG_HTTP_MAX_AGE_SECONDS",
+            "stale_while_revalidate_seconds": "CATALOG_HTTP_STALE_WHILE_REVALIDATE_SECONDS",
+        }
+        for option, env_name in option_envs.items():
+            if option in http_config:
+                envs[env_name] = str(http_config[option])
+
+        for key, value in envs.items():
+            device_manager_function.add_environment(key=key, value=value)
+
+    def _configure_search_options(self, device_manager_function: _lambda.Function) -> None:
+        """
+        Configure the autocomplete index and popular-search counters from the
+        `search.suggest` config section.
+
+        Supported keys: refresh_seconds, full_rebuild_seconds, popular_half_life_seconds,
+        popular_max_entries. Unset keys keep the application defaults.
+
+        Args:
+            device_manager_function: The Lambda function to configure
+        """
+
+        suggest_config: Dict = self._config.get("search", {}).get("suggest", {})
+        option_envs = {
+            "refresh_seconds": "SUGGEST_REFRESH_SECONDS",
+            "full_rebuild_seconds": "SUGGEST_FULL_REBUILD_SECONDS",
+            "popular_half_life_seconds": "POPULAR_SEARCH_HALF_LIFE_SECONDS",
+            "popular_max_entries": "POPULAR_SEARCH_MAX_ENTRIES",
+        }
+        for option, env_name in option_envs.items():
+            if option in suggest_config:
+                device_manager_function.add_environment(key=env_name, value=str(suggest_config[option]))
+
+    def _configure_auth_options(self, device_manager_function: _lambda.Function) -> None:
+        """
+        Configure password hashing from the `auth` config section.
+
+        Supported keys: bcrypt_rounds, hash_target_ms, hash_workers, hash_max_pending.
+        Setting bcrypt_rounds is recommended on Lambda: otherwise every cold start
+        calibrates the cost on its first login.
+
+        Args:
+            device_manager_function: The Lambda function to configure
+        """
+
+        auth_config: Dict = self._config.get("auth", {})
+        option_envs = {
+            "bcrypt_rounds": "BCRYPT_ROUNDS",
+            "hash_target_ms": "PASSWORD_HASH_TARGET_MS",
+            "hash_workers": "PASSWORD_HASH_WORKERS",
+            "hash_max_pending": "PASSWORD_HASH_MAX_PENDING",
+        }
+        for option, env_name in option_envs.items():
+            if option in auth_config:
+                device_manager_function.add_environment(key=env_name, value=str(auth_config[option]))
+
+    def _configure_metrics_options(self, device_manager_function: _lambda.Function) -> None:
+        """
+        Configure request metrics from the `metrics` config section.
+
+        Supported keys: enabled, namespace, slow_query_ms, slow_query_samples. Metrics
+        are written as CloudWatch EMF log records, so no extra permissions are needed.
+
+        Args:
+            device_manager_function: The Lambda function to configure
+        """
+
+        metrics_config: Dict = self._config.get("metrics", {})
+        option_envs = {
+            "enabled": "METRICS_ENABLED",
+            "namespace": "METRICS_NAMESPACE",
+            "slow_query_ms": "SLOW_QUERY_MS",
+            "slow_query_samples": "SLOW_QUERY_SAMPLES",
+        }
+        for option, env_name in option_envs.items():
+            if option in metrics_config:
+                value = metrics_config[option]
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                device_manager_function.add_environment(key=env_name, value=str(value))
+
+    def _create_sweeper_function(
+        self,
+        *,
+        architecture: _lambda.Architecture,
+        runtime: _lambda.Runtime,
+        **kwargs,
+    ) -> Optional[_lambda.Function]:
+        """
+        Create the maintenance sweep Lambda and its EventBridge schedule from the
+        `sweeper` config section.
+
+        The function ships the same code and layers as the API function and gets the
+        same database configuration; only the handler differs. Supported keys:
+        enabled (default true), schedule (EventBridge expression, default
+        "rate(1 hour)"), timeout_seconds, memory_size, guest_cart_retention_days,
+        batch_size, pause_seconds, token_grace_seconds, outbox_retention_days.
+
+        Args:
+            architecture: Instruction set architecture for the function
+            runtime: Lambda runtime environment
+            **kwargs: Additional configuration (layers, VPC, etc.)
+
+        Returns:
+            The sweep Lambda function, or None when disabled
+        """
+
+        sweeper_config: Dict = self._config.get("sweeper", {})
+        if not sweeper_config.get("enabled", True):
+            return None
+
+        function_name = f"{self._prefix}-{self._env}-DeviceManagerSweeperFunction"
+
+        function = _lambda.Function(
+            scope=self,
+            id=function_name,
+            code=_lambda.Code.from_asset("functions/product_manager/app"),
+            handler="sweeper_function.lambda_handler",
+            runtime=runtime,  # type: ignore
+            architecture=architecture,  # type: ignore
+            function_name=function_name,
+            timeout=Duration.seconds(sweeper_config.get("timeout_seconds", 300)),
+            memory_size=sweeper_config.get("memory_size", 256),
+            # One sweep at a time: overlapping runs would only contend for the same rows
+            reserved_concurrent_executions=1,
+            **kwargs,
+        )
+
+        self._configure_database_credentials(function)
+        self._configure_token_secret(function)
+
+        option_envs = {
+            "guest_cart_retention_days": "GUEST_CART_RETENTION_DAYS",
+            "batch_size": "SWEEPER_BATCH_SIZE",
+            "pause_seconds": "SWEEPER_BATCH_PAUSE_SECONDS",
+            "token_grace_seconds": "TOKEN_PURGE_GRACE_SECONDS",
+            "outbox_retention_days": "OUTBOX_RETENTION_DAYS",
+        }
+        for option, env_name in option_envs.items():
+            if option in sweeper_config:
+                function.add_environment(key=env_name, value=str(sweeper_config[option]))
+
+        events.Rule(
+            scope=self,
+            id=f"{self._prefix}-{self._env}-DeviceManagerSweeperSchedule",
+            schedule=events.Schedule.expression(sweeper_config.get("schedule", "rate(1 hour)")),
+            targets=[targets.LambdaFunction(function)],  # type: ignore
+        )
+
+        return function
+
+    def _create_outbox_function(
+        self,
+        *,
+        architecture: _lambda.Architecture,
+        runtime: _lambda.Runtime,
+        **kwargs,
+    ) -> Optional[_lambda.Function]:
+        """
+        Create the outbox worker Lambda and its EventBridge schedule from the `outbox`
+        config section.
+
+        Like the sweeper, it ships the API code and database configuration with its own
+        handler. Each run delivers due events until none are left or the function is
+        about to time out; concurrent runs share the table safely (SKIP LOCKED claims).
+        Supported keys: enabled (default true), schedule (default "rate(1 minute)"),
+        timeout_seconds, memory_size, handlers, batch_size, concurrency, max_attempts,
+        smtp_host, smtp_port, email_from, sheet_key, sheet_worksheet, analytics_endpoint.
+        SMTP credentials are not read from the config file.
+
+        Args:
+            architecture: Instruction set architecture for the function
+            runtime: Lambda runtime environment
+            **kwargs: Additional configuration (layers, VPC, etc.)
+
+        Returns:
+            The outbox Lambda function, or None when disabled
+        """
+
+        outbox_config: Dict = self._config.get("outbox", {})
+        if not outbox_config.get("enabled", True):
+            print(
+                "Warning: the outbox worker is disabled; order side effects stay in outbox_events "
+                "until a worker runs (app/outbox_cli.py)"
+            )
+            return None
+
+        function_name = f"{self._prefix}-{self._env}-DeviceManagerOutboxFunction"
+
+        function = _lambda.Function(
+            scope=self,
+            id=function_name,
+            code=_lambda.Code.from_asset("functions/product_manager/app"),
+            handler="outbox_function.lambda_handler",
+            runtime=runtime,  # type: ignore
+            architecture=architecture,  # type: ignore
+            function_name=function_name,
+            timeout=Duration.seconds(outbox_config.get("timeout_seconds", 300)),
+            memory_size=outbox_config.get("memory_size", 256),
+            **kwargs,
+        )
+
+        self._configure_database_credentials(function)
+        self._configure_token_secret(function)
+
+        option_envs = {
+            "handlers": "OUTBOX_HANDLERS",
+            "batch_size": "OUTBOX_BATCH_SIZE",
+            "concurrency": "OUTBOX_CONCURRENCY",
+            "max_attempts": "OUTBOX_MAX_ATTEMPTS",
+            "smtp_host": "SMTP_HOST",
+            "smtp_port": "SMTP_PORT",
+            "email_from": "ORDER_EMAIL_FROM",
+            "sheet_key": "ORDER_SHEET_KEY",
+            "sheet_worksheet": "ORDER_SHEET_WORKSHEET",
+            "analytics_endpoint": "ANALYTICS_ENDPOINT",
+        }
+        for option, env_name in option_envs.items():
+            if option in outbox_config:
+                value = outbox_config[option]
+                if isinstance(value, list):
+                    value = ",".join(value)
+                function.add_environment(key=env_name, value=str(value))
+
+        events.Rule(
+            scope=self,
+            id=f"{self._prefix}-{self._env}-DeviceManagerOutboxSchedule",
+            schedule=events.Schedule.expression(outbox_config.get("schedule", "rate(1 minute)")),
+            targets=[targets.LambdaFunction(function)],  # type: ignore
+        )
+
+        return function
+
+    def _create_api_gateway(self, device_manager_function: _lambda.IFunction):
+        """
+        Create REST API Gateway and configure routing to the Lambda function.
+
+        Catch-all routing forwards all requests to the Lambda function for internal
+        processing. The `performance.api_gateway` config section adds:
+        - throttling: {"rate_limit": requests/s, "burst_limit": requests} for the stage
+        - cache: {"enabled", "size_gb" (default "0.5"), "ttl_seconds" (default 30)} caches
+          the public GET product routes (/api/v1/products, /api/v1/products/{proxy+}),
+          keyed by path and the listing query strings; nothing else is cached
+
+        Args:
+            device_manager_function: The Lambda function (or alias) to route requests to
         """
         api_name = f"{self._prefix}-{self._env}-DeviceManagerAPI"
 
+        gateway_config: Dict = self._config.get("performance", {}).get("api_gateway", {})
+        throttling_config: Dict = gateway_config.get("throttling", {})
+        cache_config: Dict = gateway_config.get("cache", {})
+        cache_enabled = bool(cache_config.get("enabled"))
+
+        stage_options: Dict = {"stage_name": self._env}
+        if "rate_limit" in throttling_config:
+            stage_options["throttling_rate_limit"] = throttling_config["rate_limit"]
+        if "burst_limit" in throttling_config:
+            stage_options["throttling_burst_limit"] = throttling_config["burst_limit"]
+
+        if cache_enabled:
+            cache_ttl = Duration.seconds(cache_config.get("ttl_seconds", 30))
+            product_cache = apigateway.MethodDeploymentOptions(caching_enabled=True, cache_ttl=cache_ttl)
+            stage_options.update(
+                cache_cluster_enabled=True,
+                cache_cluster_size=str(cache_config.get("size_gb", "0.5")),
+                # The cluster is stage wide: only the product GETs opt in
+                caching_enabled=False,
+                method_options={
+                    "/api/v1/products/GET": product_cache,
+                    "/api/v1/products/{proxy+}/GET": product_cache,
+                },
+            )
+
         api_gateway = apigateway.RestApi(
             self,
             id=f"{self._prefix}-{self._env}-DeviceManagerAPI",
             rest_api_name=api_name,
             description="REST API Gateway for DeviceManager API Lambda function",
             deploy=True,
-            deploy_options=apigateway.StageOptions(stage_name=self._env),
+            deploy_options=apigateway.StageOptions(**stage_options),
         )
 
         # Add catch-all resource and method to forward all requests to Lambda function
@@ -504,15 +1023,73 @@ class DeviceManagerAPIStack(Stack):
         # Also handle requests to the root path
         api_gateway.root.add_method("ANY", lambda_integration)
 
+        if cache_enabled:
+            self._add_cached_product_routes(api_gateway, device_manager_function, lambda_integration)
+
         # TODO: Add security measures:
         #   - JWT/API Key authorization for authentication
-        #   - Request throttling and rate limiting
         #   - CORS configuration for browser clients
         #   - Request/response validation
         #   - Usage plans for different access tiers
 
         return api_gateway
 
+    def _add_cached_product_routes(
+        self,
+        api_gateway: apigateway.RestApi,
+        device_manager_function: _lambda.IFunction,
+        lambda_integration: apigateway.LambdaIntegration,
+    ) -> None:
+        """
+        Give the GET product routes their own resources so the stage cache can key them.
+
+        API Gateway only caches methods whose cache key parameters are declared, which
+        the catch-all {proxy+} resource cannot do per route. Other methods on these
+        paths (OPTIONS preflights) still reach the Lambda through ANY.
+
+        Args:
+            api_gateway: The REST API
+            device_manager_function: The Lambda function (or alias) to route requests to
+            lambda_integration: Uncached proxy integration shared with the catch-all routes
+        """
+        query_parameters = [f"method.request.querystring.{name}" for name in PRODUCT_CACHE_QUERY_STRINGS]
+
+        # Explicit resources shadow the root {proxy+} below them, so every level keeps its
+        # own catch-all for the other routes (/api/v1/cart, /api/v1/orders, ...)
+        api_resource = api_gateway.root.add_resource("api")
+        api_resource.add_resource("{proxy+}").add_method("ANY", lambda_integration)
+        v1_resource = api_resource.add_resource("v1")
+        v1_resource.add_resource("{proxy+}").add_method("ANY", lambda_integration)
+
+        products = v1_resource.add_resource("products")
+        products.add_method("ANY", lambda_integration)
+        products.add_method(
+            "GET",
+            apigateway.LambdaIntegration(
+                handler=device_manager_function,  # type: ignore
+                proxy=True,
+                cache_key_parameters=query_parameters,
+            ),
+            request_parameters={parameter: False for parameter in query_parameters},
+        )
+
+        # /api/v1/products/{slug} and /api/v1/products/featured
+        product_path = products.add_resource("{proxy+}")
+        path_parameters = ["method.request.path.proxy", "method.request.querystring.limit"]
+        product_path.add_method("ANY", lambda_integration)
+        product_path.add_method(
+            "GET",
+            apigateway.LambdaIntegration(
+                handler=device_manager_function,  # type: ignore
+                proxy=True,
+                cache_key_parameters=path_parameters,
+            ),
+            request_parameters={
+                "method.request.path.proxy": True,
+                "method.request.querystring.limit": False,
+            },
+        )
+
     def _grant_parameter_access(
         self,
         func: _lambda.Function,
@@ -0,0 +1,292 @@
+"""
+CDK assertions on the synthesized DeviceManagerAPIStack template.
+
+The stack is synthesized offline (no AWS credentials, no Docker: the dependency
+layer's Docker build is replaced by a placeholder asset) with configs/env.example.json,
+with no config at all, and with a SnapStart variant of the example config.
+
+Run from backend:
+    pytest cdk/tests
+"""
+
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk.assertions import Match, Template
+
+from cdk.stacks.device_manager_api_stack import PRODUCT_CACHE_QUERY_STRINGS, DeviceManagerAPIStack
+from cdk.utils import load_config
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+CONFIG_PATH = BACKEND_DIR / "configs" / "env.example.json"
+CONFIG: Dict[str, Any] = load_config(fp=str(CONFIG_PATH))
+PERFORMANCE: Dict[str, Any] = CONFIG["performance"]
+
+ENV = "dev"
+PREFIX = "RDV1"
+TOKEN_SECRET = "test-token-secret-0123456789abcdef"
+
+API_HANDLER = "lambda_function.lambda_handler"
+SWEEPER_HANDLER = "sweeper_function.lambda_handler"
+OUTBOX_HANDLER = "outbox_function.lambda_handler"
+
+
+@pytest.fixture(scope="module")
+def synth(tmp_path_factory: pytest.TempPathFactory) -> Iterator:
+    """Synthesize the stack with a config file (None for no config) and return its template."""
+    layer_dir = tmp_path_factory.mktemp("layer")
+    (layer_dir / "python").mkdir()
+
+    with pytest.MonkeyPatch.context() as patch:
+        # Asset paths are relative to backend
+        patch.chdir(BACKEND_DIR)
+        patch.setenv("DEVICE_MANAGER__TOKEN_SECRET", TOKEN_SECRET)
+        # A Code instance binds to the first stack using it, so every synth gets its own
+        patch.setattr(
+            _lambda.AssetCode,
+            "from_docker_build",
+            staticmethod(lambda *args, **kwargs: _lambda.Code.from_asset(str(layer_dir))),
+        )
+
+        def _synth(config_path: Optional[Path]) -> Template:
+            context = {"env": ENV, "prefix": PREFIX}
+            if config_path:
+                context["config_filepath"] = str(config_path)
+            stack = DeviceManagerAPIStack(
+                cdk.App(context=context),
+                f"{PREFIX}-{ENV}-DeviceManagerAPIStack",
+                env=cdk.Environment(account="123456789012", region="ap-northeast-1"),
+            )
+            return Template.from_stack(stack)
+
+        yield _synth
+
+
+@pytest.fixture(scope="module")
+def template(synth) -> Template:
+    return synth(CONFIG_PATH)
+
+
+@pytest.fixture(scope="module")
+def default_template(synth) -> Template:
+    return synth(None)
+
+
+@pytest.fixture(scope="module")
+def snap_start_template(synth, tmp_path_factory: pytest.TempPathFactory) -> Template:
+    config = copy.deepcopy(CONFIG)
+    config["performance"]["snap_start"] = True
+    del config["performance"]["provisioned_concurrency"]
+    config["performance"]["api_gateway"]["cache"]["enabled"] = False
+    config["sweeper"]["enabled"] = False
+    config["outbox"]["enabled"] = False
+    path = tmp_path_factory.mktemp("config") / "snap_start.json"
+    path.write_text(json.dumps(config))
+    return synth(path)
+
+
+def test_api_function_options_from_config(template: Template) -> None:
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": API_HANDLER,
+            "MemorySize": PERFORMANCE["memory_size"],
+            "Timeout": PERFORMANCE["timeout_seconds"],
+            "EphemeralStorage": {"Size": PERFORMANCE["ephemeral_storage_mb"]},
+            "ReservedConcurrentExecutions": PERFORMANCE["reserved_concurrency"],
+            "Architectures": ["arm64"],
+            "SnapStart": Match.absent(),
+        },
+    )
+
+
+def test_api_function_defaults_without_config(default_template: Template) -> None:
+    default_template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": API_HANDLER,
+            "MemorySize": 512,
+            "Timeout": 60,
+            "Architectures": ["arm64"],
+            "ReservedConcurrentExecutions": Match.absent(),
+            "SnapStart": Match.absent(),
+        },
+    )
+    default_template.resource_count_is("AWS::Lambda::Alias", 0)
+    default_template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+    default_template.has_resource_properties("AWS::ApiGateway::Stage", {"CacheClusterEnabled": Match.absent()})
+
+
+def test_provisioned_concurrency_on_live_alias(template: Template) -> None:
+    provisioned = PERFORMANCE["provisioned_concurrency"]
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {"Name": "live", "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": provisioned["min"]}},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": provisioned["min"],
+            "MaxCapacity": provisioned["max"],
+            "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "TargetValue": provisioned["target_utilization"],
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"
+                    },
+                }
+            )
+        },
+    )
+
+
+def test_api_gateway_invokes_the_live_alias(template: Template) -> None:
+    aliases = template.find_resources("AWS::Lambda::Alias", {"Properties": {"Name": "live"}})
+    permissions = template.find_resources(
+        "AWS::Lambda::Permission", {"Properties": {"Principal": "apigateway.amazonaws.com"}}
+    )
+    assert permissions
+    for permission in permissions.values():
+        assert permission["Properties"]["FunctionName"] in [{"Ref": alias_id} for alias_id in aliases]
+
+
+def test_snap_start(snap_start_template: Template) -> None:
+    snap_start_template.has_resource_properties(
+        "AWS::Lambda::Function", {"Handler": API_HANDLER, "SnapStart": {"ApplyOn": "PublishedVersions"}}
+    )
+    snap_start_template.has_resource_properties(
+        "AWS::Lambda::Alias", {"Name": "live", "ProvisionedConcurrencyConfig": Match.absent()}
+    )
+
+
+def test_stage_throttling(template: Template) -> None:
+    throttling = PERFORMANCE["api_gateway"]["throttling"]
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "MethodSettings": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "HttpMethod": "*",
+                            "ResourcePath": "/*",
+                            "ThrottlingRateLimit": throttling["rate_limit"],
+                            "ThrottlingBurstLimit": throttling["burst_limit"],
+                        }
+                    )
+                ]
+            )
+        },
+    )
+
+
+def test_product_routes_cache(template: Template) -> None:
+    cache = PERFORMANCE["api_gateway"]["cache"]
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "CacheClusterEnabled": True,
+            "CacheClusterSize": str(cache["size_gb"]),
+            "MethodSettings": Match.array_with(
+                [Match.object_like({"HttpMethod": "*", "ResourcePath": "/*", "CachingEnabled": False})]
+                + [
+                    Match.object_like(
+                        {
+                            "HttpMethod": "GET",
+                            "ResourcePath": path,
+                            "CachingEnabled": True,
+                            "CacheTtlInSeconds": cache["ttl_seconds"],
+                        }
+                    )
+                    for path in ("/~1api~1v1~1products", "/~1api~1v1~1products~1{proxy+}")
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "HttpMethod": "GET",
+            "Integration": Match.object_like(
+                {"CacheKeyParameters": [f"method.request.querystring.{name}" for name in PRODUCT_CACHE_QUERY_STRINGS]}
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "HttpMethod": "GET",
+            "Integration": Match.object_like(
+                {"CacheKeyParameters": ["method.request.path.proxy", "method.request.querystring.limit"]}
+            ),
+        },
+    )
+
+
+def test_read_replica_hosts(template: Template) -> None:
+    replicas = CONFIG["database"]["read_replicas"]["endpoints"]
+    hosts = ",".join(f"{replica['endpoint']}:{replica.get('port', 5432)}" for replica in replicas)
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": API_HANDLER,
+            "Environment": {"Variables": Match.object_like({"POSTGRES_READ_REPLICA_HOSTS": hosts})},
+        },
+    )
+
+
+def test_scheduled_functions(template: Template) -> None:
+    template.has_resource_properties(
+        "AWS::Lambda::Function", {"Handler": SWEEPER_HANDLER, "ReservedConcurrentExecutions": 1}
+    )
+    template.has_resource_properties("AWS::Events::Rule", {"ScheduleExpression": CONFIG["sweeper"]["schedule"]})
+
+    outbox = CONFIG["outbox"]
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": OUTBOX_HANDLER,
+            "Environment": {
+                "Variables": Match.object_like(
+                    {"OUTBOX_HANDLERS": ",".join(outbox["handlers"]), "OUTBOX_BATCH_SIZE": str(outbox["batch_size"])}
+                )
+            },
+        },
+    )
+    template.has_resource_properties("AWS::Events::Rule", {"ScheduleExpression": outbox["schedule"]})
+
+
+def test_scheduled_functions_can_be_disabled(snap_start_template: Template) -> None:
+    for handler in (SWEEPER_HANDLER, OUTBOX_HANDLER):
+        assert not snap_start_template.find_resources("AWS::Lambda::Function", {"Properties": {"Handler": handler}})
+
+
+@pytest.mark.parametrize("handler", [API_HANDLER, SWEEPER_HANDLER, OUTBOX_HANDLER])
+def test_environment_and_token_secret(template: Template, handler: str) -> None:
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": handler,
+            "Environment": {"Variables": Match.object_like({"ENVIRONMENT": ENV, "TOKEN_SECRET": TOKEN_SECRET})},
+        },
+    )
+
+
+def test_token_secret_is_not_set_without_deploy_variable(synth, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delitem(os.environ, "DEVICE_MANAGER__TOKEN_SECRET")
+    synth(None).has_resource_properties(
+        "AWS::Lambda::Function",
+        {"Handler": API_HANDLER, "Environment": {"Variables": Match.object_like({"TOKEN_SECRET": Match.absent()})}},
+    )
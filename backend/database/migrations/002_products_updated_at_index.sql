@@ -0,0 +1,10 @@
+-- ============================================================================
+-- Migration: Index products.updated_at
+-- Description:
+--   The API's catalog cache polls max(products.updated_at) to detect catalog
+--   changes. Without an index this is a full scan of products on every check;
+--   with it the planner reads a single entry from the end of the index.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_products_updated_at
+ON products(updated_at);
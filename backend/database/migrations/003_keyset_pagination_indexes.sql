@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migration: Keyset pagination indexes
+-- Description:
+--   Cursor pagination seeks on (sort_key, id). Composite indexes let Postgres
+--   answer both the row comparison and the ORDER BY ... , id tiebreak from the
+--   index, so every page is a short index range scan instead of OFFSET scanning
+--   and discarding all previous rows.
+-- ============================================================================
+
+-- GET /api/v1/products?sort=newest
+CREATE INDEX IF NOT EXISTS idx_products_created_at_id
+ON products(created_at, id);
+
+-- GET /api/v1/products?sort=price_asc|price_desc
+CREATE INDEX IF NOT EXISTS idx_products_price_id
+ON products(price, id);
+
+-- GET /api/v1/products?sort=rating (rating is nullable, sorted as 0)
+CREATE INDEX IF NOT EXISTS idx_products_rating_id
+ON products((COALESCE(rating, 0)), id);
+
+-- GET /api/v1/orders/me
+CREATE INDEX IF NOT EXISTS idx_orders_user_order_date_id
+ON orders(user_id, order_date, id);
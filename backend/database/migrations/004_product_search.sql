@@ -0,0 +1,27 @@
+-- ============================================================================
+-- Migration: Product search
+-- Description:
+--   GET /api/v1/products?search= matches name and description case-insensitively.
+--   A leading-wildcard ILIKE cannot use idx_products_name, so:
+--   1. search_vector: generated, weighted tsvector (name = A, description = B)
+--      with a GIN index for ranked full-text matches (prefix queries included)
+--   2. pg_trgm GIN index on name for typo-tolerant word similarity matches
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 1: Generated full-text column (kept in sync by Postgres on every write)
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_vector
+ON products USING GIN (search_vector);
+
+-- Step 2: Trigram index for fuzzy name matching (`<%` word similarity operator)
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+ON products USING GIN (name gin_trgm_ops);
+
+COMMENT ON COLUMN products.search_vector IS 'Weighted full-text vector of name (A) and description (B)';
@@ -0,0 +1,29 @@
+-- ============================================================================
+-- Migration: Unique cart item per SKU
+-- Description:
+--   A cart holds at most one row per SKU; adding the same SKU again increases
+--   its quantity. The unique index enforces that and is the conflict target of
+--   the INSERT ... ON CONFLICT (cart_id, sku) used to merge a guest cart into
+--   the user's cart on login.
+-- ============================================================================
+
+-- Step 1: Collapse existing duplicates into the oldest row of each (cart_id, sku)
+WITH ranked AS (
+    SELECT id,
+           first_value(id) OVER (PARTITION BY cart_id, sku ORDER BY id) AS keep_id,
+           sum(quantity) OVER (PARTITION BY cart_id, sku) AS total_quantity
+    FROM cart_items
+),
+kept AS (
+    UPDATE cart_items ci
+    SET quantity = r.total_quantity, updated_at = CURRENT_TIMESTAMP
+    FROM ranked r
+    WHERE ci.id = r.id AND r.id = r.keep_id AND ci.quantity <> r.total_quantity
+)
+DELETE FROM cart_items ci
+USING ranked r
+WHERE ci.id = r.id AND r.id <> r.keep_id;
+
+-- Step 2: Enforce one row per SKU in a cart
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_items_cart_id_sku
+ON cart_items(cart_id, sku);
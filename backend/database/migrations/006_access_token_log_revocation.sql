@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migration: access_token_log lookups and revocation feed
+-- Description:
+--   1. Token lookups are pure equality on a ~200 byte JWT. A hash index stores
+--      a 4 byte hash per row instead of the full text twice (UNIQUE btree plus
+--      idx_access_token_token). Uniqueness is guaranteed by the random `jti`
+--      claim in every token, so the unique constraint is dropped with it.
+--   2. API processes keep an in-memory copy of active token fingerprints and
+--      refresh it from rows changed since their last `updated_at` watermark;
+--      logout sets expires_at/updated_at instead of deleting, so revocations
+--      reach that feed. Expired rows are purged later.
+-- ============================================================================
+
+-- Step 1: Replace the text btrees on token with a hash index
+ALTER TABLE access_token_log
+DROP CONSTRAINT IF EXISTS access_token_log_token_key;
+
+DROP INDEX IF EXISTS idx_access_token_token;
+
+CREATE INDEX IF NOT EXISTS idx_access_token_token_hash
+ON access_token_log USING hash (token);
+
+-- Step 2: Incremental refresh of the revocation cache
+CREATE INDEX IF NOT EXISTS idx_access_token_updated_at
+ON access_token_log(updated_at);
@@ -0,0 +1,165 @@
+-- ============================================================================
+-- Migration: Precomputed homepage feed
+-- Description:
+--   The homepage ranks products by rating and review count and shows in-stock
+--   flags, which used to mean a sort over the whole catalog plus a variant
+--   lookup per product on every render. product_feed keeps one summary row per
+--   product: min/max effective price (price + price_modifier), total stock and
+--   a ranking score, with an index in feed order.
+--
+--   Triggers on products and product_variants do not update product_feed
+--   directly: checkouts decrement stock on hot variants, and a shared summary
+--   row per product would serialize checkouts of different sizes. They only
+--   enqueue the product id (ON CONFLICT DO NOTHING, so a product that is already
+--   queued costs no lock wait). refresh_product_feed() drains the queue with
+--   SKIP LOCKED and recomputes the queued products set-based; the API calls it
+--   before re-reading the feed.
+-- ============================================================================
+
+-- Step 1: Summary table and pending-refresh queue
+CREATE TABLE IF NOT EXISTS product_feed (
+    product_id INTEGER PRIMARY KEY,
+    min_price NUMERIC(10, 2) NOT NULL,
+    max_price NUMERIC(10, 2) NOT NULL,
+    total_stock INTEGER NOT NULL DEFAULT 0,
+    variant_count INTEGER NOT NULL DEFAULT 0,
+    in_stock BOOLEAN GENERATED ALWAYS AS (total_stock > 0) STORED,
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_product_feed_product
+        FOREIGN KEY (product_id)
+        REFERENCES products(id)
+        ON DELETE CASCADE
+);
+
+-- Feed order: in-stock first, then score; product_id breaks ties
+CREATE INDEX IF NOT EXISTS idx_product_feed_rank
+ON product_feed(in_stock DESC, score DESC, product_id);
+
+-- max(updated_at) tells API processes whether their rendered feed is stale
+CREATE INDEX IF NOT EXISTS idx_product_feed_updated_at
+ON product_feed(updated_at);
+
+CREATE TABLE IF NOT EXISTS product_feed_queue (
+    product_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Step 2: Set-based refresh of queued products
+-- score: rating averaged with a prior of 3.5 stars worth 20 reviews, so a single
+-- 5-star review does not outrank hundreds of 4.8-star ones
+CREATE OR REPLACE FUNCTION refresh_product_feed(p_limit INTEGER DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    WITH claimed AS (
+        DELETE FROM product_feed_queue q
+        WHERE q.product_id IN (
+            SELECT product_id FROM product_feed_queue
+            ORDER BY product_id
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING q.product_id
+    ),
+    summary AS (
+        SELECT p.id AS product_id,
+               coalesce(min(p.price + v.price_modifier), p.price) AS min_price,
+               coalesce(max(p.price + v.price_modifier), p.price) AS max_price,
+               coalesce(sum(v.stock), 0) AS total_stock,
+               count(v.id) AS variant_count,
+               (coalesce(p.rating, 0) * p.review_count + 3.5 * 20) / (p.review_count + 20) AS score
+        FROM claimed c
+        JOIN products p ON p.id = c.product_id
+        LEFT JOIN product_variants v ON v.product_id = p.id
+        GROUP BY p.id
+    ),
+    upserted AS (
+        INSERT INTO product_feed (product_id, min_price, max_price, total_stock, variant_count, score)
+        SELECT product_id, min_price, max_price, total_stock, variant_count, score FROM summary
+        ON CONFLICT (product_id) DO UPDATE
+        SET min_price = EXCLUDED.min_price,
+            max_price = EXCLUDED.max_price,
+            total_stock = EXCLUDED.total_stock,
+            variant_count = EXCLUDED.variant_count,
+            score = EXCLUDED.score,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE (product_feed.min_price, product_feed.max_price, product_feed.total_stock,
+               product_feed.variant_count, product_feed.score)
+            IS DISTINCT FROM
+            (EXCLUDED.min_price, EXCLUDED.max_price, EXCLUDED.total_stock, EXCLUDED.variant_count, EXCLUDED.score)
+    )
+    SELECT count(*) INTO refreshed FROM claimed;
+
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 3: Enqueue changed products (statement-level, one insert per statement)
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_products()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT DISTINCT id FROM changed_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_variants()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT DISTINCT product_id FROM changed_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A variant moved to another product changes both products
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_variant_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT product_id FROM new_rows
+    UNION
+    SELECT product_id FROM old_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be shared between events, hence one trigger per event
+DROP TRIGGER IF EXISTS product_feed_products_insert ON products;
+CREATE TRIGGER product_feed_products_insert AFTER INSERT ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_products();
+
+DROP TRIGGER IF EXISTS product_feed_products_update ON products;
+CREATE TRIGGER product_feed_products_update AFTER UPDATE ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_products();
+
+DROP TRIGGER IF EXISTS product_feed_variants_insert ON product_variants;
+CREATE TRIGGER product_feed_variants_insert AFTER INSERT ON product_variants
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variants();
+
+DROP TRIGGER IF EXISTS product_feed_variants_update ON product_variants;
+CREATE TRIGGER product_feed_variants_update AFTER UPDATE ON product_variants
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variant_update();
+
+DROP TRIGGER IF EXISTS product_feed_variants_delete ON product_variants;
+CREATE TRIGGER product_feed_variants_delete AFTER DELETE ON product_variants
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variants();
+
+-- Step 4: Backfill
+INSERT INTO product_feed_queue (product_id)
+SELECT id FROM products
+ON CONFLICT (product_id) DO NOTHING;
+
+SELECT refresh_product_feed();
@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migration: Idempotency-Key store
+-- Description:
+--   Clients and API Gateway retry POST /orders and POST /cart/items after
+--   timeouts; replaying the stored response instead of re-running the handler
+--   keeps a retry from reserving stock twice. One row per (scope, key), where
+--   the scope is the route plus the user or guest session, so keys of different
+--   callers never collide.
+--
+--   A row is claimed (status_code NULL, locked_until set) before the handler
+--   runs and completed with the response afterwards. A claim whose holder died
+--   can be taken over once locked_until has passed. Rows are purged in batches
+--   after expires_at.
+-- ============================================================================
+
+-- Step 1: Stored responses
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint BYTEA NOT NULL,
+    status_code SMALLINT,
+    body BYTEA,
+    locked_until TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (scope, idempotency_key)
+);
+
+-- Step 2: TTL purge
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at
+ON idempotency_keys(expires_at);
+
+COMMENT ON TABLE idempotency_keys IS 'Responses of POST requests sent with an Idempotency-Key, replayed on retries';
@@ -0,0 +1,13 @@
+-- ============================================================================
+-- Migration: Guest cart sweep index
+-- Description:
+--   Guest carts are created for every X-Session-ID and were never deleted. The
+--   maintenance sweeper (services.sweeper) removes guest carts untouched for
+--   GUEST_CART_RETENTION_DAYS in keyset batches ordered by (updated_at, id).
+--   A partial index over guest carts only answers each batch with a short range
+--   scan and stays small: user carts never enter it.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_carts_guest_updated_at
+ON carts(updated_at, id)
+WHERE user_id IS NULL;
@@ -0,0 +1,106 @@
+-- ============================================================================
+-- Migration: Denormalized cart totals
+-- Description:
+--   Add-to-cart answers with the cart totals, which used to be a sum over every
+--   cart_items row of the cart, so each add cost more the fuller the cart. carts
+--   now carries item_count (lines), total_quantity (units) and subtotal (at the
+--   snapshot cart_items.price), kept current by statement-level triggers on
+--   cart_items that apply the per-cart difference of each statement. Reading the
+--   totals is a primary key lookup whatever the cart size.
+--
+--   Stale prices and missing stock depend on product_variants and products, so
+--   they are not stored here: GET /cart checks them in its cart query.
+--
+--   The trigger UPDATE on carts also moves carts.updated_at (trigger
+--   update_carts_updated_at), so any item change counts as cart activity.
+-- ============================================================================
+
+BEGIN;
+
+-- Step 1: Totals columns
+ALTER TABLE carts
+    ADD COLUMN IF NOT EXISTS item_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_quantity INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS subtotal NUMERIC(12, 2) NOT NULL DEFAULT 0;
+
+-- Step 2: Apply the per-cart difference of each cart_items statement
+CREATE OR REPLACE FUNCTION update_cart_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE carts c
+        SET item_count = c.item_count + d.item_count,
+            total_quantity = c.total_quantity + d.total_quantity,
+            subtotal = c.subtotal + d.subtotal
+        FROM (
+            SELECT cart_id, count(*) AS item_count, sum(quantity) AS total_quantity, sum(price * quantity) AS subtotal
+            FROM new_rows
+            GROUP BY cart_id
+        ) d
+        WHERE c.id = d.cart_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE carts c
+        SET item_count = c.item_count - d.item_count,
+            total_quantity = c.total_quantity - d.total_quantity,
+            subtotal = c.subtotal - d.subtotal
+        FROM (
+            SELECT cart_id, count(*) AS item_count, sum(quantity) AS total_quantity, sum(price * quantity) AS subtotal
+            FROM old_rows
+            GROUP BY cart_id
+        ) d
+        WHERE c.id = d.cart_id;
+    ELSE
+        UPDATE carts c
+        SET item_count = c.item_count + d.item_count,
+            total_quantity = c.total_quantity + d.total_quantity,
+            subtotal = c.subtotal + d.subtotal
+        FROM (
+            SELECT cart_id, sum(lines) AS item_count, sum(quantity) AS total_quantity, sum(amount) AS subtotal
+            FROM (
+                SELECT cart_id, 1 AS lines, quantity, price * quantity AS amount FROM new_rows
+                UNION ALL
+                SELECT cart_id, -1, -quantity, -(price * quantity) FROM old_rows
+            ) changes
+            GROUP BY cart_id
+            HAVING sum(quantity) <> 0 OR sum(amount) <> 0 OR sum(lines) <> 0
+        ) d
+        WHERE c.id = d.cart_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be shared between events, hence one trigger per event
+DROP TRIGGER IF EXISTS cart_totals_items_insert ON cart_items;
+CREATE TRIGGER cart_totals_items_insert AFTER INSERT ON cart_items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
+DROP TRIGGER IF EXISTS cart_totals_items_update ON cart_items;
+CREATE TRIGGER cart_totals_items_update AFTER UPDATE ON cart_items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
+DROP TRIGGER IF EXISTS cart_totals_items_delete ON cart_items;
+CREATE TRIGGER cart_totals_items_delete AFTER DELETE ON cart_items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
+-- Step 3: Backfill (the triggers above keep carts written from now on in step)
+UPDATE carts c
+SET item_count = coalesce(t.item_count, 0),
+    total_quantity = coalesce(t.total_quantity, 0),
+    subtotal = coalesce(t.subtotal, 0)
+FROM carts base
+LEFT JOIN (
+    SELECT cart_id, count(*) AS item_count, sum(quantity) AS total_quantity, sum(price * quantity) AS subtotal
+    FROM cart_items
+    GROUP BY cart_id
+) t ON t.cart_id = base.id
+WHERE c.id = base.id
+  AND (c.item_count, c.total_quantity, c.subtotal)
+      IS DISTINCT FROM (coalesce(t.item_count, 0), coalesce(t.total_quantity, 0), coalesce(t.subtotal, 0));
+
+COMMENT ON COLUMN carts.subtotal IS 'Sum of cart_items.price * quantity, maintained by the cart_totals_items_* triggers';
+
+COMMIT;
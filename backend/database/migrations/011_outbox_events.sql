@@ -0,0 +1,45 @@
+-- ============================================================================
+-- Migration: Transactional outbox
+-- Description:
+--   Side effects of a checkout (confirmation email, Google Sheets order sync,
+--   analytics) would otherwise run inside POST /orders, adding their latency
+--   and failures to checkout. Instead the order transaction
+--   inserts one outbox_events row per handler, so an event exists exactly when
+--   its order committed, and the outbox worker (services.outbox) delivers them.
+--
+--   Workers claim due rows with FOR UPDATE SKIP LOCKED and lease them by moving
+--   available_at forward, so concurrent workers never take the same row and a
+--   crashed worker's rows come back once the lease ends. Failures are retried
+--   with exponential backoff until OUTBOX_MAX_ATTEMPTS, then kept as 'failed'.
+--   Delivered rows are deleted by the maintenance sweep after
+--   OUTBOX_RETENTION_DAYS.
+-- ============================================================================
+
+-- Step 1: Events, one row per (event, handler)
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    aggregate_id BIGINT NOT NULL,
+    handler VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP,
+
+    CONSTRAINT chk_outbox_events_status CHECK (status IN ('pending', 'done', 'failed'))
+);
+
+-- Step 2: Claim order of due rows; only pending rows are indexed
+CREATE INDEX IF NOT EXISTS idx_outbox_events_pending
+ON outbox_events(available_at, id)
+WHERE status = 'pending';
+
+-- Step 3: Retention sweep of delivered rows
+CREATE INDEX IF NOT EXISTS idx_outbox_events_done_processed_at
+ON outbox_events(processed_at, id)
+WHERE status = 'done';
+
+COMMENT ON TABLE outbox_events IS 'Side effects of committed orders, delivered by the outbox worker';
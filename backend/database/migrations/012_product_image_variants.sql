@@ -0,0 +1,21 @@
+-- ============================================================================
+-- Migration: Product image derivatives
+-- Description:
+--   products.images holds full-size URLs, so product cards downloaded the
+--   800x600+ originals. The image pipeline (services.image_pipeline) renders
+--   WebP/AVIF thumbnails at fixed widths next to each original and records them
+--   here, keyed by the original URL:
+--
+--     {"<original url>": {"width": 800, "height": 600,
+--                         "variants": [{"url": "...", "width": 320, "format": "webp"}, ...]}}
+--
+--   Product responses turn the entries into `image_sources` (srcset per format).
+--   Images without an entry are served as before. Writing the column moves
+--   products.updated_at, so catalog caches and ETags pick the change up.
+-- ============================================================================
+
+-- Step 1: Derivative metadata per original image URL
+ALTER TABLE products
+    ADD COLUMN IF NOT EXISTS image_variants JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+COMMENT ON COLUMN products.image_variants IS 'Derived WebP/AVIF images per original image URL (migration 012)';
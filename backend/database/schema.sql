@@ -9,6 +9,9 @@
 -- Enable UUID extension if not already enabled
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Trigram matching for typo-tolerant product search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================================================================
 -- Table: users
 -- Description: User accounts (Customer, Admin, Staff)
@@ -47,10 +50,15 @@ CREATE TABLE IF NOT EXISTS products (
     price NUMERIC(10, 2) NOT NULL,
     currency VARCHAR(3) NOT NULL DEFAULT 'USD',
     images JSONB DEFAULT '[]'::jsonb,
+    image_variants JSONB NOT NULL DEFAULT '{}'::jsonb,
     rating NUMERIC(3, 2) DEFAULT 0.00,
     review_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED,
     
     CONSTRAINT chk_product_price CHECK (price >= 0),
     CONSTRAINT chk_product_rating CHECK (rating >= 0 AND rating <= 5),
@@ -64,6 +72,12 @@ CREATE INDEX IF NOT EXISTS idx_products_name ON products(name);
 CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
 CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating);
 CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at);
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON products(updated_at);
+CREATE INDEX IF NOT EXISTS idx_products_created_at_id ON products(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_products_price_id ON products(price, id);
+CREATE INDEX IF NOT EXISTS idx_products_rating_id ON products((COALESCE(rating, 0)), id);
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING GIN (name gin_trgm_ops);
 
 -- ============================================================================
 -- Table: product_variants
@@ -99,6 +113,9 @@ CREATE TABLE IF NOT EXISTS carts (
     id SERIAL PRIMARY KEY,
     user_id INTEGER,
     session_id VARCHAR(255),
+    item_count INTEGER NOT NULL DEFAULT 0,
+    total_quantity INTEGER NOT NULL DEFAULT 0,
+    subtotal NUMERIC(12, 2) NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     
@@ -115,6 +132,7 @@ CREATE TABLE IF NOT EXISTS carts (
 CREATE INDEX IF NOT EXISTS idx_carts_user_id ON carts(user_id);
 CREATE INDEX IF NOT EXISTS idx_carts_session_id ON carts(session_id);
 CREATE INDEX IF NOT EXISTS idx_carts_created_at ON carts(created_at);
+CREATE INDEX IF NOT EXISTS idx_carts_guest_updated_at ON carts(updated_at, id) WHERE user_id IS NULL;
 
 -- ============================================================================
 -- Table: cart_items
@@ -146,6 +164,7 @@ CREATE TABLE IF NOT EXISTS cart_items (
 CREATE INDEX IF NOT EXISTS idx_cart_items_cart_id ON cart_items(cart_id);
 CREATE INDEX IF NOT EXISTS idx_cart_items_sku ON cart_items(sku);
 CREATE INDEX IF NOT EXISTS idx_cart_items_product_id ON cart_items(product_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_items_cart_id_sku ON cart_items(cart_id, sku);
 
 -- ============================================================================
 -- Table: orders
@@ -180,6 +199,7 @@ CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
 CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date);
 CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_user_order_date_id ON orders(user_id, order_date, id);
 
 -- ============================================================================
 -- Table: order_items
@@ -217,7 +237,7 @@ CREATE INDEX IF NOT EXISTS idx_order_items_sku ON order_items(sku);
 CREATE TABLE IF NOT EXISTS access_token_log (
     id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL,
-    token TEXT NOT NULL UNIQUE,
+    token TEXT NOT NULL,
     expires_at TIMESTAMP NOT NULL,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -230,8 +250,88 @@ CREATE TABLE IF NOT EXISTS access_token_log (
 
 -- Indexes for access_token_log
 CREATE INDEX IF NOT EXISTS idx_access_token_user_id ON access_token_log(user_id);
-CREATE INDEX IF NOT EXISTS idx_access_token_token ON access_token_log(token);
+CREATE INDEX IF NOT EXISTS idx_access_token_token_hash ON access_token_log USING hash (token);
 CREATE INDEX IF NOT EXISTS idx_access_token_expires_at ON access_token_log(expires_at);
+CREATE INDEX IF NOT EXISTS idx_access_token_updated_at ON access_token_log(updated_at);
+
+-- ============================================================================
+-- Table: product_feed / product_feed_queue
+-- Description: Precomputed homepage feed (one summary row per product) and the
+-- products waiting for a refresh (filled by triggers, drained by the API)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS product_feed (
+    product_id INTEGER PRIMARY KEY,
+    min_price NUMERIC(10, 2) NOT NULL,
+    max_price NUMERIC(10, 2) NOT NULL,
+    total_stock INTEGER NOT NULL DEFAULT 0,
+    variant_count INTEGER NOT NULL DEFAULT 0,
+    in_stock BOOLEAN GENERATED ALWAYS AS (total_stock > 0) STORED,
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_product_feed_product
+        FOREIGN KEY (product_id)
+        REFERENCES products(id)
+        ON DELETE CASCADE
+);
+
+-- Feed order: in-stock first, then score; product_id breaks ties
+CREATE INDEX IF NOT EXISTS idx_product_feed_rank
+ON product_feed(in_stock DESC, score DESC, product_id);
+
+-- max(updated_at) tells API processes whether their rendered feed is stale
+CREATE INDEX IF NOT EXISTS idx_product_feed_updated_at
+ON product_feed(updated_at);
+
+CREATE TABLE IF NOT EXISTS product_feed_queue (
+    product_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================================
+-- Table: idempotency_keys
+-- Description: Responses of POST /orders and /cart/items sent with an
+-- Idempotency-Key, replayed on retries (status_code NULL while in progress)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint BYTEA NOT NULL,
+    status_code SMALLINT,
+    body BYTEA,
+    locked_until TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (scope, idempotency_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+-- ============================================================================
+-- Table: outbox_events
+-- Description: Side effects of committed orders (email, sheet sync, analytics),
+-- one row per handler, claimed by the outbox worker with FOR UPDATE SKIP LOCKED
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    aggregate_id BIGINT NOT NULL,
+    handler VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP,
+
+    CONSTRAINT chk_outbox_events_status CHECK (status IN ('pending', 'done', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_events_pending ON outbox_events(available_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_outbox_events_done_processed_at
+    ON outbox_events(processed_at, id) WHERE status = 'done';
 
 -- ============================================================================
 -- Triggers for updated_at
@@ -263,6 +363,185 @@ CREATE TRIGGER update_orders_updated_at BEFORE UPDATE ON orders
 CREATE TRIGGER update_access_token_log_updated_at BEFORE UPDATE ON access_token_log
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- ============================================================================
+-- Homepage feed refresh (see migrations/007_product_feed.sql)
+-- ============================================================================
+-- score: rating averaged with a prior of 3.5 stars worth 20 reviews, so a single
+-- 5-star review does not outrank hundreds of 4.8-star ones
+CREATE OR REPLACE FUNCTION refresh_product_feed(p_limit INTEGER DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    WITH claimed AS (
+        DELETE FROM product_feed_queue q
+        WHERE q.product_id IN (
+            SELECT product_id FROM product_feed_queue
+            ORDER BY product_id
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING q.product_id
+    ),
+    summary AS (
+        SELECT p.id AS product_id,
+               coalesce(min(p.price + v.price_modifier), p.price) AS min_price,
+               coalesce(max(p.price + v.price_modifier), p.price) AS max_price,
+               coalesce(sum(v.stock), 0) AS total_stock,
+               count(v.id) AS variant_count,
+               (coalesce(p.rating, 0) * p.review_count + 3.5 * 20) / (p.review_count + 20) AS score
+        FROM claimed c
+        JOIN products p ON p.id = c.product_id
+        LEFT JOIN product_variants v ON v.product_id = p.id
+        GROUP BY p.id
+    ),
+    upserted AS (
+        INSERT INTO product_feed (product_id, min_price, max_price, total_stock, variant_count, score)
+        SELECT product_id, min_price, max_price, total_stock, variant_count, score FROM summary
+        ON CONFLICT (product_id) DO UPDATE
+        SET min_price = EXCLUDED.min_price,
+            max_price = EXCLUDED.max_price,
+            total_stock = EXCLUDED.total_stock,
+            variant_count = EXCLUDED.variant_count,
+            score = EXCLUDED.score,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE (product_feed.min_price, product_feed.max_price, product_feed.total_stock,
+               product_feed.variant_count, product_feed.score)
+            IS DISTINCT FROM
+            (EXCLUDED.min_price, EXCLUDED.max_price, EXCLUDED.total_stock, EXCLUDED.variant_count, EXCLUDED.score)
+    )
+    SELECT count(*) INTO refreshed FROM claimed;
+
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Enqueue changed products (statement-level, one insert per statement)
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_products()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT DISTINCT id FROM changed_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_variants()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT DISTINCT product_id FROM changed_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A variant moved to another product changes both products
+CREATE OR REPLACE FUNCTION enqueue_product_feed_from_variant_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO product_feed_queue (product_id)
+    SELECT product_id FROM new_rows
+    UNION
+    SELECT product_id FROM old_rows
+    ON CONFLICT (product_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be shared between events, hence one trigger per event
+DROP TRIGGER IF EXISTS product_feed_products_insert ON products;
+CREATE TRIGGER product_feed_products_insert AFTER INSERT ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_products();
+
+DROP TRIGGER IF EXISTS product_feed_products_update ON products;
+CREATE TRIGGER product_feed_products_update AFTER UPDATE ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_products();
+
+DROP TRIGGER IF EXISTS product_feed_variants_insert ON product_variants;
+CREATE TRIGGER product_feed_variants_insert AFTER INSERT ON product_variants
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variants();
+
+DROP TRIGGER IF EXISTS product_feed_variants_update ON product_variants;
+CREATE TRIGGER product_feed_variants_update AFTER UPDATE ON product_variants
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variant_update();
+
+DROP TRIGGER IF EXISTS product_feed_variants_delete ON product_variants;
+CREATE TRIGGER product_feed_variants_delete AFTER DELETE ON product_variants
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION enqueue_product_feed_from_variants();
+
+-- ============================================================================
+-- Cart totals (see migrations/010_cart_totals.sql)
+-- ============================================================================
+-- Statement-level: applies the per-cart difference of each cart_items statement
+CREATE OR REPLACE FUNCTION update_cart_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE carts c
+        SET item_count = c.item_count + d.item_count,
+            total_quantity = c.total_quantity + d.total_quantity,
+            subtotal = c.subtotal + d.subtotal
+        FROM (
+            SELECT cart_id, count(*) AS item_count, sum(quantity) AS total_quantity, sum(price * quantity) AS subtotal
+            FROM new_rows
+            GROUP BY cart_id
+        ) d
+        WHERE c.id = d.cart_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE carts c
+        SET item_count = c.item_count - d.item_count,
+            total_quantity = c.total_quantity - d.total_quantity,
+            subtotal = c.subtotal - d.subtotal
+        FROM (
+            SELECT cart_id, count(*) AS item_count, sum(quantity) AS total_quantity, sum(price * quantity) AS subtotal
+            FROM old_rows
+            GROUP BY cart_id
+        ) d
+        WHERE c.id = d.cart_id;
+    ELSE
+        UPDATE carts c
+        SET item_count = c.item_count + d.item_count,
+            total_quantity = c.total_quantity + d.total_quantity,
+            subtotal = c.subtotal + d.subtotal
+        FROM (
+            SELECT cart_id, sum(lines) AS item_count, sum(quantity) AS total_quantity, sum(amount) AS subtotal
+            FROM (
+                SELECT cart_id, 1 AS lines, quantity, price * quantity AS amount FROM new_rows
+                UNION ALL
+                SELECT cart_id, -1, -quantity, -(price * quantity) FROM old_rows
+            ) changes
+            GROUP BY cart_id
+            HAVING sum(quantity) <> 0 OR sum(amount) <> 0 OR sum(lines) <> 0
+        ) d
+        WHERE c.id = d.cart_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be shared between events, hence one trigger per event
+DROP TRIGGER IF EXISTS cart_totals_items_insert ON cart_items;
+CREATE TRIGGER cart_totals_items_insert AFTER INSERT ON cart_items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
+DROP TRIGGER IF EXISTS cart_totals_items_update ON cart_items;
+CREATE TRIGGER cart_totals_items_update AFTER UPDATE ON cart_items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
+DROP TRIGGER IF EXISTS cart_totals_items_delete ON cart_items;
+CREATE TRIGGER cart_totals_items_delete AFTER DELETE ON cart_items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_cart_totals();
+
 -- ============================================================================
 -- Comments for documentation
 -- ============================================================================
@@ -274,13 +553,20 @@ COMMENT ON TABLE cart_items IS 'Items in shopping carts';
 COMMENT ON TABLE orders IS 'Customer orders with status tracking';
 COMMENT ON TABLE order_items IS 'Items in orders (historical record)';
 COMMENT ON TABLE access_token_log IS 'Access token tracking for authentication';
+COMMENT ON TABLE product_feed IS 'Homepage feed: price range, total stock and ranking score per product';
+COMMENT ON TABLE product_feed_queue IS 'Products whose product_feed row must be recomputed';
+COMMENT ON TABLE idempotency_keys IS 'Responses of POST requests sent with an Idempotency-Key, replayed on retries';
+COMMENT ON TABLE outbox_events IS 'Side effects of committed orders, delivered by the outbox worker';
 
 COMMENT ON COLUMN products.images IS 'JSON array of image URLs';
+COMMENT ON COLUMN products.image_variants IS 'Derived WebP/AVIF images per original image URL (migration 012)';
 COMMENT ON COLUMN products.rating IS 'Product rating from 0.00 to 5.00';
+COMMENT ON COLUMN products.search_vector IS 'Weighted full-text vector of name (A) and description (B)';
 COMMENT ON COLUMN product_variants.sku IS 'Stock Keeping Unit - unique identifier for variant';
 COMMENT ON COLUMN product_variants.price_modifier IS 'Price adjustment from base product price';
 COMMENT ON COLUMN carts.user_id IS 'Nullable for guest carts';
 COMMENT ON COLUMN carts.session_id IS 'Session ID for guest carts';
+COMMENT ON COLUMN carts.subtotal IS 'Sum of cart_items.price * quantity, maintained by the cart_totals_items_* triggers';
 COMMENT ON COLUMN cart_items.price IS 'Price at time of adding to cart (snapshot)';
 COMMENT ON COLUMN orders.delivery_info IS 'JSON object containing delivery address and details';
 COMMENT ON COLUMN orders.status IS 'Order status: pending, paid, shipped, completed, cancelled';
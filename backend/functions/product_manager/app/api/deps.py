@@ -0,0 +1,70 @@
+from typing import Optional
+
+from fastapi import Depends, Header, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from core.security import decode_token
+from exceptions import BadRequestException, UnauthorizedException
+from services.catalog_loader import CatalogLoader
+from services.token_cache import token_cache
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+ACCESS_TOKEN_COOKIE = "access_token"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Request state key under which ConditionalGetMiddleware leaves the resource version
+RESOURCE_VERSION_STATE = "resource_version"
+
+
+def get_access_token(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[str]:
+    """Bearer token from the Authorization header, falling back to the HttpOnly cookie."""
+    if credentials is not None:
+        return credentials.credentials
+    return request.cookies.get(ACCESS_TOKEN_COOKIE)
+
+
+async def get_current_user_id(token: Optional[str] = Depends(get_access_token)) -> int:
+    """Authenticated user id; the token must be valid and not logged out."""
+    if not token:
+        raise UnauthorizedException("Not authenticated")
+
+    payload = decode_token(token)
+    # Answered from the in-process token cache in the common case
+    if not await token_cache.is_active(token):
+        raise UnauthorizedException("Token has been revoked")
+
+    return int(payload["sub"])
+
+
+async def get_optional_user_id(token: Optional[str] = Depends(get_access_token)) -> Optional[int]:
+    """User id when a token is sent (it must then be valid), None for guests."""
+    if not token:
+        return None
+    return await get_current_user_id(token)
+
+
+def get_session_id(x_session_id: Optional[str] = Header(None, alias="X-Session-ID")) -> Optional[str]:
+    """Guest cart session id."""
+    return x_session_id or None
+
+
+def get_idempotency_key(idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")) -> Optional[str]:
+    """Client-chosen retry key of a POST (services.idempotency), None when not sent."""
+    if idempotency_key is None:
+        return None
+    if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise BadRequestException(f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+    return idempotency_key
+
+
+def get_catalog_loader() -> CatalogLoader:
+    """A fresh batch loader per request, so its memo never outlives the request."""
+    return CatalogLoader()
+
+
+async def get_resource_version(request: Request) -> Optional[str]:
+    """Version of the requested resource looked up by ConditionalGetMiddleware, if it ran."""
+    return getattr(request.state, RESOURCE_VERSION_STATE, None)
@@ -0,0 +1,256 @@
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.deps import ACCESS_TOKEN_COOKIE, RESOURCE_VERSION_STATE
+from core import metrics
+from core.config import settings
+from core.database import read_from_primary
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and files it under its route template (core.metrics).
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware: it wraps `send` only to
+    read the status code and adds no extra task or body buffering per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._emf = settings.is_lambda
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = metrics.start_request(scope["path"])
+        cold_start = metrics.metrics_registry.cold_start
+        metrics.metrics_registry.cold_start = False
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            # The router stores the matched route in the (shared) scope; unmatched paths
+            # are grouped together so scanners cannot blow up the label set
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            metrics.metrics_registry.observe_request(method, route_path, status, elapsed, request, cold_start)
+            if self._emf:
+                try:
+                    metrics.emf_publisher.publish(method, route_path, status, elapsed, request, cold_start)
+                except Exception:  # noqa: BLE001 - metrics must never fail the request
+                    logger.exception("Failed to publish EMF metrics")
+
+
+# Writes after which the session reads its own data back from the primary
+PINNING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+PINNING_PATHS = ("/api/v1/cart", "/api/v1/orders", "/api/v1/auth/login")  # login merges the guest cart
+PIN_COOKIE = "read_primary_until"
+PIN_MAX_ENTRIES = 10_000
+
+
+class SessionPins:
+    """Sessions that wrote recently, by key, with the time.time() their pin expires."""
+
+    def __init__(self, max_entries: int = PIN_MAX_ENTRIES) -> None:
+        self._pins: Dict[str, float] = {}
+        self._max_entries = max_entries
+
+    def pin(self, key: str, until: float) -> None:
+        if len(self._pins) >= self._max_entries:
+            now = time.time()
+            self._pins = {k: expiry for k, expiry in self._pins.items() if expiry > now}
+            if len(self._pins) >= self._max_entries:
+                self._pins.pop(next(iter(self._pins)))
+        self._pins[key] = until
+
+    def is_pinned(self, key: str, now: float) -> bool:
+        return self._pins.get(key, 0.0) > now
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Read-your-writes on top of replica reads (core.database.read_pool).
+
+    A successful cart or order write pins its session to the primary for
+    `pin_seconds`: in this process by session key (hashed bearer token or access
+    token cookie, else X-Session-ID), and in every other container through a
+    short-lived cookie. Requests of a pinned session run inside `read_from_primary`.
+    """
+
+    def __init__(self, app: ASGIApp, pin_seconds: float = settings.READ_AFTER_WRITE_PIN_SECONDS) -> None:
+        self.app = app
+        self._pin_seconds = pin_seconds
+        self._pins = SessionPins()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        cookies = cookie_parser(headers.get("cookie", ""))
+        key = self._session_key(headers, cookies)
+        now = time.time()
+        pinned = (key is not None and self._pins.is_pinned(key, now)) or self._cookie_pinned(cookies, now)
+
+        writes = scope["method"] in PINNING_METHODS and scope["path"].startswith(PINNING_PATHS)
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self._pin_seconds
+                if key is not None:
+                    self._pins.pin(key, until)
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{PIN_COOKIE}={until:.0f}; Max-Age={self._pin_seconds:.0f}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        with read_from_primary(pinned):
+            await self.app(scope, receive, send_with_pin if writes else send)
+
+    @staticmethod
+    def _session_key(headers: Headers, cookies: Dict[str, str]) -> Optional[str]:
+        token = headers.get("authorization") or cookies.get(ACCESS_TOKEN_COOKIE)
+        if token:
+            return "token:" + hashlib.sha256(token.encode()).hexdigest()
+        session_id = headers.get("x-session-id")
+        return f"session:{session_id}" if session_id else None
+
+    def _cookie_pinned(self, cookies: Dict[str, str], now: float) -> bool:
+        try:
+            until = float(cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            return False
+        # The cookie cannot pin a client for longer than one pin window
+        return now < until <= now + self._pin_seconds + 1
+
+
+# Path params of the matched route -> version of the resource, None if it does not exist
+VersionLookup = Callable[[Dict[str, Any]], Awaitable[Optional[str]]]
+
+# Part of every ETag: bump it when a response format changes without a data change
+REPRESENTATION_VERSION = "1"
+
+
+def cache_control(*, max_age: int, stale_while_revalidate: int) -> str:
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+def make_etag(scope: Scope, version: str) -> str:
+    """Strong ETag of the representation of `version` at this path and query string."""
+    key = "\n".join((REPRESENTATION_VERSION, scope["path"], scope["query_string"].decode("latin-1"), version))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """
+    ETags and conditional GET for read routes whose data has a cheap version.
+
+    `resources` maps route path templates (as declared, e.g. "/api/v1/products/{slug}")
+    to a lookup of the version of the data the response is rendered from. For a GET
+    on one of them the version is looked up before the endpoint runs: a matching
+    If-None-Match is answered 304 without building the body, otherwise the 200
+    response gets the ETag. Both carry `cache_control`. The version is left in the
+    request state (api.deps.get_resource_version) so response caches can key on it
+    and never serve a body older than its ETag. Routes are matched in declaration
+    order, so a static route shadowing a template (/products/featured) is left alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes: Sequence[BaseRoute],
+        resources: Mapping[str, VersionLookup],
+        cache_control: str,
+    ) -> None:
+        self.app = app
+        self._routes = routes
+        self._resources = resources
+        self._cache_control = cache_control.encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        lookup, path_params = self._match(scope)
+        if lookup is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            version = await lookup(path_params)
+        except Exception:  # noqa: BLE001 - serve the response without an ETag
+            logger.exception("Failed to look up the version of %s", scope["path"])
+            version = None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(scope, version)
+        headers = [(b"etag", etag.encode("latin-1")), (b"cache-control", self._cache_control)]
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        scope.setdefault("state", {})[RESOURCE_VERSION_STATE] = version
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers:
+                    response_headers[name.decode()] = value.decode("latin-1")
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+    def _match(self, scope: Scope) -> Tuple[Optional[VersionLookup], Dict[str, Any]]:
+        for route in self._routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                # What the router would store (route, endpoint, path_params): a 304 is
+                # answered before routing, and MetricsMiddleware files it under scope["route"]
+                scope.update(child_scope)
+                lookup = self._resources.get(getattr(route, "path", None))
+                return lookup, child_scope.get("path_params", {})
+        return None, {}
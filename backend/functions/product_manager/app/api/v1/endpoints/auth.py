@@ -0,0 +1,78 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+
+from api.deps import ACCESS_TOKEN_COOKIE, get_access_token, get_current_user_id, get_session_id
+from core.config import settings
+from schemas.auth import AuthResponse, LoginRequest, MessageResponse, RegisterRequest
+from services.auth_service import auth_service
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+REFRESH_TOKEN_COOKIE = "refresh_token"
+
+
+def _set_token_cookies(response: Response, body: AuthResponse) -> None:
+    secure = settings.ENVIRONMENT != "local"
+    response.set_cookie(
+        ACCESS_TOKEN_COOKIE,
+        body.data.access_token,
+        max_age=body.data.expires_in,
+        httponly=True,
+        secure=secure,
+        samesite="lax",
+    )
+    response.set_cookie(
+        REFRESH_TOKEN_COOKIE,
+        body.data.refresh_token,
+        max_age=body.data.refresh_expires_in,
+        httponly=True,
+        secure=secure,
+        samesite="lax",
+    )
+
+
+def _clear_token_cookies(response: Response) -> None:
+    response.delete_cookie(ACCESS_TOKEN_COOKIE)
+    response.delete_cookie(REFRESH_TOKEN_COOKIE)
+
+
+@router.post("/login", response_model=AuthResponse)
+async def login(
+    request: LoginRequest,
+    response: Response,
+    session_id: Optional[str] = Depends(get_session_id),
+):
+    # The guest cart of X-Session-ID is merged into the user's cart on success
+    body = await auth_service.login(request, session_id=session_id)
+    _set_token_cookies(response, body)
+    return body
+
+
+@router.post("/register", response_model=AuthResponse)
+async def register(request: RegisterRequest, response: Response):
+    body = await auth_service.register(request)
+    _set_token_cookies(response, body)
+    return body
+
+
+@router.post("/logout", response_model=MessageResponse)
+async def logout(
+    response: Response,
+    token: str = Depends(get_access_token),
+    _: int = Depends(get_current_user_id),
+):
+    await auth_service.logout(token)
+    _clear_token_cookies(response)
+    return MessageResponse(message="Logged out successfully")
+
+
+@router.post("/logout/all", response_model=MessageResponse)
+async def logout_all(
+    response: Response,
+    token: str = Depends(get_access_token),
+    user_id: int = Depends(get_current_user_id),
+):
+    await auth_service.logout_all(user_id, token)
+    _clear_token_cookies(response)
+    return MessageResponse(message="Logged out from all devices successfully")
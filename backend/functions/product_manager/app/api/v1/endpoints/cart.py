@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from api.deps import get_catalog_loader, get_idempotency_key, get_optional_user_id, get_session_id
+from core.serialization import TrustedJSONResponse
+from schemas.cart import AddCartItemRequest, CartResponse, CartSummaryResponse
+from services.cart_service import cart_service
+from services.catalog_loader import CatalogLoader
+from services.idempotency import CommitHook, idempotency_store
+
+router = APIRouter(prefix="/cart", tags=["cart"])
+
+
+@router.get("", response_model=CartResponse)
+async def get_cart(
+    user_id: Optional[int] = Depends(get_optional_user_id),
+    session_id: Optional[str] = Depends(get_session_id),
+    loader: CatalogLoader = Depends(get_catalog_loader),
+):
+    body = await cart_service.get_cart(user_id=user_id, session_id=session_id, loader=loader)
+    return TrustedJSONResponse(body)
+
+
+@router.post("/items", response_model=CartSummaryResponse)
+async def add_cart_item(
+    request: AddCartItemRequest,
+    user_id: Optional[int] = Depends(get_optional_user_id),
+    session_id: Optional[str] = Depends(get_session_id),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+):
+    async def add(before_commit: Optional[CommitHook]) -> CartSummaryResponse:
+        return await cart_service.add_item(
+            user_id=user_id, session_id=session_id, request=request, before_commit=before_commit
+        )
+
+    owner = f"user:{user_id}" if user_id is not None else f"session:{session_id}"
+    return await idempotency_store.respond(
+        key=idempotency_key, scope=f"cart-items {owner}", request=request, status_code=200, handler=add
+    )
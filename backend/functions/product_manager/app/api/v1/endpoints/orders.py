@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from api.deps import get_current_user_id, get_idempotency_key
+from core.serialization import TrustedJSONResponse
+from schemas.order import OrderCreateRequest, OrderCreateResponse, OrderListResponse
+from services.idempotency import CommitHook, idempotency_store
+from services.order_service import order_service
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+@router.post("", response_model=OrderCreateResponse, status_code=201)
+async def create_order(
+    request: OrderCreateRequest,
+    user_id: int = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+):
+    # orders.user_id is NOT NULL, so checkout requires a signed-in user
+    async def place_order(before_commit: Optional[CommitHook]) -> OrderCreateResponse:
+        return await order_service.create_order(user_id, request, before_commit=before_commit)
+
+    return await idempotency_store.respond(
+        key=idempotency_key, scope=f"orders user:{user_id}", request=request, status_code=201, handler=place_order
+    )
+
+
+@router.get("/me", response_model=OrderListResponse)
+async def list_my_orders(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page (keyset mode)"),
+    user_id: int = Depends(get_current_user_id),
+):
+    body = await order_service.list_my_orders(user_id, offset=offset, limit=limit, cursor=cursor)
+    return TrustedJSONResponse(body)
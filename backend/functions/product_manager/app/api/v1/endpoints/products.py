@@ -0,0 +1,55 @@
+from typing import Literal, Optional, Union
+
+from fastapi import APIRouter, Depends, Query
+
+from api.deps import get_catalog_loader, get_resource_version
+from core.serialization import TrustedJSONResponse
+from exceptions import BadRequestException
+from schemas.product import FeaturedProductsResponse, ProductDetailResponse, ProductListResponse, ProductSearchResponse
+from services.catalog_loader import CatalogLoader
+from services.feed_service import feed_service
+from services.product_service import product_service
+from services.suggest_service import suggest_service
+
+router = APIRouter(prefix="/products", tags=["products"])
+
+
+@router.get("", response_model=Union[ProductListResponse, ProductSearchResponse])
+async def list_products(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    sort: Literal["newest", "price_asc", "price_desc", "rating"] = "newest",
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page (keyset mode)"),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Name/description keyword"),
+    version: Optional[str] = Depends(get_resource_version),
+):
+    # The service returns the serialized body, so no response_model validation runs
+    if search:
+        if cursor:
+            raise BadRequestException("cursor is not supported with search")
+        if offset == 0:
+            # One search, however many pages of it are read
+            suggest_service.record_query(search)
+        body = await product_service.search_products(search, offset=offset, limit=limit, version=version)
+    else:
+        body = await product_service.list_products(
+            offset=offset, limit=limit, sort=sort, cursor=cursor, version=version
+        )
+    return TrustedJSONResponse(body)
+
+
+@router.get("/featured", response_model=FeaturedProductsResponse)
+async def list_featured_products(limit: int = Query(20, ge=1, le=50)):
+    # Declared before /{slug} so "featured" is not taken for a product slug
+    body = await feed_service.featured(limit=limit)
+    return TrustedJSONResponse(body)
+
+
+@router.get("/{slug}", response_model=ProductDetailResponse)
+async def get_product(
+    slug: str,
+    loader: CatalogLoader = Depends(get_catalog_loader),
+    version: Optional[str] = Depends(get_resource_version),
+):
+    body = await product_service.get_product(slug, loader, version=version)
+    return TrustedJSONResponse(body)
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query, Response
+
+from schemas.search import SearchSuggestResponse
+from services.suggest_service import suggest_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/suggest", response_model=SearchSuggestResponse)
+async def suggest(
+    q: Optional[str] = Query(None, min_length=2, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+):
+    # Served from the in-process index: no database round trip once it is warm
+    body = await suggest_service.suggest(q, limit=limit)
+    return Response(content=body, media_type="application/json")
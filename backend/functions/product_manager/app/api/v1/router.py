@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from api.v1.endpoints import auth, cart, orders, products, search
+
+api_router = APIRouter(prefix="/api/v1")
+api_router.include_router(auth.router)
+api_router.include_router(products.router)
+api_router.include_router(search.router)
+api_router.include_router(cart.router)
+api_router.include_router(orders.router)
@@ -0,0 +1,127 @@
+"""
+Catalog import/export command line (see services.catalog_io).
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python app/catalog_cli.py import catalog.csv
+    PYTHONPATH=app python app/catalog_cli.py import catalog.ndjson --batch-size 10000
+    PYTHONPATH=app python app/catalog_cli.py import --sheet <spreadsheet key> --worksheet Catalog
+    PYTHONPATH=app python app/catalog_cli.py export -o catalog.csv
+    PYTHONPATH=app python app/catalog_cli.py export --format ndjson > catalog.ndjson
+
+Progress goes to stderr; the import summary is printed to stdout as JSON. A file
+argument of `-` reads stdin; the format follows the file extension unless --format
+is given.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import nullcontext
+from typing import Iterator, Optional
+
+from core.database import db_pool
+from services.catalog_io import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_EXPORT_PREFETCH,
+    CatalogRowError,
+    Row,
+    TransferProgress,
+    catalog_transfer,
+    read_csv,
+    read_ndjson,
+    read_sheet,
+    write_csv,
+    write_ndjson,
+)
+
+FORMATS = ("csv", "ndjson")
+
+
+def report_progress(progress: TransferProgress) -> None:
+    sys.stderr.write(
+        f"\r{progress.rows:>12,} rows  {progress.elapsed_seconds:8.1f}s  {progress.rows_per_second:>10,.0f} rows/s"
+    )
+    sys.stderr.flush()
+
+
+def detect_format(path: Optional[str], explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    if path and path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def source_rows(args: argparse.Namespace, stream) -> Iterator[Row]:
+    if args.sheet:
+        return read_sheet(args.sheet, args.worksheet, args.credentials)
+    if detect_format(args.path, args.format) == "ndjson":
+        return read_ndjson(stream)
+    return read_csv(stream)
+
+
+async def run_import(args: argparse.Namespace) -> int:
+    if not args.sheet and not args.path:
+        sys.stderr.write("import needs a file path (or -) or --sheet\n")
+        return 2
+
+    if args.sheet or args.path == "-":
+        opened = nullcontext(sys.stdin)
+    else:
+        opened = open(args.path, newline="", encoding="utf-8")
+
+    with opened as stream:
+        try:
+            result = await catalog_transfer.import_rows(
+                source_rows(args, stream), batch_size=args.batch_size, on_progress=report_progress
+            )
+        except CatalogRowError as exc:
+            sys.stderr.write(f"\nImport aborted, nothing was written: {exc}\n")
+            return 1
+
+    sys.stderr.write("\n")
+    print(json.dumps(result.to_dict(), indent=2))
+    return 0
+
+
+async def run_export(args: argparse.Namespace) -> int:
+    output_format = detect_format(args.output, args.format)
+    write = write_ndjson if output_format == "ndjson" else write_csv
+    opened = open(args.output, "w", newline="", encoding="utf-8") if args.output else nullcontext(sys.stdout)
+
+    with opened as out:
+        await write(catalog_transfer.export_rows(prefetch=args.prefetch, on_progress=report_progress), out)
+    sys.stderr.write("\n")
+    return 0
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    try:
+        return await (run_import(args) if args.command == "import" else run_export(args))
+    finally:
+        await db_pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="upsert products and variants from a file or sheet")
+    importer.add_argument("path", nargs="?", help="CSV/NDJSON file, or - for stdin")
+    importer.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    importer.add_argument("--sheet", help="Google Sheets spreadsheet key (instead of a file)")
+    importer.add_argument("--worksheet", default="Catalog", help="worksheet name (with --sheet)")
+    importer.add_argument("--credentials", help="service account JSON (with --sheet, default gspread location)")
+    importer.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per COPY batch")
+
+    exporter = commands.add_parser("export", help="stream the catalog as CSV or NDJSON")
+    exporter.add_argument("-o", "--output", help="output file (default stdout)")
+    exporter.add_argument("--format", choices=FORMATS, help="defaults to the output extension, else csv")
+    exporter.add_argument("--prefetch", type=int, default=DEFAULT_EXPORT_PREFETCH, help="rows per cursor fetch")
+
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+In-process structures behind search autocomplete.
+
+`PrefixIndex` is a sorted array of (term, item id) pairs searched with bisect: a
+prefix lookup is one binary search plus a short forward scan, with no per-node
+objects as in a trie. Every word suffix of a name is indexed ("air max 90",
+"max 90", "90"), so typing any word of a product name matches it.
+
+`DecayingCounter` ranks strings by an exponentially decaying hit count. It uses
+forward decay: a hit at time t adds 2 ** ((t - origin) / half_life) instead of
+decaying every stored score, so ranking never has to touch scores on read.
+
+Like core.cache, neither structure locks: the API runs on one event loop per process.
+"""
+
+import heapq
+import math
+import re
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Scores are rebased before 2 ** exponent can lose precision or overflow
+MAX_DECAY_EXPONENT = 60.0
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace; the form terms and queries are compared in."""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+def index_terms(*texts: str) -> Set[str]:
+    """Every word suffix of each text, normalized."""
+    terms: Set[str] = set()
+    for text in texts:
+        words = normalize(text).split()
+        terms.update(" ".join(words[position:]) for position in range(len(words)))
+    return terms
+
+
+class PrefixIndex:
+    """Sorted (term, id) array supporting prefix lookups and per-item updates."""
+
+    def __init__(self) -> None:
+        self._entries: List[Tuple[str, Hashable]] = []
+        self._terms: Dict[Hashable, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def size(self) -> int:
+        """Number of (term, id) entries."""
+        return len(self._entries)
+
+    def rebuild(self, items: Iterable[Tuple[Hashable, Set[str]]]) -> None:
+        """Replace the whole index with one sort instead of repeated inserts."""
+        self._terms = {item_id: terms for item_id, terms in items}
+        self._entries = sorted((term, item_id) for item_id, terms in self._terms.items() for term in terms)
+
+    def upsert(self, item_id: Hashable, terms: Set[str]) -> None:
+        """Index `item_id` under `terms`, replacing whatever it was indexed under before."""
+        previous = self._terms.get(item_id, set())
+        for term in previous - terms:
+            position = bisect_left(self._entries, (term, item_id))
+            if position < len(self._entries) and self._entries[position] == (term, item_id):
+                del self._entries[position]
+        for term in terms - previous:
+            insort(self._entries, (term, item_id))
+        self._terms[item_id] = terms
+
+    def remove(self, item_id: Hashable) -> None:
+        if item_id in self._terms:
+            self.upsert(item_id, set())
+            del self._terms[item_id]
+
+    def search(self, prefix: str, *, limit: int, scan_limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Ids of items with a term starting with `prefix`, in term order, deduplicated.
+
+        At most `scan_limit` entries are visited, which bounds the cost of very short
+        prefixes; callers re-rank the candidates they get back.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        scan_limit = scan_limit or limit
+        matches: List[Hashable] = []
+        seen: Set[Hashable] = set()
+        position = bisect_left(self._entries, (prefix,))
+        end = min(len(self._entries), position + scan_limit)
+        while position < end:
+            term, item_id = self._entries[position]
+            if not term.startswith(prefix):
+                break
+            if item_id not in seen:
+                seen.add(item_id)
+                matches.append(item_id)
+                if len(matches) >= limit:
+                    break
+            position += 1
+        return matches
+
+
+class DecayingCounter:
+    """Bounded counter whose counts halve every `half_life_seconds`."""
+
+    def __init__(
+        self,
+        *,
+        half_life_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.half_life_seconds = half_life_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._origin = clock()
+        self._scores: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def add(self, key: str, amount: float = 1.0) -> None:
+        exponent = (self._clock() - self._origin) / self.half_life_seconds
+        if exponent > MAX_DECAY_EXPONENT:
+            self._rebase()
+            exponent = (self._clock() - self._origin) / self.half_life_seconds
+
+        self._scores[key] = self._scores.get(key, 0.0) + amount * math.pow(2.0, exponent)
+        if len(self._scores) > self.max_entries:
+            self._prune()
+
+    def top(self, limit: int, prefix: Optional[str] = None) -> List[Tuple[str, float]]:
+        """The `limit` highest (key, decayed count) pairs, optionally only keys starting with `prefix`."""
+        items = self._scores.items()
+        if prefix:
+            items = [(key, score) for key, score in items if key.startswith(prefix)]
+
+        scale = math.pow(2.0, -(self._clock() - self._origin) / self.half_life_seconds)
+        return [(key, score * scale) for key, score in heapq.nlargest(limit, items, key=lambda item: item[1])]
+
+    def _rebase(self) -> None:
+        now = self._clock()
+        scale = math.pow(2.0, -(now - self._origin) / self.half_life_seconds)
+        self._scores = {key: score * scale for key, score in self._scores.items()}
+        self._origin = now
+
+    def _prune(self) -> None:
+        # Keep the top half so pruning runs once per max_entries / 2 new keys, not on every add
+        keep = heapq.nlargest(self.max_entries // 2, self._scores.items(), key=lambda item: item[1])
+        self._scores = dict(keep)
@@ -0,0 +1,112 @@
+"""
+Bounded in-process LRU cache with per-entry TTL.
+
+Used for read-heavy, rarely changing data. The API runs on a single event loop per
+process, so no locking is needed. Wall-clock time is used for expiry so entries do
+not outlive their TTL across a Lambda freeze.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+DEFAULT_TOP_ENTRIES = 10
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    created_at: float
+    expires_at: float
+    hits: int = 0
+
+
+@dataclass
+class CacheCounters:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class TTLCache:
+    """LRU cache bounded by entry count, with entries expiring after `ttl_seconds`."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.counters = CacheCounters()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None, refreshing its LRU position on a hit."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counters.misses += 1
+            return None
+
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            self.counters.expirations += 1
+            self.counters.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self.counters.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries beyond the bound."""
+        now = self._clock()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = CacheEntry(value=value, created_at=now, expires_at=now + ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.counters.invalidations += 1
+
+    def clear(self) -> None:
+        self.counters.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self, top: int = DEFAULT_TOP_ENTRIES) -> Dict[str, Any]:
+        """Counters plus the most frequently hit entries."""
+        now = self._clock()
+        lookups = self.counters.hits + self.counters.misses
+        hottest: List[Dict[str, Any]] = [
+            {"key": repr(key), "hits": entry.hits, "age_seconds": round(now - entry.created_at, 1)}
+            for key, entry in sorted(self._entries.items(), key=lambda item: item[1].hits, reverse=True)[:top]
+        ]
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.counters.hits,
+            "misses": self.counters.misses,
+            "hit_ratio": round(self.counters.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.counters.evictions,
+            "expirations": self.counters.expirations,
+            "invalidations": self.counters.invalidations,
+            "hottest": hottest,
+        }
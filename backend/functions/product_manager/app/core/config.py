@@ -0,0 +1,221 @@
+"""
+Application settings.
+
+Values are read from environment variables (and from `.env` when running locally
+with docker-compose/uvicorn). On Lambda they are injected by DeviceManagerAPIStack.
+"""
+
+from typing import Optional
+
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Placeholder of .env.example; signing with it outside local development is refused
+DEFAULT_TOKEN_SECRET = "your-token-secret"
+# Every placeholder the docs show (.env.example, README), refused the same way
+PLACEHOLDER_TOKEN_SECRETS = frozenset({DEFAULT_TOKEN_SECRET, "your-secret-key-change-in-production"})
+# HMAC-SHA256 keys shorter than the digest weaken it; generate with `openssl rand -hex 32`
+MIN_TOKEN_SECRET_BYTES = 32
+
+
+class Settings(BaseSettings):
+    """Runtime configuration for the product manager API."""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", case_sensitive=True)
+
+    PROJECT_NAME: str = "NEXUS E-commerce API"
+    ENVIRONMENT: str = "local"  # local/dev/qa/stg/prod
+    LOG_LEVEL: str = "info"
+
+    # Direct database credentials (docker-compose or `expose`-less CDK config)
+    POSTGRES_HOST: str = "localhost"
+    POSTGRES_PORT: int = 5432
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = ""
+    POSTGRES_DB: str = "postgres"
+
+    # JSON credentials resolved at deploy time when `database.credentials.expose` is set
+    DATABASE_CREDENTIALS: Optional[str] = None
+
+    # Runtime lookup of the credentials JSON from SSM Parameter Store / Secrets Manager
+    PARAMETERS_PROVIDER_NAME: Optional[str] = None  # "ssm" or "secret"
+    DATABASE_CREDENTIALS_PARAMETER: Optional[str] = None
+    PARAMETERS_PROVIDER_DECRYPT: bool = False
+
+    # Optional RDS Proxy endpoint, takes precedence over the instance host when set
+    POSTGRES_PROXY_HOST: Optional[str] = None
+    POSTGRES_PROXY_PORT: Optional[int] = None
+
+    # Read replicas for catalog, search and order-history reads ("host[:port],..."; they
+    # use the credentials above). Replicas are health checked every
+    # READ_REPLICA_HEALTH_CHECK_SECONDS and skipped while more than
+    # READ_REPLICA_MAX_LAG_SECONDS behind; a session that wrote its cart or an order
+    # reads from the primary for READ_AFTER_WRITE_PIN_SECONDS
+    POSTGRES_READ_REPLICA_HOSTS: Optional[str] = None
+    READ_REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    READ_AFTER_WRITE_PIN_SECONDS: float = 5.0
+
+    # Connection pool tuning. Sizes default per runtime (see core.database)
+    POSTGRES_POOL_MIN_SIZE: Optional[int] = None
+    POSTGRES_POOL_MAX_SIZE: Optional[int] = None
+    POSTGRES_POOL_MAX_IDLE_SECONDS: float = 300.0
+    POSTGRES_POOL_STALE_AFTER_SECONDS: float = 300.0
+    POSTGRES_CONNECT_TIMEOUT: float = 10.0
+    POSTGRES_COMMAND_TIMEOUT: float = 30.0
+    # Named prepared statements per connection; default 100, 0 (unnamed statements)
+    # through RDS Proxy. Set 0 behind a pgbouncer in transaction mode
+    POSTGRES_STATEMENT_CACHE_SIZE: Optional[int] = None
+
+    # Catalog response cache for GET /products and /products/{slug}
+    CATALOG_CACHE_ENABLED: bool = False
+    CATALOG_CACHE_MAX_ENTRIES: int = 1000
+    CATALOG_CACHE_TTL_SECONDS: float = 30.0
+    CATALOG_CACHE_VERSION_CHECK_SECONDS: float = 5.0
+
+    # Conditional GET on the public catalog routes (api.middleware.ConditionalGetMiddleware):
+    # strong ETags from the catalog versions, 304 for a matching If-None-Match, and
+    # this Cache-Control policy on both, so browsers, Next.js and API Gateway can reuse
+    # a response for CATALOG_HTTP_MAX_AGE_SECONDS and serve it stale while revalidating
+    CONDITIONAL_GET_ENABLED: bool = True
+    CATALOG_HTTP_MAX_AGE_SECONDS: int = 10
+    CATALOG_HTTP_STALE_WHILE_REVALIDATE_SECONDS: int = 60
+
+    # Hot read endpoints (products, cart, order history) map trusted rows straight to
+    # JSON with orjson; when off they go through pydantic models as before
+    FAST_JSON_ENABLED: bool = True
+
+    # Homepage feed (product_feed): how often queued products are recomputed and the
+    # rendered feed re-checked, and how many queued products one refresh handles
+    FEED_REFRESH_SECONDS: float = 30.0
+    FEED_REFRESH_BATCH_SIZE: int = 5000
+
+    # Search autocomplete index (rebuilt in process) and popular-query counters
+    SUGGEST_REFRESH_SECONDS: float = 30.0
+    SUGGEST_FULL_REBUILD_SECONDS: float = 900.0
+    POPULAR_SEARCH_HALF_LIFE_SECONDS: float = 21600.0
+    POPULAR_SEARCH_MAX_ENTRIES: int = 5000
+
+    # Signs JWTs and pagination cursors. Outside ENVIRONMENT=local it must be set to a
+    # private value of at least MIN_TOKEN_SECRET_BYTES bytes
+    TOKEN_SECRET: str = DEFAULT_TOKEN_SECRET
+
+    # Password hashing: bcrypt cost (calibrated to the target latency when unset),
+    # dedicated worker threads and how many hashes may wait before requests get 503
+    BCRYPT_ROUNDS: Optional[int] = None
+    PASSWORD_HASH_TARGET_MS: float = 250.0
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # In-process cache of access_token_log (token fingerprints) and purge of expired rows
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_ENTRIES: int = 100_000
+    TOKEN_CACHE_REFRESH_SECONDS: float = 5.0
+    TOKEN_PURGE_INTERVAL_SECONDS: float = 3600.0
+    TOKEN_PURGE_GRACE_SECONDS: float = 3600.0
+    TOKEN_PURGE_BATCH_SIZE: int = 1000
+
+    # Idempotency-Key replay for POST /orders and /cart/items: responses are kept
+    # IDEMPOTENCY_TTL_SECONDS in idempotency_keys, the most recent ones in memory too.
+    # A claim left by a crashed attempt can be taken over after IDEMPOTENCY_LOCK_SECONDS
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10_000
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 3600.0
+    IDEMPOTENCY_PURGE_BATCH_SIZE: int = 1000
+
+    # Maintenance sweep (services.sweeper, run by sweeper_cli.py or the scheduled
+    # sweeper Lambda): guest carts untouched for GUEST_CART_RETENTION_DAYS, expired
+    # tokens and idempotency keys are deleted SWEEPER_BATCH_SIZE rows per transaction,
+    # pausing between batches, until done or SWEEPER_MAX_SECONDS have passed
+    GUEST_CART_RETENTION_DAYS: float = 30.0
+    SWEEPER_BATCH_SIZE: int = 1000
+    SWEEPER_BATCH_PAUSE_SECONDS: float = 0.05
+    SWEEPER_MAX_SECONDS: float = 600.0
+
+    # Transactional outbox (services.outbox): checkout side effects are written to
+    # outbox_events in the order transaction, one row per handler in OUTBOX_HANDLERS,
+    # and delivered by the outbox worker (outbox_cli.py or the scheduled outbox Lambda)
+    # OUTBOX_BATCH_SIZE rows per claim. Failed deliveries are retried with exponential
+    # backoff (OUTBOX_RETRY_BASE_SECONDS doubling up to OUTBOX_RETRY_MAX_SECONDS) until
+    # OUTBOX_MAX_ATTEMPTS; delivered rows are swept after OUTBOX_RETENTION_DAYS
+    OUTBOX_HANDLERS: str = "email,sheets,analytics"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_CONCURRENCY: int = 8
+    OUTBOX_LEASE_SECONDS: float = 120.0
+    OUTBOX_HANDLER_TIMEOUT_SECONDS: float = 60.0
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 900.0
+    OUTBOX_RETENTION_DAYS: float = 7.0
+
+    # Outbox handler targets (services.outbox_handlers). Without SMTP_HOST,
+    # ORDER_SHEET_KEY or ANALYTICS_ENDPOINT the handler only logs what it would send
+    SMTP_HOST: Optional[str] = None
+    SMTP_PORT: int = 587
+    SMTP_USER: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    ORDER_EMAIL_FROM: str = "orders@example.com"
+    ORDER_SHEET_KEY: Optional[str] = None
+    ORDER_SHEET_WORKSHEET: str = "Orders"
+    GOOGLE_SERVICE_ACCOUNT_FILE: Optional[str] = None
+    ANALYTICS_ENDPOINT: Optional[str] = None
+
+    # Product image derivatives (services.image_pipeline, run by image_cli.py): WebP/AVIF
+    # copies of product images at IMAGE_WIDTHS, rendered on IMAGE_WORKERS processes and
+    # stored next to the original under IMAGE_STORAGE_DIR, the local stand-in for S3,
+    # published under IMAGE_BASE_URL (served by the app itself with IMAGE_SERVE_LOCAL)
+    IMAGE_STORAGE_DIR: str = "media"
+    IMAGE_BASE_URL: str = "/media"
+    IMAGE_SERVE_LOCAL: bool = False
+    IMAGE_WIDTHS: str = "160,320,640"
+    IMAGE_FORMATS: str = "avif,webp"
+    IMAGE_AVIF_QUALITY: int = 50
+    IMAGE_WEBP_QUALITY: int = 75
+    IMAGE_WORKERS: int = 2
+    IMAGE_MAX_SOURCE_BYTES: int = 20 * 1024 * 1024
+    IMAGE_FETCH_TIMEOUT_SECONDS: float = 10.0
+
+    # Request metrics (core.metrics): Prometheus /metrics under uvicorn, EMF in Lambda.
+    # Queries slower than SLOW_QUERY_MS are logged and sampled with normalized SQL
+    METRICS_ENABLED: bool = True
+    METRICS_NAMESPACE: str = "ProductManager"
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_SAMPLES: int = 50
+
+    # Defer heavy imports until first use. Defaults to on for Lambda, off for uvicorn
+    LAZY_IMPORTS: Optional[bool] = None
+
+    # Set by the Lambda runtime, never configured manually
+    AWS_LAMBDA_FUNCTION_NAME: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _require_token_secret(self) -> "Settings":
+        """Fail at startup rather than sign tokens with a publicly known key."""
+        if self.ENVIRONMENT == "local":
+            return self
+        secret = self.TOKEN_SECRET.strip()
+        if not secret or secret in PLACEHOLDER_TOKEN_SECRETS:
+            raise ValueError(f"TOKEN_SECRET must be set to a private value when ENVIRONMENT={self.ENVIRONMENT}")
+        if len(secret.encode()) < MIN_TOKEN_SECRET_BYTES:
+            raise ValueError(
+                f"TOKEN_SECRET must be at least {MIN_TOKEN_SECRET_BYTES} bytes when ENVIRONMENT={self.ENVIRONMENT}"
+            )
+        return self
+
+    @property
+    def is_lambda(self) -> bool:
+        """Whether the app runs inside AWS Lambda (one request per container)."""
+        return bool(self.AWS_LAMBDA_FUNCTION_NAME)
+
+    @property
+    def lazy_imports(self) -> bool:
+        """Whether heavy modules are imported on first use instead of at startup."""
+        return self.is_lambda if self.LAZY_IMPORTS is None else self.LAZY_IMPORTS
+
+
+settings = Settings()
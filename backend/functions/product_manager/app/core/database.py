@@ -0,0 +1,625 @@
+"""
+Process-wide asyncpg connection pools.
+
+Pools are created lazily on first use and kept at module level, so warm Lambda
+invocations and every request of a uvicorn worker reuse already authenticated
+connections instead of paying the TCP + TLS + auth handshake on each request.
+
+`db_pool` talks to the primary. `read_pool` spreads catalog and order-history reads
+over the read replicas in `POSTGRES_READ_REPLICA_HOSTS` and falls back to the
+primary when there are none, none is healthy, or the request is pinned to the
+primary after a write (see `read_from_primary`).
+
+Queries run as named prepared statements through asyncpg's statement cache (the hot
+ones are declared in repositories.queries). Behind RDS Proxy, or once the server
+reports a missing or duplicate prepared statement (a pgbouncer in transaction
+mode), the pool runs them as unnamed statements instead.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import asyncpg
+
+from core import metrics
+from core.config import Settings, settings
+from core.parameters import get_database_credentials, invalidate_database_credentials
+
+logger = logging.getLogger(__name__)
+
+# (min_size, max_size) per runtime. Lambda serves one request per container, so a
+# single warm connection covers it; the second slot absorbs the odd concurrent query.
+LAMBDA_POOL_SIZE: Tuple[int, int] = (1, 2)
+SERVER_POOL_SIZE: Tuple[int, int] = (2, 10)
+
+# Errors raised when a pooled connection was closed underneath us (freeze/thaw, failover)
+DISCONNECT_ERRORS = (
+    asyncpg.exceptions.ConnectionDoesNotExistError,
+    asyncpg.exceptions.InterfaceError,
+    ConnectionResetError,
+)
+
+# Raised when named prepared statements do not outlive a transaction: a pooler in
+# transaction mode (pgbouncer) ran them on, or dropped them with, another server session
+PREPARED_STATEMENT_ERRORS = (
+    asyncpg.exceptions.InvalidSQLStatementNameError,
+    asyncpg.exceptions.DuplicatePreparedStatementError,
+)
+
+# Errors after which a replica is taken out of rotation until its next health check
+REPLICA_ERRORS = DISCONNECT_ERRORS + (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.CannotConnectNowError,
+)
+
+# Whether a replica is in recovery and how far its replay is behind. A replica that
+# has replayed everything it received is current even if the primary has been idle
+# (pg_last_xact_replay_timestamp() then only tells when the last write happened)
+REPLICA_STATUS_SQL = """
+    SELECT pg_is_in_recovery() AS in_recovery,
+           CASE
+               WHEN NOT pg_is_in_recovery() THEN NULL
+               WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0.0
+               ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8
+           END AS lag_seconds
+"""
+
+# Set per request by api.middleware.ReadAfterWriteMiddleware
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+# Replica the current request read from first, so its reads share one replay position
+_sticky_replica: ContextVar[Optional["ReplicaState"]] = ContextVar("sticky_replica", default=None)
+
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    # Decode JSON/JSONB columns (products.images, orders.delivery_info) into Python objects
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+    if settings.METRICS_ENABLED:
+        # Per-query timing for request metrics and slow-query samples
+        connection.add_query_logger(metrics.record_query)
+
+
+@dataclass(frozen=True)
+class DatabaseCredentials:
+    """Connection target resolved from the environment."""
+
+    host: str
+    port: int
+    user: str
+    password: str
+    database: str
+    via_proxy: bool = False
+
+
+def resolve_credentials(config: Settings = settings) -> DatabaseCredentials:
+    """
+    Resolve database credentials from the environment.
+
+    Credentials JSON (with the same keys as the CDK `database.credentials` block),
+    either exposed as `DATABASE_CREDENTIALS` or fetched from the parameter named by
+    `DATABASE_CREDENTIALS_PARAMETER`, wins over the individual `POSTGRES_*` variables.
+    When an RDS Proxy endpoint is configured it replaces the instance host and port.
+    """
+
+    credentials_json = config.DATABASE_CREDENTIALS or get_database_credentials(config)
+    if credentials_json:
+        try:
+            raw: Dict[str, Any] = json.loads(credentials_json)
+        except json.JSONDecodeError:
+            raise ValueError("Database credentials are not a valid JSON.")
+
+        host = raw["host"]
+        port = int(raw.get("port", 5432))
+        user = raw["username"]
+        password = raw["password"]
+        database = raw["dbname"]
+    else:
+        host = config.POSTGRES_HOST
+        port = config.POSTGRES_PORT
+        user = config.POSTGRES_USER
+        password = config.POSTGRES_PASSWORD
+        database = config.POSTGRES_DB
+
+    if config.POSTGRES_PROXY_HOST:
+        return DatabaseCredentials(
+            host=config.POSTGRES_PROXY_HOST,
+            port=config.POSTGRES_PROXY_PORT or port,
+            user=user,
+            password=password,
+            database=database,
+            via_proxy=True,
+        )
+
+    return DatabaseCredentials(host=host, port=port, user=user, password=password, database=database)
+
+
+def parse_replica_hosts(value: Optional[str]) -> List[Tuple[str, int]]:
+    """`POSTGRES_READ_REPLICA_HOSTS` ("host[:port],host[:port]") as (host, port) pairs."""
+    hosts: List[Tuple[str, int]] = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(":") if ":" in entry else (entry, "", "")
+        hosts.append((host, int(port) if port else 5432))
+    return hosts
+
+
+@dataclass
+class PoolStats:
+    """Counters collected over the lifetime of the process."""
+
+    pools_created: int = 0
+    last_init_seconds: float = 0.0
+    acquisitions: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    stale_expirations: int = 0
+    reconnect_retries: int = 0
+    statement_cache_fallbacks: int = 0
+
+    def record_acquire(self, waited: float) -> None:
+        self.acquisitions += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+class DatabasePool:
+    """
+    Lazily created asyncpg pool bound to the running event loop.
+
+    Handles the Lambda specifics:
+    - the pool survives between warm invocations as long as the event loop does
+    - after a long freeze every connection is presumed dead and recycled on next acquire
+    - a new event loop gets a new pool (connections cannot move between loops)
+    """
+
+    def __init__(
+        self,
+        config: Settings = settings,
+        *,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        name: str = "primary",
+    ) -> None:
+        self._settings = config
+        # A replica pool connects to its own host with the primary's credentials
+        self._host = host
+        self._port = port
+        self.name = name
+        self._pool: Optional[asyncpg.Pool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._credentials: Optional[DatabaseCredentials] = None
+        self._last_used: float = 0.0
+        # Set once the server showed that named prepared statements do not survive
+        self._statement_cache_disabled = False
+        self._stats = PoolStats()
+
+    @property
+    def pool_size(self) -> Tuple[int, int]:
+        """Return (min_size, max_size), honouring explicit overrides."""
+        default_min, default_max = LAMBDA_POOL_SIZE if self._settings.is_lambda else SERVER_POOL_SIZE
+        min_size = self._settings.POSTGRES_POOL_MIN_SIZE
+        max_size = self._settings.POSTGRES_POOL_MAX_SIZE
+
+        min_size = default_min if min_size is None else min_size
+        max_size = default_max if max_size is None else max_size
+        return min(min_size, max_size), max_size
+
+    async def get_pool(self) -> asyncpg.Pool:
+        """Return the pool for the running loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._discard()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await self._create_pool()
+
+        return self._pool
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a connection from the pool and release it on exit."""
+        pool = await self.get_pool()
+        await self._expire_if_stale(pool)
+
+        started = time.perf_counter()
+        connection = await pool.acquire()
+        waited = time.perf_counter() - started
+        self._stats.record_acquire(waited)
+        metrics.record_pool_wait(waited)
+
+        try:
+            yield connection
+        except PREPARED_STATEMENT_ERRORS:
+            await self._disable_statement_cache(pool)
+            raise
+        finally:
+            self._last_used = time.time()
+            await pool.release(connection)
+
+    async def fetch(self, query: str, *args: Any) -> List[asyncpg.Record]:
+        """Run a read query, retrying once if the connection died underneath."""
+        return await self._read("fetch", query, *args)
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[asyncpg.Record]:
+        """Run a read query returning a single row (or None)."""
+        return await self._read("fetchrow", query, *args)
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        """Run a read query returning a single value."""
+        return await self._read("fetchval", query, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizing and usage counters."""
+        min_size, max_size = self.pool_size
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "initialized": self._pool is not None,
+            "via_proxy": bool(self._credentials and self._credentials.via_proxy),
+            "statement_cache_size": self._statement_cache_size() if self._credentials else None,
+            "min_size": min_size,
+            "max_size": max_size,
+            "size": 0,
+            "idle": 0,
+        }
+        if self._pool is not None:
+            data.update({"size": self._pool.get_size(), "idle": self._pool.get_idle_size()})
+
+        data.update(asdict(self._stats))
+        return data
+
+    async def close(self) -> None:
+        """Gracefully close the pool (uvicorn shutdown)."""
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        try:
+            await asyncio.wait_for(pool.close(), timeout=self._settings.POSTGRES_CONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out closing database pool, terminating connections")
+            pool.terminate()
+
+    async def _create_pool(self) -> asyncpg.Pool:
+        try:
+            return await self._connect()
+        except asyncpg.exceptions.InvalidPasswordError:
+            if not self._settings.DATABASE_CREDENTIALS_PARAMETER:
+                raise
+
+            # The cached secret may predate a rotation: fetch it again once
+            logger.warning("Database authentication failed, refreshing cached credentials")
+            invalidate_database_credentials()
+            return await self._connect()
+
+    async def _connect(self) -> asyncpg.Pool:
+        self._credentials = resolve_credentials(self._settings)
+        if self._host:
+            self._credentials = replace(
+                self._credentials, host=self._host, port=self._port or self._credentials.port, via_proxy=False
+            )
+        min_size, max_size = self.pool_size
+
+        started = time.perf_counter()
+        pool = await asyncpg.create_pool(
+            **self._connect_kwargs(),
+            min_size=min_size,
+            max_size=max_size,
+            max_inactive_connection_lifetime=self._settings.POSTGRES_POOL_MAX_IDLE_SECONDS,
+            init=_init_connection,
+        )
+
+        self._stats.pools_created += 1
+        self._stats.last_init_seconds = time.perf_counter() - started
+        self._last_used = time.time()
+        logger.info(
+            "Database pool %s created (min=%s, max=%s, proxy=%s) in %.3fs",
+            self.name,
+            min_size,
+            max_size,
+            self._credentials.via_proxy,
+            self._stats.last_init_seconds,
+        )
+        return pool
+
+    def _connect_kwargs(self) -> Dict[str, Any]:
+        """Arguments of every new connection (asyncpg.connect)."""
+        return {
+            "host": self._credentials.host,
+            "port": self._credentials.port,
+            "user": self._credentials.user,
+            "password": self._credentials.password,
+            "database": self._credentials.database,
+            "timeout": self._settings.POSTGRES_CONNECT_TIMEOUT,
+            "command_timeout": self._settings.POSTGRES_COMMAND_TIMEOUT,
+            "statement_cache_size": self._statement_cache_size(),
+        }
+
+    def _statement_cache_size(self) -> int:
+        if self._statement_cache_disabled:
+            return 0
+        if self._settings.POSTGRES_STATEMENT_CACHE_SIZE is not None:
+            return self._settings.POSTGRES_STATEMENT_CACHE_SIZE
+
+        # Named prepared statements pin RDS Proxy sessions to one backend connection,
+        # which defeats multiplexing; plain connections keep asyncpg's default cache.
+        return 0 if self._credentials and self._credentials.via_proxy else 100
+
+    async def _disable_statement_cache(self, pool: asyncpg.Pool) -> None:
+        """
+        Switch to unnamed statements: every connection opened from now on has no
+        statement cache, and the current ones are replaced as they are released.
+        """
+        if self._statement_cache_disabled or pool is not self._pool:
+            return
+
+        logger.warning(
+            "Database pool %s: named prepared statements are not kept between queries "
+            "(transaction pooling?), switching to unnamed statements; set POSTGRES_STATEMENT_CACHE_SIZE=0",
+            self.name,
+        )
+        self._statement_cache_disabled = True
+        self._stats.statement_cache_fallbacks += 1
+        pool.set_connect_args(**self._connect_kwargs())
+        await pool.expire_connections()
+
+    async def _expire_if_stale(self, pool: asyncpg.Pool) -> None:
+        # Idle timers do not run while a Lambda container is frozen, so after a long
+        # gap the server or NAT may already have dropped every connection we hold.
+        idle_for = time.time() - self._last_used
+        if idle_for > self._settings.POSTGRES_POOL_STALE_AFTER_SECONDS:
+            logger.info("Pool idle for %.0fs, recycling connections", idle_for)
+            self._stats.stale_expirations += 1
+            await pool.expire_connections()
+
+    async def _read(self, method: str, query: str, *args: Any) -> Any:
+        try:
+            async with self.acquire() as connection:
+                return await getattr(connection, method)(query, *args)
+        except DISCONNECT_ERRORS:
+            self._stats.reconnect_retries += 1
+            await (await self.get_pool()).expire_connections()
+        except PREPARED_STATEMENT_ERRORS:
+            # acquire() switched the pool to unnamed statements; run it once more on a fresh connection
+            pass
+
+        async with self.acquire() as connection:
+            return await getattr(connection, method)(query, *args)
+
+    def _discard(self) -> None:
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        try:
+            pool.terminate()
+        except Exception:  # noqa: BLE001 - the old loop may already be closed
+            logger.exception("Failed to terminate database pool bound to a previous event loop")
+
+
+@dataclass(eq=False)
+class ReplicaState:
+    """Health of one read replica as of its last check."""
+
+    pool: DatabasePool
+    healthy: bool = True
+    lag_seconds: Optional[float] = None
+    checked_at: float = 0.0
+    failures: int = 0
+    reads: int = 0
+    last_error: Optional[str] = None
+
+
+class ReadReplicas:
+    """
+    Read-only routing over replica pools, with the interface of DatabasePool.
+
+    Replicas are used round-robin. They are health checked every
+    `health_check_seconds` (in the background once the first check has run): a
+    replica must be in recovery and at most `max_lag_seconds` behind. A replica that
+    fails to connect is taken out of rotation until its next successful check and the
+    read moves on to the next replica, then to the primary. Reads in a context marked
+    by `read_from_primary` go straight to the primary. Within one request (context)
+    reads stay on the replica used first while it is healthy, so e.g. a version
+    check and the body it describes never come from replicas at different positions.
+
+    Only statements that tolerate slightly stale data belong here; anything that
+    writes, or reads rows it is about to write, uses the primary pool.
+    """
+
+    def __init__(
+        self,
+        primary: DatabasePool,
+        replicas: Sequence[DatabasePool] = (),
+        *,
+        health_check_seconds: float,
+        max_lag_seconds: float,
+        check_timeout: float = settings.POSTGRES_CONNECT_TIMEOUT,
+    ) -> None:
+        self._primary = primary
+        self._replicas = [ReplicaState(pool) for pool in replicas]
+        self._health_check_seconds = health_check_seconds
+        self._max_lag_seconds = max_lag_seconds
+        self._check_timeout = check_timeout
+        self._next = itertools.count()
+        self._checked_at = 0.0
+        self._check_task: Optional[asyncio.Task] = None
+        self._primary_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._replicas)
+
+    @property
+    def replica_pools(self) -> List[DatabasePool]:
+        return [replica.pool for replica in self._replicas]
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a connection from a healthy replica, or from the primary."""
+        for replica in await self._candidates():
+            stack = AsyncExitStack()
+            try:
+                connection = await stack.enter_async_context(replica.pool.acquire())
+            except REPLICA_ERRORS as exc:
+                self._mark_down(replica, exc)
+                continue
+
+            replica.reads += 1
+            _sticky_replica.set(replica)
+            async with stack:
+                yield connection
+            return
+
+        self._primary_reads += 1
+        async with self._primary.acquire() as connection:
+            yield connection
+
+    async def fetch(self, query: str, *args: Any) -> List[asyncpg.Record]:
+        return await self._read("fetch", query, *args)
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[asyncpg.Record]:
+        return await self._read("fetchrow", query, *args)
+
+    async def fetchval(self, query: str, *args: Any) -> Any:
+        return await self._read("fetchval", query, *args)
+
+    async def check_health(self) -> None:
+        """Check every replica now (normally done on its own every `health_check_seconds`)."""
+        self._checked_at = time.monotonic()
+        await asyncio.gather(*(self._check(replica) for replica in self._replicas))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [
+                {
+                    "name": replica.pool.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                    "last_error": replica.last_error,
+                    "pool": replica.pool.stats(),
+                }
+                for replica in self._replicas
+            ],
+            "primary_reads": self._primary_reads,
+            "max_lag_seconds": self._max_lag_seconds,
+        }
+
+    async def close(self) -> None:
+        """Close the replica pools; the primary pool is closed by its owner."""
+        if self._check_task is not None:
+            self._check_task.cancel()
+            self._check_task = None
+        await asyncio.gather(*(replica.pool.close() for replica in self._replicas))
+
+    async def _candidates(self) -> List[ReplicaState]:
+        if not self._replicas or _read_from_primary.get():
+            return []
+
+        if not self._checked_at:
+            # First use in this process: route only once the replicas were seen healthy
+            await self.check_health()
+        elif time.monotonic() - self._checked_at >= self._health_check_seconds:
+            if self._check_task is None or self._check_task.done():
+                self._check_task = asyncio.create_task(self.check_health())
+
+        healthy = [replica for replica in self._replicas if replica.healthy]
+        if not healthy:
+            return []
+        sticky = _sticky_replica.get()
+        if sticky in healthy:
+            return [sticky] + [replica for replica in healthy if replica is not sticky]
+        start = next(self._next) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    async def _check(self, replica: ReplicaState) -> None:
+        try:
+            async with replica.pool.acquire() as connection:
+                row = await connection.fetchrow(REPLICA_STATUS_SQL, timeout=self._check_timeout)
+        except (asyncpg.exceptions.PostgresError, *REPLICA_ERRORS) as exc:
+            self._mark_down(replica, exc)
+            return
+        finally:
+            replica.checked_at = time.time()
+
+        # Managed replicas may not expose replay positions: unknown lag counts as current
+        lag = row["lag_seconds"] or 0.0
+        replica.lag_seconds = lag
+        if not row["in_recovery"]:
+            # Promoted, or pointing at a primary: its data may have diverged from ours
+            self._mark_down(replica, "not in recovery")
+        elif lag > self._max_lag_seconds:
+            self._mark_down(replica, f"replay lag {lag:.1f}s")
+        else:
+            if not replica.healthy:
+                logger.info("Read replica %s is back in rotation (lag %.1fs)", replica.pool.name, lag)
+            replica.healthy = True
+            replica.last_error = None
+
+    def _mark_down(self, replica: ReplicaState, reason: Union[BaseException, str]) -> None:
+        replica.failures += 1
+        replica.last_error = reason if isinstance(reason, str) else f"{type(reason).__name__}: {reason}"
+        if replica.healthy:
+            logger.warning("Read replica %s taken out of rotation: %s", replica.pool.name, replica.last_error)
+        replica.healthy = False
+
+    async def _read(self, method: str, query: str, *args: Any) -> Any:
+        for replica in await self._candidates():
+            try:
+                async with replica.pool.acquire() as connection:
+                    replica.reads += 1
+                    _sticky_replica.set(replica)
+                    return await getattr(connection, method)(query, *args)
+            except REPLICA_ERRORS as exc:
+                self._mark_down(replica, exc)
+
+        self._primary_reads += 1
+        return await getattr(self._primary, method)(query, *args)
+
+
+@contextmanager
+def read_from_primary(enabled: bool = True) -> Iterator[None]:
+    """Send `read_pool` reads of the current context to the primary (read-your-writes)."""
+    token = _read_from_primary.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_primary.reset(token)
+
+
+# Pool of queries that may read from a replica
+ReadPool = Union[DatabasePool, ReadReplicas]
+
+db_pool = DatabasePool()
+read_pool = ReadReplicas(
+    db_pool,
+    [
+        DatabasePool(host=host, port=port, name=f"replica-{host}:{port}")
+        for host, port in parse_replica_hosts(settings.POSTGRES_READ_REPLICA_HOSTS)
+    ],
+    health_check_seconds=settings.READ_REPLICA_HEALTH_CHECK_SECONDS,
+    max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+)
+
+
+async def get_connection() -> AsyncIterator[asyncpg.Connection]:
+    """FastAPI dependency yielding a pooled connection for the duration of a request."""
+    async with db_pool.acquire() as connection:
+        yield connection
@@ -0,0 +1,73 @@
+"""
+Request-scoped batching loader (the DataLoader pattern).
+
+`load(key)` only registers the key and returns an awaitable. Keys requested in the
+same event-loop tick, e.g. from `asyncio.gather` over cart items, are resolved
+together by one call to the batch function, typically a single `= ANY($1)` query.
+Results are memoized, so asking again for a key later in the request costs nothing.
+
+Create one loader per request: the memo is never invalidated and must not outlive
+the request that filled it.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Mapping, Optional, Sequence, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[List[K]], Awaitable[Mapping[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Coalesces `load` calls into one `batch_load_fn(keys)` call per event-loop tick."""
+
+    def __init__(self, batch_load_fn: BatchLoadFn, *, default: Optional[V] = None) -> None:
+        self._batch_load_fn = batch_load_fn
+        self._default = default
+        self._memo: Dict[K, "asyncio.Future[V]"] = {}
+        self._queue: List[K] = []
+        self.batches = 0
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """Future for the value of `key`; `default` if the batch function did not return it."""
+        future = self._memo.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._memo[key] = future
+        if not self._queue:
+            # Dispatch after the current tick so sibling coroutines can queue their keys too
+            loop.call_soon(lambda: loop.create_task(self._dispatch()))
+        self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: Sequence[K]) -> List[V]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Seed the memo with a value fetched some other way."""
+        if key not in self._memo:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._memo[key] = future
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self.batches += 1
+        try:
+            values = await self._batch_load_fn(keys)
+        except Exception as exc:  # noqa: BLE001 - propagate to every waiter of the batch
+            for key in keys:
+                # Failed keys are forgotten so a later load can retry them
+                future = self._memo.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key in keys:
+            future = self._memo[key]
+            if not future.done():
+                future.set_result(values.get(key, self._default))
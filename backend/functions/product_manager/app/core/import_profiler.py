@@ -0,0 +1,130 @@
+"""
+Import-time profiler for the Lambda init phase.
+
+When `STARTUP_PROFILE` is enabled, every module imported after `install()` is
+timed and `report()` writes a single JSON line with the cold-start breakdown
+(total, per top-level package, slowest modules) to stdout, which Lambda ships to
+CloudWatch Logs. Only the standard library is used so it can be installed before
+anything heavy is imported.
+"""
+
+import importlib.abc
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+DEFAULT_TOP_MODULES = 25
+
+
+def _enabled() -> bool:
+    return os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegating loader that measures `exec_module` of the wrapped loader."""
+
+    def __init__(self, loader: importlib.abc.Loader, profiler: "ImportProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.exit(module.__name__)
+
+    def __getattr__(self, item):
+        # get_resource_reader, get_data, is_package... keep behaving like the real loader
+        return getattr(self._loader, item)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps loaders of newly imported modules with a timer."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.cumulative: Dict[str, float] = {}
+        self.self_time: Dict[str, float] = {}
+        self._stack: List[List[float]] = []  # [start, time spent in children]
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+
+        return None
+
+    def enter(self, name: str) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def exit(self, name: str) -> None:
+        started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.cumulative[name] = elapsed
+        self.self_time[name] = elapsed - children
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def summary(self, top: int = DEFAULT_TOP_MODULES) -> Dict[str, object]:
+        packages: Dict[str, float] = defaultdict(float)
+        for name, seconds in self.self_time.items():
+            packages[name.split(".", 1)[0]] += seconds
+
+        slowest = sorted(self.cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            "event": "cold_start_profile",
+            "init_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "imports_ms": round(sum(self.self_time.values()) * 1000, 2),
+            "modules": len(self.cumulative),
+            "packages_ms": {
+                name: round(seconds * 1000, 2)
+                for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+            },
+            "slowest_modules_ms": [
+                {"module": name, "cumulative": round(seconds * 1000, 2), "self": round(self.self_time[name] * 1000, 2)}
+                for name, seconds in slowest
+            ],
+        }
+
+
+_profiler: Optional[ImportProfiler] = None
+
+
+def install() -> None:
+    """Start timing imports if `STARTUP_PROFILE` is enabled. Safe to call twice."""
+    global _profiler
+
+    if _profiler is not None or not _enabled():
+        return
+
+    _profiler = ImportProfiler()
+    sys.meta_path.insert(0, _profiler)
+
+
+def report() -> None:
+    """Stop profiling and write the breakdown as one JSON log line."""
+    global _profiler
+
+    if _profiler is None:
+        return
+
+    sys.meta_path.remove(_profiler)
+    top = int(os.environ.get("STARTUP_PROFILE_TOP", DEFAULT_TOP_MODULES))
+    sys.stdout.write(json.dumps(_profiler.summary(top=top)) + "\n")
+    sys.stdout.flush()
+    _profiler = None
@@ -0,0 +1,36 @@
+"""
+Deferred imports for heavy optional modules.
+
+SQLAlchemy, gspread and the crypto stack (jwt, passlib, bcrypt) add hundreds of
+milliseconds to a Lambda cold start but are only needed by a few routes. Modules
+obtained through `lazy_module` are executed on first attribute access instead of
+at import time. With `LAZY_IMPORTS` disabled (the default under uvicorn, where a
+slow first request is worse than a slow boot) they are imported eagerly.
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+from core.config import settings
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Return `name` as a module whose body runs on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    if not settings.lazy_imports:
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,274 @@
+"""
+Request metrics: per-route latency histograms split into database and serialization
+time, query counts, pool wait and slow-query samples.
+
+Collection is cheap enough to stay on in production: a request costs one context
+variable and a handful of bucket increments, a query one `call_soon` callback
+(asyncpg query logger) and two additions. Nothing is locked; everything runs on
+the event loop thread.
+
+- Each request gets a `RequestMetrics` in a context variable (api.middleware).
+- asyncpg reports every query through `record_query`, DatabasePool.acquire reports
+  pool wait, core.serialization reports encode time.
+- At the end of the request the totals go into `metrics_registry` histograms,
+  labelled by method and route template, and rendered as Prometheus text on
+  `/metrics` under uvicorn. In Lambda each request is also published as one
+  Powertools EMF record (`EmfPublisher`), which CloudWatch turns into metrics with
+  percentiles.
+
+Queries slower than `SLOW_QUERY_MS` are logged and kept as bounded samples with
+literals stripped from the SQL.
+"""
+
+import json
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers cache hits (sub-millisecond) up to Lambda/API Gateway timeouts
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus `le` semantics."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class RequestMetrics:
+    """Totals of one request, filled in by the query logger, pool and encoders."""
+
+    db_seconds: float = 0.0
+    queries: int = 0
+    pool_wait_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    path: str = ""
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def start_request(path: str) -> RequestMetrics:
+    current = RequestMetrics(path=path)
+    _current.set(current)
+    return current
+
+
+def current_request() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def record_pool_wait(seconds: float) -> None:
+    current = _current.get()
+    if current is not None:
+        current.pool_wait_seconds += seconds
+
+
+def record_serialization(seconds: float) -> None:
+    current = _current.get()
+    if current is not None:
+        current.serialization_seconds += seconds
+
+
+def record_query(logged: Any) -> None:
+    """asyncpg query logger callback (Connection.add_query_logger)."""
+    # Scheduled with call_soon from the querying task, so it runs in a copy of that
+    # task's context and sees the same RequestMetrics object
+    current = _current.get()
+    if current is not None:
+        current.db_seconds += logged.elapsed
+        current.queries += 1
+    if logged.elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        metrics_registry.record_slow_query(logged.query, logged.elapsed, current.path if current else None)
+
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"(?<![$\w])\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=256)
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and replace inline literals, so samples group by statement shape."""
+    for pattern, replacement in _LITERALS:
+        query = pattern.sub(replacement, query)
+    return query.strip()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Process-wide histograms and counters keyed by (method, route)."""
+
+    def __init__(self, *, slow_query_samples: int) -> None:
+        self.cold_start = True
+        self._latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self._db: Dict[Tuple[str, str], Histogram] = {}
+        self._serialization: Dict[Tuple[str, str], Histogram] = {}
+        self._pool_wait: Dict[Tuple[str, str], Histogram] = {}
+        self._queries: Dict[Tuple[str, str], Histogram] = {}
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+        self._slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_query_samples)
+        self.slow_query_total = 0
+
+    def observe_request(
+        self, method: str, route: str, status: int, elapsed: float, request: RequestMetrics, cold_start: bool
+    ) -> None:
+        key = (method, route)
+        latency_key = (method, route, "true" if cold_start else "false")
+        for histograms, histogram_key, value, buckets in (
+            (self._latency, latency_key, elapsed, LATENCY_BUCKETS),
+            (self._db, key, request.db_seconds, LATENCY_BUCKETS),
+            (self._serialization, key, request.serialization_seconds, LATENCY_BUCKETS),
+            (self._pool_wait, key, request.pool_wait_seconds, LATENCY_BUCKETS),
+            (self._queries, key, request.queries, QUERY_COUNT_BUCKETS),
+        ):
+            histogram = histograms.get(histogram_key)
+            if histogram is None:
+                histogram = histograms[histogram_key] = Histogram(buckets)
+            histogram.observe(value)
+
+        response_key = (method, route, status)
+        self._responses[response_key] = self._responses.get(response_key, 0) + 1
+
+    def record_slow_query(self, query: str, elapsed: float, path: Optional[str]) -> None:
+        self.slow_query_total += 1
+        sample = {
+            "sql": normalize_sql(query),
+            "ms": round(elapsed * 1000, 2),
+            "path": path,
+            "at": round(time.time(), 3),
+        }
+        self._slow_queries.append(sample)
+        logger.warning("Slow query: %s", json.dumps(sample))
+
+    def stats(self) -> Dict[str, Any]:
+        """Compact per-route averages for /health; percentiles come from /metrics or EMF."""
+        routes: Dict[str, Dict[str, Any]] = {}
+        for (method, route, _), histogram in self._latency.items():
+            entry = routes.setdefault(f"{method} {route}", {"requests": 0, "latency_sum": 0.0})
+            entry["requests"] += histogram.count
+            entry["latency_sum"] += histogram.sum
+
+        summary = {}
+        for name, entry in routes.items():
+            method, route = name.split(" ", 1)
+            db, queries = self._db[(method, route)], self._queries[(method, route)]
+            summary[name] = {
+                "requests": entry["requests"],
+                "avg_ms": round(entry["latency_sum"] * 1000 / entry["requests"], 2),
+                "avg_db_ms": round(db.sum * 1000 / db.count, 2),
+                "avg_queries": round(queries.sum / queries.count, 2),
+            }
+        return {
+            "cold_start": self.cold_start,
+            "routes": summary,
+            "slow_query_total": self.slow_query_total,
+            "slow_queries": list(self._slow_queries),
+        }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        route_labels = ("method", "route")
+        for name, help_text, label_names, histograms in (
+            ("http_request_duration_seconds", "Request latency", (*route_labels, "cold_start"), self._latency),
+            ("http_request_db_seconds", "Database query time per request", route_labels, self._db),
+            ("http_request_serialization_seconds", "Response encoding time", route_labels, self._serialization),
+            ("http_request_pool_wait_seconds", "Connection pool wait per request", route_labels, self._pool_wait),
+            ("http_request_queries", "Database queries per request", route_labels, self._queries),
+        ):
+            self._render_histograms(lines, name, help_text, label_names, histograms)
+
+        lines.append("# HELP http_requests_total Responses by status")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in sorted(self._responses.items()):
+            labels = f'method="{method}",route="{_escape_label(route)}",status="{status}"'
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines.append("# HELP db_slow_queries_total Queries slower than SLOW_QUERY_MS")
+        lines.append("# TYPE db_slow_queries_total counter")
+        lines.append(f"db_slow_queries_total {self.slow_query_total}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(
+        lines: List[str], name: str, help_text: str, label_names: Sequence[str], histograms: Dict[Tuple, Histogram]
+    ) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(histograms.items()):
+            labels = ",".join(f'{label}="{_escape_label(str(value))}"' for label, value in zip(label_names, key))
+            cumulative = 0
+            for bucket, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bucket:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+class EmfPublisher:
+    """
+    One CloudWatch EMF record per request through the Powertools layer.
+
+    aws_lambda_powertools is provided by the layer DeviceManagerAPIStack attaches,
+    so it is only imported inside Lambda, on the first request.
+    """
+
+    def __init__(self, *, namespace: str, service: str) -> None:
+        self._namespace = namespace
+        self._service = service
+        self._metrics: Any = None
+        self._unit: Any = None
+
+    def publish(
+        self, method: str, route: str, status: int, elapsed: float, request: RequestMetrics, cold_start: bool
+    ) -> None:
+        if self._metrics is None:
+            from aws_lambda_powertools.metrics import Metrics, MetricUnit
+
+            self._metrics = Metrics(namespace=self._namespace, service=self._service)
+            self._unit = MetricUnit
+
+        metrics, unit = self._metrics, self._unit
+        metrics.add_dimension(name="route", value=f"{method} {route}")
+        metrics.add_metric(name="Latency", unit=unit.Milliseconds, value=elapsed * 1000)
+        metrics.add_metric(name="DbTime", unit=unit.Milliseconds, value=request.db_seconds * 1000)
+        metrics.add_metric(name="SerializationTime", unit=unit.Milliseconds, value=request.serialization_seconds * 1000)
+        metrics.add_metric(name="PoolWait", unit=unit.Milliseconds, value=request.pool_wait_seconds * 1000)
+        metrics.add_metric(name="QueryCount", unit=unit.Count, value=request.queries)
+        metrics.add_metric(name="ColdStart", unit=unit.Count, value=1 if cold_start else 0)
+        metrics.add_metadata(key="status", value=status)
+        # One record per request: Lambda serves a single request per invocation
+        metrics.flush_metrics()
+
+
+metrics_registry = MetricsRegistry(slow_query_samples=settings.SLOW_QUERY_SAMPLES)
+emf_publisher = EmfPublisher(namespace=settings.METRICS_NAMESPACE, service=settings.PROJECT_NAME)
@@ -0,0 +1,61 @@
+"""
+Runtime retrieval of parameters referenced by the CDK stack.
+
+DeviceManagerAPIStack passes `PARAMETERS_PROVIDER_NAME` ("ssm" or "secret") and
+`DATABASE_CREDENTIALS_PARAMETER` instead of plaintext credentials. The value is
+fetched once per container and cached; `prefetch_database_credentials` is called
+from the Lambda init phase so the first request does not pay for the AWS API call.
+"""
+
+import logging
+import time
+from functools import lru_cache
+from typing import Optional
+
+from core.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_parameter(name: str, provider: str, decrypt: bool = False) -> str:
+    """Fetch a parameter (SSM) or secret string (Secrets Manager), cached per process."""
+    import boto3  # imported here: only deployments using a parameter store pay for botocore
+
+    started = time.perf_counter()
+    if provider == "ssm":
+        response = boto3.client("ssm").get_parameter(Name=name, WithDecryption=decrypt)
+        value = response["Parameter"]["Value"]
+    elif provider == "secret":
+        response = boto3.client("secretsmanager").get_secret_value(SecretId=name)
+        value = response["SecretString"]
+    else:
+        raise ValueError(f"Unsupported parameters provider '{provider}'")
+
+    logger.info("Fetched parameter '%s' from %s in %.3fs", name, provider, time.perf_counter() - started)
+    return value
+
+
+def get_database_credentials(config: Settings = settings) -> Optional[str]:
+    """Return the credentials JSON referenced by the environment, if any."""
+    if not config.DATABASE_CREDENTIALS_PARAMETER:
+        return None
+
+    return get_parameter(
+        config.DATABASE_CREDENTIALS_PARAMETER,
+        config.PARAMETERS_PROVIDER_NAME or "ssm",
+        config.PARAMETERS_PROVIDER_DECRYPT,
+    )
+
+
+def prefetch_database_credentials(config: Settings = settings) -> None:
+    """Warm the credentials cache during init; failures are retried on first use."""
+    try:
+        get_database_credentials(config)
+    except Exception:  # noqa: BLE001 - init must not crash the container
+        logger.exception("Failed to prefetch database credentials")
+
+
+def invalidate_database_credentials() -> None:
+    """Drop cached values, e.g. after the secret was rotated."""
+    get_parameter.cache_clear()
@@ -0,0 +1,146 @@
+"""
+Password hashing and verification off the event loop.
+
+bcrypt spends tens to hundreds of milliseconds of CPU per call. Run inline in an
+async handler it stalls every other request on the worker, so all bcrypt work goes
+to a dedicated, size-limited thread pool (bcrypt releases the GIL while hashing).
+When more than `max_pending` calls are already waiting, new ones fail fast with
+503 instead of queueing without bound.
+
+The cost factor is `BCRYPT_ROUNDS` when set. Otherwise it is calibrated once per
+process, on first use and inside the pool, to the highest cost whose hash stays
+within `PASSWORD_HASH_TARGET_MS`. Set it explicitly on Lambda to skip calibration.
+Hashes below the current cost are re-hashed by `verify_and_update` after a
+successful check; costlier ones are kept.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.config import settings
+from core.lazy_imports import lazy_module
+from exceptions import ServiceUnavailableException
+
+passlib_context = lazy_module("passlib.context")
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 15
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+class PasswordHasher:
+    """bcrypt via passlib on a bounded thread pool, with queue-depth counters."""
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_pending: int,
+        rounds: Optional[int] = None,
+        target_ms: float = 250.0,
+    ) -> None:
+        self._workers = workers
+        self._max_pending = max_pending
+        self._rounds = rounds
+        self._target_ms = target_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._context: Any = None
+        self._context_lock = threading.Lock()
+        self._pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(lambda: self._get_context().hash(password))
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash or None); a new hash is returned when the stored cost is outdated."""
+        return await self._run(lambda: self._get_context().verify_and_update(password, password_hash))
+
+    async def dummy_verify(self) -> None:
+        """Spend the time of a real check, so unknown usernames cannot be told apart by latency."""
+        await self._run(lambda: self._get_context().dummy_verify())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": self._rounds,
+            "workers": self._workers,
+            "pending": self._pending,
+            "queue_depth": max(0, self._pending - self._workers),
+            "peak_pending": self.peak_pending,
+            "max_pending": self._max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self._busy_seconds * 1000 / self.completed, 1) if self.completed else 0.0,
+        }
+
+    async def _run(self, work: Callable[[], Any]) -> Any:
+        if self._pending >= self._max_pending:
+            self.rejected += 1
+            raise ServiceUnavailableException("Authentication is busy, please retry shortly")
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="password-hasher")
+
+        self._pending += 1
+        self.peak_pending = max(self.peak_pending, self._pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, work)
+        finally:
+            self._pending -= 1
+
+    def _timed(self, work: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return work()
+        finally:
+            # Only touched from worker threads; a lost update skews the average at worst
+            self._busy_seconds += time.perf_counter() - started
+            self.completed += 1
+
+    def _get_context(self) -> Any:
+        # Runs in a worker thread, so calibration never blocks the event loop
+        if self._context is None:
+            with self._context_lock:
+                if self._context is None:
+                    if self._rounds is None:
+                        self._rounds = self._calibrate()
+                    self._context = self._build_context(self._rounds)
+        return self._context
+
+    def _calibrate(self) -> int:
+        rounds = MIN_ROUNDS
+        for candidate in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+            started = time.perf_counter()
+            self._build_context(candidate).hash(CALIBRATION_PASSWORD)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > self._target_ms:
+                break
+            rounds = candidate
+            # Each extra round doubles the cost; stop before a trial would blow the target
+            if elapsed_ms * 2 > self._target_ms:
+                break
+        return rounds
+
+    @staticmethod
+    def _build_context(rounds: int) -> Any:
+        # min_rounds marks hashes with a lower cost as needing an update. Only the default
+        # is set, not `rounds` (which also caps the cost), so processes that calibrate
+        # differently upgrade each other's hashes but never downgrade them
+        return passlib_context.CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds
+        )
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1),
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+    target_ms=settings.PASSWORD_HASH_TARGET_MS,
+)
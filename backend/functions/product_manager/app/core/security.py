@@ -0,0 +1,52 @@
+"""JWT issuing and verification."""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+from uuid import uuid4
+
+from core.config import settings
+from core.lazy_imports import lazy_module
+from exceptions import UnauthorizedException
+
+jwt = lazy_module("jwt")
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_SECONDS = 15 * 60
+REFRESH_TOKEN_EXPIRE_SECONDS = 7 * 24 * 60 * 60
+
+# Bytes of SHA-256 kept as a token fingerprint; must match AccessTokenRepository's SQL
+FINGERPRINT_BYTES = 8
+
+
+def create_token(user_id: int, token_type: str, expires_in: int) -> str:
+    """Sign a token for `user_id`; `jti` keeps tokens issued in the same second unique."""
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": str(user_id),
+        "type": token_type,
+        "iat": now,
+        "exp": now + timedelta(seconds=expires_in),
+        "jti": uuid4().hex,
+    }
+    return jwt.encode(payload, settings.TOKEN_SECRET, algorithm=ALGORITHM)
+
+
+def decode_token(token: str, expected_type: str = "access") -> Dict[str, Any]:
+    """Verify signature, expiry and token type; raises 401 otherwise."""
+    try:
+        payload = jwt.decode(token, settings.TOKEN_SECRET, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise UnauthorizedException("Token has expired")
+    except jwt.InvalidTokenError:
+        raise UnauthorizedException("Invalid token")
+
+    if payload.get("type") != expected_type:
+        raise UnauthorizedException("Invalid token type")
+
+    return payload
+
+
+def token_fingerprint(token: str) -> bytes:
+    """Short, non-reversible token identifier for in-memory bookkeeping."""
+    return hashlib.sha256(token.encode()).digest()[:FINGERPRINT_BYTES]
@@ -0,0 +1,58 @@
+"""
+Fast JSON path for hot read endpoints.
+
+Product, cart and order rows come straight from our own database, so building a
+pydantic model per row only re-validates values that are already typed. The hot
+paths instead map rows to plain dicts (helpers.row_mapping), format NUMERIC columns
+to strings right there, and encode once with orjson. The output matches what the
+pydantic models produce (same keys, same order, Decimals as strings, UTC datetimes
+with a `Z`), so clients cannot tell which path served a response.
+"""
+
+import time
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from core.metrics import record_serialization
+
+DUMPS_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode `payload` with orjson; Decimals must already be strings (see decimal_str)."""
+    started = time.perf_counter()
+    body = orjson.dumps(payload, option=DUMPS_OPTIONS)
+    record_serialization(time.perf_counter() - started)
+    return body
+
+
+def encode_model(model: BaseModel, *, by_alias: bool = False) -> bytes:
+    """Validated-model path (FAST_JSON_ENABLED=false), timed like `dumps`."""
+    started = time.perf_counter()
+    body = model.model_dump_json(by_alias=by_alias).encode()
+    record_serialization(time.perf_counter() - started)
+    return body
+
+
+def decimal_str(value: Optional[Decimal]) -> Optional[str]:
+    """NUMERIC column -> the string pydantic would emit for it (scale preserved)."""
+    return None if value is None else str(value)
+
+
+class TrustedJSONResponse(JSONResponse):
+    """
+    Opt-in response class for routes that return trusted, already-shaped data.
+
+    Accepts a pre-serialized body (bytes, e.g. from the catalog cache) or plain
+    dicts/lists, which are encoded with orjson without any validation. Routes keep
+    their `response_model` for the OpenAPI schema only.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
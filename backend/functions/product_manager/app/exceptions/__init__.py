@@ -0,0 +1,23 @@
+from .app_exceptions import (
+    AppException,
+    BadRequestException,
+    BusinessException,
+    ConflictException,
+    ErrorCode,
+    NotFoundException,
+    ServiceUnavailableException,
+    UnauthorizedException,
+    UnprocessableEntityException,
+)
+
+__all__ = [
+    "AppException",
+    "BadRequestException",
+    "BusinessException",
+    "ConflictException",
+    "ErrorCode",
+    "NotFoundException",
+    "ServiceUnavailableException",
+    "UnauthorizedException",
+    "UnprocessableEntityException",
+]
@@ -0,0 +1,62 @@
+from enum import Enum
+from http import HTTPStatus
+from typing import Optional
+
+
+class ErrorCode(str, Enum):
+    """Business error codes shared with the frontend (see backend-specs.md)."""
+
+    OUT_OF_STOCK = "40001"
+    MAX_QUANTITY_REACHED = "40002"
+    INVALID_SKU = "40003"
+    CART_EMPTY = "40004"
+
+
+class AppException(Exception):
+    """HTTP error rendered as {"status_code", "error", "message", "path", "timestamp"}."""
+
+    status_code: int = HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        if status_code is not None:
+            self.status_code = status_code
+
+    @property
+    def error(self) -> str:
+        return HTTPStatus(self.status_code).phrase
+
+
+class BadRequestException(AppException):
+    status_code = HTTPStatus.BAD_REQUEST
+
+
+class UnauthorizedException(AppException):
+    status_code = HTTPStatus.UNAUTHORIZED
+
+
+class NotFoundException(AppException):
+    status_code = HTTPStatus.NOT_FOUND
+
+
+class ConflictException(AppException):
+    status_code = HTTPStatus.CONFLICT
+
+
+class UnprocessableEntityException(AppException):
+    status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+class ServiceUnavailableException(AppException):
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class BusinessException(Exception):
+    """Domain rule violation rendered as {"success": false, "error_code", "message"}."""
+
+    def __init__(self, error_code: ErrorCode, message: str, status_code: int = HTTPStatus.BAD_REQUEST) -> None:
+        super().__init__(message)
+        self.error_code = error_code
+        self.message = message
+        self.status_code = status_code
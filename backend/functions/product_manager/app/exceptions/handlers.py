@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from exceptions.app_exceptions import AppException, BusinessException
+
+
+async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "status_code": exc.status_code,
+            "error": exc.error,
+            "message": exc.message,
+            "path": request.url.path,
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+    )
+
+
+async def business_exception_handler(_: Request, exc: BusinessException) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"success": False, "error_code": exc.error_code.value, "message": exc.message},
+    )
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.add_exception_handler(BusinessException, business_exception_handler)
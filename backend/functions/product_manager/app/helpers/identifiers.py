@@ -0,0 +1,9 @@
+from exceptions import BadRequestException
+
+
+def parse_id(value: str, prefix: str) -> int:
+    """Numeric id from a public identifier such as "cart_123" (prefix "cart")."""
+    head, _, number = value.partition("_")
+    if head != prefix or not number.isdigit():
+        raise BadRequestException(f"Invalid {prefix} id '{value}'")
+    return int(number)
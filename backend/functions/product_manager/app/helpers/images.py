@@ -0,0 +1,98 @@
+"""
+Image derivatives: rendering (run in worker processes) and srcset mapping.
+
+`render_variants` is a top-level function of a module that imports nothing heavy,
+so a process pool can pickle it by reference; Pillow is only imported inside the
+call. `image_sources` turns the `products.image_variants` entries (migration 012)
+into the `image_sources` of product responses.
+"""
+
+import io
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# Output formats, in the order a <picture> should offer them (smallest first)
+FORMAT_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+# (width, format, encoded bytes)
+RenderedVariant = Tuple[int, str, bytes]
+
+
+class RenderedImage(NamedTuple):
+    format: str  # of the source, e.g. "jpeg"
+    width: int
+    height: int
+    variants: List[RenderedVariant]
+
+
+def render_variants(
+    data: bytes, widths: Sequence[int], formats: Sequence[str], quality: Mapping[str, int]
+) -> RenderedImage:
+    """
+    Decode `data` and encode it at each width (never upscaled) in each format.
+
+    The source size is taken after EXIF orientation. Widths at or above it collapse
+    into one variant at the source width. Raises ValueError when `data` is not an
+    image Pillow can read.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as opened:
+            source_format = (opened.format or "").lower()
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except UnidentifiedImageError as exc:
+        raise ValueError("Not a readable image") from exc
+    except OSError as exc:  # truncated or corrupt data
+        raise ValueError(f"Not a readable image: {exc}") from exc
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    width, height = image.size
+    targets = sorted({min(target, width) for target in widths})
+    variants: List[RenderedVariant] = []
+    for target in targets:
+        resized = image
+        if target < width:
+            size = (target, max(1, round(height * target / width)))
+            resized = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            out = io.BytesIO()
+            resized.save(out, format=fmt.upper(), quality=quality[fmt])
+            variants.append((target, fmt, out.getvalue()))
+    return RenderedImage(source_format, width, height, variants)
+
+
+def supported_formats(formats: Sequence[str]) -> List[str]:
+    """The subset of `formats` the installed Pillow can encode."""
+    from PIL import features
+
+    return [fmt for fmt in formats if fmt in FORMAT_TYPES and features.check(fmt)]
+
+
+def image_sources(images: Optional[Sequence[str]], image_variants: Optional[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    schemas.product.ProductImage per image, in `images` order: the original as
+    `src` plus one srcset per format. Images without derivatives get no sources.
+    """
+    image_variants = image_variants or {}
+    sources = []
+    for url in images or []:
+        entry = image_variants.get(url) or {}
+        srcsets: Dict[str, List[str]] = {}
+        for variant in entry.get("variants", ()):
+            srcsets.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+        sources.append(
+            {
+                "src": url,
+                "width": entry.get("width"),
+                "height": entry.get("height"),
+                "sources": [
+                    {"type": FORMAT_TYPES[fmt], "srcset": ", ".join(srcsets[fmt])}
+                    for fmt in FORMAT_TYPES
+                    if fmt in srcsets
+                ],
+            }
+        )
+    return sources
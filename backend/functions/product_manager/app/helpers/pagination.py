@@ -0,0 +1,94 @@
+"""
+Opaque, signed keyset cursors.
+
+A cursor records the sort it was issued for and the (sort_key, id) of the last row
+of the page. The next page seeks past that pair with a row comparison that the
+composite (sort_key, id) indexes answer directly, so page N costs the same as page 1
+regardless of catalog size. Cursors are HMAC-signed so clients cannot forge keys.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from exceptions import BadRequestException
+
+SIGNATURE_BYTES = 16
+
+# Sort key decoders by cursor kind: values travel as strings to keep Decimal/datetime exact
+KEY_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "decimal": Decimal,
+}
+
+
+@dataclass(frozen=True)
+class Cursor:
+    sort: str
+    key: Any
+    id: int
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(settings.TOKEN_SECRET.encode(), payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def _key_kind(key: Any) -> str:
+    return "datetime" if isinstance(key, datetime) else "decimal"
+
+
+def encode_cursor(sort: str, key: Any, row_id: int) -> str:
+    """Build the cursor pointing after the row (key, row_id) for the given sort."""
+    serialized_key = key.isoformat() if isinstance(key, datetime) else str(key)
+    payload = json.dumps(
+        {"s": sort, "t": _key_kind(key), "k": serialized_key, "i": row_id},
+        separators=(",", ":"),
+    ).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(value: str, sort: str) -> Cursor:
+    """Verify and decode a cursor issued for `sort`; raises 400 when invalid."""
+    try:
+        encoded_payload, encoded_signature = value.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError:
+        raise BadRequestException("Invalid cursor")
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise BadRequestException("Invalid cursor")
+
+    data = json.loads(payload)
+    if data["s"] != sort:
+        raise BadRequestException("Cursor was issued for a different sort order")
+
+    return Cursor(sort=data["s"], key=KEY_DECODERS[data["t"]](data["k"]), id=int(data["i"]))
+
+
+def paginate(rows: List[Any], limit: int, sort: str, key_column: str = "sort_key") -> Tuple[List[Any], Optional[str]]:
+    """
+    Split `limit + 1` fetched rows into the page and the cursor for the next one.
+
+    The extra row only signals that another page exists; it is never returned.
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(sort, last[key_column], last["id"])
@@ -0,0 +1,118 @@
+"""
+asyncpg rows -> response dicts for the fast JSON path (core.serialization).
+
+Each mapper mirrors one schema model field for field, in declaration order and with
+serialization aliases applied, so `dumps(mapper(row))` equals the model's JSON.
+Keep them in sync when a schema changes.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+from core.serialization import decimal_str
+from helpers.images import image_sources
+
+
+def product_item(row: asyncpg.Record) -> Dict[str, Any]:
+    """schemas.product.ProductListItem"""
+    return {
+        "id": row["id"],
+        "slug": row["slug"],
+        "name": row["name"],
+        "price": decimal_str(row["price"]),
+        "currency": row["currency"],
+        "description": row["description"],
+        "images": row["images"] or [],
+        "image_sources": image_sources(row["images"], row["image_variants"]),
+        "rating": float(row["rating"] or 0),
+        "review_count": row["review_count"],
+    }
+
+
+def search_item(row: asyncpg.Record) -> Dict[str, Any]:
+    """schemas.product.ProductSearchItem"""
+    item = product_item(row)
+    item["name_highlight"] = row["name_highlight"]
+    item["snippet"] = row["snippet"]
+    return item
+
+
+def featured_item(row: asyncpg.Record) -> Dict[str, Any]:
+    """schemas.product.FeaturedProductItem"""
+    item = product_item(row)
+    item["min_price"] = decimal_str(row["min_price"])
+    item["max_price"] = decimal_str(row["max_price"])
+    item["total_stock"] = row["total_stock"]
+    item["in_stock"] = row["in_stock"]
+    return item
+
+
+def variant_item(row: asyncpg.Record) -> Dict[str, Any]:
+    """schemas.product.ProductVariantItem"""
+    return {
+        "sku": row["sku"],
+        "color": row["color"],
+        "size": row["size"],
+        "stock": row["stock"],
+        "price_modifier": decimal_str(row["price_modifier"]),
+    }
+
+
+def product_detail(product: asyncpg.Record, variants: List[asyncpg.Record]) -> Dict[str, Any]:
+    """schemas.product.ProductDetail"""
+    detail = product_item(product)
+    detail["variants"] = [variant_item(variant) for variant in variants]
+    return detail
+
+
+def cart_item(
+    row: asyncpg.Record, product: Optional[asyncpg.Record], variant: Optional[asyncpg.Record]
+) -> Dict[str, Any]:
+    """schemas.cart.CartItem (by alias)"""
+    images = product["images"] if product else None
+    return {
+        "itemId": f"item_{row['id']}",
+        "sku": row["sku"],
+        "product_id": row["product_id"],
+        "name": product["name"] if product else None,
+        "image": images[0] if images else None,
+        "color": variant["color"] if variant else None,
+        "size": variant["size"] if variant else None,
+        "stock": variant["stock"] if variant else 0,
+        "quantity": row["quantity"],
+        "price": decimal_str(row["price"]),
+    }
+
+
+def cart_detail(cart: Optional[asyncpg.Record], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """schemas.cart.CartDetail; totals come from the cart row (CartRepository.find_cart)."""
+    if cart is None:
+        return {
+            "cart_id": None,
+            "item_count": 0,
+            "total_items": 0,
+            "total_price": "0.00",
+            "has_stale_items": False,
+            "items": items,
+        }
+    return {
+        "cart_id": f"cart_{cart['id']}",
+        "item_count": cart["item_count"],
+        "total_items": cart["total_items"],
+        "total_price": decimal_str(cart["total_price"]),
+        "has_stale_items": cart["has_stale_items"],
+        "items": items,
+    }
+
+
+def order_summary(row: asyncpg.Record) -> Dict[str, Any]:
+    """schemas.order.OrderSummary"""
+    return {
+        "order_id": f"order_{row['id']}",
+        "order_number": f"ORD-{row['order_date']:%Y}-{row['id']:03d}",
+        "status": row["status"],
+        "total_amount": decimal_str(row["total"]),
+        "shipping_cost": decimal_str(row["cost_ship"]),
+        "created_at": row["created_at"],
+    }
@@ -0,0 +1,74 @@
+"""
+Product image derivatives command line (see services.image_pipeline).
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python app/image_cli.py derive --all
+    PYTHONPATH=app python app/image_cli.py derive --slug air-runner --force
+    PYTHONPATH=app python app/image_cli.py upload --slug air-runner front.jpg side.png
+
+`derive` renders the images already listed in products.images (downloading those
+not in the store); `upload` stores new files and appends them to the product's
+images. Files go to IMAGE_STORAGE_DIR. The report (images, variants, bytes, render
+timings) is printed to stdout as JSON; the exit status is 1 when an image failed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from core.config import settings
+from core.database import db_pool
+from exceptions import AppException
+from services.image_pipeline import ImagePipeline
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    pipeline = ImagePipeline(workers=args.workers)
+    pipeline.check_formats()
+    try:
+        if args.command == "upload":
+            for path in args.files:
+                with open(path, "rb") as file:
+                    url = await pipeline.add_upload(args.slug, file.read())
+                logging.info("Stored %s as %s", path, url)
+        elif args.slug:
+            await pipeline.derive_product(args.slug, force=args.force)
+        else:
+            await pipeline.derive_missing(batch_size=args.batch_size)
+    except AppException as exc:
+        sys.stderr.write(f"{exc.message}\n")
+        return 1
+    finally:
+        pipeline.close()
+        await db_pool.close()
+
+    report = pipeline.report.to_dict()
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.IMAGE_WORKERS, help="rendering processes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    derive = commands.add_parser("derive", help="render derivatives of the listed product images")
+    target = derive.add_mutually_exclusive_group(required=True)
+    target.add_argument("--slug", help="only this product")
+    target.add_argument("--all", action="store_true", help="every image without derivatives")
+    derive.add_argument("--force", action="store_true", help="re-render images that already have derivatives")
+    derive.add_argument("--batch-size", type=int, default=100, help="products per batch with --all")
+
+    upload = commands.add_parser("upload", help="add image files to a product")
+    upload.add_argument("--slug", required=True)
+    upload.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), stream=sys.stderr)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+AWS Lambda entry point.
+
+Mangum adapts API Gateway proxy events to the FastAPI `app`. Everything at module
+level (app, database pool, cached credentials) lives as long as the container, so
+warm invocations reuse it. Work done here runs in the init phase, which is billed
+separately and gets a full CPU burst, so one-off setup belongs here rather than in
+the first request.
+"""
+
+from core import import_profiler
+
+# Must run before anything heavy is imported; no-op unless STARTUP_PROFILE is set
+import_profiler.install()
+
+from mangum import Mangum  # noqa: E402
+
+from core.parameters import prefetch_database_credentials  # noqa: E402
+from main import app  # noqa: E402
+
+prefetch_database_credentials()
+
+# Lifespan events are disabled: shutdown would close the pool after every invocation
+lambda_handler = Mangum(app, lifespan="off")
+
+import_profiler.report()
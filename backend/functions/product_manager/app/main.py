@@ -0,0 +1,91 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+
+from api.middleware import ConditionalGetMiddleware, MetricsMiddleware, ReadAfterWriteMiddleware, cache_control
+from api.v1.router import api_router
+from core.config import settings
+from core.database import db_pool, read_pool
+from core.metrics import metrics_registry
+from core.passwords import password_hasher
+from exceptions.handlers import register_exception_handlers
+from services.catalog_cache import catalog_cache
+from services.catalog_versions import catalog_versions
+from services.feed_service import feed_service
+from services.idempotency import idempotency_store, run_idempotency_purge
+from services.suggest_service import suggest_service
+from services.token_cache import run_token_purge, token_cache
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # The pool is opened lazily on first use. Lambda runs with lifespan="off", so the
+    # purges only run here under uvicorn
+    purge_tasks = [asyncio.create_task(run_token_purge()), asyncio.create_task(run_idempotency_purge())]
+    yield
+    for task in purge_tasks:
+        task.cancel()
+    await read_pool.close()
+    await db_pool.close()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+register_exception_handlers(app)
+app.include_router(api_router)
+if settings.IMAGE_SERVE_LOCAL:
+    # Local stand-in for the bucket/CDN image derivatives are published to (services.image_pipeline)
+    app.mount(settings.IMAGE_BASE_URL, StaticFiles(directory=settings.IMAGE_STORAGE_DIR, check_dir=False), name="media")
+if settings.CONDITIONAL_GET_ENABLED:
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        routes=app.routes,
+        resources={
+            "/api/v1/products": lambda params: catalog_versions.listing(),
+            "/api/v1/products/{slug}": lambda params: catalog_versions.product(params["slug"]),
+        },
+        cache_control=cache_control(
+            max_age=settings.CATALOG_HTTP_MAX_AGE_SECONDS,
+            stale_while_revalidate=settings.CATALOG_HTTP_STALE_WHILE_REVALIDATE_SECONDS,
+        ),
+    )
+# Outside ConditionalGetMiddleware, so pinned sessions also look up versions on the primary
+if read_pool.enabled:
+    app.add_middleware(ReadAfterWriteMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/")
+async def root():
+    return {"message": "Hello World"}
+
+
+@app.get("/hello/{name}")
+async def say_hello(name: str):
+    return {"message": f"Hello {name}"}
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "database": db_pool.stats(),
+        "read_replicas": read_pool.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "feed": feed_service.stats(),
+        "suggest": suggest_service.stats(),
+        "token_cache": token_cache.stats(),
+        "idempotency": idempotency_store.stats(),
+        "password_hasher": password_hasher.stats(),
+        "metrics": metrics_registry.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def prometheus_metrics():
+    # Scraped under uvicorn; Lambda publishes the same measurements as EMF instead
+    return PlainTextResponse(metrics_registry.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,69 @@
+"""
+Outbox worker command line (see services.outbox).
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python app/outbox_cli.py run --until-idle
+    PYTHONPATH=app python app/outbox_cli.py run --workers 4 --batch-size 200 --max-seconds 600
+    PYTHONPATH=app python app/outbox_cli.py status
+    PYTHONPATH=app python app/outbox_cli.py requeue-failed --handler email
+
+`run` keeps polling for new events unless --until-idle or --max-seconds is given.
+Handlers without a configured target (SMTP_HOST, ORDER_SHEET_KEY, ANALYTICS_ENDPOINT)
+only log, so nothing but Postgres is needed locally. Reports are printed to stdout
+as JSON; `run` exits 1 when an event was given up in this run.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from core.config import settings
+from core.database import db_pool
+from repositories.outbox_repository import OutboxRepository
+from services.outbox import OutboxWorker, enabled_handlers
+from services.outbox_handlers import build_handlers
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "run":
+            worker = OutboxWorker(build_handlers(), batch_size=args.batch_size)
+            report = await worker.run(workers=args.workers, max_seconds=args.max_seconds, until_idle=args.until_idle)
+        else:
+            async with db_pool.acquire() as connection:
+                repository = OutboxRepository(connection)
+                if args.command == "status":
+                    report = await repository.count_by_status()
+                else:
+                    report = {"requeued": await repository.requeue_failed(args.handler or enabled_handlers())}
+    finally:
+        await db_pool.close()
+
+    print(json.dumps(report, indent=2))
+    return 1 if args.command == "run" and report["failed"] else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="deliver due events")
+    run.add_argument("--workers", type=int, default=1, help="claim loops running side by side")
+    run.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE, help="events per claim")
+    run.add_argument("--until-idle", action="store_true", help="stop once no event is due")
+    run.add_argument("--max-seconds", type=float, help="stop between batches after this long")
+
+    commands.add_parser("status", help="count events by status")
+
+    requeue = commands.add_parser("requeue-failed", help="retry events that were given up")
+    requeue.add_argument("--handler", action="append", help="only this handler (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), stream=sys.stderr)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
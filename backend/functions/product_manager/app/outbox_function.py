@@ -0,0 +1,49 @@
+"""
+AWS Lambda entry point of the outbox worker (services.outbox).
+
+Invoked by an EventBridge schedule from DeviceManagerAPIStack. Each run delivers
+due events with `OUTBOX_CONCURRENCY` claim loops until none is left or the function
+is about to time out; what remains is picked up by the next run, and overlapping
+runs skip each other's rows. The report is returned and logged.
+"""
+
+import asyncio
+import json
+import logging
+
+from core.config import settings
+from core.database import db_pool
+from core.parameters import prefetch_database_credentials
+from services.outbox import OutboxWorker
+from services.outbox_handlers import build_handlers
+
+logger = logging.getLogger()
+logger.setLevel(settings.LOG_LEVEL.upper())
+
+# Seconds kept back from the function timeout for the last batch and the report;
+# must exceed OUTBOX_HANDLER_TIMEOUT_SECONDS so a started batch can finish
+TIMEOUT_MARGIN_SECONDS = settings.OUTBOX_HANDLER_TIMEOUT_SECONDS + 15.0
+
+prefetch_database_credentials()
+
+# Built once per container: the sheet handler keeps its authorized worksheet
+handlers = build_handlers()
+
+
+async def _deliver(max_seconds: float) -> dict:
+    try:
+        worker = OutboxWorker(handlers)
+        return await worker.run(workers=settings.OUTBOX_CONCURRENCY, max_seconds=max_seconds, until_idle=True)
+    finally:
+        # Runs are a minute apart: do not keep idle connections open in between
+        await db_pool.close()
+
+
+def lambda_handler(event, context) -> dict:
+    max_seconds = None
+    if context is not None:
+        max_seconds = max(context.get_remaining_time_in_millis() / 1000 - TIMEOUT_MARGIN_SECONDS, 0.0)
+
+    report = asyncio.run(_deliver(max_seconds))
+    logger.info("Outbox report: %s", json.dumps(report))
+    return report
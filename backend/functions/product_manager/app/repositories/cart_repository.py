@@ -0,0 +1,236 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import asyncpg
+
+from repositories.queries import CART_BY_SESSION, CART_BY_USER, CART_ITEMS
+
+# Keyset cursor (updated_at, id) placed before every cart
+KEYSET_START = (datetime.min, 0)
+
+
+class CartRepository:
+    """Queries against `carts` and `cart_items`."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def find_cart_id(self, *, user_id: Optional[int], session_id: Optional[str]) -> Optional[int]:
+        """Latest cart of a user, or of a guest session when there is no user."""
+        if user_id is not None:
+            return await self._connection.fetchval(
+                "SELECT id FROM carts WHERE user_id = $1 ORDER BY updated_at DESC, id DESC LIMIT 1",
+                user_id,
+            )
+        if session_id:
+            return await self._connection.fetchval(
+                """
+                SELECT id FROM carts
+                WHERE session_id = $1 AND user_id IS NULL
+                ORDER BY updated_at DESC, id DESC
+                LIMIT 1
+                """,
+                session_id,
+            )
+        return None
+
+    async def find_cart(self, *, user_id: Optional[int], session_id: Optional[str]) -> Optional[asyncpg.Record]:
+        """
+        The cart `find_cart_id` picks, as (id, item_count, total_items, total_price,
+        has_stale_items), in one query.
+        """
+        if user_id is not None:
+            return await self._connection.fetchrow(CART_BY_USER.sql, user_id)
+        if session_id:
+            return await self._connection.fetchrow(CART_BY_SESSION.sql, session_id)
+        return None
+
+    async def create_cart(self, *, user_id: Optional[int], session_id: Optional[str]) -> int:
+        return await self._connection.fetchval(
+            "INSERT INTO carts (user_id, session_id) VALUES ($1, $2) RETURNING id",
+            user_id,
+            session_id if user_id is None else None,
+        )
+
+    async def add_item(self, cart_id: int, sku: str, quantity: int) -> Optional[int]:
+        """
+        Add `quantity` of `sku` to the cart in one statement, at the current unit price.
+
+        An existing line (uq_cart_items_cart_id_sku) is increased. Returns the new line
+        quantity, or None when the SKU is unknown or the line would exceed its stock.
+        """
+        return await self._connection.fetchval(
+            """
+            WITH variant AS (
+                SELECT v.sku, v.product_id, v.stock, p.price + v.price_modifier AS unit_price
+                FROM product_variants v
+                JOIN products p ON p.id = v.product_id
+                WHERE v.sku = $2
+            )
+            INSERT INTO cart_items (cart_id, sku, product_id, quantity, price)
+            SELECT $1, sku, product_id, $3, unit_price FROM variant WHERE stock >= $3
+            ON CONFLICT (cart_id, sku) DO UPDATE
+            SET quantity = cart_items.quantity + EXCLUDED.quantity,
+                price = EXCLUDED.price,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE cart_items.quantity + EXCLUDED.quantity <= (SELECT stock FROM variant)
+            RETURNING quantity
+            """,
+            cart_id,
+            sku,
+            quantity,
+        )
+
+    async def get_totals(self, cart_id: int) -> asyncpg.Record:
+        """
+        (item_count, total_items, total_price) of a cart: lines, units and their sum
+        at cart prices. Read from the columns the cart_items triggers maintain, so the
+        cost does not depend on the number of lines.
+        """
+        return await self._connection.fetchrow(
+            "SELECT item_count, total_quantity AS total_items, subtotal AS total_price FROM carts WHERE id = $1",
+            cart_id,
+        )
+
+    async def list_items(self, cart_id: int) -> List[asyncpg.Record]:
+        return await self._connection.fetch(CART_ITEMS.sql, cart_id)
+
+    async def get_owned_by(self, cart_id: int, user_id: int) -> Optional[asyncpg.Record]:
+        return await self._connection.fetchrow(
+            "SELECT id, user_id, session_id FROM carts WHERE id = $1 AND user_id = $2",
+            cart_id,
+            user_id,
+        )
+
+    async def clear(self, cart_id: int) -> None:
+        await self._connection.execute("DELETE FROM cart_items WHERE cart_id = $1", cart_id)
+
+    async def merge_guest_cart(self, *, session_id: str, user_id: int) -> Optional[asyncpg.Record]:
+        """
+        Move the guest carts of `session_id` into the user's cart in one statement.
+
+        Without a user cart the newest guest cart is simply re-owned. Otherwise guest
+        items are upserted by (cart_id, sku) (uq_cart_items_cart_id_sku): quantities
+        are summed and capped at variant stock, never lowering what the user already
+        had, and out-of-stock SKUs are dropped. The merged guest carts are deleted
+        (their items cascade). All CTEs share one snapshot, so the INSERT still reads
+        items of carts the same statement deletes.
+
+        Returns (cart_id, merged_items, removed_carts), or None when there is nothing
+        to merge and the user has no cart.
+        """
+        return await self._connection.fetchrow(
+            """
+            WITH guest AS (
+                SELECT id, updated_at
+                FROM carts
+                WHERE session_id = $1 AND user_id IS NULL
+            ),
+            target AS (
+                SELECT id
+                FROM carts
+                WHERE user_id = $2
+                ORDER BY updated_at DESC, id DESC
+                LIMIT 1
+            ),
+            adopted AS (
+                UPDATE carts
+                SET user_id = $2, session_id = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = (SELECT id FROM guest ORDER BY updated_at DESC, id DESC LIMIT 1)
+                  AND NOT EXISTS (SELECT 1 FROM target)
+                RETURNING id
+            ),
+            destination AS (
+                SELECT id FROM target
+                UNION ALL
+                SELECT id FROM adopted
+            ),
+            merged AS (
+                INSERT INTO cart_items (cart_id, sku, product_id, quantity, price)
+                SELECT d.id,
+                       ci.sku,
+                       min(ci.product_id),
+                       LEAST(sum(ci.quantity), min(v.stock)),
+                       (array_agg(ci.price ORDER BY ci.updated_at DESC))[1]
+                FROM cart_items ci
+                JOIN guest g ON g.id = ci.cart_id
+                JOIN product_variants v ON v.sku = ci.sku
+                CROSS JOIN destination d
+                WHERE ci.cart_id <> d.id AND v.stock > 0
+                GROUP BY d.id, ci.sku
+                ON CONFLICT (cart_id, sku) DO UPDATE
+                SET quantity = GREATEST(
+                        cart_items.quantity,
+                        LEAST(
+                            cart_items.quantity + EXCLUDED.quantity,
+                            (SELECT stock FROM product_variants WHERE sku = EXCLUDED.sku)
+                        )
+                    ),
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING id
+            ),
+            removed AS (
+                DELETE FROM carts
+                WHERE id IN (SELECT id FROM guest)
+                  AND id NOT IN (SELECT id FROM adopted)
+                  AND EXISTS (SELECT 1 FROM destination)
+                RETURNING id
+            )
+            SELECT d.id AS cart_id,
+                   (SELECT count(*) FROM merged) AS merged_items,
+                   (SELECT count(*) FROM removed) AS removed_carts
+            FROM destination d
+            """,
+            session_id,
+            user_id,
+        )
+
+    async def delete_abandoned_guest_carts(
+        self, *, retention_seconds: float, batch_size: int, after: Tuple[datetime, int] = KEYSET_START
+    ) -> Tuple[int, Optional[Tuple[datetime, int]]]:
+        """
+        Delete up to `batch_size` guest carts untouched for `retention_seconds`, in
+        (updated_at, id) order after the `after` cursor (idx_carts_guest_updated_at).
+
+        Carts with an item changed inside the retention window are kept, and the
+        DELETE re-checks the cart so one touched concurrently (or adopted at login)
+        survives. Items cascade. Returns the number deleted and the cursor of the
+        next batch, None once the end was reached.
+        """
+        row = await self._connection.fetchrow(
+            """
+            WITH batch AS (
+                SELECT c.id, c.updated_at FROM carts c
+                WHERE c.user_id IS NULL
+                  AND c.updated_at < now() - make_interval(secs => $1)
+                  AND (c.updated_at, c.id) > ($3, $4)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM cart_items ci
+                      WHERE ci.cart_id = c.id AND ci.updated_at >= now() - make_interval(secs => $1)
+                  )
+                ORDER BY c.updated_at, c.id
+                LIMIT $2
+            ),
+            deleted AS (
+                DELETE FROM carts c
+                USING batch b
+                WHERE c.id = b.id
+                  AND c.user_id IS NULL
+                  AND c.updated_at < now() - make_interval(secs => $1)
+                RETURNING 1
+            ),
+            last AS (
+                SELECT updated_at, id FROM batch ORDER BY updated_at DESC, id DESC LIMIT 1
+            )
+            SELECT (SELECT count(*) FROM deleted)::int AS deleted,
+                   (SELECT count(*) FROM batch)::int AS scanned,
+                   (SELECT updated_at FROM last) AS last_updated_at,
+                   (SELECT id FROM last) AS last_id
+            """,
+            retention_seconds,
+            batch_size,
+            *after,
+        )
+        if row["scanned"] < batch_size:
+            return row["deleted"], None
+        return row["deleted"], (row["last_updated_at"], row["last_id"])
@@ -0,0 +1,143 @@
+from typing import AsyncIterator, Iterable, Sequence, Tuple
+
+import asyncpg
+
+STAGING_TABLE = "catalog_staging"
+
+# One staging row per variant, product fields repeated (the flat CSV/sheet layout).
+# `line` is the source position: for duplicate slugs or SKUs the last line wins.
+STAGING_COLUMNS: Tuple[str, ...] = (
+    "line",
+    "slug",
+    "name",
+    "description",
+    "price",
+    "currency",
+    "images",
+    "sku",
+    "color",
+    "size",
+    "stock",
+    "price_modifier",
+)
+
+# Statements over the whole staging table may outlive the pool's command timeout
+MERGE_TIMEOUT_SECONDS = 900.0
+
+
+class CatalogRepository:
+    """Bulk catalog load (COPY into a staging table, then upsert) and streaming export."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def create_staging(self) -> None:
+        """Session-private staging table, dropped at commit; must run inside a transaction."""
+        await self._connection.execute(
+            f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                line integer NOT NULL,
+                slug varchar(200) NOT NULL,
+                name varchar(150) NOT NULL,
+                description text,
+                price numeric(10, 2) NOT NULL,
+                currency varchar(3),
+                images text,
+                sku varchar(100),
+                color varchar(50),
+                size varchar(20),
+                stock integer,
+                price_modifier numeric(10, 2)
+            ) ON COMMIT DROP
+            """
+        )
+
+    async def copy_to_staging(self, records: Iterable[Sequence]) -> None:
+        """Binary COPY of `records` (tuples in STAGING_COLUMNS order)."""
+        await self._connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=STAGING_COLUMNS, timeout=MERGE_TIMEOUT_SECONDS
+        )
+
+    async def merge_products(self) -> asyncpg.Record:
+        """
+        Upsert staged products by slug; returns (inserted, updated) counts.
+
+        Rows whose values did not change are left alone, so their `updated_at` (and
+        with it the catalog cache version) does not move on a re-import.
+        """
+        return await self._connection.fetchrow(
+            f"""
+            WITH latest AS (
+                SELECT DISTINCT ON (slug) slug, name, description, price,
+                       coalesce(currency, 'USD') AS currency, coalesce(images, '[]')::jsonb AS images
+                FROM {STAGING_TABLE}
+                ORDER BY slug, line DESC
+            ),
+            upserted AS (
+                INSERT INTO products (slug, name, description, price, currency, images)
+                SELECT slug, name, description, price, currency, images FROM latest
+                ON CONFLICT (slug) DO UPDATE
+                SET name = EXCLUDED.name,
+                    description = EXCLUDED.description,
+                    price = EXCLUDED.price,
+                    currency = EXCLUDED.currency,
+                    images = EXCLUDED.images
+                WHERE (products.name, products.description, products.price, products.currency, products.images)
+                    IS DISTINCT FROM
+                    (EXCLUDED.name, EXCLUDED.description, EXCLUDED.price, EXCLUDED.currency, EXCLUDED.images)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+            """,
+            timeout=MERGE_TIMEOUT_SECONDS,
+        )
+
+    async def merge_variants(self) -> asyncpg.Record:
+        """Upsert staged variants by SKU under their product (by slug); same counts as above."""
+        return await self._connection.fetchrow(
+            f"""
+            WITH latest AS (
+                SELECT DISTINCT ON (s.sku) p.id AS product_id, s.sku, s.color, s.size,
+                       coalesce(s.stock, 0) AS stock, coalesce(s.price_modifier, 0) AS price_modifier
+                FROM {STAGING_TABLE} s
+                JOIN products p ON p.slug = s.slug
+                WHERE s.sku IS NOT NULL
+                ORDER BY s.sku, s.line DESC
+            ),
+            upserted AS (
+                INSERT INTO product_variants (product_id, sku, color, size, stock, price_modifier)
+                SELECT product_id, sku, color, size, stock, price_modifier FROM latest
+                ON CONFLICT (sku) DO UPDATE
+                SET product_id = EXCLUDED.product_id,
+                    color = EXCLUDED.color,
+                    size = EXCLUDED.size,
+                    stock = EXCLUDED.stock,
+                    price_modifier = EXCLUDED.price_modifier
+                WHERE (product_variants.product_id, product_variants.color, product_variants.size,
+                       product_variants.stock, product_variants.price_modifier)
+                    IS DISTINCT FROM
+                    (EXCLUDED.product_id, EXCLUDED.color, EXCLUDED.size, EXCLUDED.stock, EXCLUDED.price_modifier)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+            """,
+            timeout=MERGE_TIMEOUT_SECONDS,
+        )
+
+    def stream_catalog(self, *, prefetch: int) -> AsyncIterator[asyncpg.Record]:
+        """
+        Every product with its variants, in the staging layout, through a server-side
+        cursor fetching `prefetch` rows at a time. Must be iterated inside a transaction.
+        """
+        return self._connection.cursor(
+            """
+            SELECT p.id, p.slug, p.name, p.description, p.price, p.currency, p.images,
+                   v.sku, v.color, v.size, v.stock, v.price_modifier
+            FROM products p
+            LEFT JOIN product_variants v ON v.product_id = p.id
+            ORDER BY p.id, v.id
+            """,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,36 @@
+from typing import Any, List, Tuple
+
+import asyncpg
+
+from repositories.queries import PRODUCT_COLUMNS
+
+
+class FeedRepository:
+    """Homepage feed over `product_feed` (migration 007)."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def refresh(self, batch_size: int) -> int:
+        """Recompute up to `batch_size` queued products; returns how many were claimed."""
+        return await self._connection.fetchval("SELECT refresh_product_feed($1)", batch_size)
+
+    async def get_marker(self) -> Tuple[Any, int]:
+        """(max(updated_at), row count): changes whenever a feed row is added, updated or removed."""
+        row = await self._connection.fetchrow(
+            "SELECT max(updated_at) AS updated_at, count(*) AS total FROM product_feed"
+        )
+        return row["updated_at"], row["total"]
+
+    async def list_featured(self, limit: int) -> List[asyncpg.Record]:
+        """Top of the feed in rank order, walking idx_product_feed_rank."""
+        return await self._connection.fetch(
+            f"""
+            SELECT {PRODUCT_COLUMNS}, f.min_price, f.max_price, f.total_stock, f.in_stock
+            FROM product_feed f
+            JOIN products p ON p.id = f.product_id
+            ORDER BY f.in_stock DESC, f.score DESC, f.product_id
+            LIMIT $1
+            """,
+            limit,
+        )
@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+import asyncpg
+
+# Keyset cursor (expires_at, scope, idempotency_key) placed before every row
+KEYSET_START = (datetime.min, "", "")
+
+
+class IdempotencyRepository:
+    """
+    Queries against `idempotency_keys` (stored POST responses, migration 008).
+
+    A row with `status_code` NULL is a claim: the first attempt is still running.
+    """
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def claim(
+        self, scope: str, key: str, fingerprint: bytes, *, lock_seconds: float, ttl_seconds: float
+    ) -> Optional[datetime]:
+        """
+        Claim (scope, key) for a new attempt. Returns the claim's `created_at`, which
+        identifies this attempt to `complete` and `release`, or None when another
+        attempt holds the key or already completed it.
+
+        Expired rows and claims whose `locked_until` passed (their process died) are
+        taken over in the same statement.
+        """
+        return await self._connection.fetchval(
+            """
+            INSERT INTO idempotency_keys (scope, idempotency_key, fingerprint, locked_until, expires_at)
+            VALUES ($1, $2, $3, now() + make_interval(secs => $4), now() + make_interval(secs => $5))
+            ON CONFLICT (scope, idempotency_key) DO UPDATE
+            SET fingerprint = EXCLUDED.fingerprint,
+                status_code = NULL,
+                body = NULL,
+                locked_until = EXCLUDED.locked_until,
+                expires_at = EXCLUDED.expires_at,
+                created_at = now()
+            WHERE idempotency_keys.expires_at <= now()
+               OR (idempotency_keys.status_code IS NULL AND idempotency_keys.locked_until <= now())
+            RETURNING created_at
+            """,
+            scope,
+            key,
+            fingerprint,
+            lock_seconds,
+            ttl_seconds,
+        )
+
+    async def get(self, scope: str, key: str) -> Optional[asyncpg.Record]:
+        """(fingerprint, status_code, body, remaining_seconds) of a live row."""
+        return await self._connection.fetchrow(
+            """
+            SELECT fingerprint, status_code, body, extract(epoch FROM expires_at - now())::float8 AS remaining_seconds
+            FROM idempotency_keys
+            WHERE scope = $1 AND idempotency_key = $2 AND expires_at > now()
+            """,
+            scope,
+            key,
+        )
+
+    async def complete(self, scope: str, key: str, claimed_at: datetime, status_code: int, body: bytes) -> bool:
+        """
+        Store the response on the claim made at `claimed_at`. False when that claim
+        is gone: it expired and another attempt took the key over.
+        """
+        completed = await self._connection.fetchval(
+            """
+            UPDATE idempotency_keys
+            SET status_code = $4, body = $5, locked_until = NULL
+            WHERE scope = $1 AND idempotency_key = $2 AND created_at = $3 AND status_code IS NULL
+            RETURNING true
+            """,
+            scope,
+            key,
+            claimed_at,
+            status_code,
+            body,
+        )
+        return bool(completed)
+
+    async def release(self, scope: str, key: str, claimed_at: datetime) -> None:
+        """Drop the unfinished claim made at `claimed_at`, so the key can be retried after a failure."""
+        await self._connection.execute(
+            """
+            DELETE FROM idempotency_keys
+            WHERE scope = $1 AND idempotency_key = $2 AND created_at = $3 AND status_code IS NULL
+            """,
+            scope,
+            key,
+            claimed_at,
+        )
+
+    async def purge_expired(
+        self, *, batch_size: int, after: Tuple[datetime, str, str] = KEYSET_START
+    ) -> Tuple[int, Optional[Tuple[datetime, str, str]]]:
+        """
+        Delete up to `batch_size` expired rows in (expires_at, scope, idempotency_key)
+        order after the `after` cursor (idx_idempotency_keys_expires_at).
+
+        Returns the number deleted and the cursor of the next batch, None once the
+        end was reached.
+        """
+        row = await self._connection.fetchrow(
+            """
+            WITH batch AS (
+                SELECT scope, idempotency_key, expires_at FROM idempotency_keys
+                WHERE expires_at < now()
+                  AND expires_at >= $2
+                  AND (expires_at, scope, idempotency_key) > ($2, $3, $4)
+                ORDER BY expires_at, scope, idempotency_key
+                LIMIT $1
+            ),
+            deleted AS (
+                DELETE FROM idempotency_keys k
+                USING batch b
+                WHERE k.scope = b.scope AND k.idempotency_key = b.idempotency_key AND k.expires_at < now()
+                RETURNING 1
+            ),
+            last AS (
+                SELECT expires_at, scope, idempotency_key FROM batch
+                ORDER BY expires_at DESC, scope DESC, idempotency_key DESC
+                LIMIT 1
+            )
+            SELECT (SELECT count(*) FROM deleted)::int AS deleted,
+                   (SELECT count(*) FROM batch)::int AS scanned,
+                   (SELECT expires_at FROM last) AS last_expires_at,
+                   (SELECT scope FROM last) AS last_scope,
+                   (SELECT idempotency_key FROM last) AS last_key
+            """,
+            batch_size,
+            *after,
+        )
+        if row["scanned"] < batch_size:
+            return row["deleted"], None
+        return row["deleted"], (row["last_expires_at"], row["last_scope"], row["last_key"])
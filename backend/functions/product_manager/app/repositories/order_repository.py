@@ -0,0 +1,90 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import asyncpg
+
+from helpers.pagination import Cursor
+
+ORDER_SUMMARY_COLUMNS = "o.id, o.order_date, o.status, o.total, o.cost_ship, o.created_at"
+
+
+class OrderRepository:
+    """Queries against `orders` and `order_items`."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def list_for_user(
+        self,
+        user_id: int,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+    ) -> List[asyncpg.Record]:
+        """Most recent orders first, seeking on (order_date, id) when a cursor is given."""
+        if cursor is not None:
+            return await self._connection.fetch(
+                f"""
+                SELECT {ORDER_SUMMARY_COLUMNS}, o.order_date AS sort_key
+                FROM orders o
+                WHERE o.user_id = $1 AND (o.order_date, o.id) < ($2, $3)
+                ORDER BY o.order_date DESC, o.id DESC
+                LIMIT $4
+                """,
+                user_id,
+                cursor.key,
+                cursor.id,
+                limit,
+            )
+
+        return await self._connection.fetch(
+            f"""
+            SELECT {ORDER_SUMMARY_COLUMNS}, o.order_date AS sort_key
+            FROM orders o
+            WHERE o.user_id = $1
+            ORDER BY o.order_date DESC, o.id DESC
+            LIMIT $2 OFFSET $3
+            """,
+            user_id,
+            limit,
+            offset,
+        )
+
+    async def create_with_items(
+        self,
+        *,
+        user_id: int,
+        total_product: Decimal,
+        cost_ship: Decimal,
+        delivery_info: Dict[str, Any],
+        variant_ids: Sequence[int],
+        skus: Sequence[str],
+        quantities: Sequence[int],
+        prices: Sequence[Decimal],
+    ) -> asyncpg.Record:
+        """Insert the order and all of its items in one round trip; returns the order summary."""
+        return await self._connection.fetchrow(
+            f"""
+            WITH o AS (
+                INSERT INTO orders (user_id, status, total, total_product, cost_ship, delivery_info)
+                VALUES ($1, 'pending', $2::numeric + $3::numeric, $2, $3, $4)
+                RETURNING *
+            ),
+            items AS (
+                INSERT INTO order_items (order_id, product_variant_id, sku, quantity, price)
+                SELECT o.id, i.variant_id, i.sku, i.quantity, i.price
+                FROM o, unnest($5::int[], $6::varchar[], $7::int[], $8::numeric[])
+                    AS i(variant_id, sku, quantity, price)
+            )
+            SELECT {ORDER_SUMMARY_COLUMNS} FROM o
+            """,
+            user_id,
+            total_product,
+            cost_ship,
+            delivery_info,
+            list(variant_ids),
+            list(skus),
+            list(quantities),
+            list(prices),
+        )
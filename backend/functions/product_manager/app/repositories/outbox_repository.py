@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+# Keyset cursor (processed_at, id) placed before every row
+KEYSET_START = (datetime.min, 0)
+
+
+class OutboxRepository:
+    """
+    Queries against `outbox_events` (migration 011).
+
+    A claimed row stays 'pending' with `available_at` moved to the end of its lease;
+    it becomes 'done', or is rescheduled ('pending' again, later) or given up
+    ('failed') once its handler ran.
+    """
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def add(self, event_type: str, aggregate_id: int, payload: Dict[str, Any], handlers: Sequence[str]) -> None:
+        """One row per handler, in the caller's transaction."""
+        await self._connection.execute(
+            """
+            INSERT INTO outbox_events (event_type, aggregate_id, handler, payload)
+            SELECT $1, $2, handler, $3::jsonb FROM unnest($4::varchar[]) AS handler
+            """,
+            event_type,
+            aggregate_id,
+            payload,
+            list(handlers),
+        )
+
+    async def claim(self, handlers: Sequence[str], *, batch_size: int, lease_seconds: float) -> List[asyncpg.Record]:
+        """
+        Lease up to `batch_size` due rows of `handlers`, oldest first
+        (idx_outbox_events_pending). Rows another worker is claiming are skipped,
+        not waited for. `attempts` counts this attempt.
+        """
+        return await self._connection.fetch(
+            """
+            WITH batch AS (
+                SELECT id FROM outbox_events
+                WHERE status = 'pending' AND available_at <= now() AND handler = ANY($1::varchar[])
+                ORDER BY available_at, id
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE outbox_events e
+            SET attempts = e.attempts + 1,
+                available_at = now() + make_interval(secs => $3)
+            FROM batch b
+            WHERE e.id = b.id
+            RETURNING e.id, e.event_type, e.aggregate_id, e.handler, e.payload, e.attempts
+            """,
+            list(handlers),
+            batch_size,
+            lease_seconds,
+        )
+
+    async def complete(self, ids: Sequence[int]) -> None:
+        await self._connection.execute(
+            """
+            UPDATE outbox_events
+            SET status = 'done', processed_at = now(), last_error = NULL
+            WHERE id = ANY($1::bigint[])
+            """,
+            list(ids),
+        )
+
+    async def reschedule(
+        self, ids: Sequence[int], delays: Sequence[float], errors: Sequence[str], give_up: Sequence[bool]
+    ) -> None:
+        """Retry each row after its delay, or mark it 'failed' where `give_up` is set."""
+        await self._connection.execute(
+            """
+            UPDATE outbox_events e
+            SET status = CASE WHEN r.give_up THEN 'failed' ELSE 'pending' END,
+                available_at = now() + make_interval(secs => r.delay),
+                processed_at = CASE WHEN r.give_up THEN now() END,
+                last_error = r.error
+            FROM unnest($1::bigint[], $2::float8[], $3::text[], $4::bool[]) AS r(id, delay, error, give_up)
+            WHERE e.id = r.id
+            """,
+            list(ids),
+            list(delays),
+            list(errors),
+            list(give_up),
+        )
+
+    async def requeue_failed(self, handlers: Sequence[str]) -> int:
+        """Give failed rows of `handlers` a fresh set of attempts; returns how many."""
+        return await self._connection.fetchval(
+            """
+            WITH requeued AS (
+                UPDATE outbox_events
+                SET status = 'pending', attempts = 0, available_at = now(), processed_at = NULL
+                WHERE status = 'failed' AND handler = ANY($1::varchar[])
+                RETURNING 1
+            )
+            SELECT count(*)::int FROM requeued
+            """,
+            list(handlers),
+        )
+
+    async def count_by_status(self) -> Dict[str, int]:
+        rows = await self._connection.fetch("SELECT status, count(*)::int AS count FROM outbox_events GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
+
+    async def purge_processed(
+        self, *, retention_seconds: float, batch_size: int, after: Tuple[datetime, int] = KEYSET_START
+    ) -> Tuple[int, Optional[Tuple[datetime, int]]]:
+        """
+        Delete up to `batch_size` rows delivered more than `retention_seconds` ago,
+        in (processed_at, id) order after `after` (idx_outbox_events_done_processed_at).
+        Failed rows are kept for inspection. Returns the number deleted and the cursor
+        of the next batch, None once the end was reached.
+        """
+        row = await self._connection.fetchrow(
+            """
+            WITH batch AS (
+                SELECT id, processed_at FROM outbox_events
+                WHERE status = 'done'
+                  AND processed_at < now() - make_interval(secs => $1)
+                  AND (processed_at, id) > ($3, $4)
+                ORDER BY processed_at, id
+                LIMIT $2
+            ),
+            deleted AS (
+                DELETE FROM outbox_events e
+                USING batch b
+                WHERE e.id = b.id
+                RETURNING 1
+            ),
+            last AS (
+                SELECT processed_at, id FROM batch ORDER BY processed_at DESC, id DESC LIMIT 1
+            )
+            SELECT (SELECT count(*) FROM deleted)::int AS deleted,
+                   (SELECT count(*) FROM batch)::int AS scanned,
+                   (SELECT processed_at FROM last) AS last_processed_at,
+                   (SELECT id FROM last) AS last_id
+            """,
+            retention_seconds,
+            batch_size,
+            *after,
+        )
+        if row["scanned"] < batch_size:
+            return row["deleted"], None
+        return row["deleted"], (row["last_processed_at"], row["last_id"])
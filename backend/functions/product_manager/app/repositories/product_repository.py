@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import asyncpg
+
+from helpers.pagination import Cursor
+from repositories.queries import (
+    DEFAULT_PRODUCT_SORT,
+    PRODUCT_BY_SLUG,
+    PRODUCT_COLUMNS,
+    PRODUCT_DETAIL_VERSION,
+    PRODUCT_LIST,
+    VARIANT_COLUMNS,
+    VARIANTS_BY_PRODUCTS,
+)
+
+
+class ProductRepository:
+    """Queries against `products` and `product_variants`."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def list_products(
+        self,
+        *,
+        limit: int,
+        offset: int = 0,
+        sort: str = DEFAULT_PRODUCT_SORT,
+        cursor: Optional[Cursor] = None,
+    ) -> List[asyncpg.Record]:
+        """
+        One page of products, each row carrying its `sort_key`.
+
+        With a cursor the page starts right after (cursor.key, cursor.id) and `offset`
+        is ignored; without one the legacy OFFSET mode is used.
+        """
+        args: list = [limit]
+        page = "first"
+        if cursor is not None:
+            page = "cursor"
+            args.extend([cursor.key, cursor.id])
+        elif offset:
+            page = "offset"
+            args.append(offset)
+
+        return await self._connection.fetch(PRODUCT_LIST[(sort, page)].sql, *args)
+
+    async def get_by_slug(self, slug: str) -> Optional[asyncpg.Record]:
+        return await self._connection.fetchrow(PRODUCT_BY_SLUG.sql, slug)
+
+    async def get_listing_version(self) -> Optional[datetime]:
+        """Newest products.updated_at: one probe of idx_products_updated_at (migration 002)."""
+        return await self._connection.fetchval("SELECT max(updated_at) FROM products")
+
+    async def get_detail_version(self, slug: str) -> Optional[asyncpg.Record]:
+        """
+        (updated_at, variants_version) of a product, None if there is no such slug.
+
+        Variant changes (stock decrements above all) do not touch products.updated_at;
+        `variants_version` lists the xmin of each variant row, which changes with
+        every update, insert or delete of one of the product's variants.
+        """
+        return await self._connection.fetchrow(PRODUCT_DETAIL_VERSION.sql, slug)
+
+    async def get_by_ids(self, product_ids: Sequence[int]) -> List[asyncpg.Record]:
+        """Products for a batch of ids in one query; missing ids are simply absent."""
+        return await self._connection.fetch(
+            f"SELECT {PRODUCT_COLUMNS} FROM products p WHERE p.id = ANY($1::int[])",
+            list(product_ids),
+        )
+
+    async def get_images(self, slug: str) -> Optional[asyncpg.Record]:
+        """(id, slug, images, image_variants) of a product, None if there is no such slug."""
+        return await self._connection.fetchrow(
+            "SELECT id, slug, images, image_variants FROM products WHERE slug = $1",
+            slug,
+        )
+
+    async def list_missing_image_variants(self, *, after_id: int, limit: int) -> List[asyncpg.Record]:
+        """
+        Products with an image that has no `image_variants` entry yet, as `get_images`
+        rows, in id order after `after_id`.
+        """
+        return await self._connection.fetch(
+            """
+            SELECT p.id, p.slug, p.images, p.image_variants
+            FROM products p
+            WHERE p.id > $1
+              AND EXISTS (
+                  SELECT 1 FROM jsonb_array_elements_text(p.images) AS i(url)
+                  WHERE NOT p.image_variants ? i.url
+              )
+            ORDER BY p.id
+            LIMIT $2
+            """,
+            after_id,
+            limit,
+        )
+
+    async def set_image_variants(
+        self, product_id: int, images: Optional[List[str]], image_variants: Dict[str, Any]
+    ) -> bool:
+        """
+        Replace the product's `image_variants`, unless its `images` no longer equal
+        `images` (changed by an import meanwhile). Returns whether it was written.
+        """
+        updated = await self._connection.fetchval(
+            """
+            UPDATE products
+            SET image_variants = $3::jsonb
+            WHERE id = $1 AND images IS NOT DISTINCT FROM $2::jsonb
+            RETURNING id
+            """,
+            product_id,
+            images,
+            image_variants,
+        )
+        return updated is not None
+
+    async def add_image(self, product_id: int, url: str, entry: Dict[str, Any]) -> None:
+        """Append `url` to the product's images together with its `image_variants` entry."""
+        await self._connection.execute(
+            """
+            UPDATE products
+            SET images = coalesce(images, '[]'::jsonb) || jsonb_build_array($2::text),
+                image_variants = image_variants || jsonb_build_object($2::text, $3::jsonb)
+            WHERE id = $1
+            """,
+            product_id,
+            url,
+            entry,
+        )
+
+    async def list_variants_for_products(self, product_ids: Sequence[int]) -> List[asyncpg.Record]:
+        """Variants of a batch of products (idx_product_variants_product_id), grouped by product."""
+        return await self._connection.fetch(VARIANTS_BY_PRODUCTS.sql, list(product_ids))
+
+    async def get_variants_by_skus(self, skus: Sequence[str]) -> List[asyncpg.Record]:
+        """Variants for a batch of SKUs (unique index on sku)."""
+        return await self._connection.fetch(
+            f"SELECT {VARIANT_COLUMNS} FROM product_variants v WHERE v.sku = ANY($1::varchar[])",
+            list(skus),
+        )
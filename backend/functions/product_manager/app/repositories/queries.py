@@ -0,0 +1,213 @@
+"""
+Hot queries, declared once.
+
+These statements run on every catalog page, product page, cart view, checkout and
+authenticated request. The repositories send exactly this text, so asyncpg's
+statement cache holds one named prepared statement per query on each pooled
+connection: after its first run a query is only bound and executed, never parsed
+or planned again, and PostgreSQL switches to a cached generic plan once that is
+no costlier than the custom ones. Behind RDS Proxy or a transaction-pooling
+pgbouncer the pool runs the same text as unnamed statements (core.database).
+
+`indexes` are the indexes the plan of a query must use, its custom and its
+generic plan alike. tests/test_query_plans.py EXPLAINs every query here against
+a seeded database and fails when one of them is no longer used, e.g. after a
+migration dropped it or an edit made the query unable to use it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Tuple
+
+
+@dataclass(frozen=True)
+class Query:
+    name: str
+    sql: str
+    indexes: Tuple[str, ...] = ()
+
+
+# Unique indexes that lead with the column of a plain index of schema.sql; the
+# planner picks either, so a plan using the unique index satisfies the plain one
+EQUIVALENT_INDEXES: Dict[str, FrozenSet[str]] = {
+    "idx_products_slug": frozenset({"products_slug_key"}),
+    "idx_product_variants_sku": frozenset({"product_variants_sku_key"}),
+    "idx_cart_items_cart_id": frozenset({"uq_cart_items_cart_id_sku"}),
+}
+
+PRODUCT_COLUMNS = (
+    "p.id, p.slug, p.name, p.price, p.currency, p.description, p.images, p.image_variants, p.rating, p.review_count"
+)
+VARIANT_COLUMNS = "v.id, v.product_id, v.sku, v.color, v.size, v.stock, v.price_modifier"
+
+# sort name -> (sort key expression, direction, index); each pair is backed by a
+# (key, id) index from migration 003 so both ORDER BY and the keyset seek are index scans
+PRODUCT_SORTS: Dict[str, Tuple[str, str, str]] = {
+    "newest": ("p.created_at", "DESC", "idx_products_created_at_id"),
+    "price_asc": ("p.price", "ASC", "idx_products_price_id"),
+    "price_desc": ("p.price", "DESC", "idx_products_price_id"),
+    "rating": ("COALESCE(p.rating, 0)", "DESC", "idx_products_rating_id"),
+}
+DEFAULT_PRODUCT_SORT = "newest"
+
+# How a product list page is reached: first page, keyset cursor ($2, $3) or legacy OFFSET ($2)
+PRODUCT_LIST_PAGES = ("first", "cursor", "offset")
+
+
+def _product_list(sort: str, page: str) -> Query:
+    key_expression, direction, index = PRODUCT_SORTS[sort]
+    comparison = "<" if direction == "DESC" else ">"
+    seek = f"WHERE ({key_expression}, p.id) {comparison} ($2, $3)" if page == "cursor" else ""
+    skip = "OFFSET $2" if page == "offset" else ""
+    return Query(
+        f"product_list.{sort}.{page}",
+        f"""
+        SELECT {PRODUCT_COLUMNS}, {key_expression} AS sort_key
+        FROM products p
+        {seek}
+        ORDER BY {key_expression} {direction}, p.id {direction}
+        LIMIT $1 {skip}
+        """,
+        (index,),
+    )
+
+
+# (sort, page) -> one page of products, each row carrying its `sort_key`
+PRODUCT_LIST: Dict[Tuple[str, str], Query] = {
+    (sort, page): _product_list(sort, page) for sort in PRODUCT_SORTS for page in PRODUCT_LIST_PAGES
+}
+
+PRODUCT_BY_SLUG = Query(
+    "product_by_slug",
+    f"SELECT {PRODUCT_COLUMNS} FROM products p WHERE p.slug = $1",
+    ("idx_products_slug",),
+)
+
+# (updated_at, variants_version) of a product: the ETag probe of every detail request
+PRODUCT_DETAIL_VERSION = Query(
+    "product_detail_version",
+    """
+    SELECT p.updated_at,
+           (
+               SELECT string_agg(v.id::text || ':' || v.xmin::text, ',' ORDER BY v.id)
+               FROM product_variants v
+               WHERE v.product_id = p.id
+           ) AS variants_version
+    FROM products p
+    WHERE p.slug = $1
+    """,
+    ("idx_products_slug", "idx_product_variants_product_id"),
+)
+
+VARIANTS_BY_PRODUCTS = Query(
+    "variants_by_products",
+    f"""
+    SELECT {VARIANT_COLUMNS}
+    FROM product_variants v
+    WHERE v.product_id = ANY($1::int[])
+    ORDER BY v.product_id, v.id
+    """,
+    ("idx_product_variants_product_id",),
+)
+
+# One cart (picked by the inner query) with its trigger-maintained totals (migration
+# 010) and whether any line went stale: its snapshot price differs from the current
+# price, or its variant has too little stock or no longer exists
+CART_SUMMARY_SQL = """
+    SELECT c.id,
+           c.item_count,
+           c.total_quantity AS total_items,
+           c.subtotal AS total_price,
+           EXISTS (
+               SELECT 1
+               FROM cart_items ci
+               LEFT JOIN product_variants v ON v.sku = ci.sku
+               LEFT JOIN products p ON p.id = v.product_id
+               WHERE ci.cart_id = c.id
+                 AND (v.id IS NULL OR v.stock < ci.quantity OR ci.price <> p.price + v.price_modifier)
+           ) AS has_stale_items
+    FROM ({cart}) c
+"""
+
+CART_BY_USER = Query(
+    "cart_by_user",
+    CART_SUMMARY_SQL.format(
+        cart="""
+        SELECT id, item_count, total_quantity, subtotal FROM carts
+        WHERE user_id = $1
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+        """
+    ),
+    ("idx_carts_user_id", "idx_cart_items_cart_id", "idx_product_variants_sku", "products_pkey"),
+)
+
+CART_BY_SESSION = Query(
+    "cart_by_session",
+    CART_SUMMARY_SQL.format(
+        cart="""
+        SELECT id, item_count, total_quantity, subtotal FROM carts
+        WHERE session_id = $1 AND user_id IS NULL
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+        """
+    ),
+    ("idx_carts_session_id", "idx_cart_items_cart_id", "idx_product_variants_sku", "products_pkey"),
+)
+
+CART_ITEMS = Query(
+    "cart_items",
+    """
+    SELECT id, sku, product_id, quantity, price
+    FROM cart_items
+    WHERE cart_id = $1
+    ORDER BY id
+    """,
+    ("idx_cart_items_cart_id",),
+)
+
+# Stock decrement of a checkout; see StockRepository.reserve
+STOCK_RESERVE = Query(
+    "stock_reserve",
+    """
+    WITH locked AS (
+        SELECT v.id, v.sku, v.product_id
+        FROM product_variants v
+        WHERE v.sku = ANY($1::varchar[])
+        ORDER BY v.sku
+        FOR NO KEY UPDATE
+    )
+    UPDATE product_variants v
+    SET stock = v.stock - r.quantity
+    FROM locked l
+    JOIN unnest($1::varchar[], $2::int[]) AS r(sku, quantity) ON r.sku = l.sku
+    JOIN products p ON p.id = l.product_id
+    WHERE v.id = l.id AND v.stock >= r.quantity
+    RETURNING v.id, v.sku, v.product_id, r.quantity, p.price + v.price_modifier AS unit_price
+    """,
+    ("idx_product_variants_sku", "product_variants_pkey", "products_pkey"),
+)
+
+TOKEN_ACTIVE = Query(
+    "token_active",
+    "SELECT EXISTS (SELECT 1 FROM access_token_log WHERE token = $1 AND expires_at > now())",
+    ("idx_access_token_token_hash",),
+)
+
+TOKEN_REMAINING_SECONDS = Query(
+    "token_remaining_seconds",
+    "SELECT extract(epoch FROM expires_at - now())::float8 FROM access_token_log WHERE token = $1",
+    ("idx_access_token_token_hash",),
+)
+
+HOT_QUERIES: Tuple[Query, ...] = (
+    *PRODUCT_LIST.values(),
+    PRODUCT_BY_SLUG,
+    PRODUCT_DETAIL_VERSION,
+    VARIANTS_BY_PRODUCTS,
+    CART_BY_USER,
+    CART_BY_SESSION,
+    CART_ITEMS,
+    STOCK_RESERVE,
+    TOKEN_ACTIVE,
+    TOKEN_REMAINING_SECONDS,
+)
@@ -0,0 +1,97 @@
+import re
+from datetime import datetime
+from typing import List, Optional
+
+import asyncpg
+
+from repositories.queries import PRODUCT_COLUMNS
+
+MAX_QUERY_TERMS = 8
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=' … '"
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(keyword: str) -> Optional[str]:
+    """
+    Turn free text into a `to_tsquery` expression matching every term as a prefix.
+
+    Only word characters survive, so user input can never inject tsquery syntax.
+    "nike air ma" -> "nike:* & air:* & ma:*"
+    """
+    terms = _TERM_PATTERN.findall(keyword.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+class SearchRepository:
+    """Ranked product search over the search_vector / trigram indexes (migration 004)."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def search_products(self, keyword: str, *, limit: int, offset: int = 0) -> List[asyncpg.Record]:
+        """
+        Products matching `keyword` by full text (prefix, stemmed) or by trigram word
+        similarity on the name (typos), best first, with highlighted name and snippet.
+
+        Both predicates are GIN-indexed and combined with a BitmapOr; highlighting is
+        computed only for the returned page because ts_headline re-parses the text.
+        """
+        tsquery = build_prefix_tsquery(keyword)
+        if tsquery is None:
+            return []
+
+        return await self._connection.fetch(
+            f"""
+            WITH q AS (
+                SELECT to_tsquery('english', $1) AS query
+            ),
+            hits AS (
+                SELECT {PRODUCT_COLUMNS},
+                       GREATEST(
+                           ts_rank_cd(p.search_vector, q.query),
+                           word_similarity($2, p.name)
+                       ) AS score
+                FROM products p, q
+                WHERE p.search_vector @@ q.query OR $2 <% p.name
+                ORDER BY score DESC, p.id DESC
+                LIMIT $3 OFFSET $4
+            )
+            SELECT hits.*,
+                   ts_headline('english', hits.name, q.query, $5) AS name_highlight,
+                   ts_headline('english', coalesce(hits.description, ''), q.query, $5) AS snippet
+            FROM hits, q
+            ORDER BY hits.score DESC, hits.id DESC
+            """,
+            tsquery,
+            keyword,
+            limit,
+            offset,
+            HIGHLIGHT_OPTIONS,
+        )
+
+    async def list_suggestion_sources(self, updated_since: Optional[datetime] = None) -> List[asyncpg.Record]:
+        """
+        Name/slug of every product (or of those updated at or after `updated_since`)
+        for the in-process autocomplete index, oldest change first.
+
+        `>=` rather than `>` re-reads rows sharing the previous watermark, so a row
+        committed later with the same `updated_at` is not missed; upserts are idempotent.
+        """
+        if updated_since is None:
+            return await self._connection.fetch(
+                "SELECT id, name, slug, review_count, updated_at FROM products ORDER BY updated_at"
+            )
+
+        # Range scan on idx_products_updated_at (migration 002)
+        return await self._connection.fetch(
+            """
+            SELECT id, name, slug, review_count, updated_at
+            FROM products
+            WHERE updated_at >= $1
+            ORDER BY updated_at
+            """,
+            updated_since,
+        )
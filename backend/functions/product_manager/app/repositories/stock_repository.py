@@ -0,0 +1,34 @@
+from typing import Dict, List, Sequence
+
+import asyncpg
+
+from repositories.queries import STOCK_RESERVE
+
+
+class StockRepository:
+    """Stock reservation against `product_variants.stock` (chk_variant_stock >= 0)."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def reserve(self, skus: Sequence[str], quantities: Sequence[int]) -> List[asyncpg.Record]:
+        """
+        Decrement stock for every (sku, quantity) pair in one statement, returning the
+        variants actually reserved with their current unit price.
+
+        Rows are locked through an ORDER BY sku ... FOR NO KEY UPDATE CTE, so two orders
+        sharing SKUs always lock them in the same order and cannot deadlock. The
+        `stock >= quantity` condition is rechecked on the latest row version after the
+        lock wait, so concurrent checkouts never oversell. A SKU missing from the result
+        was short (or unknown); the caller must roll back the transaction in that case.
+        `skus` must be distinct.
+        """
+        return await self._connection.fetch(STOCK_RESERVE.sql, list(skus), list(quantities))
+
+    async def get_stock(self, skus: Sequence[str]) -> Dict[str, int]:
+        """Current stock per known SKU, used to explain a failed reservation."""
+        rows = await self._connection.fetch(
+            "SELECT sku, stock FROM product_variants WHERE sku = ANY($1::varchar[])",
+            list(skus),
+        )
+        return {row["sku"]: row["stock"] for row in rows}
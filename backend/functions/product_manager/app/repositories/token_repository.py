@@ -0,0 +1,137 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import asyncpg
+
+from core.security import FINGERPRINT_BYTES
+from repositories.queries import TOKEN_ACTIVE, TOKEN_REMAINING_SECONDS
+
+# Same digest as core.security.token_fingerprint, computed server side so refreshes
+# never ship full tokens over the wire
+FINGERPRINT_SQL = f"substr(sha256(convert_to(token, 'UTF8')), 1, {FINGERPRINT_BYTES})"
+
+# Keyset cursor (expires_at, id) placed before every row
+KEYSET_START = (datetime.min, 0)
+
+
+class AccessTokenRepository:
+    """
+    Queries against `access_token_log` (issued access tokens).
+
+    A row is active while `expires_at > now()`. Logout revokes by moving
+    `expires_at` to now rather than deleting, so the change bumps `updated_at` and
+    reaches every process refreshing from it; expired rows are purged later.
+    """
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def create(self, user_id: int, token: str, expires_in: int) -> None:
+        await self._connection.execute(
+            """
+            INSERT INTO access_token_log (user_id, token, expires_at)
+            VALUES ($1, $2, now() + make_interval(secs => $3))
+            """,
+            user_id,
+            token,
+            expires_in,
+        )
+
+    async def is_active(self, token: str) -> bool:
+        return bool(await self._connection.fetchval(TOKEN_ACTIVE.sql, token))
+
+    async def get_remaining_seconds(self, token: str) -> Optional[float]:
+        """Seconds until the token's row expires (<= 0 once revoked), None if never issued."""
+        return await self._connection.fetchval(TOKEN_REMAINING_SECONDS.sql, token)
+
+    async def list_active(self, limit: int) -> List[asyncpg.Record]:
+        """Most recently changed active tokens, as (fingerprint, remaining_seconds, updated_at)."""
+        return await self._connection.fetch(
+            f"""
+            SELECT {FINGERPRINT_SQL} AS fingerprint,
+                   extract(epoch FROM expires_at - now())::float8 AS remaining_seconds,
+                   updated_at
+            FROM access_token_log
+            WHERE expires_at > now()
+            ORDER BY updated_at DESC
+            LIMIT $1
+            """,
+            limit,
+        )
+
+    async def list_changed_since(self, watermark: datetime, overlap_seconds: float) -> List[asyncpg.Record]:
+        """
+        Rows issued or revoked since `watermark` (idx_access_token_updated_at).
+
+        The window starts `overlap_seconds` early so rows committed late with an
+        older `updated_at` are still seen; re-reading a row is harmless.
+        """
+        return await self._connection.fetch(
+            f"""
+            SELECT {FINGERPRINT_SQL} AS fingerprint,
+                   extract(epoch FROM expires_at - now())::float8 AS remaining_seconds,
+                   updated_at
+            FROM access_token_log
+            WHERE updated_at >= $1::timestamp - make_interval(secs => $2)
+            ORDER BY updated_at
+            """,
+            watermark,
+            overlap_seconds,
+        )
+
+    async def revoke(self, token: str) -> bool:
+        status = await self._connection.execute(
+            "UPDATE access_token_log SET expires_at = now() WHERE token = $1 AND expires_at > now()",
+            token,
+        )
+        return status != "UPDATE 0"
+
+    async def revoke_all_for_user(self, user_id: int) -> int:
+        status = await self._connection.execute(
+            "UPDATE access_token_log SET expires_at = now() WHERE user_id = $1 AND expires_at > now()",
+            user_id,
+        )
+        return int(status.split()[-1])
+
+    async def purge_expired(
+        self, *, grace_seconds: float, batch_size: int, after: Tuple[datetime, int] = KEYSET_START
+    ) -> Tuple[int, Optional[Tuple[datetime, int]]]:
+        """
+        Delete up to `batch_size` rows expired for more than `grace_seconds`, in
+        (expires_at, id) order after the `after` cursor (idx_access_token_expires_at).
+
+        The grace period keeps revoked rows visible to the refresh feed long enough
+        for every process to pick the revocation up. Returns the number deleted and
+        the cursor of the next batch, None once the end was reached.
+        """
+        row = await self._connection.fetchrow(
+            """
+            WITH batch AS (
+                SELECT id, expires_at FROM access_token_log
+                WHERE expires_at < now() - make_interval(secs => $1)
+                  AND expires_at >= $3
+                  AND (expires_at, id) > ($3, $4)
+                ORDER BY expires_at, id
+                LIMIT $2
+            ),
+            deleted AS (
+                DELETE FROM access_token_log t
+                USING batch b
+                WHERE t.id = b.id
+                RETURNING 1
+            ),
+            last AS (
+                SELECT expires_at, id FROM batch ORDER BY expires_at DESC, id DESC LIMIT 1
+            )
+            SELECT (SELECT count(*) FROM deleted)::int AS deleted,
+                   (SELECT count(*) FROM batch)::int AS scanned,
+                   (SELECT expires_at FROM last) AS last_expires_at,
+                   (SELECT id FROM last) AS last_id
+            """,
+            grace_seconds,
+            batch_size,
+            *after,
+        )
+        if row["scanned"] < batch_size:
+            return row["deleted"], None
+        return row["deleted"], (row["last_expires_at"], row["last_id"])
@@ -0,0 +1,49 @@
+from typing import Optional
+
+import asyncpg
+
+
+class UserRepository:
+    """Queries against `users`."""
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self._connection = connection
+
+    async def get_by_username(self, username: str) -> Optional[asyncpg.Record]:
+        return await self._connection.fetchrow(
+            "SELECT id, username, password_hash, role, status FROM users WHERE username = $1",
+            username,
+        )
+
+    async def create(
+        self,
+        *,
+        username: str,
+        password_hash: str,
+        email: Optional[str],
+        full_name: Optional[str],
+        phone: Optional[str],
+    ) -> asyncpg.Record:
+        """Insert a customer; raises asyncpg.UniqueViolationError on a taken username/email."""
+        return await self._connection.fetchrow(
+            """
+            INSERT INTO users (username, password_hash, email, full_name, phone)
+            VALUES ($1, $2, $3, $4, $5)
+            RETURNING id, username, role
+            """,
+            username,
+            password_hash,
+            email,
+            full_name,
+            phone,
+        )
+
+    async def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Swap in an upgraded hash unless the password changed meanwhile."""
+        status = await self._connection.execute(
+            "UPDATE users SET password_hash = $3 WHERE id = $1 AND password_hash = $2",
+            user_id,
+            old_hash,
+            new_hash,
+        )
+        return status != "UPDATE 0"
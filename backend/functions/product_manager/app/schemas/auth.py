@@ -0,0 +1,38 @@
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field
+
+
+class LoginRequest(BaseModel):
+    username: str = Field(..., min_length=1, max_length=50)
+    password: str = Field(..., min_length=1, max_length=128)
+
+
+class RegisterRequest(BaseModel):
+    username: str = Field(..., min_length=3, max_length=50)
+    email: Optional[EmailStr] = None
+    password: str = Field(..., min_length=6, max_length=72)  # bcrypt ignores bytes past 72
+    full_name: Optional[str] = Field(None, max_length=150)
+    phone: Optional[str] = Field(None, max_length=20)
+
+
+class TokenData(BaseModel):
+    token_type: str = "bearer"
+    access_token: str
+    refresh_token: str
+    expires_in: int
+    refresh_expires_in: int
+    id: int
+    username: str
+    role: str
+
+
+class AuthResponse(BaseModel):
+    status_code: int = 200
+    message: str = "Success"
+    data: TokenData
+
+
+class MessageResponse(BaseModel):
+    status_code: int = 200
+    message: str
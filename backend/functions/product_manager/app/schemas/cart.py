@@ -0,0 +1,52 @@
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CartItem(BaseModel):
+    item_id: str = Field(serialization_alias="itemId")
+    sku: str
+    product_id: int
+    name: Optional[str] = None
+    image: Optional[str] = None
+    color: Optional[str] = None
+    size: Optional[str] = None
+    stock: int = 0
+    quantity: int
+    price: Decimal
+
+
+class CartDetail(BaseModel):
+    cart_id: Optional[str] = None
+    item_count: int = 0
+    total_items: int = 0
+    total_price: Decimal = Decimal("0.00")
+    # Some line's snapshot price differs from the current price, or its variant has
+    # less stock than the line quantity (or is gone); checkout would reject the cart
+    has_stale_items: bool = False
+    items: List[CartItem] = Field(default_factory=list)
+
+
+class CartResponse(BaseModel):
+    status_code: int = 200
+    message: str = "Success"
+    data: CartDetail
+
+
+class AddCartItemRequest(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=100)
+    quantity: int = Field(1, ge=1)
+
+
+class CartSummary(BaseModel):
+    cart_id: str
+    item_count: int
+    total_items: int
+    total_price: Decimal
+
+
+class CartSummaryResponse(BaseModel):
+    status_code: int = 200
+    message: str = "Item added to cart"
+    data: CartSummary
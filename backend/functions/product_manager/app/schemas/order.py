@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class OrderSummary(BaseModel):
+    order_id: str
+    order_number: str
+    status: str
+    total_amount: Decimal
+    shipping_cost: Decimal
+    created_at: datetime
+
+
+class OrderListResponse(BaseModel):
+    status_code: int = 200
+    message: str = "Success"
+    data: List[OrderSummary]
+    next_cursor: Optional[str] = None
+
+
+class ShippingInfo(BaseModel):
+    full_name: str = Field(..., min_length=1, max_length=255)
+    email: str = Field(..., min_length=3, max_length=255)
+    phone: str = Field(..., min_length=1, max_length=50)
+    address: str = Field(..., min_length=1, max_length=500)
+    city: str = Field(..., min_length=1, max_length=100)
+    postal_code: str = Field(..., min_length=1, max_length=20)
+    country: str = Field(..., min_length=2, max_length=2)
+
+
+class OrderCreateRequest(BaseModel):
+    shipping_info: ShippingInfo
+    shipping_method: Literal["standard", "express", "overnight"] = "standard"
+    payment_method: str = Field(..., min_length=1, max_length=50)
+    cart_id: str
+
+
+class OrderCreateResponse(BaseModel):
+    status_code: int = 201
+    message: str = "Order created successfully"
+    data: OrderSummary
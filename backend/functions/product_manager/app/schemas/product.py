@@ -0,0 +1,84 @@
+from decimal import Decimal
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from helpers.images import image_sources
+
+
+class ProductVariantItem(BaseModel):
+    sku: str
+    color: Optional[str] = None
+    size: Optional[str] = None
+    stock: int
+    price_modifier: Decimal
+
+
+class ImageSource(BaseModel):
+    type: str
+    srcset: str
+
+
+class ProductImage(BaseModel):
+    src: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    sources: List[ImageSource] = Field(default_factory=list)
+
+
+class ProductListItem(BaseModel):
+    id: int
+    slug: str
+    name: str
+    price: Decimal
+    currency: str
+    description: Optional[str] = None
+    images: List[str] = Field(default_factory=list)
+    image_sources: List[ProductImage] = Field(default_factory=list)
+    rating: float
+    review_count: int
+
+    @model_validator(mode="before")
+    @classmethod
+    def _derive_image_sources(cls, data: Any) -> Any:
+        # Rows carry products.image_variants; the response carries the srcsets
+        if isinstance(data, dict) and "image_sources" not in data:
+            data = {**data, "image_sources": image_sources(data.get("images"), data.get("image_variants"))}
+        return data
+
+
+class ProductDetail(ProductListItem):
+    variants: List[ProductVariantItem] = Field(default_factory=list)
+
+
+class ProductListResponse(BaseModel):
+    success: bool = True
+    data: List[ProductListItem]
+    next_cursor: Optional[str] = None
+
+
+class FeaturedProductItem(ProductListItem):
+    min_price: Decimal
+    max_price: Decimal
+    total_stock: int
+    in_stock: bool
+
+
+class FeaturedProductsResponse(BaseModel):
+    success: bool = True
+    data: List[FeaturedProductItem]
+
+
+class ProductSearchItem(ProductListItem):
+    name_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+
+
+class ProductSearchResponse(BaseModel):
+    success: bool = True
+    data: List[ProductSearchItem]
+
+
+class ProductDetailResponse(BaseModel):
+    success: bool = True
+    data: ProductDetail
@@ -0,0 +1,24 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ProductSuggestion(BaseModel):
+    name: str
+    slug: str
+
+
+class PopularSearch(BaseModel):
+    query: str
+    score: float
+
+
+class SearchSuggestions(BaseModel):
+    query: Optional[str] = None
+    products: List[ProductSuggestion]
+    popular: List[PopularSearch]
+
+
+class SearchSuggestResponse(BaseModel):
+    success: bool = True
+    data: SearchSuggestions
@@ -0,0 +1,112 @@
+import logging
+from typing import Optional
+
+import asyncpg
+
+from core.database import DatabasePool, db_pool
+from core.passwords import PasswordHasher, password_hasher
+from core.security import ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_SECONDS, create_token
+from exceptions import ConflictException, UnauthorizedException
+from repositories.token_repository import AccessTokenRepository
+from repositories.user_repository import UserRepository
+from schemas.auth import AuthResponse, LoginRequest, RegisterRequest, TokenData
+from services.cart_service import CartService, cart_service
+from services.token_cache import TokenCache, token_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AuthService:
+    """
+    Login, registration and logout.
+
+    bcrypt runs on the PasswordHasher pool, never on the event loop; no database
+    connection is held while a hash is computed.
+    """
+
+    def __init__(
+        self,
+        pool: DatabasePool = db_pool,
+        hasher: PasswordHasher = password_hasher,
+        tokens: TokenCache = token_cache,
+        carts: CartService = cart_service,
+    ) -> None:
+        self._pool = pool
+        self._hasher = hasher
+        self._tokens = tokens
+        self._carts = carts
+
+    async def login(self, request: LoginRequest, *, session_id: Optional[str] = None) -> AuthResponse:
+        async with self._pool.acquire() as connection:
+            user = await UserRepository(connection).get_by_username(request.username)
+
+        if user is None:
+            await self._hasher.dummy_verify()
+            raise UnauthorizedException("Invalid credentials")
+
+        verified, upgraded_hash = await self._hasher.verify_and_update(request.password, user["password_hash"])
+        if not verified:
+            raise UnauthorizedException("Invalid credentials")
+        if not user["status"]:
+            raise UnauthorizedException("User is blocked")
+
+        if upgraded_hash is not None:
+            async with self._pool.acquire() as connection:
+                await UserRepository(connection).update_password_hash(user["id"], user["password_hash"], upgraded_hash)
+            logger.info("Upgraded password hash cost for user %s", user["id"])
+
+        response = await self._issue_tokens(user)
+        await self._carts.merge_guest_cart(session_id=session_id, user_id=user["id"])
+        return response
+
+    async def register(self, request: RegisterRequest) -> AuthResponse:
+        password_hash = await self._hasher.hash(request.password)
+        try:
+            async with self._pool.acquire() as connection:
+                user = await UserRepository(connection).create(
+                    username=request.username,
+                    password_hash=password_hash,
+                    email=request.email,
+                    full_name=request.full_name,
+                    phone=request.phone,
+                )
+        except asyncpg.UniqueViolationError:
+            raise ConflictException("Username or email already exists")
+
+        response = await self._issue_tokens(user)
+        response.message = "User registered successfully"
+        return response
+
+    async def logout(self, token: str) -> None:
+        async with self._pool.acquire() as connection:
+            await AccessTokenRepository(connection).revoke(token)
+        self._tokens.forget(token)
+
+    async def logout_all(self, user_id: int, token: str) -> None:
+        async with self._pool.acquire() as connection:
+            await AccessTokenRepository(connection).revoke_all_for_user(user_id)
+        # Other tokens of the user drop out of every cache on its next refresh
+        self._tokens.forget(token)
+
+    async def _issue_tokens(self, user: asyncpg.Record) -> AuthResponse:
+        access_token = create_token(user["id"], "access", ACCESS_TOKEN_EXPIRE_SECONDS)
+        refresh_token = create_token(user["id"], "refresh", REFRESH_TOKEN_EXPIRE_SECONDS)
+
+        async with self._pool.acquire() as connection:
+            await AccessTokenRepository(connection).create(user["id"], access_token, ACCESS_TOKEN_EXPIRE_SECONDS)
+        self._tokens.remember(access_token, ACCESS_TOKEN_EXPIRE_SECONDS)
+
+        return AuthResponse(
+            data=TokenData(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                expires_in=ACCESS_TOKEN_EXPIRE_SECONDS,
+                refresh_expires_in=REFRESH_TOKEN_EXPIRE_SECONDS,
+                id=user["id"],
+                username=user["username"],
+                role=user["role"],
+            )
+        )
+
+
+auth_service = AuthService()
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+import asyncpg
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from core.serialization import dumps, encode_model
+from exceptions import BadRequestException, BusinessException, ErrorCode
+from helpers import row_mapping
+from repositories.cart_repository import CartRepository
+from repositories.stock_repository import StockRepository
+from schemas.cart import AddCartItemRequest, CartDetail, CartItem, CartResponse, CartSummary, CartSummaryResponse
+from services.catalog_loader import CatalogLoader
+from services.idempotency import CommitHook
+
+logger = logging.getLogger(__name__)
+
+
+class CartService:
+    def __init__(self, pool: DatabasePool = db_pool, *, fast_json: bool = settings.FAST_JSON_ENABLED) -> None:
+        self._pool = pool
+        self._fast_json = fast_json
+
+    async def get_cart(
+        self,
+        *,
+        user_id: Optional[int],
+        session_id: Optional[str],
+        loader: CatalogLoader,
+    ) -> bytes:
+        """
+        Full cart with product name/image and variant stock per item, as a JSON body.
+
+        Costs two cart queries plus one products and one variants query whatever the
+        number of items: per-item lookups go through the request's batch loader. The
+        totals and the stale-item flag come with the cart row (CartRepository.find_cart).
+        """
+        async with self._pool.acquire() as connection:
+            repository = CartRepository(connection)
+            cart = await repository.find_cart(user_id=user_id, session_id=session_id)
+            cart_id = cart["id"] if cart is not None else None
+            rows = await repository.list_items(cart_id) if cart_id is not None else []
+
+        catalog = await asyncio.gather(*(self._load_catalog(row, loader) for row in rows))
+        logger.debug("Cart %s: %d items rendered with %d catalog queries", cart_id, len(rows), loader.query_count)
+
+        if self._fast_json:
+            items = [row_mapping.cart_item(row, product, variant) for row, (product, variant) in zip(rows, catalog)]
+            return dumps({"status_code": 200, "message": "Success", "data": row_mapping.cart_detail(cart, items)})
+
+        if cart is None:
+            return encode_model(CartResponse(data=CartDetail()), by_alias=True)
+
+        cart_items = [self._to_cart_item(row, product, variant) for row, (product, variant) in zip(rows, catalog)]
+        body = CartResponse(
+            data=CartDetail(
+                cart_id=f"cart_{cart_id}",
+                item_count=cart["item_count"],
+                total_items=cart["total_items"],
+                total_price=cart["total_price"],
+                has_stale_items=cart["has_stale_items"],
+                items=cart_items,
+            )
+        )
+        return encode_model(body, by_alias=True)
+
+    async def add_item(
+        self,
+        *,
+        user_id: Optional[int],
+        session_id: Optional[str],
+        request: AddCartItemRequest,
+        before_commit: Optional[CommitHook] = None,
+    ) -> CartSummaryResponse:
+        """
+        Add a SKU to the caller's cart (created on first use) and return the cart totals.
+
+        Stock is checked, not reserved: a line may not exceed the variant's current
+        stock. Failures roll back the whole transaction, including a new cart. The cost
+        does not grow with the cart: cart lookup, one upsert, then a primary key read
+        of the totals the cart_items triggers maintain (they also move carts.updated_at).
+        `before_commit` (the Idempotency-Key completion) runs last, in the same transaction.
+        """
+        if user_id is None and not session_id:
+            raise BadRequestException("Guest carts need an X-Session-ID header")
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                repository = CartRepository(connection)
+                cart_id = await repository.find_cart_id(user_id=user_id, session_id=session_id)
+                if cart_id is None:
+                    cart_id = await repository.create_cart(user_id=user_id, session_id=session_id)
+
+                if await repository.add_item(cart_id, request.sku, request.quantity) is None:
+                    await self._raise_add_failure(StockRepository(connection), request.sku)
+
+                totals = await repository.get_totals(cart_id)
+                response = CartSummaryResponse(
+                    data=CartSummary(
+                        cart_id=f"cart_{cart_id}",
+                        item_count=totals["item_count"],
+                        total_items=totals["total_items"],
+                        total_price=totals["total_price"],
+                    )
+                )
+                if before_commit is not None:
+                    await before_commit(connection, response)
+
+        return response
+
+    async def merge_guest_cart(self, *, session_id: Optional[str], user_id: int) -> Optional[int]:
+        """
+        Fold the guest cart of `session_id` into the user's cart at login.
+
+        A single set-based statement (CartRepository.merge_guest_cart), so login cost
+        does not grow with the guest cart. Returns the user's cart id, if any.
+        """
+        if not session_id:
+            return None
+
+        async with self._pool.acquire() as connection:
+            result = await CartRepository(connection).merge_guest_cart(session_id=session_id, user_id=user_id)
+
+        if result is None:
+            return None
+        if result["merged_items"] or result["removed_carts"]:
+            logger.info(
+                "Merged guest cart of session into cart %s: %d items upserted, %d guest carts removed",
+                result["cart_id"],
+                result["merged_items"],
+                result["removed_carts"],
+            )
+        return result["cart_id"]
+
+    @staticmethod
+    async def _raise_add_failure(stock: StockRepository, sku: str) -> None:
+        available = (await stock.get_stock([sku])).get(sku)
+        if available is None:
+            raise BusinessException(ErrorCode.INVALID_SKU, f"SKU {sku} does not exist")
+        if available == 0:
+            raise BusinessException(ErrorCode.OUT_OF_STOCK, f"Product {sku} is out of stock")
+        raise BusinessException(ErrorCode.MAX_QUANTITY_REACHED, f"Only {available} of {sku} available")
+
+    @staticmethod
+    async def _load_catalog(
+        row: asyncpg.Record, loader: CatalogLoader
+    ) -> Tuple[Optional[asyncpg.Record], Optional[asyncpg.Record]]:
+        # Both loads are queued in the same tick as every other item's, then batched
+        product, variant = await asyncio.gather(
+            loader.products.load(row["product_id"]),
+            loader.variants_by_sku.load(row["sku"]),
+        )
+        return product, variant
+
+    @staticmethod
+    def _to_cart_item(
+        row: asyncpg.Record, product: Optional[asyncpg.Record], variant: Optional[asyncpg.Record]
+    ) -> CartItem:
+        images = product["images"] if product else None
+        return CartItem(
+            item_id=f"item_{row['id']}",
+            sku=row["sku"],
+            product_id=row["product_id"],
+            name=product["name"] if product else None,
+            image=images[0] if images else None,
+            color=variant["color"] if variant else None,
+            size=variant["size"] if variant else None,
+            stock=variant["stock"] if variant else 0,
+            quantity=row["quantity"],
+            price=row["price"],
+        )
+
+
+cart_service = CartService()
@@ -0,0 +1,121 @@
+"""
+Catalog response cache for the public product endpoints.
+
+Entries hold fully serialized JSON bodies, so a hit is returned as-is without
+touching the database or pydantic. Keys embed a catalog version counter that is
+bumped whenever `max(products.updated_at)` moves (product edited or added); the
+database is polled for it at most every `version_check_seconds`. Stock changes do
+not touch `products.updated_at`; when a request carries the resource version of its
+ETag (ProductService `version`) that version is part of the key, otherwise detail
+entries rely on their TTL for freshness.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from core.cache import TTLCache
+from core.config import settings
+from core.database import read_pool
+
+logger = logging.getLogger(__name__)
+
+LIST_NAMESPACE = "product_list"
+DETAIL_NAMESPACE = "product_detail"
+SEARCH_NAMESPACE = "product_search"
+
+VersionLoader = Callable[[], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """Result of a lookup: the cached body (if any) and the version it must be stored under."""
+
+    body: Optional[bytes]
+    version: int
+
+
+class CatalogCache:
+    """Versioned LRU+TTL cache of serialized product list, search and detail responses."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        max_entries: int,
+        ttl_seconds: float,
+        version_check_seconds: float,
+        version_loader: VersionLoader,
+    ) -> None:
+        self.enabled = enabled
+        self.version = 0
+        self._marker: Any = None
+        self._version_checked_at = 0.0
+        self._version_check_seconds = version_check_seconds
+        self._version_loader = version_loader
+        self._caches: Dict[str, TTLCache] = {
+            namespace: TTLCache(namespace, max_entries=max_entries, ttl_seconds=ttl_seconds)
+            for namespace in (LIST_NAMESPACE, DETAIL_NAMESPACE, SEARCH_NAMESPACE)
+        }
+
+    async def lookup(self, namespace: str, key: Hashable) -> CacheLookup:
+        """Return the cached body for `key`, checking the catalog version first if due."""
+        if not self.enabled:
+            return CacheLookup(body=None, version=self.version)
+
+        await self._refresh_version()
+        body = self._caches[namespace].get((self.version, key))
+        return CacheLookup(body=body, version=self.version)
+
+    def store(self, namespace: str, key: Hashable, body: bytes, version: int) -> None:
+        """Store a body computed under `version`; dropped if the catalog changed meanwhile."""
+        if self.enabled and version == self.version:
+            self._caches[namespace].set((version, key), body)
+
+    def invalidate(self) -> None:
+        """Bump the version after a known catalog write (import, admin edit)."""
+        self.version += 1
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "namespaces": {name: cache.stats() for name, cache in self._caches.items()},
+        }
+
+    async def _refresh_version(self) -> None:
+        now = time.time()
+        if now - self._version_checked_at < self._version_check_seconds:
+            return
+
+        self._version_checked_at = now
+        try:
+            marker = await self._version_loader()
+        except Exception:  # noqa: BLE001 - serve from cache (TTL-bounded) if the check fails
+            logger.exception("Failed to check catalog version")
+            return
+
+        if marker != self._marker:
+            if self._marker is not None:
+                logger.info("Catalog changed (%s -> %s), invalidating cache", self._marker, marker)
+                self.invalidate()
+            self._marker = marker
+
+
+async def _load_catalog_marker() -> Any:
+    # Backed by idx_products_updated_at (migration 002): a single index probe. Read from
+    # the same replicas as the cached bodies, so a body is never filed under a newer
+    # marker than the data it was rendered from (up to READ_REPLICA_MAX_LAG_SECONDS)
+    return await read_pool.fetchval("SELECT max(updated_at) FROM products")
+
+
+catalog_cache = CatalogCache(
+    enabled=settings.CATALOG_CACHE_ENABLED,
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+    version_check_seconds=settings.CATALOG_CACHE_VERSION_CHECK_SECONDS,
+    version_loader=_load_catalog_marker,
+)
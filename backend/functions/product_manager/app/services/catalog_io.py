@@ -0,0 +1,277 @@
+"""
+Bulk catalog import and export.
+
+Sources (CSV, NDJSON, a Google Sheet worksheet) are read as a stream of flat rows,
+one per variant with the product fields repeated (a product without variants is a
+row with an empty `sku`). Rows are converted and sent with binary COPY into a
+temporary staging table in batches of `batch_size`, so memory stays bounded by one
+batch whatever the file size. The staging table is then merged into `products`
+(upsert on slug) and `product_variants` (upsert on SKU) inside the same
+transaction: an invalid row anywhere rolls the whole import back.
+
+Export streams the same layout back from a server-side cursor, so an export can be
+fed straight into an import.
+"""
+
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core.database import DatabasePool, db_pool
+from core.lazy_imports import lazy_module
+from repositories.catalog_repository import STAGING_COLUMNS, CatalogRepository
+from services.catalog_cache import CatalogCache, catalog_cache
+
+logger = logging.getLogger(__name__)
+
+gspread = lazy_module("gspread")
+
+# Column order of files written by export and expected (by header name) on import
+CATALOG_COLUMNS: Tuple[str, ...] = STAGING_COLUMNS[1:]
+REQUIRED_COLUMNS = ("slug", "name", "price")
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_EXPORT_PREFETCH = 2000
+
+Row = Dict[str, Any]
+
+
+class CatalogRowError(ValueError):
+    """A source row that cannot be imported; carries its 1-based row number."""
+
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class TransferProgress:
+    """Running counters handed to the progress callback after every batch."""
+
+    rows: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.rows / elapsed if elapsed else 0.0
+
+
+@dataclass
+class ImportResult:
+    rows: int
+    products_inserted: int
+    products_updated: int
+    variants_inserted: int
+    variants_updated: int
+    copy_seconds: float
+    merge_seconds: float
+    rows_per_second: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+ProgressCallback = Callable[[TransferProgress], None]
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Row]:
+    """Rows of a CSV file with a header line; `lines` is consumed lazily."""
+    yield from csv.DictReader(lines)
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Row]:
+    """One JSON object per line; blank lines are skipped."""
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise CatalogRowError(number, f"invalid JSON ({exc.msg})")
+
+
+def read_sheet(spreadsheet_key: str, worksheet: str, credentials_file: Optional[str] = None) -> Iterator[Row]:
+    """Rows of a worksheet whose first row holds the column names (service-account auth)."""
+    client = gspread.service_account(filename=credentials_file) if credentials_file else gspread.service_account()
+    values = client.open_by_key(spreadsheet_key).worksheet(worksheet).get_all_values()
+    if not values:
+        return
+    header = values[0]
+    for cells in values[1:]:
+        yield dict(zip(header, cells))
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _decimal(value: Any, line: int, column: str) -> Optional[Decimal]:
+    text = _text(value)
+    if text is None:
+        return None
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        raise CatalogRowError(line, f"{column} is not a number: {text!r}")
+
+
+def _integer(value: Any, line: int, column: str) -> Optional[int]:
+    text = _text(value)
+    if text is None:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        raise CatalogRowError(line, f"{column} is not an integer: {text!r}")
+
+
+def _images(value: Any, line: int) -> Optional[str]:
+    # JSON arrays (NDJSON, exports) or "url1|url2" as typed into a sheet cell
+    if isinstance(value, list):
+        return json.dumps(value)
+    text = _text(value)
+    if text is None:
+        return None
+    if text.startswith("["):
+        try:
+            return json.dumps(json.loads(text))
+        except json.JSONDecodeError:
+            raise CatalogRowError(line, "images is not a valid JSON array")
+    return json.dumps([url.strip() for url in text.split("|") if url.strip()])
+
+
+def to_staging_record(row: Row, line: int) -> Tuple[Any, ...]:
+    """Convert one source row to a staging tuple (STAGING_COLUMNS order)."""
+    for column in REQUIRED_COLUMNS:
+        if _text(row.get(column)) is None:
+            raise CatalogRowError(line, f"{column} is required")
+
+    return (
+        line,
+        _text(row["slug"]),
+        _text(row["name"]),
+        _text(row.get("description")),
+        _decimal(row["price"], line, "price"),
+        _text(row.get("currency")),
+        _images(row.get("images"), line),
+        _text(row.get("sku")),
+        _text(row.get("color")),
+        _text(row.get("size")),
+        _integer(row.get("stock"), line, "stock"),
+        _decimal(row.get("price_modifier"), line, "price_modifier"),
+    )
+
+
+class CatalogTransfer:
+    def __init__(self, pool: DatabasePool = db_pool, cache: CatalogCache = catalog_cache) -> None:
+        self._pool = pool
+        self._cache = cache
+
+    async def import_rows(
+        self,
+        rows: Iterable[Row],
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> ImportResult:
+        """COPY `rows` into staging batch by batch, then upsert products and variants."""
+        progress = TransferProgress()
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                repository = CatalogRepository(connection)
+                await repository.create_staging()
+
+                batch: List[Tuple[Any, ...]] = []
+                for line, row in enumerate(rows, start=1):
+                    batch.append(to_staging_record(row, line))
+                    if len(batch) >= batch_size:
+                        await self._copy_batch(repository, batch, progress, on_progress)
+                        batch = []
+                if batch:
+                    await self._copy_batch(repository, batch, progress, on_progress)
+                copy_seconds = progress.elapsed_seconds
+
+                products = await repository.merge_products()
+                variants = await repository.merge_variants()
+                merge_seconds = progress.elapsed_seconds - copy_seconds
+
+        if products["inserted"] or products["updated"] or variants["inserted"] or variants["updated"]:
+            # Other processes notice product changes through max(products.updated_at) and
+            # variant-only changes once their detail entries expire; this one right away
+            self._cache.invalidate()
+
+        result = ImportResult(
+            rows=progress.rows,
+            products_inserted=products["inserted"],
+            products_updated=products["updated"],
+            variants_inserted=variants["inserted"],
+            variants_updated=variants["updated"],
+            copy_seconds=round(copy_seconds, 3),
+            merge_seconds=round(merge_seconds, 3),
+            rows_per_second=round(progress.rows / progress.elapsed_seconds, 1) if progress.rows else 0.0,
+        )
+        logger.info("Catalog import finished: %s", result.to_dict())
+        return result
+
+    async def export_rows(
+        self,
+        *,
+        prefetch: int = DEFAULT_EXPORT_PREFETCH,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> AsyncIterator[Row]:
+        """
+        Yield the catalog one flat row at a time (CATALOG_COLUMNS keys).
+
+        Holds one pooled connection and a read-only transaction for the whole
+        iteration; memory is bounded by `prefetch` rows.
+        """
+        progress = TransferProgress()
+        async with self._pool.acquire() as connection:
+            async with connection.transaction(readonly=True):
+                async for record in CatalogRepository(connection).stream_catalog(prefetch=prefetch):
+                    yield {column: record[column] for column in CATALOG_COLUMNS}
+                    progress.rows += 1
+                    if on_progress is not None and progress.rows % prefetch == 0:
+                        on_progress(progress)
+        if on_progress is not None:
+            on_progress(progress)
+
+    @staticmethod
+    async def _copy_batch(
+        repository: CatalogRepository,
+        batch: List[Tuple[Any, ...]],
+        progress: TransferProgress,
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        await repository.copy_to_staging(batch)
+        progress.rows += len(batch)
+        if on_progress is not None:
+            on_progress(progress)
+
+
+async def write_csv(rows: AsyncIterator[Row], out: TextIO) -> None:
+    """Write exported rows as CSV; images as a JSON array, Decimals as plain strings."""
+    writer = csv.DictWriter(out, fieldnames=CATALOG_COLUMNS)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow({**row, "images": json.dumps(row["images"] or [])})
+
+
+async def write_ndjson(rows: AsyncIterator[Row], out: TextIO) -> None:
+    async for row in rows:
+        out.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+
+
+catalog_transfer = CatalogTransfer()
@@ -0,0 +1,51 @@
+"""
+Request-scoped batch loaders for products and variants.
+
+Rendering a cart or a product page asks for products and variants one item at a
+time; the loaders turn those lookups into one `= ANY($1)` query per table per
+event-loop tick, so cost no longer grows with the number of items.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import asyncpg
+
+from core.database import ReadPool, read_pool
+from core.dataloader import DataLoader
+from repositories.product_repository import ProductRepository
+
+
+class CatalogLoader:
+    """One instance per request (see `api.deps.get_catalog_loader`)."""
+
+    def __init__(self, pool: ReadPool = read_pool) -> None:
+        self._pool = pool
+        self.products: DataLoader[int, Optional[asyncpg.Record]] = DataLoader(self._load_products)
+        self.variants_by_sku: DataLoader[str, Optional[asyncpg.Record]] = DataLoader(self._load_variants_by_sku)
+        self.variants_by_product: DataLoader[int, List[asyncpg.Record]] = DataLoader(self._load_variants_by_product)
+
+    @property
+    def query_count(self) -> int:
+        """Queries issued so far, one per dispatched batch."""
+        return self.products.batches + self.variants_by_sku.batches + self.variants_by_product.batches
+
+    async def _load_products(self, product_ids: Sequence[int]) -> Dict[int, asyncpg.Record]:
+        async with self._pool.acquire() as connection:
+            rows = await ProductRepository(connection).get_by_ids(product_ids)
+        return {row["id"]: row for row in rows}
+
+    async def _load_variants_by_sku(self, skus: Sequence[str]) -> Dict[str, asyncpg.Record]:
+        async with self._pool.acquire() as connection:
+            rows = await ProductRepository(connection).get_variants_by_skus(skus)
+        return {row["sku"]: row for row in rows}
+
+    async def _load_variants_by_product(self, product_ids: Sequence[int]) -> Dict[int, List[asyncpg.Record]]:
+        async with self._pool.acquire() as connection:
+            rows = await ProductRepository(connection).list_variants_for_products(product_ids)
+
+        grouped: Dict[int, List[asyncpg.Record]] = {product_id: [] for product_id in product_ids}
+        for row in rows:
+            grouped[row["product_id"]].append(row)
+            # A later lookup by SKU (e.g. add-to-cart from the detail page) needs no query
+            self.variants_by_sku.prime(row["sku"], row)
+        return grouped
@@ -0,0 +1,39 @@
+"""
+Versions of the public catalog resources, the basis of their ETags.
+
+A version names the data a response is rendered from: product lists and search
+results only show product columns, so their version is `max(products.updated_at)`;
+a product page also shows variant stock, so its version adds the product's variant
+row versions. Both are a single indexed probe, far cheaper than building the body,
+which is what lets api.middleware.ConditionalGetMiddleware answer 304 up front.
+"""
+
+from typing import Optional
+
+from core.database import ReadPool, read_pool
+from repositories.product_repository import ProductRepository
+
+# Version of a listing when there are no products yet
+EMPTY_CATALOG = "empty"
+
+
+class CatalogVersions:
+    def __init__(self, pool: ReadPool = read_pool) -> None:
+        self._pool = pool
+
+    async def listing(self) -> str:
+        """Version of every product list and search page."""
+        async with self._pool.acquire() as connection:
+            marker = await ProductRepository(connection).get_listing_version()
+        return marker.isoformat() if marker is not None else EMPTY_CATALOG
+
+    async def product(self, slug: str) -> Optional[str]:
+        """Version of a product page, None when the product does not exist."""
+        async with self._pool.acquire() as connection:
+            row = await ProductRepository(connection).get_detail_version(slug)
+        if row is None:
+            return None
+        return f"{row['updated_at'].isoformat()}/{row['variants_version'] or ''}"
+
+
+catalog_versions = CatalogVersions()
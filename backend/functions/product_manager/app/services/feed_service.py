@@ -0,0 +1,111 @@
+"""
+Homepage "featured products" feed.
+
+Reads the precomputed `product_feed` table (migration 007) instead of sorting the
+catalog and looking up variants per render. Triggers queue every product whose
+price, rating or variants change; at most every `refresh_seconds` this process
+drains part of that queue (refresh_product_feed, SKIP LOCKED, so concurrent
+processes split the work) and re-checks the feed marker. Rendered bodies are
+kept per `limit` until the marker moves, so a warm feed costs no database work.
+"""
+
+import logging
+import time
+from typing import Any, Dict
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from core.serialization import dumps, encode_model
+from helpers import row_mapping
+from repositories.feed_repository import FeedRepository
+from schemas.product import FeaturedProductItem, FeaturedProductsResponse
+
+logger = logging.getLogger(__name__)
+
+
+class FeedService:
+    def __init__(
+        self,
+        pool: DatabasePool = db_pool,
+        *,
+        refresh_seconds: float,
+        batch_size: int,
+        fast_json: bool = settings.FAST_JSON_ENABLED,
+    ) -> None:
+        self._pool = pool
+        self._refresh_seconds = refresh_seconds
+        self._batch_size = batch_size
+        self._fast_json = fast_json
+        self._bodies: Dict[int, bytes] = {}
+        self._marker: Any = None
+        self._generation = 0
+        self._checked_at = 0.0
+        self._refreshed_products = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def featured(self, *, limit: int) -> bytes:
+        """Serialized top `limit` products of the feed: in stock first, then by score."""
+        await self._ensure_fresh()
+
+        body = self._bodies.get(limit)
+        if body is not None:
+            self.hits += 1
+            return body
+
+        self.misses += 1
+        generation = self._generation
+        async with self._pool.acquire() as connection:
+            rows = await FeedRepository(connection).list_featured(limit)
+
+        if self._fast_json:
+            body = dumps({"success": True, "data": [row_mapping.featured_item(row) for row in rows]})
+        else:
+            response = FeaturedProductsResponse(data=[FeaturedProductItem.model_validate(dict(row)) for row in rows])
+            body = encode_model(response)
+
+        # Dropped if the feed changed while this body was being rendered
+        if generation == self._generation:
+            self._bodies[limit] = body
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        updated_at, feed_rows = self._marker or (None, None)
+        return {
+            "cached_limits": sorted(self._bodies),
+            "feed_rows": feed_rows,
+            "feed_updated_at": updated_at.isoformat() if updated_at else None,
+            "refreshed_products": self._refreshed_products,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def _ensure_fresh(self) -> None:
+        now = time.time()
+        if now - self._checked_at < self._refresh_seconds:
+            return
+
+        # Claimed before awaiting so concurrent requests keep serving the rendered feed
+        self._checked_at = now
+        try:
+            async with self._pool.acquire() as connection:
+                repository = FeedRepository(connection)
+                refreshed = await repository.refresh(self._batch_size)
+                marker = await repository.get_marker()
+        except Exception:  # noqa: BLE001 - keep serving the rendered feed
+            logger.exception("Failed to refresh the homepage feed")
+            return
+
+        self._refreshed_products += refreshed
+        if marker != self._marker:
+            self._marker = marker
+            self._generation += 1
+            self._bodies = {}
+
+
+feed_service = FeedService(
+    refresh_seconds=settings.FEED_REFRESH_SECONDS,
+    batch_size=settings.FEED_REFRESH_BATCH_SIZE,
+)
@@ -0,0 +1,262 @@
+"""
+Idempotency-Key support for POST /orders and POST /cart/items.
+
+A retry that carries the same key gets the stored response of the first attempt
+instead of running the handler again, so a timed-out checkout cannot reserve stock
+twice:
+
+- Recent responses sit in a bounded in-process LRU; a retry that reaches the same
+  process costs no query.
+- Duplicates arriving while the first attempt still runs in this process wait for
+  its outcome, so a retry storm costs one transaction.
+- Otherwise the key is claimed in `idempotency_keys` (migration 008) before the
+  handler runs, and completed with the response by a `CommitHook` the handler
+  calls inside its own transaction. A retry on another process replays the
+  completed row, or gets 409 while the first attempt is still running there.
+
+Because the response is stored by the transaction that does the work, the work
+never commits without its key being completed: a process that dies mid-handler
+leaves only its claim, which a retry takes over after `lock_seconds`, and an
+attempt that outlived its claim rolls back instead of committing a second time.
+
+Keys are scoped to the route and the caller (user or guest session) and bound to
+a fingerprint of the request body; reusing a key for a different body is a 422.
+Only successful responses are stored: when the handler fails the claim is
+released and the key can be retried.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from pydantic import BaseModel
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from core.serialization import TrustedJSONResponse, encode_model
+from exceptions import ConflictException, UnprocessableEntityException
+from repositories.idempotency_repository import IdempotencyRepository
+from services.sweeper import sweep_idempotency_keys
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BYTES = 16
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+CacheKey = Tuple[str, str]
+
+# Called by a handler with its connection and response model just before its
+# transaction commits; raising rolls the transaction back
+CommitHook = Callable[[asyncpg.Connection, BaseModel], Awaitable[None]]
+Handler = Callable[[Optional[CommitHook]], Awaitable[BaseModel]]
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: bytes
+    fingerprint: bytes
+    expires_at: float
+
+
+def request_fingerprint(request: BaseModel) -> bytes:
+    """Digest of the validated request body, so formatting differences do not matter."""
+    return hashlib.sha256(request.model_dump_json().encode()).digest()[:FINGERPRINT_BYTES]
+
+
+class IdempotencyStore:
+    """Stored responses by (scope, key): LRU in front of `idempotency_keys`, plus in-flight attempts."""
+
+    def __init__(
+        self,
+        pool: DatabasePool = db_pool,
+        *,
+        enabled: bool,
+        ttl_seconds: float,
+        lock_seconds: float,
+        max_entries: int,
+    ) -> None:
+        self._pool = pool
+        self.enabled = enabled
+        self._ttl_seconds = ttl_seconds
+        self._lock_seconds = lock_seconds
+        self._max_entries = max_entries
+        self._recent: "OrderedDict[CacheKey, StoredResponse]" = OrderedDict()
+        self._inflight: Dict[CacheKey, "asyncio.Future[StoredResponse]"] = {}
+        self.executed = 0
+        self.cache_replays = 0
+        self.collapsed = 0
+        self.database_replays = 0
+        self.conflicts = 0
+
+    async def respond(
+        self,
+        *,
+        key: Optional[str],
+        scope: str,
+        request: BaseModel,
+        status_code: int,
+        handler: Handler,
+    ) -> TrustedJSONResponse:
+        """
+        Run `handler` at most once per key and scope and answer with its response model.
+
+        The handler gets a CommitHook (None when there is nothing to store) and must
+        await it inside its transaction, after the last statement, with the response.
+        """
+        if key is None or not self.enabled:
+            return TrustedJSONResponse(encode_model(await handler(None)), status_code=status_code)
+
+        stored, replayed = await self._execute((scope, key), request_fingerprint(request), status_code, handler)
+        headers = {REPLAYED_HEADER: "true"} if replayed else None
+        return TrustedJSONResponse(stored.body, status_code=stored.status_code, headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "cached": len(self._recent),
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "cache_replays": self.cache_replays,
+            "collapsed": self.collapsed,
+            "database_replays": self.database_replays,
+            "conflicts": self.conflicts,
+        }
+
+    async def _execute(
+        self, cache_key: CacheKey, fingerprint: bytes, status_code: int, handler: Handler
+    ) -> Tuple[StoredResponse, bool]:
+        stored = self._recent.get(cache_key)
+        if stored is not None and stored.expires_at > time.time():
+            self.cache_replays += 1
+            self._recent.move_to_end(cache_key)
+            return self._check(stored, fingerprint), True
+
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            self.collapsed += 1
+            # Shielded: a duplicate whose client went away must not cancel the first attempt
+            return self._check(await asyncio.shield(pending), fingerprint), True
+
+        future: "asyncio.Future[StoredResponse]" = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            stored, replayed = await self._claim_and_run(cache_key, fingerprint, status_code, handler)
+        except Exception as exc:
+            # Duplicates waiting on this attempt fail the same way
+            future.set_exception(exc)
+            future.exception()  # retrieved, even when nobody was waiting
+            raise
+        except BaseException:
+            # The first attempt was cancelled (client gone, shutdown), not its duplicates:
+            # they get the retryable 409 a duplicate on another process gets while the
+            # claim is held, instead of a CancelledError of their own
+            future.set_exception(ConflictException("A request with this Idempotency-Key is still being processed"))
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
+
+        future.set_result(stored)
+        self._remember(cache_key, stored)
+        return stored, replayed
+
+    async def _claim_and_run(
+        self, cache_key: CacheKey, fingerprint: bytes, status_code: int, handler: Handler
+    ) -> Tuple[StoredResponse, bool]:
+        scope, key = cache_key
+        async with self._pool.acquire() as connection:
+            repository = IdempotencyRepository(connection)
+            claimed_at = await repository.claim(
+                scope, key, fingerprint, lock_seconds=self._lock_seconds, ttl_seconds=self._ttl_seconds
+            )
+            existing = None if claimed_at else await repository.get(scope, key)
+
+        if claimed_at is None:
+            if existing is None or existing["status_code"] is None:
+                self.conflicts += 1
+                raise ConflictException("A request with this Idempotency-Key is still being processed")
+            self.database_replays += 1
+            stored = StoredResponse(
+                status_code=existing["status_code"],
+                body=bytes(existing["body"]),
+                fingerprint=bytes(existing["fingerprint"]),
+                expires_at=time.time() + existing["remaining_seconds"],
+            )
+            return self._check(stored, fingerprint), True
+
+        bodies: List[bytes] = []
+
+        async def complete(connection: asyncpg.Connection, response: BaseModel) -> None:
+            body = encode_model(response)
+            if not await IdempotencyRepository(connection).complete(scope, key, claimed_at, status_code, body):
+                # The claim expired and another attempt took the key over
+                self.conflicts += 1
+                raise ConflictException("A request with this Idempotency-Key is still being processed")
+            bodies.append(body)
+
+        try:
+            await handler(complete)
+            if not bodies:
+                raise RuntimeError("Idempotent handler returned without calling its commit hook")
+        except Exception:
+            await self._release(scope, key, claimed_at)
+            raise
+
+        self.executed += 1
+        return StoredResponse(status_code, bodies[-1], fingerprint, time.time() + self._ttl_seconds), False
+
+    async def _release(self, scope: str, key: str, claimed_at: datetime) -> None:
+        try:
+            async with self._pool.acquire() as connection:
+                await IdempotencyRepository(connection).release(scope, key, claimed_at)
+        except Exception:  # noqa: BLE001 - the claim then expires after lock_seconds
+            logger.exception("Failed to release an idempotency key claim")
+
+    @staticmethod
+    def _check(stored: StoredResponse, fingerprint: bytes) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise UnprocessableEntityException("Idempotency-Key was already used for a different request")
+        return stored
+
+    def _remember(self, cache_key: CacheKey, stored: StoredResponse) -> None:
+        self._recent[cache_key] = stored
+        self._recent.move_to_end(cache_key)
+        while len(self._recent) > self._max_entries:
+            self._recent.popitem(last=False)
+
+
+async def purge_expired_idempotency_keys(
+    pool: DatabasePool = db_pool,
+    *,
+    batch_size: int = settings.IDEMPOTENCY_PURGE_BATCH_SIZE,
+) -> int:
+    """Delete expired `idempotency_keys` rows in short keyset batches; returns the number removed."""
+    result = await sweep_idempotency_keys(pool, batch_size=batch_size)
+    return result.rows
+
+
+async def run_idempotency_purge(interval_seconds: float = settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS) -> None:
+    """Purge loop for long-running servers; cancelled on shutdown."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await purge_expired_idempotency_keys()
+            if removed:
+                logger.info("Purged %d expired idempotency keys", removed)
+        except Exception:  # noqa: BLE001 - try again next interval
+            logger.exception("Failed to purge expired idempotency keys")
+
+
+idempotency_store = IdempotencyStore(
+    enabled=settings.IDEMPOTENCY_ENABLED,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    max_entries=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+)
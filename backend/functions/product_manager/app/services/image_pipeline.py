@@ -0,0 +1,306 @@
+"""
+Product image derivatives.
+
+`products.images` holds full-size URLs, so every product card used to download an
+800x600+ original. The pipeline renders each image as AVIF and WebP at
+`IMAGE_WIDTHS` (never upscaled), stores the files next to the original and records
+them in `products.image_variants` (migration 012); product responses turn that into
+a srcset per format (helpers.images.image_sources).
+
+Decoding, resizing and encoding are CPU bound, AVIF above all, so they run on a
+process pool of `IMAGE_WORKERS` (helpers.images.render_variants) and the event loop
+only moves bytes. A source is either an uploaded file, stored under
+`products/<slug>/` first, or a URL already in `products.images`: URLs of the store
+are read from it, others are downloaded and a copy is stored the same way.
+
+`LocalImageStore` is the filesystem stand-in for S3: keys are paths under
+`IMAGE_STORAGE_DIR`, published under `IMAGE_BASE_URL`.
+
+Entry point: `image_cli.py`. Lambda offers no shared memory for process pools, so
+the pipeline is not run by the API; the API only reads the recorded metadata.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+
+import asyncpg
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from core.lazy_imports import lazy_module
+from exceptions import BadRequestException, NotFoundException
+from helpers.images import RenderedImage, render_variants, supported_formats
+from repositories.product_repository import ProductRepository
+from services.catalog_cache import CatalogCache, catalog_cache
+
+logger = logging.getLogger(__name__)
+
+requests = lazy_module("requests")
+
+# Extensions of stored originals by the format Pillow detected
+SOURCE_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "avif": ".avif", "gif": ".gif"}
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class LocalImageStore:
+    """Image files under a directory, published under a base URL (S3 bucket stand-in)."""
+
+    def __init__(self, root: str = settings.IMAGE_STORAGE_DIR, base_url: str = settings.IMAGE_BASE_URL) -> None:
+        self._root = os.path.abspath(root)
+        self._base_url = base_url.rstrip("/")
+
+    def url(self, key: str) -> str:
+        return f"{self._base_url}/{key}"
+
+    def key_for(self, url: str) -> Optional[str]:
+        """Key of a URL this store published, None for any other URL."""
+        prefix = f"{self._base_url}/"
+        return url[len(prefix) :] if url.startswith(prefix) else None
+
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+    async def write(self, key: str, data: bytes) -> str:
+        """Store `data` under `key` (replacing it atomically) and return its URL."""
+        await asyncio.to_thread(self._write, key, data)
+        return self.url(key)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self._root, key))
+        if not path.startswith(self._root + os.sep):
+            raise ValueError(f"Image key outside the store: {key}")
+        return path
+
+    def _read(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as file:
+            return file.read()
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".upload-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def variant_key(source_key: str, width: int, fmt: str) -> str:
+    """Key of a derivative, next to its original: products/x/a.jpg -> products/x/a.w320.webp"""
+    stem, _ = os.path.splitext(source_key)
+    return f"{stem}.w{width}.{fmt}"
+
+
+@dataclass
+class PipelineReport:
+    products: int = 0
+    images: int = 0
+    variants: int = 0
+    failed: int = 0
+    skipped_products: int = 0
+    source_bytes: int = 0
+    variant_bytes: int = 0
+    render_ms: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        timings = sorted(self.render_ms)
+        return {
+            "products": self.products,
+            "images": self.images,
+            "variants": self.variants,
+            "failed": self.failed,
+            "skipped_products": self.skipped_products,
+            "source_bytes": self.source_bytes,
+            "variant_bytes": self.variant_bytes,
+            "render_ms": {
+                "mean": round(sum(timings) / len(timings), 2) if timings else 0.0,
+                "p95": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2) if timings else 0.0,
+                "max": round(timings[-1], 2) if timings else 0.0,
+            },
+        }
+
+
+class ImagePipeline:
+    """Renders, stores and records product image derivatives (see module docstring)."""
+
+    def __init__(
+        self,
+        store: Optional[LocalImageStore] = None,
+        pool: DatabasePool = db_pool,
+        cache: CatalogCache = catalog_cache,
+        *,
+        workers: int = settings.IMAGE_WORKERS,
+        widths: Sequence[int] = tuple(int(width) for width in _split(settings.IMAGE_WIDTHS)),
+        formats: Sequence[str] = tuple(_split(settings.IMAGE_FORMATS)),
+        max_source_bytes: int = settings.IMAGE_MAX_SOURCE_BYTES,
+        fetch_timeout_seconds: float = settings.IMAGE_FETCH_TIMEOUT_SECONDS,
+    ) -> None:
+        self._store = store or LocalImageStore()
+        self._pool = pool
+        self._cache = cache
+        self._workers = workers
+        self._widths = tuple(widths)
+        self._formats = tuple(formats)
+        self._quality = {"avif": settings.IMAGE_AVIF_QUALITY, "webp": settings.IMAGE_WEBP_QUALITY}
+        self._max_source_bytes = max_source_bytes
+        self._fetch_timeout_seconds = fetch_timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Sources downloaded and held in memory at once
+        self._sources = asyncio.Semaphore(workers * 2)
+        self.report = PipelineReport()
+
+    def check_formats(self) -> None:
+        """Fail early when the installed Pillow cannot encode a configured format."""
+        missing = [fmt for fmt in self._formats if fmt not in supported_formats(self._formats)]
+        if missing:
+            raise ValueError(f"Pillow cannot encode {missing}; AVIF needs Pillow 11.3 or later")
+
+    async def derive_product(self, slug: str, *, force: bool = False) -> int:
+        """Derive the images of one product that have no derivatives yet (all with `force`)."""
+        async with self._pool.acquire() as connection:
+            product = await ProductRepository(connection).get_images(slug)
+        if product is None:
+            raise NotFoundException(f"Product '{slug}' not found")
+        return await self._derive_images(product, force=force)
+
+    async def derive_missing(self, *, batch_size: int = 100) -> Dict[str, Any]:
+        """Derive every product image without derivatives, `batch_size` products at a time."""
+        after_id = 0
+        while True:
+            async with self._pool.acquire() as connection:
+                products = await ProductRepository(connection).list_missing_image_variants(
+                    after_id=after_id, limit=batch_size
+                )
+            if not products:
+                break
+            await asyncio.gather(*(self._derive_images(product) for product in products))
+            after_id = products[-1]["id"]
+        return self.report.to_dict()
+
+    async def add_upload(self, slug: str, data: bytes) -> str:
+        """Store an uploaded image with its derivatives and append it to the product's images."""
+        if len(data) > self._max_source_bytes:
+            raise BadRequestException(f"Image is larger than {self._max_source_bytes} bytes")
+        async with self._pool.acquire() as connection:
+            product = await ProductRepository(connection).get_images(slug)
+        if product is None:
+            raise NotFoundException(f"Product '{slug}' not found")
+
+        try:
+            rendered = await self._render(data)
+        except ValueError as exc:
+            raise BadRequestException(str(exc)) from exc
+        key = self._source_key(slug, data, rendered)
+        url = await self._store.write(key, data)
+        entry = await self._publish(key, data, rendered)
+
+        async with self._pool.acquire() as connection:
+            await ProductRepository(connection).add_image(product["id"], url, entry)
+        self.report.products += 1
+        self._cache.invalidate()
+        return url
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _derive_images(self, product: asyncpg.Record, *, force: bool = False) -> int:
+        images: List[str] = product["images"] or []
+        recorded: Dict[str, Any] = product["image_variants"] or {}
+        pending = [url for url in dict.fromkeys(images) if force or url not in recorded]
+        entries = await asyncio.gather(*(self._derive_url(product["slug"], url) for url in pending))
+
+        # Entries of images no longer listed are dropped
+        merged = {url: recorded[url] for url in images if url in recorded}
+        merged.update({url: entry for url, entry in zip(pending, entries) if entry is not None})
+        async with self._pool.acquire() as connection:
+            saved = await ProductRepository(connection).set_image_variants(product["id"], product["images"], merged)
+
+        derived = sum(entry is not None for entry in entries)
+        if not saved:
+            # Its images changed meanwhile; the next run derives the new list
+            logger.warning("Images of product %s changed during derivation, not recorded", product["slug"])
+            self.report.skipped_products += 1
+            return 0
+        self.report.products += 1
+        if derived:
+            self._cache.invalidate()
+        return derived
+
+    async def _derive_url(self, slug: str, url: str) -> Optional[Dict[str, Any]]:
+        """The `image_variants` entry of one image, None when it could not be derived."""
+        try:
+            async with self._sources:
+                key = self._store.key_for(url)
+                data = await self._store.read(key) if key else await asyncio.to_thread(self._fetch, url)
+                rendered = await self._render(data)
+                if key is None:
+                    key = self._source_key(slug, data, rendered)
+                    await self._store.write(key, data)
+                return await self._publish(key, data, rendered)
+        except Exception as exc:  # noqa: BLE001 - one bad image must not stop the others
+            logger.warning("Cannot derive image %s of product %s: %s", url, slug, exc)
+            self.report.failed += 1
+            return None
+
+    async def _render(self, data: bytes) -> RenderedImage:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and holds sockets is unsafe
+            self._executor = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn"))
+        started = time.perf_counter()
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(render_variants, data, self._widths, self._formats, self._quality)
+        )
+        self.report.render_ms.append((time.perf_counter() - started) * 1000)
+        return rendered
+
+    async def _publish(self, source_key: str, data: bytes, rendered: RenderedImage) -> Dict[str, Any]:
+        urls = await asyncio.gather(
+            *(
+                self._store.write(variant_key(source_key, width, fmt), encoded)
+                for width, fmt, encoded in rendered.variants
+            )
+        )
+        self.report.images += 1
+        self.report.variants += len(urls)
+        self.report.source_bytes += len(data)
+        self.report.variant_bytes += sum(len(encoded) for _, _, encoded in rendered.variants)
+        return {
+            "width": rendered.width,
+            "height": rendered.height,
+            "variants": [
+                {"url": url, "width": width, "format": fmt} for url, (width, fmt, _) in zip(urls, rendered.variants)
+            ],
+        }
+
+    @staticmethod
+    def _source_key(slug: str, data: bytes, rendered: RenderedImage) -> str:
+        # Content-addressed, so storing the same file twice is a no-op
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        return f"products/{slug}/{digest}{SOURCE_EXTENSIONS.get(rendered.format, '.img')}"
+
+    def _fetch(self, url: str) -> bytes:
+        with requests.get(url, stream=True, timeout=self._fetch_timeout_seconds) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > self._max_source_bytes:
+                    raise ValueError(f"Image is larger than {self._max_source_bytes} bytes")
+        return bytes(data)
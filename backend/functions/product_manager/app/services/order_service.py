@@ -0,0 +1,188 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import asyncpg
+
+from core.config import settings
+from core.database import DatabasePool, ReadPool, db_pool, read_pool
+from core.serialization import dumps, encode_model
+from exceptions import BadRequestException, BusinessException, ErrorCode, NotFoundException
+from helpers import row_mapping
+from helpers.identifiers import parse_id
+from helpers.pagination import decode_cursor, paginate
+from repositories.cart_repository import CartRepository
+from repositories.order_repository import OrderRepository
+from repositories.stock_repository import StockRepository
+from schemas.order import OrderCreateRequest, OrderCreateResponse, OrderListResponse, OrderSummary
+from services.idempotency import CommitHook
+from services.outbox import add_order_placed
+
+ORDER_HISTORY_SORT = "order_date"
+
+# Shipping method -> cost (story-007: Standard free, Express $10, Overnight $25)
+SHIPPING_COSTS: Dict[str, Decimal] = {
+    "standard": Decimal("0.00"),
+    "express": Decimal("10.00"),
+    "overnight": Decimal("25.00"),
+}
+
+
+def to_order_summary(row: asyncpg.Record) -> OrderSummary:
+    return OrderSummary(
+        order_id=f"order_{row['id']}",
+        order_number=f"ORD-{row['order_date']:%Y}-{row['id']:03d}",
+        status=row["status"],
+        total_amount=row["total"],
+        shipping_cost=row["cost_ship"],
+        created_at=row["created_at"],
+    )
+
+
+class OrderService:
+    def __init__(
+        self,
+        pool: DatabasePool = db_pool,
+        history_pool: ReadPool = read_pool,
+        *,
+        fast_json: bool = settings.FAST_JSON_ENABLED,
+    ) -> None:
+        self._pool = pool
+        # Order history may come from a replica; a session that just ordered is pinned
+        # to the primary (api.middleware.ReadAfterWriteMiddleware)
+        self._history_pool = history_pool
+        self._fast_json = fast_json
+
+    async def list_my_orders(
+        self,
+        user_id: int,
+        *,
+        offset: int,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> bytes:
+        """The user's order history page as a JSON body."""
+        if cursor and offset:
+            raise BadRequestException("offset cannot be combined with cursor")
+
+        seek = decode_cursor(cursor, ORDER_HISTORY_SORT) if cursor else None
+        async with self._history_pool.acquire() as connection:
+            rows = await OrderRepository(connection).list_for_user(user_id, limit=limit + 1, offset=offset, cursor=seek)
+
+        page, next_cursor = paginate(rows, limit, ORDER_HISTORY_SORT)
+        if self._fast_json:
+            return dumps(
+                {
+                    "status_code": 200,
+                    "message": "Success",
+                    "data": [row_mapping.order_summary(row) for row in page],
+                    "next_cursor": next_cursor,
+                }
+            )
+        body = OrderListResponse(data=[to_order_summary(row) for row in page], next_cursor=next_cursor)
+        return encode_model(body)
+
+    async def create_order(
+        self, user_id: int, request: OrderCreateRequest, *, before_commit: Optional[CommitHook] = None
+    ) -> OrderCreateResponse:
+        """
+        Turn the user's cart into an order in a single transaction.
+
+        Stock for all SKUs is reserved with one conditional UPDATE (see
+        StockRepository.reserve); if any SKU is short the transaction rolls back and
+        nothing is decremented. The order and its items are then inserted in one
+        statement and the cart is emptied, so row locks are held for four statements.
+        Confirmation email, sheet sync and analytics are only recorded in the outbox
+        (services.outbox) by a fifth insert; the outbox worker delivers them.
+        `before_commit` (the Idempotency-Key completion) runs last, in the same transaction.
+        """
+        cart_id = parse_id(request.cart_id, "cart")
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                carts = CartRepository(connection)
+                if await carts.get_owned_by(cart_id, user_id) is None:
+                    raise NotFoundException(f"Cart '{request.cart_id}' not found")
+
+                rows = await carts.list_items(cart_id)
+                if not rows:
+                    raise BusinessException(ErrorCode.CART_EMPTY, "Cart is empty")
+
+                quantities: Dict[str, int] = {}
+                for row in rows:
+                    quantities[row["sku"]] = quantities.get(row["sku"], 0) + row["quantity"]
+                skus = sorted(quantities)
+
+                stock = StockRepository(connection)
+                reserved = await stock.reserve(skus, [quantities[sku] for sku in skus])
+                if len(reserved) != len(skus):
+                    await self._raise_reservation_failure(stock, skus, reserved)
+
+                reserved = sorted(reserved, key=lambda variant: variant["sku"])
+                total_product = sum(
+                    (variant["unit_price"] * variant["quantity"] for variant in reserved), start=Decimal("0.00")
+                )
+                order = await OrderRepository(connection).create_with_items(
+                    user_id=user_id,
+                    total_product=total_product,
+                    cost_ship=SHIPPING_COSTS[request.shipping_method],
+                    delivery_info={
+                        **request.shipping_info.model_dump(),
+                        "shipping_method": request.shipping_method,
+                        "payment_method": request.payment_method,
+                    },
+                    variant_ids=[variant["id"] for variant in reserved],
+                    skus=[variant["sku"] for variant in reserved],
+                    quantities=[variant["quantity"] for variant in reserved],
+                    prices=[variant["unit_price"] for variant in reserved],
+                )
+                await carts.clear(cart_id)
+
+                summary = to_order_summary(order)
+                await add_order_placed(
+                    connection,
+                    order["id"],
+                    {
+                        "order_id": summary.order_id,
+                        "order_number": summary.order_number,
+                        "user_id": user_id,
+                        "status": summary.status,
+                        "total_amount": str(summary.total_amount),
+                        "shipping_cost": str(summary.shipping_cost),
+                        "created_at": summary.created_at.isoformat(),
+                        "shipping_method": request.shipping_method,
+                        "payment_method": request.payment_method,
+                        "customer": request.shipping_info.model_dump(),
+                        "items": [
+                            {
+                                "sku": variant["sku"],
+                                "quantity": variant["quantity"],
+                                "price": str(variant["unit_price"]),
+                            }
+                            for variant in reserved
+                        ],
+                    },
+                )
+
+                response = OrderCreateResponse(data=summary)
+                if before_commit is not None:
+                    await before_commit(connection, response)
+
+        return response
+
+    @staticmethod
+    async def _raise_reservation_failure(
+        stock: StockRepository, skus: Sequence[str], reserved: List[asyncpg.Record]
+    ) -> None:
+        reserved_skus = {variant["sku"] for variant in reserved}
+        missing = [sku for sku in skus if sku not in reserved_skus]
+        available = await stock.get_stock(missing)
+
+        unknown = [sku for sku in missing if sku not in available]
+        if unknown:
+            raise BusinessException(ErrorCode.INVALID_SKU, f"SKU {unknown[0]} does not exist")
+
+        sku = missing[0]
+        raise BusinessException(ErrorCode.OUT_OF_STOCK, f"Product {sku} is out of stock ({available[sku]} left)")
+
+
+order_service = OrderService()
@@ -0,0 +1,236 @@
+"""
+Transactional outbox for the side effects of a checkout.
+
+POST /orders only records what has to happen next: `add_order_placed` inserts one
+`outbox_events` row per handler (email, sheets, analytics) in the order's own
+transaction, so an event exists if and only if its order committed, and checkout
+latency no longer depends on SMTP or the Google Sheets API.
+
+`OutboxWorker` delivers the rows. Each claim leases up to `batch_size` due rows with
+FOR UPDATE SKIP LOCKED and commits at once, so any number of workers (loops of one
+process, processes, Lambda invocations) share the table without blocking each other
+and no lock is held while a handler runs. A claimed batch is split by handler; the
+handlers run concurrently and each gets all of its events at once, which lets the
+sheet sync append a whole batch in one API call. Failed events are retried with
+exponential backoff and marked 'failed' after `max_attempts`. Delivery is at least
+once: an event whose lease ran out before its result was stored runs again.
+
+Entry points: `outbox_cli.py` locally (needs nothing but Postgres: handlers without a
+configured target only log), `outbox_function.lambda_handler` as the scheduled Lambda.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import asyncpg
+
+from core.config import Settings, settings
+from core.database import DatabasePool, db_pool
+from repositories.outbox_repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+ORDER_PLACED = "order.placed"
+
+# Longest error message kept in outbox_events.last_error
+MAX_ERROR_LENGTH = 2000
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    id: int
+    event_type: str
+    aggregate_id: int
+    handler: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+# Events of one handler -> error of each event, None when it was delivered
+BatchHandler = Callable[[Sequence[OutboxEvent]], Awaitable[List[Optional[BaseException]]]]
+
+
+def enabled_handlers(config: Settings = settings) -> List[str]:
+    """Handler names of `OUTBOX_HANDLERS`, in order."""
+    return [name.strip() for name in config.OUTBOX_HANDLERS.split(",") if name.strip()]
+
+
+async def add_order_placed(
+    connection: asyncpg.Connection,
+    order_id: int,
+    payload: Dict[str, Any],
+    handlers: Optional[Sequence[str]] = None,
+) -> None:
+    """Record `order.placed` for every enabled handler; call inside the order transaction."""
+    handlers = enabled_handlers() if handlers is None else handlers
+    if handlers:
+        await OutboxRepository(connection).add(ORDER_PLACED, order_id, payload, handlers)
+
+
+def retry_delay(attempts: int, *, base_seconds: float, max_seconds: float) -> float:
+    """
+    Backoff before attempt `attempts + 1`: doubles per attempt up to `max_seconds`,
+    half of it random so events that failed together do not retry together.
+    """
+    ceiling = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+@dataclass
+class WorkerReport:
+    claimed: int = 0
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    batch_ms: List[float] = field(default_factory=list)
+    by_handler: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def to_dict(self) -> Dict[str, Any]:
+        timings = sorted(self.batch_ms)
+        return {
+            "claimed": self.claimed,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": len(timings),
+            "batch_ms": {
+                "mean": round(sum(timings) / len(timings), 2) if timings else 0.0,
+                "p95": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2) if timings else 0.0,
+                "max": round(timings[-1], 2) if timings else 0.0,
+            },
+            "handlers": {name: dict(counts) for name, counts in self.by_handler.items()},
+        }
+
+
+class OutboxWorker:
+    """Claims due outbox rows in batches and runs their handlers (see module docstring)."""
+
+    def __init__(
+        self,
+        handlers: Mapping[str, BatchHandler],
+        pool: DatabasePool = db_pool,
+        *,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        lease_seconds: float = settings.OUTBOX_LEASE_SECONDS,
+        handler_timeout_seconds: float = settings.OUTBOX_HANDLER_TIMEOUT_SECONDS,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.OUTBOX_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = settings.OUTBOX_RETRY_MAX_SECONDS,
+    ) -> None:
+        if handler_timeout_seconds >= lease_seconds:
+            raise ValueError("The handler timeout must be shorter than the lease")
+        self._handlers = dict(handlers)
+        self._pool = pool
+        self._batch_size = batch_size
+        self._lease_seconds = lease_seconds
+        self._handler_timeout_seconds = handler_timeout_seconds
+        self._max_attempts = max_attempts
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self.report = WorkerReport()
+
+    async def run_batch(self) -> int:
+        """Claim and deliver one batch; returns the number of events claimed."""
+        async with self._pool.acquire() as connection:
+            rows = await OutboxRepository(connection).claim(
+                list(self._handlers), batch_size=self._batch_size, lease_seconds=self._lease_seconds
+            )
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        groups: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for row in rows:
+            groups[row["handler"]].append(OutboxEvent(**dict(row)))
+
+        errors = await asyncio.gather(*(self._deliver(name, events) for name, events in groups.items()))
+        await self._store_results(
+            [
+                (event, error)
+                for events, handler_errors in zip(groups.values(), errors)
+                for event, error in zip(events, handler_errors)
+            ]
+        )
+
+        self.report.claimed += len(rows)
+        self.report.batch_ms.append((time.perf_counter() - started) * 1000)
+        return len(rows)
+
+    async def run(
+        self,
+        *,
+        workers: int = 1,
+        max_seconds: Optional[float] = None,
+        until_idle: bool = False,
+        poll_seconds: float = settings.OUTBOX_POLL_SECONDS,
+    ) -> Dict[str, Any]:
+        """
+        Run `workers` claim loops side by side until `max_seconds` have passed or,
+        with `until_idle`, until no event is due. Returns the report.
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        started = time.perf_counter()
+
+        async def loop() -> None:
+            while deadline is None or time.monotonic() < deadline:
+                if await self.run_batch():
+                    continue
+                if until_idle:
+                    return
+                await asyncio.sleep(poll_seconds)
+
+        await asyncio.gather(*(loop() for _ in range(workers)))
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        return {**self.report.to_dict(), "workers": workers, "elapsed_ms": elapsed_ms}
+
+    async def _deliver(self, name: str, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        try:
+            errors = await asyncio.wait_for(self._handlers[name](events), timeout=self._handler_timeout_seconds)
+        except Exception as exc:  # noqa: BLE001 - a handler failure fails its events, never the worker
+            errors = [exc] * len(events)
+        if len(errors) != len(events):
+            mismatch = RuntimeError(f"Handler {name} returned {len(errors)} results for {len(events)} events")
+            errors = [mismatch] * len(events)
+        return list(errors)
+
+    async def _store_results(self, outcomes: Sequence[Tuple[OutboxEvent, Optional[BaseException]]]) -> None:
+        delivered: List[int] = []
+        ids: List[int] = []
+        delays: List[float] = []
+        messages: List[str] = []
+        give_up: List[bool] = []
+        for event, error in outcomes:
+            counts = self.report.by_handler[event.handler]
+            if error is None:
+                delivered.append(event.id)
+                counts["delivered"] += 1
+                continue
+
+            final = event.attempts >= self._max_attempts
+            ids.append(event.id)
+            delay = retry_delay(
+                event.attempts, base_seconds=self._retry_base_seconds, max_seconds=self._retry_max_seconds
+            )
+            delays.append(0.0 if final else delay)
+            messages.append(f"{type(error).__name__}: {error}"[:MAX_ERROR_LENGTH])
+            give_up.append(final)
+            counts["failed" if final else "retried"] += 1
+            log = logger.error if final else logger.warning
+            log("Outbox event %s (%s, attempt %d) failed: %s", event.id, event.handler, event.attempts, messages[-1])
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                repository = OutboxRepository(connection)
+                if delivered:
+                    await repository.complete(delivered)
+                if ids:
+                    await repository.reschedule(ids, delays, messages, give_up)
+
+        self.report.delivered += len(delivered)
+        self.report.failed += sum(give_up)
+        self.report.retried += len(give_up) - sum(give_up)
@@ -0,0 +1,184 @@
+"""
+Delivery of `order.placed` outbox events (services.outbox).
+
+Each handler receives every event of its kind in a claimed batch and returns one
+error (or None) per event, so a batch can partly succeed:
+
+- email: order confirmations over SMTP, spread over up to `OUTBOX_CONCURRENCY`
+  connections, each sending its share of the batch
+- sheets: one row per order appended to `ORDER_SHEET_WORKSHEET` with a single
+  `append_rows` call per batch (the Sheets API is quota bound per request)
+- analytics: the whole batch POSTed as one JSON array to `ANALYTICS_ENDPOINT`
+
+smtplib, gspread and requests block, so the calls run in worker threads. A handler
+whose target is not configured logs what it would send, which keeps the worker
+runnable locally against Postgres alone.
+"""
+
+import asyncio
+import json
+import logging
+import smtplib
+from email.message import EmailMessage
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from core.config import Settings, settings
+from core.lazy_imports import lazy_module
+from services.outbox import BatchHandler, OutboxEvent, enabled_handlers
+
+logger = logging.getLogger(__name__)
+
+gspread = lazy_module("gspread")
+requests = lazy_module("requests")
+
+# Column order of the rows appended to the orders worksheet
+SHEET_COLUMNS = (
+    "order_number",
+    "created_at",
+    "status",
+    "customer",
+    "email",
+    "items",
+    "shipping_method",
+    "shipping_cost",
+    "total_amount",
+)
+
+
+def order_email(event: OutboxEvent, sender: str) -> EmailMessage:
+    order = event.payload
+    lines = [f"- {item['sku']} x {item['quantity']} @ {item['price']}" for item in order["items"]]
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = order["customer"]["email"]
+    message["Subject"] = f"Order {order['order_number']} confirmed"
+    message.set_content(
+        "\n".join(
+            [
+                f"Hi {order['customer']['full_name']},",
+                "",
+                f"Thank you for your order {order['order_number']}.",
+                "",
+                *lines,
+                "",
+                f"Shipping ({order['shipping_method']}): {order['shipping_cost']}",
+                f"Total: {order['total_amount']}",
+            ]
+        )
+    )
+    return message
+
+
+def sheet_row(event: OutboxEvent) -> List[Any]:
+    order = event.payload
+    values = {
+        **order,
+        "customer": order["customer"]["full_name"],
+        "email": order["customer"]["email"],
+        "items": ", ".join(f"{item['sku']} x{item['quantity']}" for item in order["items"]),
+    }
+    return [values[column] for column in SHEET_COLUMNS]
+
+
+class EmailHandler:
+    def __init__(self, config: Settings = settings) -> None:
+        self._config = config
+
+    async def __call__(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        messages = [order_email(event, self._config.ORDER_EMAIL_FROM) for event in events]
+        if not self._config.SMTP_HOST:
+            for event, message in zip(events, messages):
+                logger.info("Outbox email for event %s (SMTP_HOST unset): %s", event.id, message["Subject"])
+            return [None] * len(events)
+
+        connections = max(1, min(self._config.OUTBOX_CONCURRENCY, len(messages)))
+        shares = [list(range(start, len(messages), connections)) for start in range(connections)]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._send, [messages[index] for index in share]) for share in shares)
+        )
+        errors: List[Optional[BaseException]] = [None] * len(messages)
+        for share, share_errors in zip(shares, results):
+            for index, error in zip(share, share_errors):
+                errors[index] = error
+        return errors
+
+    def _send(self, messages: Sequence[EmailMessage]) -> List[Optional[BaseException]]:
+        """Send over one SMTP connection; a failed connection fails every message of the share."""
+        config = self._config
+        try:
+            with smtplib.SMTP(config.SMTP_HOST, config.SMTP_PORT, timeout=config.SMTP_TIMEOUT_SECONDS) as smtp:
+                if config.SMTP_STARTTLS:
+                    smtp.starttls()
+                if config.SMTP_USER:
+                    smtp.login(config.SMTP_USER, config.SMTP_PASSWORD or "")
+                errors: List[Optional[BaseException]] = []
+                for message in messages:
+                    try:
+                        smtp.send_message(message)
+                        errors.append(None)
+                    except smtplib.SMTPRecipientsRefused as exc:
+                        errors.append(exc)
+                return errors
+        except (OSError, smtplib.SMTPException) as exc:
+            return [exc] * len(messages)
+
+
+class SheetSyncHandler:
+    def __init__(self, config: Settings = settings) -> None:
+        self._config = config
+        self._worksheet = None
+
+    async def __call__(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        rows = [sheet_row(event) for event in events]
+        if not self._config.ORDER_SHEET_KEY:
+            logger.info("Outbox sheet sync of %d orders (ORDER_SHEET_KEY unset)", len(rows))
+            return [None] * len(events)
+
+        await asyncio.to_thread(self._append, rows)
+        return [None] * len(events)
+
+    def _append(self, rows: List[List[Any]]) -> None:
+        if self._worksheet is None:
+            credentials_file = self._config.GOOGLE_SERVICE_ACCOUNT_FILE
+            client = (
+                gspread.service_account(filename=credentials_file) if credentials_file else gspread.service_account()
+            )
+            spreadsheet = client.open_by_key(self._config.ORDER_SHEET_KEY)
+            self._worksheet = spreadsheet.worksheet(self._config.ORDER_SHEET_WORKSHEET)
+        self._worksheet.append_rows(rows, value_input_option="USER_ENTERED")
+
+
+class AnalyticsHandler:
+    def __init__(self, config: Settings = settings) -> None:
+        self._config = config
+
+    async def __call__(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        records = [
+            {"event_id": event.id, "event_type": event.event_type, "order_id": event.aggregate_id, **event.payload}
+            for event in events
+        ]
+        if not self._config.ANALYTICS_ENDPOINT:
+            for record in records:
+                logger.info("Outbox analytics (ANALYTICS_ENDPOINT unset): %s", json.dumps(record))
+            return [None] * len(events)
+
+        await asyncio.to_thread(self._post, records)
+        return [None] * len(events)
+
+    def _post(self, records: List[Dict[str, Any]]) -> None:
+        response = requests.post(
+            self._config.ANALYTICS_ENDPOINT, json=records, timeout=self._config.OUTBOX_HANDLER_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+
+
+HANDLERS = {"email": EmailHandler, "sheets": SheetSyncHandler, "analytics": AnalyticsHandler}
+
+
+def build_handlers(config: Settings = settings) -> Mapping[str, BatchHandler]:
+    """Handlers named in `OUTBOX_HANDLERS`."""
+    names = enabled_handlers(config)
+    unknown = set(names) - set(HANDLERS)
+    if unknown:
+        raise ValueError(f"Unknown outbox handlers: {sorted(unknown)}")
+    return {name: HANDLERS[name](config) for name in names}
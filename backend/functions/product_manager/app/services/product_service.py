@@ -0,0 +1,135 @@
+from typing import Optional
+
+from core.config import settings
+from core.database import ReadPool, read_pool
+from core.serialization import dumps, encode_model
+from exceptions import BadRequestException, NotFoundException
+from helpers import row_mapping
+from helpers.pagination import decode_cursor, paginate
+from repositories.product_repository import DEFAULT_PRODUCT_SORT, ProductRepository
+from repositories.search_repository import SearchRepository
+from schemas.product import (
+    ProductDetail,
+    ProductDetailResponse,
+    ProductListItem,
+    ProductListResponse,
+    ProductSearchItem,
+    ProductSearchResponse,
+)
+from services.catalog_cache import DETAIL_NAMESPACE, LIST_NAMESPACE, SEARCH_NAMESPACE, CatalogCache, catalog_cache
+from services.catalog_loader import CatalogLoader
+
+
+class ProductService:
+    """
+    Public catalog reads.
+
+    Methods return serialized JSON bodies: cache hits skip the database and pydantic
+    entirely, misses serialize the rows once and store the resulting bytes. With
+    `fast_json` rows are mapped to dicts and encoded with orjson, otherwise they are
+    validated through the response models. `version` is the resource version the
+    response's ETag was made from (services.catalog_versions); it is part of the cache
+    key, so a cached body is never older than the ETag it is sent with.
+    """
+
+    def __init__(
+        self,
+        pool: ReadPool = read_pool,
+        cache: CatalogCache = catalog_cache,
+        *,
+        fast_json: bool = settings.FAST_JSON_ENABLED,
+    ) -> None:
+        self._pool = pool
+        self._cache = cache
+        self._fast_json = fast_json
+
+    async def list_products(
+        self,
+        *,
+        offset: int,
+        limit: int,
+        sort: str = DEFAULT_PRODUCT_SORT,
+        cursor: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> bytes:
+        if cursor and offset:
+            raise BadRequestException("offset cannot be combined with cursor")
+
+        key = (sort, offset, limit, cursor, version)
+        lookup = await self._cache.lookup(LIST_NAMESPACE, key)
+        if lookup.body is not None:
+            return lookup.body
+
+        seek = decode_cursor(cursor, sort) if cursor else None
+        async with self._pool.acquire() as connection:
+            rows = await ProductRepository(connection).list_products(
+                limit=limit + 1, offset=offset, sort=sort, cursor=seek
+            )
+
+        page, next_cursor = paginate(rows, limit, sort)
+        if self._fast_json:
+            serialized = dumps(
+                {
+                    "success": True,
+                    "data": [row_mapping.product_item(row) for row in page],
+                    "next_cursor": next_cursor,
+                }
+            )
+        else:
+            body = ProductListResponse(
+                data=[ProductListItem.model_validate(dict(row)) for row in page],
+                next_cursor=next_cursor,
+            )
+            serialized = encode_model(body)
+        self._cache.store(LIST_NAMESPACE, key, serialized, lookup.version)
+        return serialized
+
+    async def search_products(self, keyword: str, *, offset: int, limit: int, version: Optional[str] = None) -> bytes:
+        """Ranked, typo-tolerant search with highlighted name and description snippet."""
+        key = (" ".join(keyword.lower().split()), offset, limit, version)
+        lookup = await self._cache.lookup(SEARCH_NAMESPACE, key)
+        if lookup.body is not None:
+            return lookup.body
+
+        async with self._pool.acquire() as connection:
+            rows = await SearchRepository(connection).search_products(keyword, limit=limit, offset=offset)
+
+        if self._fast_json:
+            serialized = dumps({"success": True, "data": [row_mapping.search_item(row) for row in rows]})
+        else:
+            body = ProductSearchResponse(data=[ProductSearchItem.model_validate(dict(row)) for row in rows])
+            serialized = encode_model(body)
+        self._cache.store(SEARCH_NAMESPACE, key, serialized, lookup.version)
+        return serialized
+
+    async def get_product(
+        self, slug: str, loader: Optional[CatalogLoader] = None, *, version: Optional[str] = None
+    ) -> bytes:
+        """Product detail with variants; variants go through the request's batch loader."""
+        key = (slug, version)
+        lookup = await self._cache.lookup(DETAIL_NAMESPACE, key)
+        if lookup.body is not None:
+            return lookup.body
+
+        async with self._pool.acquire() as connection:
+            product = await ProductRepository(connection).get_by_slug(slug)
+
+        if product is None:
+            raise NotFoundException(f"Product '{slug}' not found")
+
+        loader = loader or CatalogLoader(self._pool)
+        loader.products.prime(product["id"], product)
+        variants = await loader.variants_by_product.load(product["id"])
+
+        if self._fast_json:
+            serialized = dumps({"success": True, "data": row_mapping.product_detail(product, variants)})
+        else:
+            detail = ProductDetail.model_validate(
+                {**dict(product), "variants": [dict(variant) for variant in variants]}
+            )
+            serialized = encode_model(ProductDetailResponse(data=detail))
+        self._cache.store(DETAIL_NAMESPACE, key, serialized, lookup.version)
+        return serialized
+
+
+product_service = ProductService()
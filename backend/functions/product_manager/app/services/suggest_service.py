@@ -0,0 +1,156 @@
+"""
+Search-as-you-type suggestions served from process memory.
+
+Product names and slugs live in a `PrefixIndex` that is built once per process and
+then kept current by polling `products.updated_at` every `refresh_seconds`; only the
+changed rows are re-indexed. Deleted products cannot be seen through `updated_at`,
+so the index is rebuilt from scratch every `full_rebuild_seconds`.
+
+"Popular searches" come from a `DecayingCounter` fed by submitted searches. Counts
+are per process (per Lambda container), which is enough for a ranking hint.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from core.autocomplete import DecayingCounter, PrefixIndex, index_terms, normalize
+from core.config import settings
+from core.database import ReadPool, read_pool
+from core.serialization import encode_model
+from repositories.search_repository import SearchRepository
+from schemas.search import PopularSearch, ProductSuggestion, SearchSuggestions, SearchSuggestResponse
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+
+# Candidates fetched from the index per requested suggestion, re-ranked by review count
+CANDIDATES_PER_RESULT = 5
+SCAN_ENTRIES_PER_RESULT = 50
+
+
+@dataclass(frozen=True)
+class SuggestionSource:
+    name: str
+    slug: str
+    review_count: int
+
+
+class SuggestService:
+    """Autocomplete over product names/slugs plus decaying popular-query counts."""
+
+    def __init__(
+        self,
+        pool: ReadPool = read_pool,
+        *,
+        refresh_seconds: float,
+        full_rebuild_seconds: float,
+        popular_half_life_seconds: float,
+        popular_max_entries: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._pool = pool
+        self._refresh_seconds = refresh_seconds
+        self._full_rebuild_seconds = full_rebuild_seconds
+        self._clock = clock
+        self._index = PrefixIndex()
+        self._products: Dict[int, SuggestionSource] = {}
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._rebuilt_at = 0.0
+        self._last_refresh_ms = 0.0
+        self._popular = DecayingCounter(
+            half_life_seconds=popular_half_life_seconds, max_entries=popular_max_entries, clock=clock
+        )
+
+    def record_query(self, query: str) -> None:
+        """Count a submitted search towards "Popular Searches"."""
+        normalized = normalize(query)
+        if len(normalized) >= MIN_QUERY_LENGTH:
+            self._popular.add(normalized)
+
+    async def suggest(self, query: Optional[str], *, limit: int) -> bytes:
+        """Serialized suggestions: matching products (if `query` is given) and popular searches."""
+        await self._ensure_fresh()
+
+        prefix = normalize(query) if query else ""
+        products: List[ProductSuggestion] = []
+        if len(prefix) >= MIN_QUERY_LENGTH:
+            candidates = self._index.search(
+                prefix,
+                limit=limit * CANDIDATES_PER_RESULT,
+                scan_limit=limit * SCAN_ENTRIES_PER_RESULT,
+            )
+            ranked = sorted(
+                (self._products[product_id] for product_id in candidates),
+                key=lambda source: source.review_count,
+                reverse=True,
+            )
+            products = [ProductSuggestion(name=source.name, slug=source.slug) for source in ranked[:limit]]
+
+        popular = [
+            PopularSearch(query=popular_query, score=round(score, 3))
+            for popular_query, score in self._popular.top(limit, prefix=prefix or None)
+        ]
+        body = SearchSuggestResponse(data=SearchSuggestions(query=query, products=products, popular=popular))
+        return encode_model(body)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "products": len(self._index),
+            "entries": self._index.size,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "rebuilt_seconds_ago": round(now - self._rebuilt_at, 1) if self._rebuilt_at else None,
+            "last_refresh_ms": round(self._last_refresh_ms, 2),
+            "popular_queries": len(self._popular),
+        }
+
+    async def _ensure_fresh(self) -> None:
+        now = self._clock()
+        if now - self._checked_at < self._refresh_seconds:
+            return
+
+        # Claimed before awaiting so concurrent requests keep serving the current index
+        self._checked_at = now
+        full = not self._rebuilt_at or now - self._rebuilt_at >= self._full_rebuild_seconds
+        started = time.perf_counter()
+        try:
+            async with self._pool.acquire() as connection:
+                rows = await SearchRepository(connection).list_suggestion_sources(None if full else self._watermark)
+        except Exception:  # noqa: BLE001 - keep serving the previous index
+            logger.exception("Failed to refresh the suggestion index")
+            return
+
+        if full:
+            self._products = {}
+        for row in rows:
+            self._products[row["id"]] = SuggestionSource(
+                name=row["name"], slug=row["slug"], review_count=row["review_count"] or 0
+            )
+            self._watermark = row["updated_at"]
+
+        if full:
+            self._index.rebuild(
+                (product_id, index_terms(source.name, source.slug)) for product_id, source in self._products.items()
+            )
+            self._rebuilt_at = now
+        else:
+            for row in rows:
+                source = self._products[row["id"]]
+                self._index.upsert(row["id"], index_terms(source.name, source.slug))
+
+        self._last_refresh_ms = (time.perf_counter() - started) * 1000
+        if full:
+            logger.info("Suggestion index rebuilt: %d products in %.1f ms", len(rows), self._last_refresh_ms)
+
+
+suggest_service = SuggestService(
+    refresh_seconds=settings.SUGGEST_REFRESH_SECONDS,
+    full_rebuild_seconds=settings.SUGGEST_FULL_REBUILD_SECONDS,
+    popular_half_life_seconds=settings.POPULAR_SEARCH_HALF_LIFE_SECONDS,
+    popular_max_entries=settings.POPULAR_SEARCH_MAX_ENTRIES,
+)
@@ -0,0 +1,248 @@
+"""
+Maintenance sweep of rows nothing else deletes.
+
+- guest carts untouched for `GUEST_CART_RETENTION_DAYS` (their items cascade)
+- access tokens expired for more than `TOKEN_PURGE_GRACE_SECONDS`
+- idempotency keys past their `expires_at`
+- outbox events delivered more than `OUTBOX_RETENTION_DAYS` ago (failed ones stay)
+
+Each table is walked in keyset order and deleted `batch_size` rows per statement,
+each statement its own transaction, so no lock is held for longer than one short
+batch and the walk never re-scans index entries of rows it already removed. A
+sweep stops at its deadline and the next run picks up from the start; nothing is
+lost by stopping early.
+
+Entry points: `sweeper_cli.py` locally, `sweeper_function.lambda_handler` as the
+scheduled Lambda. The purge loops of the API (token_cache, idempotency) reuse the
+same batch walk.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from repositories import cart_repository, idempotency_repository, outbox_repository, token_repository
+from repositories.cart_repository import CartRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.outbox_repository import OutboxRepository
+from repositories.token_repository import AccessTokenRepository
+
+logger = logging.getLogger(__name__)
+
+Cursor = Tuple[Any, ...]
+# (connection, cursor, batch_size) -> (rows deleted, cursor of the next batch or None at the end)
+DeleteBatch = Callable[[asyncpg.Connection, Cursor, int], Awaitable[Tuple[int, Optional[Cursor]]]]
+
+GUEST_CARTS = "guest_carts"
+ACCESS_TOKENS = "access_tokens"
+IDEMPOTENCY_KEYS = "idempotency_keys"
+OUTBOX_EVENTS = "outbox_events"
+SWEEPS = (GUEST_CARTS, ACCESS_TOKENS, IDEMPOTENCY_KEYS, OUTBOX_EVENTS)
+
+
+@dataclass
+class SweepResult:
+    name: str
+    rows: int = 0
+    batch_ms: List[float] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    complete: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        timings = sorted(self.batch_ms)
+        return {
+            "rows": self.rows,
+            "batches": len(timings),
+            "complete": self.complete,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "batch_ms": {
+                "mean": round(sum(timings) / len(timings), 2) if timings else 0.0,
+                "p95": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2) if timings else 0.0,
+                "max": round(timings[-1], 2) if timings else 0.0,
+            },
+        }
+
+
+async def sweep_in_batches(
+    name: str,
+    delete_batch: DeleteBatch,
+    start: Cursor,
+    pool: DatabasePool = db_pool,
+    *,
+    batch_size: int,
+    pause_seconds: float = 0.0,
+    deadline: Optional[float] = None,
+) -> SweepResult:
+    """
+    Run `delete_batch` from `start` until it reports the end of the table.
+
+    `deadline` is a time.monotonic() value; past it the sweep stops between
+    batches and is reported incomplete.
+    """
+    result = SweepResult(name)
+    cursor: Optional[Cursor] = start
+    started = time.perf_counter()
+    while cursor is not None:
+        if deadline is not None and time.monotonic() >= deadline:
+            result.complete = False
+            break
+        if result.batch_ms and pause_seconds:
+            # Room for autovacuum, replication and the requests queued behind each batch
+            await asyncio.sleep(pause_seconds)
+
+        batch_started = time.perf_counter()
+        async with pool.acquire() as connection:
+            deleted, cursor = await delete_batch(connection, cursor, batch_size)
+        result.batch_ms.append((time.perf_counter() - batch_started) * 1000)
+        result.rows += deleted
+        logger.debug("Sweep %s: %d rows in %.1f ms", name, deleted, result.batch_ms[-1])
+
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+async def sweep_guest_carts(
+    pool: DatabasePool = db_pool,
+    *,
+    retention_seconds: float,
+    batch_size: int,
+    pause_seconds: float = 0.0,
+    deadline: Optional[float] = None,
+) -> SweepResult:
+    async def delete_batch(connection: asyncpg.Connection, cursor: Cursor, size: int):
+        return await CartRepository(connection).delete_abandoned_guest_carts(
+            retention_seconds=retention_seconds, batch_size=size, after=cursor
+        )
+
+    return await sweep_in_batches(
+        GUEST_CARTS,
+        delete_batch,
+        cart_repository.KEYSET_START,
+        pool,
+        batch_size=batch_size,
+        pause_seconds=pause_seconds,
+        deadline=deadline,
+    )
+
+
+async def sweep_access_tokens(
+    pool: DatabasePool = db_pool,
+    *,
+    grace_seconds: float,
+    batch_size: int,
+    pause_seconds: float = 0.0,
+    deadline: Optional[float] = None,
+) -> SweepResult:
+    async def delete_batch(connection: asyncpg.Connection, cursor: Cursor, size: int):
+        return await AccessTokenRepository(connection).purge_expired(
+            grace_seconds=grace_seconds, batch_size=size, after=cursor
+        )
+
+    return await sweep_in_batches(
+        ACCESS_TOKENS,
+        delete_batch,
+        token_repository.KEYSET_START,
+        pool,
+        batch_size=batch_size,
+        pause_seconds=pause_seconds,
+        deadline=deadline,
+    )
+
+
+async def sweep_idempotency_keys(
+    pool: DatabasePool = db_pool,
+    *,
+    batch_size: int,
+    pause_seconds: float = 0.0,
+    deadline: Optional[float] = None,
+) -> SweepResult:
+    async def delete_batch(connection: asyncpg.Connection, cursor: Cursor, size: int):
+        return await IdempotencyRepository(connection).purge_expired(batch_size=size, after=cursor)
+
+    return await sweep_in_batches(
+        IDEMPOTENCY_KEYS,
+        delete_batch,
+        idempotency_repository.KEYSET_START,
+        pool,
+        batch_size=batch_size,
+        pause_seconds=pause_seconds,
+        deadline=deadline,
+    )
+
+
+async def sweep_outbox_events(
+    pool: DatabasePool = db_pool,
+    *,
+    retention_seconds: float,
+    batch_size: int,
+    pause_seconds: float = 0.0,
+    deadline: Optional[float] = None,
+) -> SweepResult:
+    async def delete_batch(connection: asyncpg.Connection, cursor: Cursor, size: int):
+        return await OutboxRepository(connection).purge_processed(
+            retention_seconds=retention_seconds, batch_size=size, after=cursor
+        )
+
+    return await sweep_in_batches(
+        OUTBOX_EVENTS,
+        delete_batch,
+        outbox_repository.KEYSET_START,
+        pool,
+        batch_size=batch_size,
+        pause_seconds=pause_seconds,
+        deadline=deadline,
+    )
+
+
+async def run_sweep(
+    pool: DatabasePool = db_pool,
+    *,
+    sweeps: Sequence[str] = SWEEPS,
+    guest_cart_retention_days: float = settings.GUEST_CART_RETENTION_DAYS,
+    token_grace_seconds: float = settings.TOKEN_PURGE_GRACE_SECONDS,
+    outbox_retention_days: float = settings.OUTBOX_RETENTION_DAYS,
+    batch_size: int = settings.SWEEPER_BATCH_SIZE,
+    pause_seconds: float = settings.SWEEPER_BATCH_PAUSE_SECONDS,
+    max_seconds: float = settings.SWEEPER_MAX_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Run the selected sweeps one after another within `max_seconds` and return the
+    report: rows reclaimed and batch timings per sweep.
+    """
+    unknown = set(sweeps) - set(SWEEPS)
+    if unknown:
+        raise ValueError(f"Unknown sweeps: {sorted(unknown)}")
+
+    deadline = time.monotonic() + max_seconds
+    options = {"batch_size": batch_size, "pause_seconds": pause_seconds, "deadline": deadline}
+    started = time.perf_counter()
+    results: List[SweepResult] = []
+    for name in sweeps:
+        if name == GUEST_CARTS:
+            result = await sweep_guest_carts(pool, retention_seconds=guest_cart_retention_days * 86400, **options)
+        elif name == ACCESS_TOKENS:
+            result = await sweep_access_tokens(pool, grace_seconds=token_grace_seconds, **options)
+        elif name == IDEMPOTENCY_KEYS:
+            result = await sweep_idempotency_keys(pool, **options)
+        else:
+            result = await sweep_outbox_events(pool, retention_seconds=outbox_retention_days * 86400, **options)
+        results.append(result)
+        logger.info(
+            "Sweep %s: %d rows in %d batches (%.0f ms)", name, result.rows, len(result.batch_ms), result.elapsed_ms
+        )
+
+    return {
+        "rows": sum(result.rows for result in results),
+        "complete": all(result.complete for result in results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "batch_size": batch_size,
+        "guest_cart_retention_days": guest_cart_retention_days,
+        "outbox_retention_days": outbox_retention_days,
+        "sweeps": {result.name: result.to_dict() for result in results},
+    }
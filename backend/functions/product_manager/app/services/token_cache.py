@@ -0,0 +1,177 @@
+"""
+In-process view of `access_token_log` for the per-request "not logged out" check.
+
+Tokens are tracked by 8-byte fingerprints (core.security.token_fingerprint), never
+in full. Active fingerprints map to their expiry; revoked ones sit in a second
+bounded set. Both are refreshed every `refresh_seconds` from rows whose
+`updated_at` moved past the last watermark, so issuing and logging out on another
+instance become visible within one refresh interval. Anything not in memory (new
+process, evicted entry) is checked against the database once and then remembered.
+
+`purge_expired_tokens` removes long-expired rows; under uvicorn it runs as a
+lifespan background task, in Lambda deployments the scheduled sweeper
+(services.sweeper) does it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from core.database import DatabasePool, db_pool
+from core.security import token_fingerprint
+from repositories.token_repository import AccessTokenRepository
+from services.sweeper import sweep_access_tokens
+
+logger = logging.getLogger(__name__)
+
+# Re-read this much before the watermark on each refresh (late commits)
+REFRESH_OVERLAP_SECONDS = 2.0
+
+
+class TokenCache:
+    """Bounded fingerprint sets of active and revoked access tokens."""
+
+    def __init__(
+        self,
+        pool: DatabasePool = db_pool,
+        *,
+        enabled: bool,
+        max_entries: int,
+        refresh_seconds: float,
+    ) -> None:
+        self._pool = pool
+        self.enabled = enabled
+        self._max_entries = max_entries
+        self._refresh_seconds = refresh_seconds
+        self._active: "OrderedDict[bytes, float]" = OrderedDict()
+        self._revoked: "OrderedDict[bytes, None]" = OrderedDict()
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    async def is_active(self, token: str) -> bool:
+        """Whether `token` was issued and not revoked; usually answered from memory."""
+        if not self.enabled:
+            async with self._pool.acquire() as connection:
+                return await AccessTokenRepository(connection).is_active(token)
+
+        await self._refresh()
+        fingerprint = token_fingerprint(token)
+
+        expires_at = self._active.get(fingerprint)
+        if expires_at is not None and expires_at > time.time():
+            self.hits += 1
+            return True
+        if fingerprint in self._revoked:
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        async with self._pool.acquire() as connection:
+            remaining = await AccessTokenRepository(connection).get_remaining_seconds(token)
+
+        if remaining is not None and remaining > 0:
+            self._remember(fingerprint, remaining)
+            return True
+        self._forget(fingerprint)
+        return False
+
+    def remember(self, token: str, expires_in: float) -> None:
+        """Record a token just issued by this process, saving its first lookup."""
+        if self.enabled:
+            self._remember(token_fingerprint(token), expires_in)
+
+    def forget(self, token: str) -> None:
+        """Record a revocation made by this process; other processes see it on refresh."""
+        if self.enabled:
+            self._forget(token_fingerprint(token))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "active": len(self._active),
+            "revoked": len(self._revoked),
+            "max_entries": self._max_entries,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remember(self, fingerprint: bytes, remaining_seconds: float) -> None:
+        self._revoked.pop(fingerprint, None)
+        self._active[fingerprint] = time.time() + remaining_seconds
+        self._active.move_to_end(fingerprint)
+        while len(self._active) > self._max_entries:
+            self._active.popitem(last=False)
+
+    def _forget(self, fingerprint: bytes) -> None:
+        self._active.pop(fingerprint, None)
+        self._revoked[fingerprint] = None
+        self._revoked.move_to_end(fingerprint)
+        while len(self._revoked) > self._max_entries:
+            self._revoked.popitem(last=False)
+
+    async def _refresh(self) -> None:
+        now = time.time()
+        if now - self._checked_at < self._refresh_seconds:
+            return
+
+        # Claimed before awaiting so concurrent requests do not refresh in parallel
+        self._checked_at = now
+        try:
+            async with self._pool.acquire() as connection:
+                repository = AccessTokenRepository(connection)
+                if self._watermark is None:
+                    rows = await repository.list_active(self._max_entries)
+                else:
+                    rows = await repository.list_changed_since(self._watermark, REFRESH_OVERLAP_SECONDS)
+        except Exception:  # noqa: BLE001 - fall back to per-token database checks
+            logger.exception("Failed to refresh the token cache")
+            return
+
+        # Oldest first, so the most recent tokens survive the size bound
+        for row in sorted(rows, key=lambda row: row["updated_at"]):
+            fingerprint = bytes(row["fingerprint"])
+            if row["remaining_seconds"] > 0:
+                self._remember(fingerprint, row["remaining_seconds"])
+            else:
+                self._forget(fingerprint)
+            if self._watermark is None or row["updated_at"] > self._watermark:
+                self._watermark = row["updated_at"]
+
+
+async def purge_expired_tokens(
+    pool: DatabasePool = db_pool,
+    *,
+    grace_seconds: float = settings.TOKEN_PURGE_GRACE_SECONDS,
+    batch_size: int = settings.TOKEN_PURGE_BATCH_SIZE,
+) -> int:
+    """Delete expired `access_token_log` rows in short keyset batches; returns the number removed."""
+    result = await sweep_access_tokens(pool, grace_seconds=grace_seconds, batch_size=batch_size)
+    return result.rows
+
+
+async def run_token_purge(interval_seconds: float = settings.TOKEN_PURGE_INTERVAL_SECONDS) -> None:
+    """Purge loop for long-running servers; cancelled on shutdown."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await purge_expired_tokens()
+            if removed:
+                logger.info("Purged %d expired access tokens", removed)
+        except Exception:  # noqa: BLE001 - try again next interval
+            logger.exception("Failed to purge expired access tokens")
+
+
+token_cache = TokenCache(
+    enabled=settings.TOKEN_CACHE_ENABLED,
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    refresh_seconds=settings.TOKEN_CACHE_REFRESH_SECONDS,
+)
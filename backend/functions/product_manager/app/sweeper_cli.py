@@ -0,0 +1,64 @@
+"""
+Maintenance sweep command line (see services.sweeper).
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python app/sweeper_cli.py
+    PYTHONPATH=app python app/sweeper_cli.py --only guest_carts --retention-days 7
+    PYTHONPATH=app python app/sweeper_cli.py --batch-size 5000 --pause 0 --max-seconds 3600
+
+Defaults come from the GUEST_CART_RETENTION_DAYS / SWEEPER_* settings. The report
+(rows reclaimed and batch timings per sweep) is printed to stdout as JSON; the exit
+status is 1 when a sweep stopped at --max-seconds before reaching the end.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from core.config import settings
+from core.database import db_pool
+from services.sweeper import SWEEPS, run_sweep
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    try:
+        report = await run_sweep(
+            sweeps=args.only or SWEEPS,
+            guest_cart_retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            pause_seconds=args.pause,
+            max_seconds=args.max_seconds,
+        )
+    finally:
+        await db_pool.close()
+
+    print(json.dumps(report, indent=2))
+    return 0 if report["complete"] else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=SWEEPS, help="run only this sweep (repeatable)")
+    parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=settings.GUEST_CART_RETENTION_DAYS,
+        help="delete guest carts untouched for this long",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.SWEEPER_BATCH_SIZE, help="rows per DELETE")
+    parser.add_argument(
+        "--pause", type=float, default=settings.SWEEPER_BATCH_PAUSE_SECONDS, help="seconds to wait between batches"
+    )
+    parser.add_argument(
+        "--max-seconds", type=float, default=settings.SWEEPER_MAX_SECONDS, help="stop between batches after this long"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), stream=sys.stderr)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
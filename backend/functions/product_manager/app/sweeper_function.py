@@ -0,0 +1,44 @@
+"""
+AWS Lambda entry point of the scheduled maintenance sweep (services.sweeper).
+
+Invoked by an EventBridge schedule from DeviceManagerAPIStack. The event may narrow
+the run, e.g. {"sweeps": ["guest_carts"]}; otherwise every sweep runs with the
+configured retention. The sweep stops between batches shortly before the function
+times out, and the next scheduled run continues where the tables still need it.
+The report is returned and logged, so it also shows in the invocation output.
+"""
+
+import asyncio
+import json
+import logging
+
+from core.config import settings
+from core.database import db_pool
+from core.parameters import prefetch_database_credentials
+from services.sweeper import SWEEPS, run_sweep
+
+logger = logging.getLogger()
+logger.setLevel(settings.LOG_LEVEL.upper())
+
+# Seconds kept back from the function timeout for the last batch and the report
+TIMEOUT_MARGIN_SECONDS = 15.0
+
+prefetch_database_credentials()
+
+
+async def _sweep(event: dict, max_seconds: float) -> dict:
+    try:
+        return await run_sweep(sweeps=event.get("sweeps") or SWEEPS, max_seconds=max_seconds)
+    finally:
+        # Scheduled runs are far apart: do not keep idle connections open in between
+        await db_pool.close()
+
+
+def lambda_handler(event, context) -> dict:
+    max_seconds = settings.SWEEPER_MAX_SECONDS
+    if context is not None:
+        max_seconds = min(max_seconds, context.get_remaining_time_in_millis() / 1000 - TIMEOUT_MARGIN_SECONDS)
+
+    report = asyncio.run(_sweep(event if isinstance(event, dict) else {}, max(max_seconds, 0.0)))
+    logger.info("Sweep report: %s", json.dumps(report))
+    return report
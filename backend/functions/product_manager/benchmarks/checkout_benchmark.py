@@ -0,0 +1,189 @@
+"""
+Checkout concurrency benchmark (flash sale on one hot SKU).
+
+Seeds a scratch schema with `--checkouts` carts that all contain the hot SKU plus
+one of a few shared SKUs sorting before or after it (so opposite lock orders would
+deadlock), then runs OrderService.create_order for every cart at once over a pool
+of `--concurrency` connections. Reports throughput, latency percentiles and the
+outcome mix, and verifies that stock never oversold: units sold must equal the
+stock decrement and never exceed the initial stock, and every order must have left
+one outbox event per enabled handler. Exits 1 if a check fails.
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python benchmarks/checkout_benchmark.py --checkouts 5000 --stock 1000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+import asyncpg
+from common import connect_kwargs, percentiles
+
+from core.database import _init_connection
+from exceptions import BusinessException
+from schemas.order import OrderCreateRequest, ShippingInfo
+from services.order_service import OrderService
+from services.outbox import enabled_handlers
+
+SCHEMA = "bench_checkout"
+HOT_SKU = "M-HOT-42"
+# Sort on both sides of HOT_SKU, so carts lock SKUs in different cart orders
+SIDE_SKUS = ["A-SIDE-1", "B-SIDE-2", "X-SIDE-3", "Z-SIDE-4"]
+TABLES = ["products", "product_variants", "carts", "cart_items", "orders", "order_items", "outbox_events"]
+
+SHIPPING = ShippingInfo(
+    full_name="Bench User",
+    email="bench@example.com",
+    phone="+10000000000",
+    address="1 Bench St",
+    city="Benchville",
+    postal_code="00000",
+    country="US",
+)
+
+
+async def seed(connection: asyncpg.Connection, checkouts: int, stock: int) -> None:
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in TABLES:
+        # Constraints such as chk_variant_stock are copied; foreign keys are not
+        await connection.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING ALL)")
+    for table in ("cart_items", "orders", "order_items", "outbox_events"):
+        # Own sequences, so the benchmark does not consume ids of the real tables
+        await connection.execute(f"CREATE SEQUENCE {SCHEMA}.{table}_id_seq OWNED BY {SCHEMA}.{table}.id")
+        await connection.execute(
+            f"ALTER TABLE {SCHEMA}.{table} ALTER COLUMN id SET DEFAULT nextval('{SCHEMA}.{table}_id_seq')"
+        )
+
+    await connection.execute(
+        f"""
+        INSERT INTO {SCHEMA}.products (id, name, slug, price, currency, images)
+        VALUES (1, 'Flash Sale Sneaker', 'flash-sale-sneaker', 100.00, 'USD', '[]'::jsonb)
+        """
+    )
+    await connection.execute(
+        f"""
+        INSERT INTO {SCHEMA}.product_variants (id, product_id, sku, stock, price_modifier)
+        SELECT row_number() OVER (), 1, sku, CASE WHEN sku = $1 THEN $2 ELSE 1000000 END, 0
+        FROM unnest($3::varchar[]) AS sku
+        """,
+        HOT_SKU,
+        stock,
+        [HOT_SKU, *SIDE_SKUS],
+    )
+    await connection.execute(
+        f"INSERT INTO {SCHEMA}.carts (id, user_id) SELECT g, g FROM generate_series(1, $1) AS g",
+        checkouts,
+    )
+    await connection.execute(
+        f"""
+        INSERT INTO {SCHEMA}.cart_items (cart_id, sku, product_id, quantity, price)
+        SELECT g, $2, 1, 1, 100.00 FROM generate_series(1, $1) AS g
+        UNION ALL
+        SELECT g, ($3::varchar[])[1 + g % cardinality($3::varchar[])], 1, 1, 100.00 FROM generate_series(1, $1) AS g
+        """,
+        checkouts,
+        HOT_SKU,
+        SIDE_SKUS,
+    )
+    await connection.execute(f"ANALYZE {SCHEMA}.product_variants")
+
+
+async def checkout(service: OrderService, cart_id: int, latencies: List[float], outcomes: Counter) -> None:
+    request = OrderCreateRequest(
+        shipping_info=SHIPPING, shipping_method="standard", payment_method="cod", cart_id=f"cart_{cart_id}"
+    )
+    started = time.perf_counter()
+    try:
+        await service.create_order(cart_id, request)  # user id == cart id in the seed
+        outcomes["ok"] += 1
+    except BusinessException as exc:
+        outcomes[exc.error_code.name] += 1
+    except Exception as exc:  # noqa: BLE001 - deadlocks or constraint violations are what we look for
+        outcomes[type(exc).__name__] += 1
+    latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def verify(connection: asyncpg.Connection, stock: int) -> Dict[str, object]:
+    final_stock = await connection.fetchval(f"SELECT stock FROM {SCHEMA}.product_variants WHERE sku = $1", HOT_SKU)
+    sold = await connection.fetchval(
+        f"SELECT coalesce(sum(quantity), 0) FROM {SCHEMA}.order_items WHERE sku = $1", HOT_SKU
+    )
+    orders = await connection.fetchval(f"SELECT count(*) FROM {SCHEMA}.orders")
+    events = await connection.fetchval(f"SELECT count(*) FROM {SCHEMA}.outbox_events")
+    return {
+        "stock_initial": stock,
+        "stock_final": final_stock,
+        "units_sold": sold,
+        "oversold": sold > stock or final_stock < 0,
+        "consistent": stock - final_stock == sold and events == orders * len(enabled_handlers()),
+        "orders": orders,
+        "outbox_events": events,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    admin = await asyncpg.connect(**connect_kwargs())
+    try:
+        await seed(admin, args.checkouts, args.stock)
+
+        pool = await asyncpg.create_pool(
+            **connect_kwargs(),
+            min_size=args.concurrency,
+            max_size=args.concurrency,
+            init=_init_connection,
+            server_settings={"search_path": SCHEMA},
+        )
+        # asyncpg.Pool offers the acquire() context manager OrderService relies on
+        service = OrderService(pool)
+        latencies: List[float] = []
+        outcomes: Counter = Counter()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(
+                *(checkout(service, cart_id, latencies, outcomes) for cart_id in range(1, args.checkouts + 1))
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            await pool.close()
+
+        result = {
+            "benchmark": "checkout_hot_sku",
+            "checkouts": args.checkouts,
+            "concurrency": args.concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_second": round(args.checkouts / elapsed, 1),
+            "latency": percentiles(latencies),
+            "outcomes": dict(outcomes),
+            **await verify(admin, args.stock),
+        }
+
+        if not args.keep:
+            await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        await admin.close()
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkouts", type=int, default=5000, help="parallel checkouts (one cart each)")
+    parser.add_argument("--stock", type=int, default=1000, help="initial stock of the hot SKU")
+    parser.add_argument("--concurrency", type=int, default=20, help="database connections")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if result["oversold"] or not result["consistent"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Helpers shared by the benchmark scripts (run them with PYTHONPATH=app)."""
+
+import statistics
+from typing import Any, Dict, List
+
+from core.database import resolve_credentials
+
+
+def connect_kwargs() -> Dict[str, Any]:
+    """asyncpg connection arguments for the database configured in .env / the environment."""
+    credentials = resolve_credentials()
+    return {
+        "host": credentials.host,
+        "port": credentials.port,
+        "user": credentials.user,
+        "password": credentials.password,
+        "database": credentials.database,
+    }
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    cuts = statistics.quantiles(samples_ms, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
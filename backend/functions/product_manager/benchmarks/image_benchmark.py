@@ -0,0 +1,142 @@
+"""
+Image derivative benchmark: rendering inline on the event loop vs on a process pool.
+
+Generates `--images` synthetic 1200x900 JPEG photos, then renders the configured
+widths and formats (helpers.images.render_variants) for all of them twice: inline
+in the event loop, and through a ProcessPoolExecutor of `--workers` spawned
+processes as services.image_pipeline does. A ticker coroutine measures event loop
+lag meanwhile, i.e. how long an API request would have waited. Reports throughput,
+loop lag and the bytes of the originals against the variants a product card loads
+(`--card-width`). Needs Pillow, no database.
+
+Usage (from backend/functions/product_manager):
+    PYTHONPATH=app python benchmarks/image_benchmark.py --images 24 --workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List
+
+from common import percentiles
+
+from core.config import settings
+from helpers.images import RenderedImage, render_variants, supported_formats
+
+TICK_SECONDS = 0.005
+
+
+def synthetic_photo(seed: int) -> bytes:
+    """A noisy gradient: compresses like a photo, unlike a flat test pattern."""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = random.Random(seed)
+    image = Image.effect_noise((1200, 900), 60).convert("RGB")
+    draw = ImageDraw.Draw(image, "RGBA")
+    for _ in range(40):
+        x, y = rng.randrange(1200), rng.randrange(900)
+        radius = rng.randrange(40, 300)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256), 120)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+    out = io.BytesIO()
+    image.filter(ImageFilter.GaussianBlur(2)).save(out, format="JPEG", quality=88)
+    return out.getvalue()
+
+
+async def measure(render, sources: List[bytes]) -> Dict[str, object]:
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append((time.perf_counter() - started - TICK_SECONDS) * 1000)
+
+    ticks = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results: List[RenderedImage] = await render(sources)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticks
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "images_per_second": round(len(sources) / elapsed, 2),
+        "loop_lag": percentiles(lags if len(lags) > 1 else lags + [0.0, 0.0]),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--widths", default=settings.IMAGE_WIDTHS)
+    parser.add_argument("--formats", default=settings.IMAGE_FORMATS)
+    parser.add_argument("--card-width", type=int, default=320, help="variant width a product card loads")
+    args = parser.parse_args()
+
+    widths = [int(width) for width in args.widths.split(",")]
+    formats = supported_formats(args.formats.split(","))
+    quality = {"avif": settings.IMAGE_AVIF_QUALITY, "webp": settings.IMAGE_WEBP_QUALITY}
+    render_one = partial(render_variants, widths=widths, formats=formats, quality=quality)
+    sources = [synthetic_photo(seed) for seed in range(args.images)]
+
+    async def inline(batch: List[bytes]) -> List[RenderedImage]:
+        results = []
+        for data in batch:
+            results.append(render_one(data))
+            await asyncio.sleep(0)  # the best an inline handler can do between images
+        return results
+
+    async def pooled(batch: List[bytes]) -> List[RenderedImage]:
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(executor, render_one, data) for data in batch))
+
+    async def run() -> Dict[str, object]:
+        report = {"inline": await measure(inline, sources)}
+        # Started before timing, as the pipeline keeps its pool for the whole run
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, abs, 0) for _ in range(args.workers)))
+        report["process_pool"] = await measure(pooled, sources)
+        return report
+
+    with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        report = asyncio.run(run())
+
+    rendered = report["process_pool"].pop("results")
+    report["inline"].pop("results")
+    card = {
+        fmt: sum(
+            len(encoded)
+            for image in rendered
+            for width, variant_format, encoded in image.variants
+            if variant_format == fmt and width == args.card_width
+        )
+        for fmt in formats
+    }
+    print(
+        json.dumps(
+            {
+                "benchmark": "image_derivatives",
+                "images": args.images,
+                "workers": args.workers,
+                "widths": widths,
+                "formats": formats,
+                **report,
+                "bytes": {"originals": sum(len(data) for data in sources), f"card_{args.card_width}": card},
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
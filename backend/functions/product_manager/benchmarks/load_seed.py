@@ -0,0 +1,248 @@
+"""
+Seed a dedicated database for the load test (benchmarks/load_test.py).
+
+Creates `--database` if it does not exist and applies database/schema.sql to it
+(an existing database is assumed to be on the current schema), empties every
+table and fills it with synthetic data at production scale: `--products` products
+with `--variants-per-product` variants each, `--users` customers (all sharing one
+bcrypt hash of LOAD_PASSWORD, hashed at the cost the API uses), one cart per user
+plus guest carts up to `--carts`, `--items-per-cart` lines in every cart and
+`--tokens` issued access tokens (every other one expired). The defaults give 100k
+products, 1M variants and 1M cart items. Row ids are contiguous
+from 1, so the load test can pick random products, users and sessions without
+reading them back.
+
+Everything in the target database is deleted; it refuses to seed a database that
+holds anything other than load-test users unless --force is given.
+
+Usage (from backend/functions/product_manager, server settings from .env):
+    PYTHONPATH=app python benchmarks/load_seed.py --database nexus_loadtest
+    PYTHONPATH=app python benchmarks/load_seed.py --database nexus_loadtest --products 10000 --carts 10000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import asyncpg
+from common import connect_kwargs
+
+from core.passwords import password_hasher
+
+SCHEMA_FILE = Path(__file__).resolve().parents[3] / "database" / "schema.sql"
+
+LOAD_PASSWORD = "load-test-password"
+USERNAME_PREFIX = "load_user_"
+SESSION_PREFIX = "load-session-"
+SLUG_PREFIX = "load-"
+SKU_PREFIX = "LT-"
+TOKEN_PREFIX = "load-token-"
+
+
+def username(user_id: int) -> str:
+    return f"{USERNAME_PREFIX}{user_id}"
+
+
+def session_id(cart_id: int) -> str:
+    return f"{SESSION_PREFIX}{cart_id}"
+
+
+def slug(product_id: int) -> str:
+    return f"{SLUG_PREFIX}{product_id}"
+
+
+# Prices, ratings and words are functions of the id, so every run seeds the same data
+PRODUCTS_SQL = f"""
+INSERT INTO products (id, name, slug, description, price, currency, images, rating, review_count)
+SELECT g,
+       w.brand || ' ' || w.model || ' ' || (g % 97),
+       '{SLUG_PREFIX}' || g,
+       'The ' || w.brand || ' ' || w.model || ' is a ' || w.adjective || ' ' || w.category
+           || ' built for ' || w.usage || ' with ' || w.material || ' upper and cushioned sole.',
+       round((20 + (g * 7919) % 300)::numeric, 2),
+       'USD',
+       jsonb_build_array('https://cdn.example.com/load/' || g || '.jpg'),
+       round(((g * 31) % 500)::numeric / 100, 2),
+       (g * 17) % 1000
+FROM generate_series(1, $1) AS g,
+LATERAL (
+    SELECT (ARRAY['Nike', 'Adidas', 'Puma', 'New Balance', 'Converse', 'Asics', 'Salomon', 'Vans'])[1 + g % 8] AS brand,
+           (ARRAY['Air Max', 'Ultraboost', 'RS-X', '574', 'Chuck Taylor', 'Gel Kayano', 'Speedcross', 'Old Skool',
+                  'Pegasus', 'Gazelle'])[1 + (g / 8) % 10] AS model,
+           (ARRAY['lightweight', 'waterproof', 'breathable', 'classic', 'retro', 'durable'])[1 + (g / 3) % 6] AS adjective,
+           (ARRAY['running shoe', 'trail shoe', 'sneaker', 'leather boot', 'kids sandal', 'court shoe'])[1 + (g / 5) % 6]
+               AS category,
+           (ARRAY['daily runs', 'hiking', 'the gym', 'city walks', 'weekend trips'])[1 + (g / 7) % 5] AS usage,
+           (ARRAY['mesh', 'leather', 'suede', 'canvas', 'knit'])[1 + (g / 11) % 5] AS material
+) AS w
+"""
+
+VARIANTS_SQL = f"""
+INSERT INTO product_variants (id, product_id, sku, color, size, stock, price_modifier)
+SELECT (p - 1) * $2 + k + 1,
+       p,
+       '{SKU_PREFIX}' || p || '-' || k,
+       (ARRAY['Black', 'White', 'Red', 'Blue', 'Grey'])[1 + k % 5],
+       (36 + k % 10)::text,
+       $3,
+       (k % 3) * 5
+FROM generate_series(1, $1) AS p, generate_series(0, $2 - 1) AS k
+"""
+
+USERS_SQL = f"""
+INSERT INTO users (id, username, password_hash, full_name, email)
+SELECT g, '{USERNAME_PREFIX}' || g, $2, 'Load User ' || g, '{USERNAME_PREFIX}' || g || '@example.com'
+FROM generate_series(1, $1) AS g
+"""
+
+# Carts 1..users belong to the user with the same id, the rest are guest sessions
+CARTS_SQL = f"""
+INSERT INTO carts (id, user_id, session_id)
+SELECT g,
+       CASE WHEN g <= $2 THEN g END,
+       CASE WHEN g > $2 THEN '{SESSION_PREFIX}' || g END
+FROM generate_series(1, $1) AS g
+"""
+
+# Spread lines over the catalog; price is the seeded product price plus the variant modifier
+CART_ITEMS_SQL = f"""
+INSERT INTO cart_items (cart_id, sku, product_id, quantity, price)
+SELECT c, '{SKU_PREFIX}' || p || '-' || k, p, 1 + i % 2, round((20 + (p * 7919) % 300)::numeric, 2) + (k % 3) * 5
+FROM generate_series(1, $1) AS c,
+     generate_series(0, $2 - 1) AS i,
+     LATERAL (SELECT 1 + ((c::bigint * 7919 + i * 104729) % $3)::int AS p, i % $4 AS k) AS pick
+ON CONFLICT (cart_id, sku) DO NOTHING
+"""
+
+# Spread over the users; their access tokens come from logins, these only fill the table
+TOKENS_SQL = f"""
+INSERT INTO access_token_log (user_id, token, expires_at)
+SELECT 1 + g % $2, '{TOKEN_PREFIX}' || g, now() + CASE WHEN g % 2 = 0 THEN interval '1 hour' ELSE interval '-1 hour' END
+FROM generate_series(1, $1) AS g
+"""
+
+
+async def ensure_database(args: argparse.Namespace) -> bool:
+    maintenance = await asyncpg.connect(**{**connect_kwargs(), "database": args.maintenance_db})
+    try:
+        if await maintenance.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", args.database):
+            return False
+        await maintenance.execute(f'CREATE DATABASE "{args.database}"')
+        return True
+    finally:
+        await maintenance.close()
+
+
+async def timed(timings: Dict[str, float], step: str, work) -> None:
+    started = time.perf_counter()
+    await work
+    timings[step] = round(time.perf_counter() - started, 3)
+
+
+async def seed(connection: asyncpg.Connection, args: argparse.Namespace, timings: Dict[str, float]) -> None:
+    # Nothing here has to survive a crash; the seed is simply rerun
+    await connection.execute("SET synchronous_commit = off")
+
+    tables = await connection.fetch("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+    await connection.execute(
+        "TRUNCATE " + ", ".join(f'"{row["tablename"]}"' for row in tables) + " RESTART IDENTITY CASCADE"
+    )
+
+    password_hash = await password_hasher.hash(LOAD_PASSWORD)
+    await timed(timings, "users", connection.execute(USERS_SQL, args.users, password_hash))
+    await timed(timings, "products", connection.execute(PRODUCTS_SQL, args.products))
+    await timed(
+        timings,
+        "variants",
+        connection.execute(VARIANTS_SQL, args.products, args.variants_per_product, args.stock),
+    )
+    await timed(timings, "carts", connection.execute(CARTS_SQL, args.carts, args.users))
+    await timed(
+        timings,
+        "cart_items",
+        connection.execute(CART_ITEMS_SQL, args.carts, args.items_per_cart, args.products, args.variants_per_product),
+    )
+    await timed(timings, "access_tokens", connection.execute(TOKENS_SQL, args.tokens, args.users))
+
+    # Explicit ids bypassed the sequences; later inserts (register, checkout) must not collide
+    for table in ("users", "products", "product_variants", "carts"):
+        await connection.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        )
+
+    await timed(timings, "product_feed", connection.execute("SELECT refresh_product_feed()"))
+    await timed(timings, "analyze", connection.execute("ANALYZE"))
+
+
+async def run(args: argparse.Namespace) -> int:
+    if args.users > args.carts:
+        sys.stderr.write("--users must not exceed --carts (every user gets one of the carts)\n")
+        return 2
+
+    started = time.perf_counter()
+    created = await ensure_database(args)
+    connection = await asyncpg.connect(**{**connect_kwargs(), "database": args.database})
+    timings: Dict[str, float] = {}
+    try:
+        # schema.sql is not idempotent (plain CREATE TRIGGER), so it only runs on a new database
+        if await connection.fetchval("SELECT to_regclass('public.users') IS NULL"):
+            await timed(timings, "schema", connection.execute(SCHEMA_FILE.read_text(encoding="utf-8")))
+        else:
+            foreign_users = await connection.fetchval(
+                "SELECT count(*) FROM users WHERE username NOT LIKE $1", USERNAME_PREFIX + "%"
+            )
+            if foreign_users and not args.force:
+                sys.stderr.write(
+                    f"Database '{args.database}' has {foreign_users} users not created by this script; "
+                    "use --force to wipe it anyway\n"
+                )
+                return 1
+
+        await seed(connection, args, timings)
+        counts = {
+            table: await connection.fetchval(f"SELECT count(*) FROM {table}")
+            for table in (
+                "products",
+                "product_variants",
+                "users",
+                "carts",
+                "cart_items",
+                "access_token_log",
+                "product_feed",
+            )
+        }
+    finally:
+        await connection.close()
+
+    report = {
+        "database": args.database,
+        "created": created,
+        "rows": counts,
+        "timings_s": timings,
+        "total_s": round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="nexus_loadtest", help="database to (re)create and fill")
+    parser.add_argument("--maintenance-db", default="postgres", help="database to connect to for CREATE DATABASE")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--variants-per-product", type=int, default=10)
+    parser.add_argument("--stock", type=int, default=1_000_000, help="stock of every variant")
+    parser.add_argument("--users", type=int, default=20_000, help="customers; each has a filled cart to check out")
+    parser.add_argument("--carts", type=int, default=100_000, help="user carts plus guest carts")
+    parser.add_argument("--items-per-cart", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=100_000, help="rows of access_token_log")
+    parser.add_argument("--force", action="store_true", help="wipe the database even if it holds other data")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+"""
+Load test of the API flows against uvicorn or the Mangum Lambda handler.
+
+Runs each flow in turn for `--warmup` + `--duration` seconds at `--concurrency`
+and reports throughput and latency percentiles per flow and per request as JSON:
+
+- products: page of the catalog, a random product page, the homepage feed
+- search:   keyword search (including misspellings) and autocomplete
+- cart:     a random guest cart (X-Session-ID)
+- login:    password login of a random user (bcrypt bound)
+- checkout: login, read the cart, place the order; every checkout uses up one
+            seeded user cart, so long runs need a larger `--users` seed
+
+Targets:
+- uvicorn: HTTP against `--base-url` with `--concurrency` in-flight flows. With
+  --spawn-server the script starts uvicorn itself (`--server-workers` processes)
+  on the load-test database and stops it afterwards.
+- mangum:  `lambda_function.lambda_handler` invoked in-process with API Gateway
+  proxy events. Lambda runs one request per container at a time, so
+  `--concurrency` is the number of worker processes (warm containers), each
+  invoking the handler sequentially. Every worker starts cold; its init time and
+  first request are reported separately.
+
+The database must be seeded with benchmarks/load_seed.py first. The report can be
+written to a file and compared with an earlier one: with --baseline, any request
+whose p95 grew or whose throughput fell by more than `--tolerance` is listed under
+"regressions" and the exit code is 1.
+
+Usage (from backend/functions/product_manager, server settings from .env):
+    PYTHONPATH=app python benchmarks/load_seed.py --database nexus_loadtest
+    PYTHONPATH=app python benchmarks/load_test.py --target uvicorn --spawn-server --concurrency 32 -o uvicorn.json
+    PYTHONPATH=app python benchmarks/load_test.py --target mangum --concurrency 4 --flows products,cart
+    PYTHONPATH=app python benchmarks/load_test.py --spawn-server --baseline uvicorn.json --tolerance 0.1
+"""
+
+import argparse
+import asyncio
+import base64
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Sequence
+
+import asyncpg
+from common import connect_kwargs, percentiles
+from load_seed import LOAD_PASSWORD, SESSION_PREFIX, SLUG_PREFIX, USERNAME_PREFIX, session_id, slug, username
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+# Seconds a worker process may take to start (import the app) or to finish its last flow
+WORKER_TIMEOUT = 120
+
+KEYWORDS = ["nike", "air max", "running shoe", "leather boot", "ultrabost", "gazele", "waterproof trail", "kids sandal"]
+PREFIXES = ["ni", "adi", "air", "gel", "spee", "old sk", "new bal", "chuck"]
+
+SHIPPING_INFO = {
+    "full_name": "Load User",
+    "email": "load@example.com",
+    "phone": "+10000000000",
+    "address": "1 Load St",
+    "city": "Loadville",
+    "postal_code": "00000",
+    "country": "US",
+}
+
+
+class Exhausted(Exception):
+    """No seeded cart is left to check out."""
+
+
+@dataclass
+class Call:
+    step: str
+    method: str
+    path: str
+    params: Optional[Dict[str, str]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Reply:
+    status: int  # 0 when the request failed without a response
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass
+class Dataset:
+    """What load_seed.py created, read back from the database once per run."""
+
+    products: int
+    users: int
+    carts: int
+    checkout_users: List[int]
+    _checkouts: Optional[Iterator[int]] = None
+
+    def for_worker(self, worker: int, workers: int) -> "Dataset":
+        """Copy with a disjoint share of the checkout carts, for one Lambda worker process."""
+        return Dataset(self.products, self.users, self.carts, self.checkout_users[worker::workers])
+
+    def next_checkout_user(self) -> int:
+        if self._checkouts is None:
+            self._checkouts = iter(self.checkout_users)
+        user_id = next(self._checkouts, None)
+        if user_id is None:
+            raise Exhausted()
+        return user_id
+
+
+Flow = Generator[Call, Reply, None]
+
+
+def products_flow(data: Dataset, rng: random.Random) -> Flow:
+    yield Call("products.list", "GET", "/api/v1/products", {"offset": str(rng.randrange(0, 1000, 20)), "limit": "20"})
+    yield Call("products.detail", "GET", f"/api/v1/products/{slug(rng.randint(1, data.products))}")
+    yield Call("products.featured", "GET", "/api/v1/products/featured", {"limit": "20"})
+
+
+def search_flow(data: Dataset, rng: random.Random) -> Flow:
+    yield Call("search.products", "GET", "/api/v1/products", {"search": rng.choice(KEYWORDS), "limit": "20"})
+    yield Call("search.suggest", "GET", "/api/v1/search/suggest", {"q": rng.choice(PREFIXES), "limit": "8"})
+
+
+def cart_flow(data: Dataset, rng: random.Random) -> Flow:
+    guest_cart = rng.randint(data.users + 1, data.carts)
+    yield Call("cart.get", "GET", "/api/v1/cart", headers={"X-Session-ID": session_id(guest_cart)})
+
+
+def login_body(user_id: int) -> Dict[str, Any]:
+    return {"username": username(user_id), "password": LOAD_PASSWORD}
+
+
+def login_flow(data: Dataset, rng: random.Random) -> Flow:
+    yield Call("login", "POST", "/api/v1/auth/login", body=login_body(rng.randint(1, data.users)))
+
+
+def checkout_flow(data: Dataset, rng: random.Random) -> Flow:
+    user_id = data.next_checkout_user()
+    reply = yield Call("checkout.login", "POST", "/api/v1/auth/login", body=login_body(user_id))
+    if reply.status != 200:
+        return
+
+    auth = {"Authorization": f"Bearer {reply.json()['data']['access_token']}"}
+    yield Call("checkout.cart", "GET", "/api/v1/cart", headers=auth)
+    order = {
+        "shipping_info": SHIPPING_INFO,
+        "shipping_method": "standard",
+        "payment_method": "cod",
+        "cart_id": f"cart_{user_id}",  # seeded carts share the id of their user
+    }
+    yield Call("checkout.order", "POST", "/api/v1/orders", headers=auth, body=order)
+
+
+FLOWS: Dict[str, Callable[[Dataset, random.Random], Flow]] = {
+    "products": products_flow,
+    "search": search_flow,
+    "cart": cart_flow,
+    "login": login_flow,
+    "checkout": checkout_flow,
+}
+
+
+class Recorder:
+    """Latencies and statuses of the requests that started inside the measurement window."""
+
+    def __init__(self, measure_from: float) -> None:
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.flows = 0
+        self.exhausted = False
+
+    def record(self, step: str, status: int, started_at: float, elapsed_ms: float) -> None:
+        if started_at >= self.measure_from:
+            self.latencies[step].append(elapsed_ms)
+            self.statuses[step][status] += 1
+
+    def merge(self, other: "Recorder") -> None:
+        for step, samples in other.latencies.items():
+            self.latencies[step].extend(samples)
+        for step, statuses in other.statuses.items():
+            self.statuses[step].update(statuses)
+        self.flows += other.flows
+        self.exhausted = self.exhausted or other.exhausted
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        steps = {
+            step: self._summarize(samples, self.statuses[step], duration) for step, samples in self.latencies.items()
+        }
+        statuses = sum(self.statuses.values(), Counter())
+        return {
+            "flows": self.flows,
+            "flows_per_second": round(self.flows / duration, 2),
+            "checkout_carts_exhausted": self.exhausted,
+            **self._summarize(list(chain.from_iterable(self.latencies.values())), statuses, duration),
+            "steps": dict(sorted(steps.items())),
+        }
+
+    @staticmethod
+    def _summarize(samples: List[float], statuses: Counter, duration: float) -> Dict[str, Any]:
+        errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+        return {
+            "requests": len(samples),
+            "rps": round(len(samples) / duration, 2),
+            "errors": errors,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            **(percentiles(samples) if len(samples) > 1 else {}),
+        }
+
+
+def run_flow(flow: Flow, send: Callable[[Call], Reply]) -> None:
+    reply = None
+    try:
+        while True:
+            reply = send(flow.send(reply))
+    except StopIteration:
+        pass
+
+
+async def run_flow_async(flow: Flow, send: Callable[[Call], Any]) -> None:
+    reply = None
+    try:
+        while True:
+            reply = await send(flow.send(reply))
+    except StopIteration:
+        pass
+
+
+# --- uvicorn target ----------------------------------------------------------------
+
+
+async def http_phase(args: argparse.Namespace, name: str, data: Dataset) -> Recorder:
+    import httpx
+
+    recorder = Recorder(time.time() + args.warmup)
+    deadline = recorder.measure_from + args.duration
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+
+        async def send(call: Call) -> Reply:
+            started_at, started = time.time(), time.perf_counter()
+            try:
+                response = await client.request(
+                    call.method, call.path, params=call.params, headers=call.headers, json=call.body
+                )
+                reply = Reply(response.status_code, response.content)
+            except httpx.HTTPError:
+                reply = Reply(0, b"")
+            recorder.record(call.step, reply.status, started_at, (time.perf_counter() - started) * 1000)
+            return reply
+
+        async def worker(rng: random.Random) -> None:
+            while time.time() < deadline:
+                try:
+                    await run_flow_async(FLOWS[name](data, rng), send)
+                except Exhausted:
+                    recorder.exhausted = True
+                    return
+                if time.time() >= recorder.measure_from:
+                    recorder.flows += 1
+
+        await asyncio.gather(*(worker(random.Random(args.seed + index)) for index in range(args.concurrency)))
+    return recorder
+
+
+def spawn_server(args: argparse.Namespace) -> subprocess.Popen:
+    import httpx
+
+    host, port = "127.0.0.1", args.port
+    args.base_url = f"http://{host}:{port}"
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(APP_DIR), "--host", host]
+    command += ["--port", str(port), "--workers", str(args.server_workers), "--no-access-log", "--log-level", "warning"]
+    server = subprocess.Popen(command, cwd=APP_DIR.parent, env={**os.environ, "POSTGRES_DB": args.database})
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{args.base_url}/health", timeout=2).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+async def run_uvicorn(args: argparse.Namespace, data: Dataset) -> Dict[str, Any]:
+    flows = {}
+    for name in args.flows:
+        recorder = await http_phase(args, name, data)
+        flows[name] = recorder.summary(args.duration)
+    return {"flows": flows}
+
+
+# --- mangum target -----------------------------------------------------------------
+
+
+def api_gateway_event(call: Call) -> Dict[str, Any]:
+    """REST API (v1) proxy event, as API Gateway sends it to the function."""
+    headers = {"host": "load.test", "user-agent": "load-test", **call.headers}
+    params = call.params or {}
+    if call.body is not None:
+        headers["content-type"] = "application/json"
+    return {
+        "resource": "/{proxy+}",
+        "path": call.path,
+        "httpMethod": call.method,
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": params or None,
+        "multiValueQueryStringParameters": {key: [value] for key, value in params.items()} or None,
+        "pathParameters": {"proxy": call.path.lstrip("/")},
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": call.method,
+            "path": call.path,
+            "stage": "load",
+            "requestId": str(uuid.uuid4()),
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": json.dumps(call.body) if call.body is not None else None,
+        "isBase64Encoded": False,
+    }
+
+
+def lambda_worker(worker: int, args: argparse.Namespace, data: Dataset, barrier: Any, results: Any) -> None:
+    """One warm container: imports the handler once, then runs every flow sequentially."""
+    init_started = time.perf_counter()
+    from lambda_function import lambda_handler
+
+    init_ms = (time.perf_counter() - init_started) * 1000
+    context = SimpleNamespace(function_name="load-test", aws_request_id="", get_remaining_time_in_millis=lambda: 30000)
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    data = data.for_worker(worker, args.concurrency)
+    first_request_ms: Optional[float] = None
+
+    for name in args.flows:
+        barrier.wait()
+        recorder = Recorder(time.time() + args.warmup)
+        deadline = recorder.measure_from + args.duration
+        rng = random.Random(args.seed + worker)
+
+        def send(call: Call) -> Reply:
+            nonlocal first_request_ms
+            started_at, started = time.time(), time.perf_counter()
+            try:
+                response = lambda_handler(api_gateway_event(call), context)
+                body = response.get("body") or ""
+                raw = base64.b64decode(body) if response.get("isBase64Encoded") else body.encode()
+                reply = Reply(response["statusCode"], raw)
+            except Exception:  # noqa: BLE001 - counted as a failed request
+                reply = Reply(0, b"")
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if first_request_ms is None:
+                first_request_ms = elapsed_ms
+            recorder.record(call.step, reply.status, started_at, elapsed_ms)
+            return reply
+
+        while time.time() < deadline:
+            try:
+                run_flow(FLOWS[name](data, rng), send)
+            except Exhausted:
+                recorder.exhausted = True
+                break
+            if time.time() >= recorder.measure_from:
+                recorder.flows += 1
+
+        cold_start = {"worker": worker, "init_ms": round(init_ms, 1), "first_request_ms": round(first_request_ms, 1)}
+        results.put((name, recorder, cold_start))
+
+
+def run_mangum(args: argparse.Namespace, data: Dataset) -> Dict[str, Any]:
+    # Inherited by the spawned workers: load-test database and Lambda runtime defaults
+    os.environ["POSTGRES_DB"] = args.database
+    os.environ.setdefault("AWS_LAMBDA_FUNCTION_NAME", "load-test")
+    notes = []
+    if importlib.util.find_spec("aws_lambda_powertools") is None:
+        # The Powertools layer is only attached in AWS; without it EMF publishing would fail per request
+        os.environ["METRICS_ENABLED"] = "false"
+        notes.append("aws_lambda_powertools is not installed; request metrics were disabled in the workers")
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.concurrency + 1)
+    results = context.Queue()
+    workers = [
+        context.Process(target=lambda_worker, args=(index, args, data, barrier, results), daemon=True)
+        for index in range(args.concurrency)
+    ]
+    for process in workers:
+        process.start()
+
+    flows: Dict[str, Any] = {}
+    cold_starts: List[Dict[str, Any]] = []
+    for name in args.flows:
+        barrier.wait(timeout=WORKER_TIMEOUT)
+        recorder = Recorder(0)
+        for _ in workers:
+            flow_name, worker_recorder, cold_start = results.get(timeout=args.warmup + args.duration + WORKER_TIMEOUT)
+            recorder.merge(worker_recorder)
+            if flow_name == args.flows[0]:
+                cold_starts.append(cold_start)
+        flows[name] = recorder.summary(args.duration)
+
+    for process in workers:
+        process.join()
+    return {"flows": flows, "cold_starts": sorted(cold_starts, key=lambda entry: entry["worker"]), "notes": notes}
+
+
+# --- report ------------------------------------------------------------------------
+
+
+async def load_dataset(database: str) -> Dataset:
+    connection = await asyncpg.connect(**{**connect_kwargs(), "database": database})
+    try:
+        products = await connection.fetchval("SELECT count(*) FROM products WHERE slug LIKE $1", SLUG_PREFIX + "%")
+        users = await connection.fetchval("SELECT count(*) FROM users WHERE username LIKE $1", USERNAME_PREFIX + "%")
+        carts = await connection.fetchval(
+            "SELECT coalesce(max(id), 0) FROM carts WHERE session_id LIKE $1", SESSION_PREFIX + "%"
+        )
+        # Carts emptied by earlier checkout runs are skipped
+        checkout_users = await connection.fetch(
+            """
+            SELECT c.user_id FROM carts c
+            WHERE c.user_id IS NOT NULL AND EXISTS (SELECT 1 FROM cart_items i WHERE i.cart_id = c.id)
+            ORDER BY c.user_id
+            """
+        )
+    finally:
+        await connection.close()
+    if not products or not users or carts <= users:
+        raise RuntimeError(f"Database '{database}' is not seeded; run benchmarks/load_seed.py first")
+    return Dataset(products, users, carts, [row["user_id"] for row in checkout_users])
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for flow, current in report["flows"].items():
+        previous = baseline.get("flows", {}).get(flow)
+        if previous is None:
+            continue
+        for step, stats in current["steps"].items():
+            before = previous["steps"].get(step)
+            if before is None or "p95_ms" not in stats or "p95_ms" not in before:
+                continue
+            if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{step}: p95 {before['p95_ms']} -> {stats['p95_ms']} ms")
+            if stats["rps"] < before["rps"] * (1 - tolerance):
+                regressions.append(f"{step}: rps {before['rps']} -> {stats['rps']}")
+    return regressions
+
+
+def parse_flows(value: str) -> Sequence[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FLOWS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown flow(s): {', '.join(unknown)}")
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("uvicorn", "mangum"), default="uvicorn")
+    parser.add_argument("--flows", type=parse_flows, default=list(FLOWS), help="comma separated, default all")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight flows (mangum: worker processes)")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per flow")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before each flow")
+    parser.add_argument("--database", default="nexus_loadtest", help="database seeded by load_seed.py")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="uvicorn target")
+    parser.add_argument("--spawn-server", action="store_true", help="start uvicorn on the load-test database")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn processes (with --spawn-server)")
+    parser.add_argument("--port", type=int, default=8765, help="port of the spawned server")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the request mix")
+    parser.add_argument("-o", "--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95/rps change vs the baseline")
+    args = parser.parse_args()
+
+    data = asyncio.run(load_dataset(args.database))
+    server = spawn_server(args) if args.target == "uvicorn" and args.spawn_server else None
+    try:
+        if args.target == "uvicorn":
+            results = asyncio.run(run_uvicorn(args, data))
+        else:
+            results = run_mangum(args, data)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "target": args.target,
+        "base_url": args.base_url if args.target == "uvicorn" else None,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "dataset": {
+            "products": data.products,
+            "users": data.users,
+            "carts": data.carts,
+            "checkout_carts_at_start": len(data.checkout_users),
+        },
+        **results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            report["regressions"] = compare(report, json.load(baseline), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    sys.exit(1 if report.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
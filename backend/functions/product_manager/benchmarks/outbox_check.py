@@ -0,0 +1,216 @@
+"""
+Outbox worker check (services.outbox) against Postgres alone.
+
+Seeds a scratch `outbox_events` table with `--orders` order.placed events for three
+fake handlers, then runs `--processes` OutboxWorker instances side by side, each with
+`--workers` claim loops, until the table is drained. The fake handlers sleep like a
+network call; "email" fails every `--flaky-every`-th event on its first attempt, and
+"sheets" records the batch sizes it was handed; "analytics" rejects the orders of
+`--poison` ids on every attempt.
+
+Verifies that no event was claimed by two workers at once, that every event except
+the poison ones was delivered exactly once, that flaky events were retried and
+delivered, and that poison events ended 'failed' after `--max-attempts`. Prints the
+report as JSON and exits 1 if a check fails.
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python benchmarks/outbox_check.py --orders 2000 --processes 4 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set
+
+import asyncpg
+from common import connect_kwargs
+
+from core.database import _init_connection
+from repositories.outbox_repository import OutboxRepository
+from services.outbox import ORDER_PLACED, OutboxEvent, OutboxWorker
+
+SCHEMA = "bench_outbox"
+HANDLERS = ("email", "sheets", "analytics")
+
+
+class Recorder:
+    """Fake handlers sharing one record of what ran."""
+
+    def __init__(self, latency_seconds: float, flaky_every: int, poison: Set[int]) -> None:
+        self.latency_seconds = latency_seconds
+        self.flaky_every = flaky_every
+        self.poison = poison
+        self.in_flight: Set[int] = set()
+        self.overlaps = 0
+        self.delivered: Counter = Counter()
+        self.retried: Set[int] = set()
+        self.sheet_batches: List[int] = []
+
+    async def _run(self, events: Sequence[OutboxEvent], fail) -> List[Optional[BaseException]]:
+        ids = {event.id for event in events}
+        self.overlaps += len(ids & self.in_flight)
+        self.in_flight |= ids
+        try:
+            await asyncio.sleep(self.latency_seconds)
+        finally:
+            self.in_flight -= ids
+        errors: List[Optional[BaseException]] = []
+        for event in events:
+            error = fail(event)
+            if error is None:
+                self.delivered[event.id] += 1
+                if event.attempts > 1:
+                    self.retried.add(event.id)
+            errors.append(error)
+        return errors
+
+    async def email(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        def fail(event: OutboxEvent) -> Optional[BaseException]:
+            if event.attempts == 1 and event.aggregate_id % self.flaky_every == 0:
+                return ConnectionError("SMTP connection reset")
+            return None
+
+        return await self._run(events, fail)
+
+    async def sheets(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        self.sheet_batches.append(len(events))
+        return await self._run(events, lambda event: None)
+
+    async def analytics(self, events: Sequence[OutboxEvent]) -> List[Optional[BaseException]]:
+        return await self._run(
+            events, lambda event: ValueError("rejected") if event.aggregate_id in self.poison else None
+        )
+
+
+async def seed(connection: asyncpg.Connection, orders: int) -> None:
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    await connection.execute(f"CREATE TABLE {SCHEMA}.outbox_events (LIKE public.outbox_events INCLUDING ALL)")
+    # Own sequence, so the check does not consume ids of the real table
+    await connection.execute(f"CREATE SEQUENCE {SCHEMA}.outbox_events_id_seq OWNED BY {SCHEMA}.outbox_events.id")
+    await connection.execute(
+        f"ALTER TABLE {SCHEMA}.outbox_events ALTER COLUMN id SET DEFAULT nextval('{SCHEMA}.outbox_events_id_seq')"
+    )
+    await connection.execute(f"SET search_path TO {SCHEMA}")
+    repository = OutboxRepository(connection)
+    async with connection.transaction():
+        for order_id in range(1, orders + 1):
+            payload = {"order_id": f"order_{order_id}", "items": [{"sku": "SKU-1", "quantity": 1}]}
+            await repository.add(ORDER_PLACED, order_id, payload, HANDLERS)
+    await connection.execute(f"ANALYZE {SCHEMA}.outbox_events")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    admin = await asyncpg.connect(**connect_kwargs())
+    await _init_connection(admin)
+    try:
+        await seed(admin, args.orders)
+        poison = set(range(7, args.orders + 1, max(args.orders // max(args.poison, 1), 1))[: args.poison])
+        recorder = Recorder(args.latency_ms / 1000, args.flaky_every, poison)
+        handlers = {"email": recorder.email, "sheets": recorder.sheets, "analytics": recorder.analytics}
+
+        pool = await asyncpg.create_pool(
+            **connect_kwargs(),
+            min_size=args.processes,
+            max_size=args.processes * args.workers,
+            init=_init_connection,
+            server_settings={"search_path": SCHEMA},
+        )
+        # asyncpg.Pool offers the acquire() context manager OutboxWorker relies on
+        workers = [
+            OutboxWorker(
+                handlers,
+                pool,
+                batch_size=args.batch_size,
+                lease_seconds=60,
+                handler_timeout_seconds=30,
+                max_attempts=args.max_attempts,
+                retry_base_seconds=0.05,
+                retry_max_seconds=0.2,
+            )
+            for _ in range(args.processes)
+        ]
+        started = time.perf_counter()
+        try:
+            # Retries are due a moment after they fail, so poll until nothing is pending
+            while True:
+                await asyncio.gather(*(worker.run(workers=args.workers, until_idle=True) for worker in workers))
+                async with pool.acquire() as connection:
+                    counts = await OutboxRepository(connection).count_by_status()
+                if not counts.get("pending"):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            elapsed = time.perf_counter() - started
+            await pool.close()
+
+        events = args.orders * len(HANDLERS)
+        failed_ids = {
+            row["aggregate_id"]
+            for row in await admin.fetch(f"SELECT aggregate_id FROM {SCHEMA}.outbox_events WHERE status = 'failed'")
+        }
+        flaky = {order_id for order_id in range(1, args.orders + 1) if order_id % args.flaky_every == 0}
+        reports = [worker.report.to_dict() for worker in workers]
+        result = {
+            "check": "outbox_worker",
+            "events": events,
+            "processes": args.processes,
+            "workers_per_process": args.workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(events / elapsed, 1),
+            "status": counts,
+            "claimed": sum(report["claimed"] for report in reports),
+            "batches": sum(report["batches"] for report in reports),
+            "sheet_batch_sizes": {
+                "count": len(recorder.sheet_batches),
+                "mean": round(sum(recorder.sheet_batches) / max(len(recorder.sheet_batches), 1), 1),
+                "max": max(recorder.sheet_batches, default=0),
+            },
+            "overlapping_claims": recorder.overlaps,
+            "duplicate_deliveries": sum(1 for count in recorder.delivered.values() if count > 1),
+            "delivered": sum(recorder.delivered.values()),
+            "retried_then_delivered": len(recorder.retried),
+            "failed": counts.get("failed", 0),
+        }
+        result["ok"] = (
+            result["overlapping_claims"] == 0
+            and result["duplicate_deliveries"] == 0
+            and result["delivered"] == events - len(poison)
+            and counts.get("done", 0) == events - len(poison)
+            and failed_ids == poison
+            # Exactly the flaky emails were delivered on a later attempt
+            and len(recorder.retried) == len(flaky)
+        )
+
+        if not args.keep:
+            await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        await admin.close()
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000, help="order.placed events per handler")
+    parser.add_argument("--processes", type=int, default=4, help="OutboxWorker instances (as separate workers)")
+    parser.add_argument("--workers", type=int, default=4, help="claim loops per worker")
+    parser.add_argument("--batch-size", type=int, default=100, help="events per claim")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated handler call time")
+    parser.add_argument("--flaky-every", type=int, default=10, help="fail every n-th email once")
+    parser.add_argument("--poison", type=int, default=5, help="analytics events that always fail")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Read replica routing check (core.database.read_pool) against a primary and replica.
+
+Start both with docker-compose.replica.yaml, then run with the replica configured:
+    POSTGRES_READ_REPLICA_HOSTS=localhost:5434 POSTGRES_HOST=localhost POSTGRES_PORT=5433 \\
+        PYTHONPATH=app python benchmarks/read_replica_check.py --writes 50
+
+Each round writes a row on the primary and reads it back at once through
+`read_pool`, both pinned (`read_from_primary`, as after a cart or order write) and
+unpinned, then polls the replica until the row shows up. Reports the health check
+result, how often an unpinned read missed its own write and the replication delay.
+Then adds an unreachable replica and checks that it is taken out of rotation while
+reads go on against the healthy one (or the primary). Stopping the replica container
+during a run exercises the failover of reads already routed to it. Exits 1 if a
+pinned read missed its write, a failover read failed or the bad replica stayed in.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from common import percentiles
+
+from core.config import settings
+from core.database import DatabasePool, ReadReplicas, db_pool, read_from_primary, read_pool
+
+SCHEMA = "bench_replica"
+UNREACHABLE = ("127.0.0.1", 1)
+
+
+async def measure_read_after_write(writes: int, timeout: float) -> Dict[str, Any]:
+    async with db_pool.acquire() as connection:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        await connection.execute(f"CREATE TABLE {SCHEMA}.marker (id int PRIMARY KEY, written_at timestamptz)")
+
+    query = f"SELECT 1 FROM {SCHEMA}.marker WHERE id = $1"
+    pinned_misses = unpinned_misses = 0
+    delays_ms: List[float] = []
+    try:
+        # The table must reach the replica before rows can be looked up there
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                await read_pool.fetchval(f"SELECT count(*) FROM {SCHEMA}.marker")
+                break
+            except Exception:  # noqa: BLE001 - UndefinedTableError until replayed
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+        for marker in range(writes):
+            await db_pool.fetchval(f"INSERT INTO {SCHEMA}.marker VALUES ($1, now()) RETURNING id", marker)
+            written = time.perf_counter()
+            with read_from_primary():
+                pinned_misses += await read_pool.fetchval(query, marker) is None
+            unpinned_misses += await read_pool.fetchval(query, marker) is None
+
+            while await read_pool.fetchval(query, marker) is None:
+                if time.perf_counter() - written > timeout:
+                    break
+                await asyncio.sleep(0.005)
+            delays_ms.append((time.perf_counter() - written) * 1000)
+    finally:
+        async with db_pool.acquire() as connection:
+            await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+    return {
+        "writes": writes,
+        "pinned_misses": pinned_misses,
+        "unpinned_misses": unpinned_misses,
+        "visible_on_replica": percentiles(delays_ms) if len(delays_ms) > 1 else delays_ms,
+    }
+
+
+async def check_failover(reads: int) -> Dict[str, Any]:
+    host, port = UNREACHABLE
+    replicas = [DatabasePool(host=host, port=port, name="unreachable")]
+    replicas += read_pool.replica_pools
+    routing = ReadReplicas(
+        db_pool,
+        replicas,
+        health_check_seconds=settings.READ_REPLICA_HEALTH_CHECK_SECONDS,
+        max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+        check_timeout=2.0,
+    )
+    # The first read runs the health check, which takes the unreachable replica out
+    failures = 0
+    for _ in range(reads):
+        try:
+            await routing.fetchval("SELECT 1")
+        except Exception:  # noqa: BLE001 - counted and reported
+            failures += 1
+    stats = routing.stats()
+    await replicas[0].close()
+    if stats["replicas"][0]["healthy"]:
+        failures += 1
+    return {"reads": reads, "failures": failures, "routing": stats}
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not read_pool.enabled:
+        sys.exit("POSTGRES_READ_REPLICA_HOSTS is not set")
+
+    await read_pool.check_health()
+    report: Dict[str, Any] = {"health": read_pool.stats()}
+    report["read_after_write"] = await measure_read_after_write(args.writes, args.timeout)
+    report["failover"] = await check_failover(args.failover_reads)
+    report["routing"] = read_pool.stats()
+
+    await read_pool.close()
+    await db_pool.close()
+
+    print(json.dumps(report, indent=2, default=str))
+    if report["read_after_write"]["pinned_misses"] or report["failover"]["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for a row on the replica")
+    parser.add_argument("--failover-reads", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,152 @@
+"""
+Product search benchmark.
+
+Seeds a synthetic catalog into a scratch schema (a copy of `products` with all its
+indexes, so migration 004 must be applied), runs the production search query for a
+set of keywords (exact, prefix and misspelled) and reports latency percentiles as
+JSON. A naive `ILIKE '%kw%'` baseline is measured on the same data for comparison.
+
+Usage (from backend/functions/product_manager, database settings from .env):
+    PYTHONPATH=app python benchmarks/search_benchmark.py --products 200000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import asyncpg
+from common import connect_kwargs, percentiles
+
+from repositories.search_repository import SearchRepository
+
+SCHEMA = "bench_search"
+
+KEYWORDS = [
+    "nike",
+    "air max",
+    "running shoes",
+    "leather boot",
+    "ultrabost",  # typo: ultraboost
+    "convrse chuck",  # typo: converse
+    "waterproof trail",
+    "kids sandal",
+]
+
+SEED_SQL = f"""
+INSERT INTO {SCHEMA}.products (id, name, slug, description, price, currency, images, rating, review_count)
+SELECT g,
+       w.brand || ' ' || w.model || ' ' || (g % 97),
+       'bench-' || g,
+       'The ' || w.brand || ' ' || w.model || ' is a ' || w.adjective || ' ' || w.category
+           || ' built for ' || w.usage || ' with ' || w.material || ' upper and cushioned sole.',
+       round((20 + (g * 7919) % 300)::numeric, 2),
+       'USD',
+       '[]'::jsonb,
+       round(((g * 31) % 500)::numeric / 100, 2),
+       (g * 17) % 1000
+FROM generate_series(1, $1) AS g,
+LATERAL (
+    SELECT (ARRAY['Nike', 'Adidas', 'Puma', 'New Balance', 'Converse', 'Asics', 'Salomon', 'Vans'])[1 + g % 8] AS brand,
+           (ARRAY['Air Max', 'Ultraboost', 'RS-X', '574', 'Chuck Taylor', 'Gel Kayano', 'Speedcross', 'Old Skool',
+                  'Pegasus', 'Gazelle'])[1 + (g / 8) % 10] AS model,
+           (ARRAY['lightweight', 'waterproof', 'breathable', 'classic', 'retro', 'durable'])[1 + (g / 3) % 6] AS adjective,
+           (ARRAY['running shoe', 'trail shoe', 'sneaker', 'leather boot', 'kids sandal', 'court shoe'])[1 + (g / 5) % 6]
+               AS category,
+           (ARRAY['daily runs', 'hiking', 'the gym', 'city walks', 'weekend trips'])[1 + (g / 7) % 5] AS usage,
+           (ARRAY['mesh', 'leather', 'suede', 'canvas', 'knit'])[1 + (g / 11) % 5] AS material
+) AS w
+"""
+
+BASELINE_SQL = f"""
+SELECT id, name FROM {SCHEMA}.products
+WHERE name ILIKE '%' || $1 || '%' OR description ILIKE '%' || $1 || '%'
+ORDER BY id DESC
+LIMIT $2
+"""
+
+
+async def seed(connection: asyncpg.Connection, products: int) -> float:
+    started = time.perf_counter()
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    await connection.execute(f"CREATE TABLE {SCHEMA}.products (LIKE public.products INCLUDING ALL)")
+    await connection.execute(SEED_SQL, products)
+    await connection.execute(f"ANALYZE {SCHEMA}.products")
+    return time.perf_counter() - started
+
+
+async def measure(connection: asyncpg.Connection, keyword: str, iterations: int, limit: int) -> Dict[str, object]:
+    repository = SearchRepository(connection)
+    search_samples: List[float] = []
+    baseline_samples: List[float] = []
+    hits = 0
+
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rows = await repository.search_products(keyword, limit=limit)
+        search_samples.append((time.perf_counter() - started) * 1000)
+        hits = len(rows)
+
+        started = time.perf_counter()
+        await connection.fetch(BASELINE_SQL, keyword, limit)
+        baseline_samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "keyword": keyword,
+        "hits": hits,
+        "search": percentiles(search_samples),
+        "ilike_baseline": percentiles(baseline_samples),
+        "_samples": search_samples,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    connection = await asyncpg.connect(**connect_kwargs())
+
+    try:
+        seed_seconds = 0.0
+        if not args.reuse:
+            seed_seconds = await seed(connection, args.products)
+
+        # Unqualified `products` in the production query now resolves to the scratch table
+        await connection.execute(f"SET search_path TO {SCHEMA}, public")
+
+        for keyword in KEYWORDS:  # warm up plans and buffers
+            await SearchRepository(connection).search_products(keyword, limit=args.limit)
+
+        results = [await measure(connection, keyword, args.iterations, args.limit) for keyword in KEYWORDS]
+        all_samples = [sample for result in results for sample in result.pop("_samples")]
+
+        if not args.keep:
+            await connection.execute("SET search_path TO DEFAULT")
+            await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        await connection.close()
+
+    return {
+        "benchmark": "product_search",
+        "products": args.products,
+        "iterations": args.iterations,
+        "limit": args.limit,
+        "seed_seconds": round(seed_seconds, 2),
+        "overall": percentiles(all_samples),
+        "keywords": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=200_000, help="synthetic catalog size")
+    parser.add_argument("--iterations", type=int, default=50, help="runs per keyword")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing seeded schema")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Response serialization micro-benchmark (no database needed).
+
+Encodes a 50-item product page and a 30-line cart from synthetic rows shaped like
+the asyncpg records the services receive, once through the pydantic response
+models (model_validate + model_dump_json, the FAST_JSON_ENABLED=false path) and
+once through helpers.row_mapping + orjson (the default fast path). Checks that both
+paths produce byte-identical bodies, then reports per-encode latency percentiles and
+the speedup as JSON. Exits 1 if the bodies differ.
+
+Usage (from backend/functions/product_manager):
+    PYTHONPATH=app python benchmarks/serialization_benchmark.py --iterations 5000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from common import percentiles
+
+from core.serialization import dumps
+from helpers import row_mapping
+from schemas.cart import CartDetail, CartItem, CartResponse
+from schemas.product import ProductListItem, ProductListResponse
+
+Row = Dict[str, Any]
+
+
+def product_rows(count: int) -> List[Row]:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "slug": f"air-runner-{i}",
+            "name": f"Air Runner {i} — Édition",
+            "price": Decimal(f"{49 + i % 150}.{i % 100:02d}"),
+            "currency": "USD",
+            "description": "Lightweight running shoe with breathable mesh upper and foam midsole. " * 3,
+            "images": [f"https://cdn.example.com/products/{i}/{n}.jpg" for n in range(4)],
+            "image_variants": {
+                f"https://cdn.example.com/products/{i}/{n}.jpg": {
+                    "width": 800,
+                    "height": 600,
+                    "variants": [
+                        {"url": f"/media/products/{i}/{n}.w{width}.{fmt}", "width": width, "format": fmt}
+                        for width in (160, 320, 640)
+                        for fmt in ("avif", "webp")
+                    ],
+                }
+                for n in range(4)
+            },
+            "rating": Decimal(f"{i % 5}.{i % 10}0"),
+            "review_count": i * 7,
+            "sort_key": created + timedelta(minutes=i),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def cart_rows(count: int) -> Row:
+    """The cart row (with its trigger-maintained totals, as CartRepository.find_cart returns it) and its lines."""
+    products = {row["id"]: row for row in product_rows(count)}
+    lines = []
+    for i in range(1, count + 1):
+        item = {
+            "id": 1000 + i,
+            "sku": f"AR-{i}-{40 + i % 6}",
+            "product_id": i,
+            "quantity": 1 + i % 3,
+            "price": products[i]["price"],
+        }
+        variant = {"sku": item["sku"], "color": "black", "size": str(40 + i % 6), "stock": 10 * i}
+        lines.append({"row": item, "product": products[i], "variant": variant})
+    cart = {
+        "id": 1,
+        "item_count": len(lines),
+        "total_items": sum(line["row"]["quantity"] for line in lines),
+        "total_price": sum((line["row"]["price"] * line["row"]["quantity"] for line in lines), start=Decimal("0.00")),
+        "has_stale_items": False,
+    }
+    return {"cart": cart, "lines": lines}
+
+
+def product_page_models(rows: List[Row]) -> bytes:
+    body = ProductListResponse(
+        data=[ProductListItem.model_validate(dict(row)) for row in rows], next_cursor="cursor-token"
+    )
+    return body.model_dump_json().encode()
+
+
+def product_page_fast(rows: List[Row]) -> bytes:
+    return dumps(
+        {"success": True, "data": [row_mapping.product_item(row) for row in rows], "next_cursor": "cursor-token"}
+    )
+
+
+def cart_models(payload: Row) -> bytes:
+    cart = payload["cart"]
+    items = []
+    for line in payload["lines"]:
+        row, product, variant = line["row"], line["product"], line["variant"]
+        items.append(
+            CartItem(
+                item_id=f"item_{row['id']}",
+                sku=row["sku"],
+                product_id=row["product_id"],
+                name=product["name"],
+                image=product["images"][0],
+                color=variant["color"],
+                size=variant["size"],
+                stock=variant["stock"],
+                quantity=row["quantity"],
+                price=row["price"],
+            )
+        )
+    body = CartResponse(
+        data=CartDetail(
+            cart_id=f"cart_{cart['id']}",
+            item_count=cart["item_count"],
+            total_items=cart["total_items"],
+            total_price=cart["total_price"],
+            has_stale_items=cart["has_stale_items"],
+            items=items,
+        )
+    )
+    return body.model_dump_json(by_alias=True).encode()
+
+
+def cart_fast(payload: Row) -> bytes:
+    items = [row_mapping.cart_item(line["row"], line["product"], line["variant"]) for line in payload["lines"]]
+    return dumps({"status_code": 200, "message": "Success", "data": row_mapping.cart_detail(payload["cart"], items)})
+
+
+def measure(encode: Callable[[Any], bytes], payload: Any, iterations: int) -> List[float]:
+    for _ in range(min(200, iterations)):
+        encode(payload)  # warm up
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        encode(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def compare(name: str, payload: Any, models: Callable, fast: Callable, iterations: int) -> Dict[str, Any]:
+    model_body, fast_body = models(payload), fast(payload)
+    model_latency = percentiles(measure(models, payload, iterations))
+    fast_latency = percentiles(measure(fast, payload, iterations))
+    return {
+        "case": name,
+        "body_bytes": len(fast_body),
+        "identical": model_body == fast_body,
+        "pydantic": model_latency,
+        "orjson_rows": fast_latency,
+        "speedup_p50": round(model_latency["p50_ms"] / fast_latency["p50_ms"], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000, help="encodes per case and path")
+    parser.add_argument("--products", type=int, default=50, help="items on the product page")
+    parser.add_argument("--cart-lines", type=int, default=30, help="lines in the cart")
+    args = parser.parse_args()
+
+    page, cart = product_rows(args.products), cart_rows(args.cart_lines)
+    results = [
+        compare(f"product_page_{args.products}", page, product_page_models, product_page_fast, args.iterations),
+        compare(f"cart_{args.cart_lines}", cart, cart_models, cart_fast, args.iterations),
+    ]
+    report = {"benchmark": "response_serialization", "iterations": args.iterations, "results": results}
+    print(json.dumps(report, indent=2))
+    if not all(result["identical"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
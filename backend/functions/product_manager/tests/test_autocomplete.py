@@ -0,0 +1,152 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import pytest
+
+from core.autocomplete import DecayingCounter, PrefixIndex, index_terms, normalize
+from services.suggest_service import SuggestService
+
+HALF_LIFE = 3600.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_and_index_terms() -> None:
+    assert normalize("  Air-Max  90! ") == "air max 90"
+    assert index_terms("Air Max 90", "air-max-90") == {"air max 90", "max 90", "90"}
+
+
+@pytest.fixture
+def index() -> PrefixIndex:
+    index = PrefixIndex()
+    index.rebuild(
+        [
+            (1, index_terms("Air Max 90")),
+            (2, index_terms("Air Force 1")),
+            (3, index_terms("Max Runner")),
+        ]
+    )
+    return index
+
+
+def test_prefix_matches_any_word_in_term_order(index: PrefixIndex) -> None:
+    assert index.search("air", limit=10) == [2, 1]  # "air force 1" < "air max 90"
+    assert index.search("MAX", limit=10) == [1, 3]  # "max 90" < "max runner"
+    assert index.search("max r", limit=10) == [3]
+    assert index.search("zzz", limit=10) == []
+    assert index.search("  ", limit=10) == []
+
+
+def test_search_is_bounded_by_limit_and_scan_limit(index: PrefixIndex) -> None:
+    assert index.search("a", limit=1) == [2]
+    assert index.search("max", limit=10, scan_limit=1) == [1]
+
+
+def test_item_matched_by_several_terms_is_returned_once() -> None:
+    index = PrefixIndex()
+    index.rebuild([(1, index_terms("Max Max"))])
+    assert index.search("max", limit=10) == [1]
+
+
+def test_upsert_replaces_terms_and_remove_drops_item(index: PrefixIndex) -> None:
+    index.upsert(1, index_terms("Cortez"))
+    assert index.search("air", limit=10) == [2]
+    assert index.search("cortez", limit=10) == [1]
+
+    index.remove(1)
+    assert index.search("cortez", limit=10) == []
+    assert len(index) == 2
+    assert index.size == len(index_terms("Air Force 1")) + len(index_terms("Max Runner"))
+
+
+def test_counts_halve_every_half_life() -> None:
+    clock = FakeClock()
+    counter = DecayingCounter(half_life_seconds=HALF_LIFE, max_entries=10, clock=clock)
+    counter.add("shoes")
+    counter.add("shoes")
+    clock.now += HALF_LIFE
+    assert counter.top(1) == [("shoes", pytest.approx(1.0))]
+
+    clock.now += HALF_LIFE
+    assert counter.top(1) == [("shoes", pytest.approx(0.5))]
+
+
+def test_recent_hits_outrank_older_ones() -> None:
+    clock = FakeClock()
+    counter = DecayingCounter(half_life_seconds=HALF_LIFE, max_entries=10, clock=clock)
+    for _ in range(3):
+        counter.add("boots")
+    clock.now += 2 * HALF_LIFE
+    counter.add("sandals")
+    counter.add("sandals")
+
+    assert counter.top(2) == [("sandals", pytest.approx(2.0)), ("boots", pytest.approx(0.75))]
+    assert counter.top(2, prefix="bo") == [("boots", pytest.approx(0.75))]
+
+
+def test_scores_survive_rebase() -> None:
+    clock = FakeClock()
+    counter = DecayingCounter(half_life_seconds=1.0, max_entries=10, clock=clock)
+    counter.add("old", 2.0**40)
+    clock.now += 70  # past MAX_DECAY_EXPONENT half-lives, forces a rebase
+    counter.add("new")
+
+    assert counter.top(2) == [("new", pytest.approx(1.0)), ("old", pytest.approx(2.0**-30))]
+
+
+def test_pruning_keeps_the_highest_counts() -> None:
+    counter = DecayingCounter(half_life_seconds=HALF_LIFE, max_entries=4, clock=FakeClock())
+    for position, key in enumerate("abcde"):
+        counter.add(key, position + 1)
+
+    assert len(counter) == 2
+    assert [key for key, _ in counter.top(10)] == ["e", "d"]
+
+
+class FakePool:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["FakePool"]:
+        yield self
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        return self.rows
+
+
+def product(product_id: int, name: str, review_count: Optional[int]) -> Dict[str, Any]:
+    return {
+        "id": product_id,
+        "name": name,
+        "slug": f"product-{product_id}",
+        "review_count": review_count,
+        "updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=product_id),
+    }
+
+
+@pytest.mark.asyncio
+async def test_suggestions_are_ranked_by_review_count() -> None:
+    pool = FakePool([product(1, "Air Max 90", 5), product(2, "Air Force 1", None), product(3, "Air Zoom", 50)])
+    service = SuggestService(
+        pool,
+        refresh_seconds=60,
+        full_rebuild_seconds=3600,
+        popular_half_life_seconds=HALF_LIFE,
+        popular_max_entries=10,
+        clock=FakeClock(),
+    )
+    service.record_query("Air Max")
+    service.record_query("a")  # shorter than MIN_QUERY_LENGTH
+
+    data = json.loads(await service.suggest("air", limit=2))["data"]
+    assert [suggestion["name"] for suggestion in data["products"]] == ["Air Zoom", "Air Max 90"]
+    assert [popular["query"] for popular in data["popular"]] == ["air max"]
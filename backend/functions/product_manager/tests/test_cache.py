@@ -0,0 +1,150 @@
+from typing import Any
+
+import pytest
+
+from core.cache import TTLCache
+from services.catalog_cache import DETAIL_NAMESPACE, LIST_NAMESPACE, CatalogCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock: FakeClock) -> TTLCache:
+    return TTLCache("test", max_entries=2, ttl_seconds=10, clock=clock)
+
+
+def test_entry_expires_after_ttl(cache: TTLCache, clock: FakeClock) -> None:
+    cache.set("a", 1)
+    clock.now += 9.9
+    assert cache.get("a") == 1
+
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.counters.expirations == 1
+
+
+def test_per_entry_ttl_overrides_default(cache: TTLCache, clock: FakeClock) -> None:
+    cache.set("a", 1, ttl_seconds=60)
+    clock.now += 30
+    assert cache.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted(cache: TTLCache) -> None:
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.counters.evictions == 1
+
+
+def test_delete_and_clear_invalidate(cache: TTLCache) -> None:
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.counters.invalidations == 2
+
+
+class VersionLoader:
+    def __init__(self, marker: Any) -> None:
+        self.marker = marker
+        self.calls = 0
+
+    async def __call__(self) -> Any:
+        self.calls += 1
+        if isinstance(self.marker, Exception):
+            raise self.marker
+        return self.marker
+
+
+def catalog_cache(loader: VersionLoader, *, enabled: bool = True, version_check_seconds: float = 0) -> CatalogCache:
+    return CatalogCache(
+        enabled=enabled,
+        max_entries=16,
+        ttl_seconds=60,
+        version_check_seconds=version_check_seconds,
+        version_loader=loader,
+    )
+
+
+@pytest.mark.asyncio
+async def test_catalog_cache_hit_under_same_version() -> None:
+    cache = catalog_cache(VersionLoader("t1"))
+    miss = await cache.lookup(LIST_NAMESPACE, "page-1")
+    assert miss.body is None
+    cache.store(LIST_NAMESPACE, "page-1", b"[]", miss.version)
+
+    assert (await cache.lookup(LIST_NAMESPACE, "page-1")).body == b"[]"
+    assert (await cache.lookup(DETAIL_NAMESPACE, "page-1")).body is None
+
+
+@pytest.mark.asyncio
+async def test_catalog_change_invalidates() -> None:
+    loader = VersionLoader("t1")
+    cache = catalog_cache(loader)
+    lookup = await cache.lookup(LIST_NAMESPACE, "page-1")
+    cache.store(LIST_NAMESPACE, "page-1", b"[]", lookup.version)
+
+    loader.marker = "t2"
+    lookup = await cache.lookup(LIST_NAMESPACE, "page-1")
+    assert lookup.body is None
+    assert lookup.version == 1
+
+
+@pytest.mark.asyncio
+async def test_body_rendered_under_old_version_is_dropped() -> None:
+    cache = catalog_cache(VersionLoader("t1"))
+    stale = await cache.lookup(DETAIL_NAMESPACE, "slug")
+    cache.invalidate()
+    cache.store(DETAIL_NAMESPACE, "slug", b"{}", stale.version)
+
+    assert (await cache.lookup(DETAIL_NAMESPACE, "slug")).body is None
+
+
+@pytest.mark.asyncio
+async def test_version_is_polled_at_most_every_check_interval() -> None:
+    loader = VersionLoader("t1")
+    cache = catalog_cache(loader, version_check_seconds=3600)
+    for _ in range(3):
+        await cache.lookup(LIST_NAMESPACE, "page-1")
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_version_check_keeps_serving() -> None:
+    loader = VersionLoader("t1")
+    cache = catalog_cache(loader)
+    lookup = await cache.lookup(LIST_NAMESPACE, "page-1")
+    cache.store(LIST_NAMESPACE, "page-1", b"[]", lookup.version)
+
+    loader.marker = ConnectionError("database down")
+    assert (await cache.lookup(LIST_NAMESPACE, "page-1")).body == b"[]"
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_stores_nothing() -> None:
+    loader = VersionLoader("t1")
+    cache = catalog_cache(loader, enabled=False)
+    cache.store(LIST_NAMESPACE, "page-1", b"[]", 0)
+
+    assert (await cache.lookup(LIST_NAMESPACE, "page-1")).body is None
+    assert loader.calls == 0
@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from core.config import DEFAULT_TOKEN_SECRET, MIN_TOKEN_SECRET_BYTES, Settings
+
+PRIVATE_SECRET = "0123456789abcdef" * 4
+
+
+def settings(environment: str, token_secret: str) -> Settings:
+    return Settings(_env_file=None, ENVIRONMENT=environment, TOKEN_SECRET=token_secret)
+
+
+@pytest.mark.parametrize("token_secret", ["", "  ", DEFAULT_TOKEN_SECRET, "your-secret-key-change-in-production"])
+def test_placeholder_secret_is_refused_outside_local(token_secret: str) -> None:
+    with pytest.raises(ValidationError, match="private value"):
+        settings("prod", token_secret)
+
+
+def test_short_secret_is_refused_outside_local() -> None:
+    with pytest.raises(ValidationError, match=f"at least {MIN_TOKEN_SECRET_BYTES} bytes"):
+        settings("dev", PRIVATE_SECRET[: MIN_TOKEN_SECRET_BYTES - 1])
+
+
+def test_private_secret_is_accepted() -> None:
+    assert settings("prod", PRIVATE_SECRET).TOKEN_SECRET == PRIVATE_SECRET
+
+
+def test_local_development_may_use_the_placeholder() -> None:
+    assert settings("local", DEFAULT_TOKEN_SECRET).TOKEN_SECRET == DEFAULT_TOKEN_SECRET
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+from pydantic import BaseModel
+
+from exceptions import ConflictException, UnprocessableEntityException
+from services import idempotency as idempotency_module
+from services.idempotency import REPLAYED_HEADER, CommitHook, IdempotencyStore
+
+SCOPE = "orders:user:1"
+TTL_SECONDS = 3600
+
+
+class OrderRequest(BaseModel):
+    cart_id: int
+
+
+class OrderResponse(BaseModel):
+    order_id: int
+
+
+class FakeDatabase:
+    """idempotency_keys rows by (scope, key), shared by every store like the real table."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["FakeDatabase"]:
+        yield self
+
+
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch) -> FakeDatabase:
+    database = FakeDatabase()
+
+    class FakeRepository:
+        def __init__(self, connection: Any) -> None:
+            pass
+
+        async def claim(
+            self, scope: str, key: str, fingerprint: bytes, *, lock_seconds: float, ttl_seconds: float
+        ) -> Optional[datetime]:
+            if (scope, key) in database.rows:
+                return None
+            claimed_at = datetime.now(timezone.utc)
+            database.rows[scope, key] = {
+                "claimed_at": claimed_at,
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "body": None,
+                "remaining_seconds": ttl_seconds,
+            }
+            return claimed_at
+
+        async def get(self, scope: str, key: str) -> Optional[Dict[str, Any]]:
+            return database.rows.get((scope, key))
+
+        async def complete(self, scope: str, key: str, claimed_at: datetime, status_code: int, body: bytes) -> bool:
+            row = database.rows.get((scope, key))
+            if row is None or row["claimed_at"] != claimed_at:
+                return False
+            row.update(status_code=status_code, body=body)
+            return True
+
+        async def release(self, scope: str, key: str, claimed_at: datetime) -> None:
+            if database.rows.get((scope, key), {}).get("claimed_at") == claimed_at:
+                del database.rows[scope, key]
+
+    monkeypatch.setattr(idempotency_module, "IdempotencyRepository", FakeRepository)
+    return database
+
+
+def idempotency_store(database: FakeDatabase) -> IdempotencyStore:
+    return IdempotencyStore(database, enabled=True, ttl_seconds=TTL_SECONDS, lock_seconds=30, max_entries=16)
+
+
+class Checkout:
+    """Handler that creates order 1, 2, ... and completes the key the way OrderService does."""
+
+    def __init__(self, *, gate: Optional[asyncio.Event] = None, error: Optional[Exception] = None) -> None:
+        self.calls = 0
+        self.gate = gate
+        self.error = error
+
+    async def __call__(self, commit: Optional[CommitHook]) -> OrderResponse:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        response = OrderResponse(order_id=self.calls)
+        if commit is not None:
+            await commit(None, response)
+        return response
+
+
+async def checkout(store: IdempotencyStore, handler: Checkout, key: Optional[str] = "key-1", cart_id: int = 7) -> Any:
+    return await store.respond(
+        key=key, scope=SCOPE, request=OrderRequest(cart_id=cart_id), status_code=201, handler=handler
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_the_stored_response(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    handler = Checkout()
+
+    first = await checkout(store, handler)
+    retry = await checkout(store, handler)
+
+    assert handler.calls == 1
+    assert (retry.status_code, retry.body) == (first.status_code, first.body) == (201, b'{"order_id":1}')
+    assert REPLAYED_HEADER not in first.headers
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert store.stats()["cache_replays"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_on_another_process_replays_from_the_database(database: FakeDatabase) -> None:
+    first = await checkout(idempotency_store(database), Checkout())
+
+    handler = Checkout()
+    other = idempotency_store(database)
+    retry = await checkout(other, handler)
+
+    assert handler.calls == 0
+    assert retry.body == first.body
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert other.stats()["database_replays"] == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request_is_rejected(database: FakeDatabase) -> None:
+    await checkout(idempotency_store(database), Checkout(), cart_id=7)
+
+    # From the in-process cache and from the database alike
+    for store in (idempotency_store(database), idempotency_store(database)):
+        with pytest.raises(UnprocessableEntityException):
+            await checkout(store, Checkout(), cart_id=8)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_collapse_into_one_attempt(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    handler = Checkout(gate=asyncio.Event())
+
+    attempts = [asyncio.create_task(checkout(store, handler)) for _ in range(5)]
+    await asyncio.sleep(0)
+    handler.gate.set()
+    responses = await asyncio.gather(*attempts)
+
+    assert handler.calls == 1
+    assert {response.body for response in responses} == {b'{"order_id":1}'}
+    assert [REPLAYED_HEADER in response.headers for response in responses].count(True) == 4
+    assert store.stats()["collapsed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_collapsed_duplicate_with_another_request_is_rejected(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    handler = Checkout(gate=asyncio.Event())
+
+    first = asyncio.create_task(checkout(store, handler, cart_id=7))
+    duplicate = asyncio.create_task(checkout(store, handler, cart_id=8))
+    await asyncio.sleep(0)
+    handler.gate.set()
+
+    assert (await first).status_code == 201
+    with pytest.raises(UnprocessableEntityException):
+        await duplicate
+
+
+@pytest.mark.asyncio
+async def test_attempt_running_on_another_process_conflicts(database: FakeDatabase) -> None:
+    handler = Checkout(gate=asyncio.Event())
+    running = asyncio.create_task(checkout(idempotency_store(database), handler))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ConflictException):
+        await checkout(idempotency_store(database), Checkout())
+
+    handler.gate.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_releases_the_key(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    with pytest.raises(ConflictException):
+        await checkout(store, Checkout(error=ConflictException("Insufficient stock")))
+    assert not database.rows
+
+    handler = Checkout()
+    assert (await checkout(store, handler)).status_code == 201
+    assert handler.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_response_is_not_replayed_from_memory(
+    database: FakeDatabase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = idempotency_store(database)
+    await checkout(store, Checkout())
+    database.rows.clear()  # purged from the table as well
+    later = time.time() + TTL_SECONDS
+    monkeypatch.setattr(idempotency_module, "time", SimpleNamespace(time=lambda: later))
+
+    handler = Checkout()
+    await checkout(store, handler)
+    assert handler.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_without_key_always_run(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    handler = Checkout()
+    responses: List[Any] = [await checkout(store, handler, key=None) for _ in range(2)]
+
+    assert handler.calls == 2
+    assert [response.body for response in responses] == [b'{"order_id":1}', b'{"order_id":2}']
+    assert not database.rows
+
+
+@pytest.mark.asyncio
+async def test_cancelled_attempt_gives_duplicates_a_retryable_conflict(database: FakeDatabase) -> None:
+    store = idempotency_store(database)
+    handler = Checkout(gate=asyncio.Event())
+
+    first = asyncio.create_task(checkout(store, handler))
+    duplicate = asyncio.create_task(checkout(store, handler))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    with pytest.raises(ConflictException):
+        await duplicate
+    assert not duplicate.cancelled()
+    assert handler.calls == 1
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.middleware import ConditionalGetMiddleware, MetricsMiddleware, cache_control
+from core import metrics
+from core.metrics import MetricsRegistry
+
+VERSION = "v1"
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> MetricsRegistry:
+    registry = MetricsRegistry(slow_query_samples=1)
+    monkeypatch.setattr(metrics, "metrics_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def client(registry: MetricsRegistry) -> httpx.AsyncClient:
+    app = FastAPI()
+
+    @app.get("/products/{slug}")
+    async def product(slug: str) -> Dict[str, Any]:
+        return {"slug": slug}
+
+    async def product_version(params: Dict[str, Any]) -> Optional[str]:
+        return VERSION if params["slug"] != "missing" else None
+
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        routes=app.routes,
+        resources={"/products/{slug}": product_version},
+        cache_control=cache_control(max_age=60, stale_while_revalidate=0),
+    )
+    app.add_middleware(MetricsMiddleware)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def requests_total(registry: MetricsRegistry) -> List[str]:
+    return [line for line in registry.render_prometheus().splitlines() if line.startswith("http_requests_total{")]
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_is_answered_304(client: httpx.AsyncClient) -> None:
+    response = await client.get("/products/air-max")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    etag = response.headers["etag"]
+    not_modified = await client.get("/products/air-max", headers={"if-none-match": f"W/{etag}"})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    other = await client.get("/products/cortez", headers={"if-none-match": etag})
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_304_is_filed_under_its_route(client: httpx.AsyncClient, registry: MetricsRegistry) -> None:
+    etag = (await client.get("/products/air-max")).headers["etag"]
+    await client.get("/products/air-max", headers={"if-none-match": etag})
+    await client.get("/nowhere")
+
+    assert requests_total(registry) == [
+        'http_requests_total{method="GET",route="/products/{slug}",status="200"} 1',
+        'http_requests_total{method="GET",route="/products/{slug}",status="304"} 1',
+        'http_requests_total{method="GET",route="unmatched",status="404"} 1',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resource_without_version_gets_no_etag(client: httpx.AsyncClient) -> None:
+    response = await client.get("/products/missing")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
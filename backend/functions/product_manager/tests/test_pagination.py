@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+import pytest
+
+from core.config import settings
+from exceptions import BadRequestException
+from helpers.pagination import Cursor, decode_cursor, encode_cursor, paginate
+
+
+@pytest.mark.parametrize(
+    "sort, key",
+    [
+        ("newest", datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)),
+        ("price_asc", Decimal("19.90")),
+        ("rating", Decimal("0")),
+    ],
+)
+def test_cursor_round_trip(sort: str, key: Any) -> None:
+    cursor = decode_cursor(encode_cursor(sort, key, 42), sort)
+    assert cursor == Cursor(sort=sort, key=key, id=42)
+    assert type(cursor.key) is type(key)
+
+
+def test_cursor_is_url_safe() -> None:
+    value = encode_cursor("price_asc", Decimal("19.90"), 42)
+    assert set(value) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.")
+
+
+def test_tampered_cursor_is_rejected() -> None:
+    _, signature = encode_cursor("price_asc", Decimal("19.90"), 42).split(".")
+    forged = json.dumps({"s": "price_asc", "t": "decimal", "k": "0.01", "i": 1}, separators=(",", ":")).encode()
+    forged_payload = base64.urlsafe_b64encode(forged).rstrip(b"=").decode()
+
+    with pytest.raises(BadRequestException):
+        decode_cursor(f"{forged_payload}.{signature}", "price_asc")
+
+
+def test_cursor_signed_with_another_key_is_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "TOKEN_SECRET", "another-secret-0123456789abcdefghij")
+    value = encode_cursor("newest", datetime(2026, 1, 2, tzinfo=timezone.utc), 42)
+    monkeypatch.undo()
+
+    with pytest.raises(BadRequestException):
+        decode_cursor(value, "newest")
+
+
+@pytest.mark.parametrize("value", ["", "garbage", "not.base64!", "YQ.YQ"])
+def test_malformed_cursor_is_rejected(value: str) -> None:
+    with pytest.raises(BadRequestException):
+        decode_cursor(value, "newest")
+
+
+def test_cursor_for_another_sort_is_rejected() -> None:
+    value = encode_cursor("price_asc", Decimal("19.90"), 42)
+    with pytest.raises(BadRequestException):
+        decode_cursor(value, "price_desc")
+
+
+def test_paginate_returns_cursor_after_last_row() -> None:
+    rows = [{"id": i, "sort_key": Decimal(i)} for i in range(1, 5)]
+
+    page, cursor = paginate(rows, 3, "price_asc")
+    assert page == rows[:3]
+    assert decode_cursor(cursor, "price_asc") == Cursor(sort="price_asc", key=Decimal(3), id=3)
+
+    assert paginate(rows[:3], 3, "price_asc") == (rows[:3], None)
@@ -0,0 +1,39 @@
+import pytest
+from passlib.context import CryptContext
+
+from core.passwords import PasswordHasher
+
+ROUNDS = 5  # bcrypt's minimum is 4; keep the tests fast
+
+
+def hash_at(rounds: int, password: str = "secret-password") -> str:
+    return CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds, bcrypt__min_rounds=4).hash(password)
+
+
+@pytest.fixture
+def hasher() -> PasswordHasher:
+    return PasswordHasher(workers=1, max_pending=8, rounds=ROUNDS)
+
+
+@pytest.mark.asyncio
+async def test_new_hashes_use_the_configured_cost(hasher: PasswordHasher) -> None:
+    assert (await hasher.hash("secret-password")).startswith(f"$2b$0{ROUNDS}$")
+
+
+@pytest.mark.asyncio
+async def test_costlier_hash_is_not_downgraded(hasher: PasswordHasher) -> None:
+    matches, new_hash = await hasher.verify_and_update("secret-password", hash_at(ROUNDS + 1))
+    assert matches
+    assert new_hash is None
+
+
+@pytest.mark.asyncio
+async def test_cheaper_hash_is_upgraded(hasher: PasswordHasher) -> None:
+    matches, new_hash = await hasher.verify_and_update("secret-password", hash_at(ROUNDS - 1))
+    assert matches
+    assert new_hash is not None and new_hash.startswith(f"$2b$0{ROUNDS}$")
+
+
+@pytest.mark.asyncio
+async def test_wrong_password_is_not_rehashed(hasher: PasswordHasher) -> None:
+    assert await hasher.verify_and_update("wrong-password", hash_at(ROUNDS - 1)) == (False, None)
@@ -0,0 +1,36 @@
+from typing import List
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.v1.endpoints import products
+from services.product_service import product_service
+
+
+@pytest.fixture
+def recorded(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    recorded: List[str] = []
+
+    async def search_products(keyword: str, **kwargs) -> bytes:
+        return b'{"success":true,"data":[]}'
+
+    monkeypatch.setattr(product_service, "search_products", search_products)
+    monkeypatch.setattr(products.suggest_service, "record_query", recorded.append)
+    return recorded
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(products.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_search_is_counted_once_across_its_pages(client: httpx.AsyncClient, recorded: List[str]) -> None:
+    for offset in (0, 20, 40):
+        response = await client.get("/products", params={"search": "air max", "offset": offset, "limit": 20})
+        assert response.status_code == 200
+
+    assert recorded == ["air max"]
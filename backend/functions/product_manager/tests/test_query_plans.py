@@ -0,0 +1,181 @@
+"""
+Plan checks of the hot queries (repositories.queries) against a seeded database.
+
+Every query is EXPLAINed twice: with parameters taken from the data, as planned for
+the first executions of a prepared statement (custom plan), and as the generic plan
+PostgreSQL caches for it afterwards (plan_cache_mode = force_generic_plan). A test
+fails when a plan does not use every index in the query's `indexes`, e.g. after a
+migration dropped idx_cart_items_cart_id or an edit made a query unable to use
+idx_product_variants_product_id. Nothing is executed, and the transaction is rolled back.
+
+The planner prefers sequential scans on small tables, so the database must hold data
+at a realistic scale: the load-test database of benchmarks/load_seed.py, named by
+QUERY_PLAN_DATABASE (default nexus_loadtest). The tests are skipped when it cannot
+be reached or is not seeded.
+
+    PYTHONPATH=app python benchmarks/load_seed.py --database nexus_loadtest
+    pytest tests/test_query_plans.py
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Set, Tuple
+
+import asyncpg
+import pytest
+
+from core.database import resolve_credentials
+from repositories.queries import (
+    CART_BY_SESSION,
+    CART_BY_USER,
+    CART_ITEMS,
+    EQUIVALENT_INDEXES,
+    HOT_QUERIES,
+    PRODUCT_BY_SLUG,
+    PRODUCT_DETAIL_VERSION,
+    PRODUCT_LIST,
+    PRODUCT_SORTS,
+    STOCK_RESERVE,
+    TOKEN_ACTIVE,
+    TOKEN_REMAINING_SECONDS,
+    VARIANTS_BY_PRODUCTS,
+    Query,
+)
+
+DATABASE = os.environ.get("QUERY_PLAN_DATABASE", "nexus_loadtest")
+PAGE_SIZE = 21
+OFFSET = 1000
+STATEMENT = "plan_check"
+
+# Indexes whose loss turns a hot path into a sequential scan of a large table
+CRITICAL_INDEXES = {
+    "idx_product_variants_product_id": [PRODUCT_DETAIL_VERSION, VARIANTS_BY_PRODUCTS],
+    "idx_cart_items_cart_id": [CART_BY_USER, CART_BY_SESSION, CART_ITEMS],
+}
+
+# The product in the middle of the catalog, with its sort keys and SKUs, plus a
+# user cart, a guest session, a cart with items and the newest token. The product
+# is picked first, so the subselects run once even on a table missing its indexes.
+SAMPLE_SQL = f"""
+    SELECT p.id,
+           p.slug,
+           {", ".join(f"{expression} AS {sort}_key" for sort, (expression, _, _) in PRODUCT_SORTS.items())},
+           (SELECT array_agg(v.sku ORDER BY v.sku) FROM product_variants v WHERE v.product_id = p.id) AS skus,
+           (SELECT c.user_id FROM carts c WHERE c.user_id IS NOT NULL ORDER BY c.id LIMIT 1) AS user_id,
+           (SELECT c.session_id FROM carts c WHERE c.user_id IS NULL ORDER BY c.id LIMIT 1) AS session_id,
+           (SELECT ci.cart_id FROM cart_items ci ORDER BY ci.id LIMIT 1) AS cart_id,
+           (SELECT t.token FROM access_token_log t ORDER BY t.id DESC LIMIT 1) AS token
+    FROM (
+        SELECT * FROM products ORDER BY id OFFSET (SELECT count(*) / 2 FROM products) LIMIT 1
+    ) AS p
+"""
+
+Plans = Dict[str, Dict[str, Set[str]]]
+
+
+def parameters(sample: asyncpg.Record) -> Dict[str, Tuple[Any, ...]]:
+    """Arguments per query name, the way the repositories pass them."""
+    pages = {
+        "first": lambda sort: (PAGE_SIZE,),
+        "cursor": lambda sort: (PAGE_SIZE, sample[f"{sort}_key"], sample["id"]),
+        "offset": lambda sort: (PAGE_SIZE, OFFSET),
+    }
+    args = {query.name: pages[page](sort) for (sort, page), query in PRODUCT_LIST.items()}
+    args.update(
+        {
+            PRODUCT_BY_SLUG.name: (sample["slug"],),
+            PRODUCT_DETAIL_VERSION.name: (sample["slug"],),
+            # The variants of one page of products
+            VARIANTS_BY_PRODUCTS.name: (list(range(sample["id"], sample["id"] + PAGE_SIZE)),),
+            CART_BY_USER.name: (sample["user_id"],),
+            CART_BY_SESSION.name: (sample["session_id"],),
+            CART_ITEMS.name: (sample["cart_id"],),
+            STOCK_RESERVE.name: (sample["skus"], [1] * len(sample["skus"])),
+            TOKEN_ACTIVE.name: (sample["token"],),
+            TOKEN_REMAINING_SECONDS.name: (sample["token"],),
+        }
+    )
+    return args
+
+
+def used_indexes(plan: Dict[str, Any]) -> Set[str]:
+    used = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        used |= used_indexes(child)
+    return used
+
+
+def missing_indexes(query: Query, used: Set[str]) -> List[str]:
+    return [index for index in query.indexes if not ({index} | EQUIVALENT_INDEXES.get(index, frozenset())) & used]
+
+
+async def explain(connection: asyncpg.Connection, query: Query, args: Tuple[Any, ...]) -> Dict[str, Set[str]]:
+    await connection.execute("SET LOCAL plan_cache_mode = force_custom_plan")
+    custom = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {query.sql}", *args)
+
+    # The generic plan ignores the parameter values, so NULLs do
+    await connection.execute(f"PREPARE {STATEMENT} AS {query.sql}")
+    try:
+        await connection.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+        nulls = ", ".join(["NULL"] * len(args))
+        generic = await connection.fetchval(f"EXPLAIN (FORMAT JSON) EXECUTE {STATEMENT}({nulls})")
+    finally:
+        await connection.execute(f"DEALLOCATE {STATEMENT}")
+
+    return {
+        "custom": used_indexes(json.loads(custom)[0]["Plan"]),
+        "generic": used_indexes(json.loads(generic)[0]["Plan"]),
+    }
+
+
+async def explain_hot_queries() -> Plans:
+    credentials = resolve_credentials()
+    try:
+        connection = await asyncpg.connect(
+            host=credentials.host,
+            port=credentials.port,
+            user=credentials.user,
+            password=credentials.password,
+            database=DATABASE,
+            timeout=5,
+        )
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as exc:
+        pytest.skip(f"database {DATABASE} is not reachable: {exc}")
+
+    try:
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            try:
+                sample = await connection.fetchrow(SAMPLE_SQL)
+            except asyncpg.UndefinedTableError as exc:
+                pytest.skip(f"database {DATABASE} has no schema: {exc}")
+            empty = [key for key, value in (sample or {"products": None}).items() if value is None]
+            if empty:
+                pytest.skip(f"database {DATABASE} is not seeded (benchmarks/load_seed.py); no sample for {empty}")
+
+            args = parameters(sample)
+            return {query.name: await explain(connection, query, args[query.name]) for query in HOT_QUERIES}
+        finally:
+            await transaction.rollback()
+    finally:
+        await connection.close()
+
+
+@pytest.fixture(scope="module")
+def plans() -> Plans:
+    return asyncio.run(explain_hot_queries())
+
+
+@pytest.mark.parametrize("index, queries", CRITICAL_INDEXES.items())
+def test_critical_indexes_are_declared(index: str, queries: List[Query]) -> None:
+    for query in queries:
+        assert index in query.indexes, f"{query.name} no longer declares {index}"
+
+
+@pytest.mark.parametrize("mode", ["custom", "generic"])
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=[query.name for query in HOT_QUERIES])
+def test_hot_query_uses_its_indexes(plans: Plans, query: Query, mode: str) -> None:
+    used = plans[query.name][mode]
+    assert missing_indexes(query, used) == [], f"{mode} plan of {query.name} uses {sorted(used)}"
@@ -0,0 +1,177 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import pytest
+
+from core.security import token_fingerprint
+from services import token_cache as token_cache_module
+from services.token_cache import TokenCache
+
+REFRESH_SECONDS = 30
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeDatabase:
+    """access_token_log as token -> expiry, plus the rows a refresh returns."""
+
+    def __init__(self, clock: FakeTime) -> None:
+        self.clock = clock
+        self.expires_at: Dict[str, float] = {}
+        self.changes: List[Dict[str, Any]] = []
+        self.lookups = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        yield None
+
+    def change(self, token: str, remaining_seconds: float) -> None:
+        updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=self.clock.now)
+        self.changes.append(
+            {
+                "fingerprint": token_fingerprint(token),
+                "remaining_seconds": remaining_seconds,
+                "updated_at": updated_at,
+            }
+        )
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeTime:
+    clock = FakeTime()
+    monkeypatch.setattr(token_cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def database(clock: FakeTime, monkeypatch: pytest.MonkeyPatch) -> FakeDatabase:
+    database = FakeDatabase(clock)
+
+    class FakeRepository:
+        def __init__(self, connection: None) -> None:
+            pass
+
+        async def is_active(self, token: str) -> bool:
+            return (await self.get_remaining_seconds(token) or 0) > 0
+
+        async def get_remaining_seconds(self, token: str) -> Optional[float]:
+            database.lookups += 1
+            expires_at = database.expires_at.get(token)
+            return None if expires_at is None else expires_at - clock.now
+
+        async def list_active(self, limit: int) -> List[Dict[str, Any]]:
+            return self._drain()
+
+        async def list_changed_since(self, watermark: datetime, overlap_seconds: float) -> List[Dict[str, Any]]:
+            return self._drain()
+
+        def _drain(self) -> List[Dict[str, Any]]:
+            rows, database.changes = database.changes, []
+            return rows
+
+    monkeypatch.setattr(token_cache_module, "AccessTokenRepository", FakeRepository)
+    return database
+
+
+def token_cache(database: FakeDatabase, *, enabled: bool = True, max_entries: int = 16) -> TokenCache:
+    return TokenCache(database, enabled=enabled, max_entries=max_entries, refresh_seconds=REFRESH_SECONDS)
+
+
+@pytest.mark.asyncio
+async def test_remembered_token_is_answered_from_memory(database: FakeDatabase) -> None:
+    cache = token_cache(database)
+    cache.remember("token", 3600)
+
+    assert await cache.is_active("token")
+    assert await cache.is_active("token")
+    assert database.lookups == 0
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_token_expires_from_memory(database: FakeDatabase, clock: FakeTime) -> None:
+    cache = token_cache(database)
+    cache.remember("token", 60)
+    clock.now += 60
+
+    assert not await cache.is_active("token")
+    assert database.lookups == 1
+
+    # Remembered as gone, so the next check does not hit the database again
+    assert not await cache.is_active("token")
+    assert database.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_local_revoke_is_immediate(database: FakeDatabase) -> None:
+    cache = token_cache(database)
+    cache.remember("token", 3600)
+    cache.forget("token")
+
+    assert not await cache.is_active("token")
+    assert database.lookups == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_token_is_checked_once_then_remembered(database: FakeDatabase, clock: FakeTime) -> None:
+    database.expires_at["token"] = clock.now + 3600
+    cache = token_cache(database)
+
+    assert await cache.is_active("token")
+    assert await cache.is_active("token")
+    assert database.lookups == 1
+    assert not await cache.is_active("never-issued")
+
+
+@pytest.mark.asyncio
+async def test_revoke_on_another_instance_is_seen_after_refresh(database: FakeDatabase, clock: FakeTime) -> None:
+    cache = token_cache(database)
+    cache.remember("token", 3600)
+    assert await cache.is_active("token")
+
+    database.change("token", remaining_seconds=0)
+    assert await cache.is_active("token")  # within the refresh interval
+
+    clock.now += REFRESH_SECONDS
+    assert not await cache.is_active("token")
+    assert database.lookups == 0
+
+
+@pytest.mark.asyncio
+async def test_token_issued_on_another_instance_is_loaded_by_refresh(database: FakeDatabase) -> None:
+    database.change("token", remaining_seconds=3600)
+    cache = token_cache(database)
+
+    assert await cache.is_active("token")
+    assert database.lookups == 0
+
+
+@pytest.mark.asyncio
+async def test_sets_are_bounded(database: FakeDatabase) -> None:
+    cache = token_cache(database, max_entries=2)
+    for token in ("a", "b", "c"):
+        cache.remember(token, 3600)
+        cache.forget(f"revoked-{token}")
+
+    assert cache.stats()["active"] == 2
+    assert cache.stats()["revoked"] == 2
+    assert not await cache.is_active("a")  # evicted, so checked against the database
+    assert database.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_asks_the_database(database: FakeDatabase, clock: FakeTime) -> None:
+    database.expires_at["token"] = clock.now + 3600
+    cache = token_cache(database, enabled=False)
+    cache.remember("token", 3600)
+
+    assert await cache.is_active("token")
+    assert await cache.is_active("token")
+    assert database.lookups == 2